@@ -83,6 +83,12 @@ class Constants(object):
 
 	hfVSI = 'X-M2M-VSI'
 	"""	HTTP header field: vendor information """
+
+	hfCTS = 'X-M2M-CTS'
+	"""	HTTP header field: content status """
+
+	hfCTO = 'X-M2M-CTO'
+	"""	HTTP header field: content offset """
 			
 	#
 	# 	Contstants for internal Resource attributes
@@ -15,6 +15,8 @@ from email.utils import formatdate
 from datetime import datetime, timedelta, timezone
 import isodate
 
+from ..helpers.CronPattern import compileCronPattern
+
 ##############################################################################
 #
 #	Time, Date, Timestamp related
@@ -273,93 +275,31 @@ def cronMatchesTimestamp(cronPattern:Union[str, list[str]],
 			ValueError: If *cronPattern* is invalid.
 	"""
 
-	def _parseMatchCronArg(element:str, target:int) -> bool:
-		"""	Parse and match a single cron element and match it against a target value.
-
-			Args:
-				element: A single cron element/pattern.
-				target: Target value to match.
-			
-			Return:
-				Indication whether the target value matches against the pattern element.
-
-			Raises:
-				ValueError: If *element* is invalid.
-		"""
+	if ts is None:
+		ts = utcDatetime()
+	return compileCronPattern(cronPattern).matches(ts)
 
-		# Return True if element is only a *, because this matches anything
-		if element == '*':
-			return True
 
-		# Either a list of values, of a single value 
-		for element in element.split(',') if ',' in element else [ element ] :
-			try:
-				# First, try a direct comparison
-				# If this isn't a number then continue after the exception
-				if int(element) == target:
-					return True
-				continue	# It didnt raise an exception, but didn't match either, so continue
-			except ValueError:
-				pass		# Exception, no number, but maybe a pattern
-			
-			# Value is something else, not a number, look for - or /
-			# If not, then ignore wrong format of value
-
-			if '-' in element:
-				step = 1
-				if '/' in element:
-					# Allow divider in values
-					try:
-						st, tmp = ( x for x in element.split('-') )	# tmp could be another value
-						start = int(st)
-						end, step =( int(x) for x in tmp.split('/') )
-					except ValueError:
-						raise ValueError(f'Invalid cron element: {element}')	# Error in any of the values
-				else:
-					try:
-						start, end = ( int(x) for x in element.split('-') )
-					except ValueError:
-						raise ValueError(f'Invalid cron element: {element}. Not a number.')	# Not a number
-
-				# If target value is in the range, it matches
-				if target in range(start, end + 1, step):
-					return True
-			
-				# Else continue
-				continue
-
-			if '/' in element:
-				v, interval = ( x for x in element.split('/') )
-				if v != '*':	
-					raise ValueError(f'Invalid cron element: {element}. Interval only for *.')	# Intervals only, if it is a *
-				# If the remainder is zero, this matches
-				try:
-					if target % int(interval) == 0:
-						return True
-				except ValueError:
-					raise ValueError(f'Invalid cron element: {element}. Not a number.')	# Not a number
-				# Else continue
-				continue
-
-			raise ValueError(f'Invalid cron element: {element}.')	# Not a number
+def cronNextMatch(cronPattern:Union[str, list[str]], 
+				  ts:Optional[datetime] = None) -> Optional[datetime]:
+	"""	Determine the next timestamp at or after *ts* that matches the *cronPattern*.
 
-		return False
+		This allows to wait until the next matching time instead of checking the pattern repeatedly.
+		See `cronMatchesTimestamp()` for the format of the pattern.
 
+		Args:
+			cronPattern: Either a string with the pattern or a list of strings, one for each pattern element.
+			ts: Optional timestamp. If *None* then a current UTC-based timestamp is used to fill the timestamp.
+		
+		Return:
+			The next matching timestamp with a precision of one second, or None if the pattern doesn't match within the next 100 years.
+		
+		Raises:
+			ValueError: If *cronPattern* is invalid.
+	"""
 	if ts is None:
 		ts = utcDatetime()
-	
-	cronElements = cronPattern.split() if isinstance(cronPattern, str) else cronPattern
-	if len(cronElements) != 7:
-		raise ValueError(f'Invalid or empty cron pattern: "{cronPattern}". Must have 7 elements.')
-
-	weekday = ts.isoweekday()
-	return  _parseMatchCronArg(cronElements[0], ts.second) \
-		and _parseMatchCronArg(cronElements[1], ts.minute) \
-		and _parseMatchCronArg(cronElements[2], ts.hour) \
-		and _parseMatchCronArg(cronElements[3], ts.day) \
-		and _parseMatchCronArg(cronElements[4], ts.month) \
-		and _parseMatchCronArg(cronElements[5], 0 if weekday == 7 else weekday) \
-		and _parseMatchCronArg(cronElements[6], ts.year)
+	return compileCronPattern(cronPattern).next(ts)
 
 
 def cronInPeriod(cronPattern:Union[str, 
@@ -370,10 +310,6 @@ def cronInPeriod(cronPattern:Union[str,
 	
 		This is useful for applications which cannot check every minute or need to catch up during a
 		restart, or want to determinethe next run at some time in the future.
-
-		Attention:
-			Be aware that this function just tries every minute between *startTs* and *endTs*, 
-			so it might take some time to execute.
 	
 		Args:
 			cronPattern: Either a string with the pattern or a list of strings, one for each pattern element.
@@ -397,12 +333,9 @@ def cronInPeriod(cronPattern:Union[str,
 	if endTs < startTs:
 		raise ValueError('timestamp must be before the current datetime.')
 
-	# Check for every minute
-	td = timedelta(minutes = 1)
-	while startTs <= endTs:
-		if cronMatchesTimestamp(cronPattern, startTs):
-			return True, startTs
-		startTs += td	# Increase by 1 minute for each iteration
+	# Find the first match at or after the start of the period
+	if (match := cronNextMatch(cronPattern, startTs)) is not None and match <= endTs:
+		return True, match
 
 	return False, None
 
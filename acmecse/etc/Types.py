@@ -1134,6 +1134,14 @@ class DesiredIdentifierResultType(ACMEIntEnum):
 	""" Unstructured. """
 
 
+class ContentStatus(ACMEIntEnum):
+	""" Content Status """
+	partialContent	= 1
+	""" Partial content. """
+	fullContent		= 2
+	""" Full content. """
+
+
 ##############################################################################
 #
 #	CSE related
@@ -2008,6 +2016,14 @@ class Result:
 	""" Optional `CSERequest`. """
 	embeddedRequest:Optional[CSERequest]	= None		# May contain a request as a response, e.g. when polling
 	""" Optional embedded `CSERequest`. """
+	cnst:Optional[ContentStatus]			= None		# Indicates a partial result, e.g. of a limited discovery
+	""" Optional content status. """
+	cnot:Optional[int]						= None
+	""" Optional content offset of a partial result. """
+	etag:Optional[str]						= None		# Entity tag of the content, e.g. for HTTP ETag headers
+	""" Optional entity tag of the content. """
+	notModified:bool						= False
+	""" Indicates that the content matches one of the request's entity tags. The result has no content then. """
 
 
 	# def errorResultCopy(self) -> Result:
@@ -2037,11 +2053,13 @@ class Result:
 	# 	return Result(status = False, rsc = rsc, request = request, dbg = dbg, data = data) 
 
 
-	def toData(self, ct:Optional[ContentSerializationType] = None) -> str|bytes|JSON:
+	def toData(self, ct:Optional[ContentSerializationType] = None,
+					 shared:Optional[bool] = False) -> str|bytes|JSON:
 		"""	Return the result data as a string or bytes or JSON.
 
 			Args:
 				ct: The content serialization type to use. If not given, the default serialization type is used.
+				shared: Whether a *PLAIN* resource representation may share its attribute values with the resource. It must then not be modified. The values are always shared for the other serialization types.
 
 			Return:
 				The result data as a string or bytes or JSON.
@@ -2053,7 +2071,8 @@ class Result:
 		ct = RC.defaultSerialization if not ct else ct
 
 		if isinstance(self.resource, Resource):
-			r = serializeData(self.resource.asDict(), ct)
+			# Serialized data doesn't need a copy of the attribute values
+			r = serializeData(self.resource.asDict(shared = shared or ct != ContentSerializationType.PLAIN), ct)
 		elif self.dbg:
 			r = serializeData({ 'm2m:dbg' : self.dbg }, ct)
 		elif isinstance(self.resource, dict):
@@ -2302,6 +2321,43 @@ class FilterCriteria:
 		return result
 
 
+	def canonical(self) -> str:
+		"""	Return a canonical string of all set Filter Criteria attributes, e.g. for an entity tag.
+
+			Equal filter criteria have the same canonical string, independent of the order of the
+			attributes and of the order of the values in lists.
+
+			Return:
+				String with the sorted attributes and their values.
+		"""
+
+		def _value(v:Any) -> Any:
+			if isinstance(v, list):
+				return sorted(repr(_value(e)) for e in v)
+			if isinstance(v, dict):
+				return sorted((k, repr(_value(e))) for k, e in v.items())
+			if isinstance(v, ACMEIntEnum):
+				return int(v)
+			return v
+
+		return repr(sorted( (k, _value(v))
+							for k, v in self.__dict__.items()
+							if v is not None and not k.startswith('_') ))
+
+
+	def dependsOnTime(self) -> bool:
+		"""	Check whether the result of the filter criteria may change over time without any resource being changed.
+
+			This is the case for the time-window criteria *crb*, *cra*, *ms*, *us*, *exb*, and *exa*, which
+			select resources close to their creation, modification, or expiration, and for advanced queries,
+			which may evaluate the current time.
+
+			Return:
+				True if the result may depend on the current time.
+		"""
+		return any(v is not None for v in (self.crb, self.cra, self.ms, self.us, self.exb, self.exa, self.aq))
+
+
 
 	def mapAttributes(self, cb:Callable, flattenList:bool) -> None:
 		"""	Map the standard and attribute Filter Criteria attributes.
@@ -2539,6 +2595,9 @@ class CSERequest:
 	_ma:Optional[float] = None
 	""" maxAge duration converted """
 
+	ifNoneMatch:Optional[list[str]] = None
+	""" Entity tags of the representations the originator already has (HTTP *If-None-Match* header, CoAP *ETag* option). A "*" matches any entity tag. """
+
 	pc:Optional[JSON] = None
 	""" The request's primitive content as a dictionary. """
 	
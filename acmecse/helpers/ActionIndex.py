@@ -0,0 +1,144 @@
+#
+#	ActionIndex.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+"""	An in-memory index of the action representations by their subject resources.
+"""
+
+from __future__ import annotations
+from typing import Optional, Iterable
+
+import sys
+from threading import Lock
+
+from ..etc.Types import JSON
+
+
+class ActionIndex():
+	"""	In-memory index of the resource IDs of the action representations, keyed by their subject resources.
+
+		The resource IDs for a subject are sorted by the actions' priorities (*apy*). Actions
+		without a priority come last. Actions with the same priority are kept in the order in which
+		they were added.
+
+		The index entries are immutable tuples that are replaced when an action is added or
+		removed, so that they can be read without a lock. Changes are serialized.
+	"""
+
+	__slots__ = (
+		'_subjects',
+		'_actions',
+		'_counter',
+		'_lock',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self) -> None:
+		"""	Initialize the index.
+		"""
+		self._subjects:dict[str, tuple[str, ...]] = {}
+		""" The sorted resource IDs of the actions, keyed by the subject resource IDs. """
+
+		self._actions:dict[str, tuple[str, int, int]] = {}
+		""" The subject resource ID, the priority, and the insertion number of each action, keyed by the action's resource ID. """
+
+		self._counter = 0
+		""" Counter for the insertion numbers. """
+
+		self._lock = Lock()
+		""" Lock to serialize the changes. """
+
+
+	def load(self, actions:Optional[Iterable[JSON]]) -> None:
+		"""	Replace the content of the index.
+
+			Args:
+				actions: The action representations.
+		"""
+		with self._lock:
+			self._subjects.clear()
+			self._actions.clear()
+			for action in actions or []:
+				self._add(action)
+
+
+	def clear(self) -> None:
+		"""	Remove all actions from the index.
+		"""
+		with self._lock:
+			self._subjects.clear()
+			self._actions.clear()
+
+
+	def add(self, action:JSON) -> None:
+		"""	Add an action representation to the index, or update it.
+
+			Args:
+				action: The action representation. It must contain the *ri*, *subject*, and *apy* attributes.
+		"""
+		with self._lock:
+			self._add(action)
+
+
+	def remove(self, ri:str) -> None:
+		"""	Remove an action from the index.
+
+			Args:
+				ri: The resource ID of the action.
+		"""
+		with self._lock:
+			if (entry := self._actions.pop(ri, None)) is None:
+				return
+			self._sortSubject(entry[0], removedRi = ri)
+
+
+	def forSubject(self, subjectRi:str) -> tuple[str, ...]:
+		"""	Return the resource IDs of the actions for a subject resource.
+
+			Args:
+				subjectRi: The resource ID of the subject resource.
+
+			Return:
+				The resource IDs of the actions, sorted by their priorities.
+		"""
+		return self._subjects.get(subjectRi, ())
+
+
+	def _add(self, action:JSON) -> None:
+		"""	Add or update an action. The caller must hold the lock.
+
+			Args:
+				action: The action representation.
+		"""
+		ri = action['ri']
+		previous = self._actions.get(ri)
+		if previous:
+			number = previous[2]	# Keep the position of an updated action
+		else:
+			number = self._counter = self._counter + 1
+		apy = action.get('apy')
+		self._actions[ri] = (action['subject'], apy if apy is not None else sys.maxsize, number)
+		if previous and previous[0] != action['subject']:
+			self._sortSubject(previous[0], removedRi = ri)
+		self._sortSubject(action['subject'], addedRi = ri)
+
+
+	def _sortSubject(self, subjectRi:str, addedRi:Optional[str] = None, removedRi:Optional[str] = None) -> None:
+		"""	Rebuild the sorted entry of a subject resource. The caller must hold the lock.
+
+			Args:
+				subjectRi: The resource ID of the subject resource.
+				addedRi: The resource ID of an action that is added to or updated for the subject resource.
+				removedRi: The resource ID of an action that is removed from the subject resource.
+		"""
+		ris = set(self._subjects.get(subjectRi, ()))
+		if addedRi:
+			ris.add(addedRi)
+		ris.discard(removedRi)
+		if ris:
+			self._subjects[subjectRi] = tuple(sorted(ris, key = lambda ri: self._actions[ri][1:]))
+		else:
+			self._subjects.pop(subjectRi, None)
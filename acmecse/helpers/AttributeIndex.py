@@ -0,0 +1,133 @@
+#
+#	AttributeIndex.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+"""	A hash index for attribute values of documents.
+"""
+
+from __future__ import annotations
+from typing import Any, Optional, Sequence, Iterable
+
+from ..etc.Types import JSON
+
+
+class AttributeIndex():
+	"""	A hash index that maps the values of a fixed set of top-level attributes to the
+		IDs of the documents that contain them.
+
+		For each indexed attribute the index holds a dictionary that maps an attribute value
+		to the document IDs with that value. The document IDs are kept in insertion order.
+		Documents that don't contain an attribute, or where the value is *None* or not hashable,
+		are not indexed for that attribute.
+
+		The index is not thread-safe. Callers must synchronize access.
+	"""
+
+	__slots__ = (
+		'attributes',
+		'_indexes',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self, attributes:Sequence[str]) -> None:
+		"""	Initialize an empty attribute index.
+
+			Args:
+				attributes: The names of the attributes to index.
+		"""
+		self.attributes = tuple(attributes)
+		""" The names of the indexed attributes. """
+
+		self._indexes:dict[str, dict[Any, dict[str, None]]] = { a: {} for a in self.attributes }
+		""" The value indexes, one for each attribute. The inner dictionaries are used as ordered sets. """
+
+
+	def values(self, doc:Optional[JSON]) -> dict[str, Any]:
+		"""	Extract the values of the indexed attributes from a document.
+
+			This can be used to save the indexed values of a document before it is modified in place.
+
+			Args:
+				doc: The document. May be None.
+
+			Return:
+				A dictionary with the values of the indexed attributes that are present in the document.
+		"""
+		if not doc:
+			return {}
+		return { a: v for a in self.attributes if (v := doc.get(a)) is not None }
+
+
+	def add(self, id:str, values:dict[str, Any]) -> None:
+		"""	Add a document to the index.
+
+			Args:
+				id: The document ID.
+				values: The document, or the values of the indexed attributes (see `values()`).
+		"""
+		for a in self.attributes:
+			if (v := values.get(a)) is not None:
+				try:
+					self._indexes[a].setdefault(v, {})[id] = None
+				except TypeError:
+					pass	# value is not hashable, e.g. a list. Don't index.
+
+
+	def remove(self, id:str, values:dict[str, Any]) -> None:
+		"""	Remove a document from the index.
+
+			Args:
+				id: The document ID.
+				values: The document, or the values of the indexed attributes as they were indexed (see `values()`).
+		"""
+		for a in self.attributes:
+			if (v := values.get(a)) is not None:
+				try:
+					if (ids := self._indexes[a].get(v)) is not None:
+						ids.pop(id, None)
+						if not ids:
+							del self._indexes[a][v]
+				except TypeError:
+					pass	# value is not hashable, so it wasn't indexed
+
+
+	def update(self, id:str, oldValues:dict[str, Any], newValues:dict[str, Any]) -> None:
+		"""	Update a document in the index.
+
+			Only the attributes whose values have changed are re-indexed.
+
+			Args:
+				id: The document ID.
+				oldValues: The values of the indexed attributes before the update (see `values()`).
+				newValues: The document, or the values of the indexed attributes after the update.
+		"""
+		for a in self.attributes:
+			if (old := oldValues.get(a)) != (new := newValues.get(a)):
+				self.remove(id, { a: old })
+				self.add(id, { a: new })
+
+
+	def get(self, attribute:str, value:Any) -> Iterable[str]:
+		"""	Return the IDs of the documents with a value for an attribute.
+
+			Args:
+				attribute: The name of the attribute. It must be one of the indexed attributes.
+				value: The value to look for.
+
+			Return:
+				An iterable of document IDs, in insertion order. It may be empty.
+		"""
+		try:
+			return self._indexes[attribute].get(value, {}).keys()
+		except TypeError:
+			return ()
+
+
+	def clear(self) -> None:
+		"""	Remove all entries from the index.
+		"""
+		for index in self._indexes.values():
+			index.clear()
@@ -0,0 +1,250 @@
+#
+#	BackupSnapshots.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+"""	Incremental backups of files into snapshot directories with a retention limit.
+"""
+
+from __future__ import annotations
+from typing import Optional, Callable, Sequence, Iterator, NamedTuple
+
+import hashlib, json, os, shutil
+from threading import Lock
+
+from ..etc.DateUtils import getResourceDate
+
+
+_manifest = 'manifest.json'
+""" Name of the manifest file in a snapshot directory. """
+
+_partial = '.partial'
+""" Suffix of a snapshot directory that is being created. """
+
+_ManifestEntry = NamedTuple('_ManifestEntry', [ ('size', int), ('mtime', int), ('hash', str) ])
+""" The manifest entry of a file: its size, modification time in nanoseconds, and SHA-256 content hash. """
+
+
+class BackupSnapshots():
+	"""	Incremental backups of files into timestamped snapshot directories.
+
+		Each backup creates a new snapshot directory that contains a complete copy of the
+		backed up files. A manifest in the snapshot directory records the size, modification
+		time, and SHA-256 hash of every file.
+
+		A file that has not changed since the previous snapshot is not copied again, but
+		hard-linked from the previous snapshot. A file is regarded as unchanged if its size
+		and modification time are the same as recorded in the previous manifest, or, when
+		they differ, if its content hash is the same. If hard links are not supported then
+		the file is copied. A writer gets the previous snapshot as well, so it can link the
+		files that it knows are unchanged itself. Those files are not hashed again.
+
+		A snapshot directory is created with a temporary name and only renamed when the backup
+		is complete, so incomplete snapshots are never used as the base of a backup. After
+		a backup the oldest snapshots are removed so that at most *retention* snapshots are kept.
+
+		Backups are serialized. The class is thread-safe.
+	"""
+
+	__slots__ = (
+		'path',
+		'retention',
+		'_lock',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self, path:str, retention:int) -> None:
+		"""	Initialize the backup snapshots.
+
+			Args:
+				path: The directory for the snapshot directories.
+				retention: The maximum number of snapshots to keep. Must be greater than 0.
+		"""
+		self.path = path
+		""" The directory for the snapshot directories. """
+
+		self.retention = retention
+		""" The maximum number of snapshots to keep. """
+
+		self._lock = Lock()
+		""" Lock to serialize the backups. """
+
+
+	def snapshots(self) -> list[str]:
+		"""	Return the complete snapshots.
+
+			Return:
+				The names of the snapshot directories, oldest first.
+		"""
+		if not os.path.isdir(self.path):
+			return []
+		return sorted(entry.name
+					  for entry in os.scandir(self.path)
+					  if entry.is_dir() and not entry.name.endswith(_partial) and os.path.isfile(os.path.join(entry.path, _manifest)))
+
+
+	def create(self, files:Optional[Sequence[str]] = None, writer:Optional[Callable[[str, Optional[str]], bool]] = None) -> Optional[str]:
+		"""	Create a new snapshot.
+
+			The content of the snapshot is either copied from a list of files and directories, or
+			written by a *writer* function. Files that are written by the writer are hard-linked
+			from the previous snapshot afterwards if their content didn't change.
+
+			Args:
+				files: The files and directories to back up. Directories are backed up recursively. Files that don't exist are skipped.
+				writer: A function that writes the backup to the directory that is passed as the first argument, and returns *True* on success. The second argument is the previous snapshot directory, or None.
+
+			Return:
+				The path of the new snapshot directory, or None if the writer failed.
+		"""
+		with self._lock:
+			name = getResourceDate()
+			target = os.path.join(self.path, name + _partial)
+			os.makedirs(target, exist_ok = True)
+
+			previous = self._previous()
+			manifest:dict[str, _ManifestEntry] = {}
+
+			# Copy the files, or let the writer create them
+			for source, relPath in self._walk(files or []):
+				try:
+					stat = os.stat(source)
+					if (known := previous[1].get(relPath)) and (known.size, known.mtime) == (stat.st_size, stat.st_mtime_ns):
+						entry = known		# Unchanged, no need to read the file
+					else:
+						entry = _ManifestEntry(stat.st_size, stat.st_mtime_ns, _hashFile(source))
+					self._store(source, relPath, target, entry, previous)
+				except FileNotFoundError:
+					continue	# Removed in the meantime
+				manifest[relPath] = entry
+
+			if writer:
+				if not writer(target, previous[0]):
+					shutil.rmtree(target, ignore_errors = True)
+					return None
+				for written, relPath in self._walk([ os.path.join(target, f) for f in os.listdir(target) ]):
+					if (known := previous[1].get(relPath)) and os.path.samefile(written, os.path.join(previous[0], relPath)):	# type:ignore[arg-type]
+						manifest[relPath] = known	# Linked by the writer, no need to read the file
+						continue
+					stat = os.stat(written)
+					entry = _ManifestEntry(stat.st_size, stat.st_mtime_ns, _hashFile(written))
+					if known and known.hash == entry.hash:
+						os.remove(written)
+						self._store(os.path.join(previous[0], relPath), relPath, target, entry, previous)	# type:ignore[arg-type]
+					manifest[relPath] = entry
+
+			with open(os.path.join(target, _manifest), 'w', encoding = 'utf-8') as file:
+				json.dump(manifest, file, indent = 1)
+			snapshot = os.path.join(self.path, name)
+			os.rename(target, snapshot)
+
+			self._rotate()
+			return snapshot
+
+
+	def _previous(self) -> tuple[Optional[str], dict[str, _ManifestEntry]]:
+		"""	Return the latest complete snapshot and its manifest.
+
+			Return:
+				Tuple with the path of the snapshot directory and its manifest. The path is None and the manifest empty if there is no snapshot yet.
+		"""
+		for name in reversed(self.snapshots()):
+			snapshot = os.path.join(self.path, name)
+			try:
+				with open(os.path.join(snapshot, _manifest), 'r', encoding = 'utf-8') as file:
+					return snapshot, { relPath: _ManifestEntry(*entry) for relPath, entry in json.load(file).items() }
+			except (OSError, ValueError, TypeError):
+				continue	# Try the next older snapshot
+		return None, {}
+
+
+	def _store(self, source:str, relPath:str, target:str, entry:_ManifestEntry, previous:tuple[Optional[str], dict[str, _ManifestEntry]]) -> None:
+		"""	Store a file in a snapshot. Link it from the previous snapshot if it is unchanged, or copy it otherwise.
+
+			Args:
+				source: The path of the source file.
+				relPath: The path of the file relative to the snapshot directory.
+				target: The snapshot directory.
+				entry: The manifest entry of the file.
+				previous: The previous snapshot and its manifest.
+		"""
+		destination = os.path.join(target, relPath)
+		os.makedirs(os.path.dirname(destination), exist_ok = True)
+		if previous[0] and (known := previous[1].get(relPath)) and known.hash == entry.hash:
+			try:
+				os.link(os.path.join(previous[0], relPath), destination)
+				return
+			except OSError:
+				pass	# Fall back to copying
+		shutil.copy2(source, destination)
+
+
+	def _walk(self, files:Sequence[str]) -> Iterator[tuple[str, str]]:
+		"""	Iterate over the files to back up, and expand directories recursively.
+
+			Args:
+				files: The files and directories.
+
+			Return:
+				Iterator over tuples with the path of a file and its path relative to the snapshot directory.
+		"""
+		for path in files:
+			base = os.path.basename(path)
+			if os.path.isdir(path):
+				for root, _, fileNames in os.walk(path):
+					for fileName in sorted(fileNames):
+						fullPath = os.path.join(root, fileName)
+						yield fullPath, os.path.join(base, os.path.relpath(fullPath, path))
+			elif base != _manifest:
+				yield path, base
+
+
+	def _rotate(self) -> None:
+		"""	Remove the oldest snapshots beyond the retention limit, and left-over incomplete snapshots.
+		"""
+		for name in self.snapshots()[:-self.retention]:
+			shutil.rmtree(os.path.join(self.path, name), ignore_errors = True)
+		for entry in os.scandir(self.path):
+			if entry.is_dir() and entry.name.endswith(_partial):
+				shutil.rmtree(entry.path, ignore_errors = True)
+
+
+def linkUnchanged(stat:os.stat_result, previous:Optional[str], destination:str) -> bool:
+	"""	Hard-link a file from a previous backup if it has the same size and modification time as a source file.
+
+		Args:
+			stat: The status of the source file.
+			previous: The path of the file in the previous backup, or None if there is no previous backup.
+			destination: The path of the file in the new backup.
+
+		Return:
+			True if the file was linked, or False if it must be copied.
+	"""
+	if not previous:
+		return False
+	try:
+		known = os.stat(previous)
+		if (known.st_size, known.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+			return False
+		os.link(previous, destination)
+		return True
+	except OSError:
+		return False	# Not in the previous backup, or hard links are not supported
+
+
+def _hashFile(path:str) -> str:
+	"""	Calculate the SHA-256 hash of a file's content.
+
+		Args:
+			path: The path of the file.
+
+		Return:
+			The hash as a hex string.
+	"""
+	digest = hashlib.sha256()
+	with open(path, 'rb') as file:
+		while (chunk := file.read(1024 * 1024)):
+			digest.update(chunk)
+	return digest.hexdigest()
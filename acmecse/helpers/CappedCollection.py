@@ -0,0 +1,151 @@
+#
+#	CappedCollection.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+"""	A collection of documents with a maximum size that evicts the oldest documents first.
+"""
+
+from __future__ import annotations
+from typing import Optional
+from collections import OrderedDict
+
+from ..etc.Types import JSON
+
+
+class CappedCollection():
+	"""	A collection of documents, ordered by their insertion, with a maximum number of documents.
+
+		The collection works like a ring: when a document is added to a full collection, then
+		the oldest documents are evicted. Adding a document and evicting the oldest document
+		are O(1) operations.
+
+		In addition, the collection keeps an index of the document keys per resource ID, so
+		that the documents for a resource can be retrieved and removed without scanning
+		the whole collection.
+
+		The collection is not thread-safe. Callers must synchronize access.
+	"""
+
+	__slots__ = (
+		'_documents',
+		'_index',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self) -> None:
+		"""	Initialize an empty collection.
+		"""
+		self._documents:OrderedDict[str, tuple[Optional[str], JSON]] = OrderedDict()
+		""" The (ri, document) tuples, keyed by the document keys, in insertion order. """
+
+		self._index:dict[str, dict[str, None]] = {}
+		""" The document keys per resource ID. The inner dictionaries are used as ordered sets. """
+
+
+	def add(self, key:str, ri:Optional[str], doc:JSON, maxSize:Optional[int] = None) -> list[str]:
+		"""	Add a document to the collection and evict the oldest documents if the collection
+			is full.
+
+			The maximum size is passed with each call, so that it can be changed at runtime.
+
+			Args:
+				key: The unique key of the document.
+				ri: The resource ID for which the document is indexed. May be None.
+				doc: The document.
+				maxSize: The maximum number of documents to keep. If None, then no document is evicted.
+
+			Return:
+				The keys of the evicted documents, oldest first.
+		"""
+		# A document with the same key is replaced and becomes the newest document
+		if (_old := self._documents.pop(key, None)) is not None:
+			self._unindex(key, _old[0])
+		self._documents[key] = (ri, doc)
+		if ri is not None:
+			self._index.setdefault(ri, {})[key] = None
+
+		evicted:list[str] = []
+		if maxSize is None:
+			return evicted
+		while len(self._documents) > max(maxSize, 0):
+			_key, (_ri, _) = self._documents.popitem(last = False)
+			self._unindex(_key, _ri)
+			evicted.append(_key)
+		return evicted
+
+
+	def get(self, ri:Optional[str] = None) -> list[JSON]:
+		"""	Return the documents for a resource ID, or all documents.
+
+			Args:
+				ri: The resource ID. If *None* or empty, then all documents are returned.
+
+			Return:
+				The documents in insertion order. The list may be empty.
+		"""
+		if not ri:
+			return [ doc for _, doc in self._documents.values() ]
+		return [ self._documents[key][1] for key in self._index.get(ri, ()) ]
+
+
+	def remove(self, ri:Optional[str] = None) -> list[str]:
+		"""	Remove the documents for a resource ID, or all documents.
+
+			Args:
+				ri: The resource ID. If *None* or empty, then all documents are removed.
+
+			Return:
+				The keys of the removed documents.
+		"""
+		if not ri:
+			keys = list(self._documents.keys())
+			self.clear()
+			return keys
+		keys = list(self._index.pop(ri, {}).keys())
+		for key in keys:
+			del self._documents[key]
+		return keys
+
+
+	def clear(self) -> None:
+		"""	Remove all documents from the collection.
+		"""
+		self._documents.clear()
+		self._index.clear()
+
+
+	def __contains__(self, key:object) -> bool:
+		"""	Check whether a document with a key is in the collection.
+
+			Args:
+				key: The document key.
+
+			Return:
+				True if the collection contains the document, False otherwise.
+		"""
+		return key in self._documents
+
+
+	def __len__(self) -> int:
+		"""	Return the number of documents in the collection.
+
+			Return:
+				The number of documents.
+		"""
+		return len(self._documents)
+
+
+	def _unindex(self, key:str, ri:Optional[str]) -> None:
+		"""	Remove a document key from the resource ID index.
+
+			Args:
+				key: The document key.
+				ri: The resource ID for which the document was indexed. May be None.
+		"""
+		if ri is not None and (keys := self._index.get(ri)) is not None:
+			keys.pop(key, None)
+			if not keys:
+				del self._index[ri]
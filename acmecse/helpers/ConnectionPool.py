@@ -0,0 +1,255 @@
+#
+#	ConnectionPool.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+"""	A bounded, thread-safe pool for database connections.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Iterator, Optional
+
+from contextlib import contextmanager
+from threading import Condition, local
+from time import monotonic
+
+
+class ConnectionPool():
+	"""	A bounded pool of database connections with per-thread checkout.
+
+		A thread checks out a connection with the `connection()` context manager. While a thread
+		holds a connection, nested checkouts in the same thread return the same connection.
+		When all connections are in use and the pool has reached its maximum size, a checkout
+		waits until a connection is returned to the pool.
+
+		The pool is independent of a database library. Connections are created, checked, and
+		closed by callback functions:
+
+		- *connect()* creates and returns a new connection. This is the place to prepare statements for the connection.
+		- *check(connection)* returns *True* if the connection is still usable. It is called for connections that have been idle for some time.
+		- *isClosed(connection)* returns *True* if the connection has been closed, e.g. after an error.
+		- *close(connection)* closes a connection.
+	"""
+
+	__slots__ = (
+		'_connect',
+		'_check',
+		'_isClosed',
+		'_close',
+		'_minSize',
+		'_maxSize',
+		'_timeout',
+		'_checkInterval',
+		'_idle',
+		'_size',
+		'_closed',
+		'_condition',
+		'_local',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self, connect:Callable[[], Any],
+					   check:Callable[[Any], bool],
+					   isClosed:Callable[[Any], bool],
+					   close:Callable[[Any], None],
+					   minSize:int = 1,
+					   maxSize:int = 10,
+					   timeout:float = 30.0,
+					   checkInterval:float = 60.0) -> None:
+		"""	Initialize the connection pool. No connections are created until `open()` is called.
+
+			Args:
+				connect: Callback to create a new connection.
+				check: Callback to check whether an idle connection is still usable.
+				isClosed: Callback to determine whether a connection has been closed.
+				close: Callback to close a connection.
+				minSize: The number of connections that are created when the pool is opened.
+				maxSize: The maximum number of connections.
+				timeout: The time in seconds to wait for a free connection before a *TimeoutError* is raised.
+				checkInterval: Idle time in seconds after which a connection is checked before it is handed out.
+		"""
+		self._connect = connect
+		""" Callback to create a new connection. """
+		self._check = check
+		""" Callback to check whether a connection is still usable. """
+		self._isClosed = isClosed
+		""" Callback to determine whether a connection has been closed. """
+		self._close = close
+		""" Callback to close a connection. """
+		self._minSize = minSize
+		""" The number of connections that are created when the pool is opened. """
+		self._maxSize = maxSize
+		""" The maximum number of connections. """
+		self._timeout = timeout
+		""" The time in seconds to wait for a free connection. """
+		self._checkInterval = checkInterval
+		""" Idle time in seconds after which a connection is checked. """
+		self._idle:list[tuple[Any, float]] = []
+		""" The idle connections and the times when they were returned to the pool. """
+		self._size = 0
+		""" The number of open connections, idle or in use. """
+		self._closed = False
+		""" Indicator that the pool has been closed. """
+		self._condition = Condition()
+		""" Condition to protect the pool's state and to wait for free connections. """
+		self._local = local()
+		""" Thread-local storage for the connection that a thread currently holds. """
+
+
+	def __len__(self) -> int:
+		"""	Return the number of open connections.
+
+			Return:
+				The number of open connections, idle or in use.
+		"""
+		return self._size
+
+
+	def open(self) -> None:
+		"""	Open the pool and create the minimum number of connections.
+		"""
+		self._closed = False
+		connections = [ self._acquire() for _ in range(self._minSize) ]
+		for connection in connections:
+			self._release(connection)
+
+
+	def close(self) -> None:
+		"""	Close the pool and all idle connections. Connections that are in use are closed when they are returned.
+		"""
+		with self._condition:
+			self._closed = True
+			idle = self._idle
+			self._idle = []
+			self._size -= len(idle)
+			self._condition.notify_all()
+		for connection, _ in idle:
+			self._closeQuietly(connection)
+
+
+	@contextmanager
+	def connection(self) -> Iterator[Any]:
+		"""	Check out a connection for the current thread.
+
+			The connection is returned to the pool when the context is left. If the connection
+			has been closed in the meantime, e.g. because of an error, it is discarded instead.
+
+			Return:
+				A context manager that yields a connection.
+
+			Raises:
+				TimeoutError: If no connection became available within the timeout.
+				RuntimeError: If the pool is closed.
+		"""
+		if (connection := getattr(self._local, 'connection', None)) is not None:
+			yield connection	# nested checkout in the same thread
+			return
+
+		connection = self._acquire()
+		self._local.connection = connection
+		try:
+			yield connection
+		finally:
+			self._local.connection = None
+			self._release(connection)
+
+
+	@contextmanager
+	def dedicatedConnection(self) -> Iterator[Any]:
+		"""	Check out a connection that is not shared with nested checkouts of the current thread.
+
+			This is used for long-running reads, e.g. a server-side cursor that is consumed while
+			other statements are executed by the same thread. The connection is returned to the pool
+			when the context is left.
+
+			Return:
+				A context manager that yields a connection.
+
+			Raises:
+				TimeoutError: If no connection became available within the timeout.
+				RuntimeError: If the pool is closed.
+		"""
+		connection = self._acquire()
+		try:
+			yield connection
+		finally:
+			self._release(connection)
+
+
+	def _acquire(self) -> Any:
+		"""	Get an idle connection, or create a new one if the pool is not exhausted.
+
+			Return:
+				A connection.
+		"""
+		deadline = monotonic() + self._timeout
+		while True:
+			connection = None
+			with self._condition:
+				while True:
+					if self._closed:
+						raise RuntimeError('Connection pool is closed')
+					if self._idle:
+						connection, lastUsed = self._idle.pop()	# most recently used first
+						break
+					if self._size < self._maxSize:
+						self._size += 1		# reserve a slot for a new connection
+						break
+					if (remaining := deadline - monotonic()) <= 0:
+						raise TimeoutError('No database connection available')
+					self._condition.wait(remaining)
+
+			# Create a new connection outside of the lock
+			if connection is None:
+				try:
+					return self._connect()
+				except Exception:
+					self._discard(None)
+					raise
+
+			# Check connections that have been idle for a while
+			if self._isClosed(connection) or (monotonic() - lastUsed > self._checkInterval and not self._check(connection)):
+				self._discard(connection)
+				continue
+			return connection
+
+
+	def _release(self, connection:Any) -> None:
+		"""	Return a connection to the pool, or discard it if it is closed.
+
+			Args:
+				connection: The connection to return.
+		"""
+		if self._closed or self._isClosed(connection):
+			self._discard(connection)
+			return
+		with self._condition:
+			self._idle.append((connection, monotonic()))
+			self._condition.notify()
+
+
+	def _discard(self, connection:Optional[Any]) -> None:
+		"""	Remove a connection from the pool and close it.
+
+			Args:
+				connection: The connection to discard, or None if the connection couldn't be created.
+		"""
+		with self._condition:
+			self._size -= 1
+			self._condition.notify()
+		if connection is not None:
+			self._closeQuietly(connection)
+
+
+	def _closeQuietly(self, connection:Any) -> None:
+		"""	Close a connection and ignore any error.
+
+			Args:
+				connection: The connection to close.
+		"""
+		try:
+			self._close(connection)
+		except Exception:
+			pass
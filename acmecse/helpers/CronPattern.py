@@ -0,0 +1,311 @@
+#
+#	CronPattern.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+"""	Compiled cron-like patterns with a shared cache.
+"""
+
+from __future__ import annotations
+from typing import Optional, Union, Iterator
+
+from calendar import monthrange
+from datetime import datetime, date, timedelta
+from functools import lru_cache
+
+
+_cacheSize = 256
+""" Maximum number of compiled cron patterns in the cache. """
+
+_searchYears = 100
+""" Number of years that are searched for the next matching timestamp. """
+
+
+class CronPattern():
+	r"""	A compiled cron-like pattern.
+
+		The pattern must follow the usual crontab pattern of 7 fields:
+
+			second minute hour dayOfMonth month dayOfWeek year
+
+		which each must comply to the following patterns:
+
+		- \* : any integer value
+		- \*/num : step values
+		- num[,num]\* : value list separator (either num, range or step)
+		- num-num : range of values
+		- num-num/num : range of values with a step
+
+		The fields with a limited range of values are compiled to bitsets, in which bit *n* is set
+		if the value *n* matches. The year field is compiled to a list of ranges and divisors.
+
+		Compiled patterns should be retrieved with `compileCronPattern()`, which caches them.
+	"""
+
+	__slots__ = (
+		'pattern',
+		'seconds',
+		'minutes',
+		'hours',
+		'days',
+		'months',
+		'weekdays',
+		'years',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self, pattern:Union[str, tuple[str, ...]]) -> None:
+		"""	Compile a cron pattern.
+
+			Args:
+				pattern: Either a string with the pattern or a tuple of strings, one for each pattern element.
+
+			Raises:
+				ValueError: If *pattern* is invalid.
+		"""
+		elements = pattern.split() if isinstance(pattern, str) else pattern
+		if len(elements) != 7:
+			raise ValueError(f'Invalid or empty cron pattern: "{pattern}". Must have 7 elements.')
+
+		self.pattern = pattern
+		""" The original pattern. """
+
+		self.seconds = _bitset(elements[0], 0, 59)
+		""" Bitset of the matching seconds. """
+
+		self.minutes = _bitset(elements[1], 0, 59)
+		""" Bitset of the matching minutes. """
+
+		self.hours = _bitset(elements[2], 0, 23)
+		""" Bitset of the matching hours. """
+
+		self.days = _bitset(elements[3], 1, 31)
+		""" Bitset of the matching days of the month. """
+
+		self.months = _bitset(elements[4], 1, 12)
+		""" Bitset of the matching months. """
+
+		self.weekdays = _bitset(elements[5], 0, 6)
+		""" Bitset of the matching days of the week. Sunday is 0. """
+
+		self.years = _parseField(elements[6])
+		""" Tuple of the ranges and divisors of the matching years, or None if any year matches. """
+
+
+	def matches(self, ts:datetime) -> bool:
+		"""	Test whether the pattern matches a timestamp.
+
+			Args:
+				ts: The timestamp.
+
+			Return:
+				True if the pattern matches the timestamp.
+		"""
+		return bool(self.seconds >> ts.second & 1
+					and self.minutes >> ts.minute & 1
+					and self.hours >> ts.hour & 1
+					and self.days >> ts.day & 1
+					and self.months >> ts.month & 1
+					and self.weekdays >> (ts.isoweekday() % 7) & 1
+					and self._matchesYear(ts.year))
+
+
+	def next(self, ts:datetime) -> Optional[datetime]:
+		"""	Find the first timestamp at or after a timestamp that matches the pattern. The precision is one second.
+
+			Args:
+				ts: The timestamp to start with. Fractions of a second are rounded up to the next full second.
+
+			Return:
+				The first matching timestamp, with the same timezone as *ts*, or None if there is no matching timestamp within the next 100 years.
+		"""
+		if ts.microsecond:
+			ts = ts.replace(microsecond = 0) + timedelta(seconds = 1)
+		if not (self.seconds and self.minutes and self.hours and self.days and self.months and self.weekdays):
+			return None
+
+		for year in range(ts.year, ts.year + _searchYears):
+			if not self._matchesYear(year):
+				continue
+			later = year > ts.year
+			for month in _values(self.months, 1 if later else ts.month, 12):
+				laterMonth = later or month > ts.month
+				for day in _values(self.days, 1 if laterMonth else ts.day, monthrange(year, month)[1]):
+					if not self.weekdays >> (date(year, month, day).isoweekday() % 7) & 1:
+						continue
+					laterDay = laterMonth or day > ts.day
+					for hour in _values(self.hours, 0 if laterDay else ts.hour, 23):
+						laterHour = laterDay or hour > ts.hour
+						for minute in _values(self.minutes, 0 if laterHour else ts.minute, 59):
+							laterMinute = laterHour or minute > ts.minute
+							for second in _values(self.seconds, 0 if laterMinute else ts.second, 59):
+								return ts.replace(year = year, month = month, day = day, hour = hour, minute = minute, second = second)
+		return None
+
+
+	def _matchesYear(self, year:int) -> bool:
+		"""	Test whether the pattern matches a year.
+
+			Args:
+				year: The year.
+
+			Return:
+				True if the pattern matches the year.
+		"""
+		if self.years is None:
+			return True
+		ranges, divisors = self.years
+		return any(year in r for r in ranges) or any(year % d == 0 for d in divisors)
+
+
+	def __repr__(self) -> str:
+		return f'CronPattern({self.pattern!r})'
+
+
+@lru_cache(maxsize = _cacheSize)
+def _compile(pattern:Union[str, tuple[str, ...]]) -> CronPattern:
+	"""	Compile a cron pattern. The result is cached.
+
+		Args:
+			pattern: Either a string with the pattern or a tuple of strings, one for each pattern element.
+
+		Return:
+			The compiled pattern.
+
+		Raises:
+			ValueError: If *pattern* is invalid.
+	"""
+	return CronPattern(pattern)
+
+
+def compileCronPattern(pattern:Union[str, list[str], tuple[str, ...]]) -> CronPattern:
+	"""	Return a compiled cron pattern from a bounded cache that is shared by all callers.
+
+		Args:
+			pattern: Either a string with the pattern or a list of strings, one for each pattern element.
+
+		Return:
+			The compiled pattern.
+
+		Raises:
+			ValueError: If *pattern* is invalid.
+	"""
+	return _compile(pattern if isinstance(pattern, str) else tuple(pattern))
+
+
+def _parseField(field:str) -> Optional[tuple[tuple[range, ...], tuple[int, ...]]]:
+	"""	Parse a single cron field.
+
+		Args:
+			field: A single cron field.
+
+		Return:
+			Tuple with the ranges of the matching values, and the divisors for the step values (*/num). None if the field is *.
+
+		Raises:
+			ValueError: If *field* is invalid.
+	"""
+	# A * matches anything
+	if field == '*':
+		return None
+
+	ranges:list[range] = []
+	divisors:list[int] = []
+
+	# Either a list of values, of a single value
+	for element in field.split(','):
+		try:
+			# First, try a single number
+			# If this isn't a number then continue after the exception
+			value = int(element)
+			ranges.append(range(value, value + 1))
+			continue
+		except ValueError:
+			pass		# Exception, no number, but maybe a pattern
+
+		# Value is something else, not a number, look for - or /
+		if '-' in element:
+			step = 1
+			if '/' in element:
+				# Allow divider in values
+				try:
+					st, tmp = element.split('-')	# tmp could be another value
+					start = int(st)
+					end, step = ( int(x) for x in tmp.split('/') )
+				except ValueError:
+					raise ValueError(f'Invalid cron element: {element}')	# Error in any of the values
+			else:
+				try:
+					start, end = ( int(x) for x in element.split('-') )
+				except ValueError:
+					raise ValueError(f'Invalid cron element: {element}. Not a number.')	# Not a number
+			if step <= 0:
+				raise ValueError(f'Invalid cron element: {element}. Step must be greater than 0.')
+			ranges.append(range(start, end + 1, step))
+			continue
+
+		if '/' in element:
+			try:
+				v, interval = element.split('/')
+			except ValueError:
+				raise ValueError(f'Invalid cron element: {element}.')
+			if v != '*':
+				raise ValueError(f'Invalid cron element: {element}. Interval only for *.')	# Intervals only, if it is a *
+			try:
+				divisor = int(interval)
+			except ValueError:
+				raise ValueError(f'Invalid cron element: {element}. Not a number.')	# Not a number
+			if divisor <= 0:
+				raise ValueError(f'Invalid cron element: {element}. Interval must be greater than 0.')
+			divisors.append(divisor)
+			continue
+
+		raise ValueError(f'Invalid cron element: {element}.')	# Not a number
+
+	return tuple(ranges), tuple(divisors)
+
+
+def _bitset(field:str, low:int, high:int) -> int:
+	"""	Compile a single cron field with a limited range of values to a bitset.
+
+		Args:
+			field: A single cron field.
+			low: The lowest possible value.
+			high: The highest possible value.
+
+		Return:
+			Bitset in which bit *n* is set if the value *n* matches.
+
+		Raises:
+			ValueError: If *field* is invalid.
+	"""
+	if (parsed := _parseField(field)) is None:
+		return sum(1 << value for value in range(low, high + 1))
+	ranges, divisors = parsed
+	bits = 0
+	for value in range(low, high + 1):
+		if any(value in r for r in ranges) or any(value % d == 0 for d in divisors):
+			bits |= 1 << value
+	return bits
+
+
+def _values(bits:int, start:int, end:int) -> Iterator[int]:
+	"""	Iterate over the values of a bitset in a range.
+
+		Args:
+			bits: The bitset.
+			start: The first value.
+			end: The last value (inclusive).
+
+		Return:
+			Iterator over the values whose bits are set, in ascending order.
+	"""
+	bits >>= start
+	value = start
+	while bits and value <= end:
+		if bits & 1:
+			yield value
+		bits >>= 1
+		value += 1
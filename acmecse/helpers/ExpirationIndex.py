@@ -0,0 +1,127 @@
+#
+#	ExpirationIndex.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+"""	A min-heap based index for resource expiration timestamps.
+"""
+
+from __future__ import annotations
+from typing import Optional
+import heapq
+
+
+class ExpirationIndex():
+	"""	A min-heap index of resource expiration timestamps.
+
+		The index maps resource IDs to their *expirationTime* and keeps the entries ordered
+		by that timestamp, so that the expired resources can be determined without scanning
+		all resources. The timestamps are the oneM2M timestamp strings as stored in the
+		resources. Their fixed format sorts chronologically, so no conversion is necessary.
+
+		Updates and removals are handled lazily: outdated heap entries stay in the heap and
+		are discarded when they reach the top. The heap is rebuilt when the number of outdated
+		entries grows too large.
+
+		The index is not thread-safe. Callers must synchronize access.
+	"""
+
+	__slots__ = (
+		'_heap',
+		'_expirations',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self) -> None:
+		"""	Initialize an empty expiration index.
+		"""
+		self._heap:list[tuple[str, str]] = []
+		""" The heap of (et, ri) tuples. May contain outdated entries. """
+
+		self._expirations:dict[str, str] = {}
+		""" The current expiration timestamp for each indexed resource ID. """
+
+
+	def __len__(self) -> int:
+		"""	Return the number of indexed resources.
+
+			Return:
+				The number of resources with an expiration timestamp.
+		"""
+		return len(self._expirations)
+
+
+	def set(self, ri:str, et:Optional[str]) -> None:
+		"""	Add or update the expiration timestamp for a resource.
+
+			Args:
+				ri: The resource ID.
+				et: The resource's expiration timestamp. If this is *None* or empty then the resource is removed from the index.
+		"""
+		if not et:
+			self.remove(ri)
+			return
+		if self._expirations.get(ri) == et:
+			return
+		self._expirations[ri] = et
+		heapq.heappush(self._heap, (et, ri))
+
+		# Rebuild the heap if it contains too many outdated entries
+		if len(self._heap) > 2 * len(self._expirations) + 1000:
+			self._rebuild()
+
+
+	def remove(self, ri:str) -> None:
+		"""	Remove a resource from the index. The heap entry is discarded lazily.
+
+			Args:
+				ri: The resource ID.
+		"""
+		self._expirations.pop(ri, None)
+
+
+	def clear(self) -> None:
+		"""	Remove all entries from the index.
+		"""
+		self._heap.clear()
+		self._expirations.clear()
+
+
+	def expired(self, now:str, limit:Optional[int] = None) -> list[str]:
+		"""	Return the resource IDs of all resources that expired before a timestamp.
+
+			The entries are **not** removed from the index. They are removed when the
+			resources are deleted.
+
+			Args:
+				now: The timestamp to compare with.
+				limit: Optional maximum number of resource IDs to return.
+
+			Return:
+				The list of resource IDs of the expired resources, ordered by their expiration timestamps.
+		"""
+		result:list[str] = []
+		popped:list[tuple[str, str]] = []
+		heap = self._heap
+		while heap and heap[0][0] < now and (limit is None or len(result) < limit):
+			entry = heapq.heappop(heap)
+			if self._expirations.get(entry[1]) != entry[0]:
+				continue	# outdated entry, discard it
+			if popped and popped[-1] == entry:
+				continue	# duplicate entry of a resource that was removed and added again, discard it
+			result.append(entry[1])
+			popped.append(entry)
+
+		# Push back the valid entries. They will be removed when the resources are deleted.
+		for entry in popped:
+			heapq.heappush(heap, entry)
+		return result
+
+
+	def _rebuild(self) -> None:
+		"""	Rebuild the heap from the current expiration timestamps and remove all outdated entries.
+		"""
+		self._heap = [ (et, ri) for ri, et in self._expirations.items() ]
+		heapq.heapify(self._heap)
@@ -0,0 +1,285 @@
+#
+#	IdentifierTrie.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+"""	An in-memory path trie of the resource tree for resolving structured and unstructured resource IDs.
+"""
+
+from __future__ import annotations
+from typing import Optional, Iterable
+
+from threading import Lock
+
+from ..etc.Types import JSON
+
+
+class _Node():
+	"""	A node in the identifier trie. It represents a resource, or a not yet known parent resource.
+	"""
+
+	__slots__ = (
+		'ri',
+		'rn',
+		'ty',
+		'parent',
+		'children',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self, rn:str, parent:Optional[_Node]) -> None:
+		"""	Initialize the node.
+
+			Args:
+				rn: The resource name.
+				parent: The parent node, or None for a root node.
+		"""
+		self.ri:Optional[str] = None
+		""" The resource ID, or None if the resource is not known. """
+
+		self.rn = rn
+		""" The resource name. """
+
+		self.ty:Optional[int] = None
+		""" The resource type. """
+
+		self.parent = parent
+		""" The parent node. """
+
+		self.children:Optional[dict[str, _Node]] = None
+		""" The child nodes, keyed by their resource names, or None if there are no children. """
+
+
+	def srn(self) -> str:
+		"""	Build the structured resource name of the node.
+
+			Return:
+				The structured resource name.
+		"""
+		names:list[str] = []
+		node:Optional[_Node] = self
+		while node:
+			names.append(node.rn)
+			node = node.parent
+		return '/'.join(reversed(names))
+
+
+class IdentifierTrie():
+	"""	In-memory path trie of the resource tree.
+
+		Each node of the trie represents a resource and is reachable by the path of resource names
+		in its structured resource name, as well as directly by its resource ID. Resolving a
+		structured, unstructured, or hybrid resource ID and building the structured resource name
+		of a resource costs O(depth) dictionary lookups.
+
+		The trie does not need to contain all resources. A resource that is not found in the trie
+		must be looked up in the database.
+
+		Changes are serialized. Lookups don't need a lock.
+	"""
+
+	__slots__ = (
+		'_roots',
+		'_nodes',
+		'_lock',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self) -> None:
+		"""	Initialize the trie.
+		"""
+		self._roots:dict[str, _Node] = {}
+		""" The root nodes, keyed by their resource names. """
+
+		self._nodes:dict[str, _Node] = {}
+		""" The nodes of the known resources, keyed by their resource IDs. """
+
+		self._lock = Lock()
+		""" Lock to serialize the changes. """
+
+
+	def load(self, identifiers:Optional[Iterable[JSON]]) -> None:
+		"""	Replace the content of the trie.
+
+			Args:
+				identifiers: The identifier mappings with the *ri*, *srn*, and *ty* attributes.
+		"""
+		with self._lock:
+			self._roots.clear()
+			self._nodes.clear()
+			for each in identifiers or []:
+				self._add(each['ri'], each['srn'], each.get('ty'))
+
+
+	def clear(self) -> None:
+		"""	Remove all resources from the trie.
+		"""
+		with self._lock:
+			self._roots.clear()
+			self._nodes.clear()
+
+
+	def add(self, ri:str, srn:str, ty:Optional[int]) -> None:
+		"""	Add a resource to the trie, or replace it.
+
+			Args:
+				ri: The resource ID.
+				srn: The structured resource name.
+				ty: The resource type.
+		"""
+		with self._lock:
+			self._add(ri, srn, ty)
+
+
+	def remove(self, ri:str) -> None:
+		"""	Remove a resource and all its descendants from the trie.
+
+			Args:
+				ri: The resource ID.
+		"""
+		with self._lock:
+			if (node := self._nodes.get(ri)) is not None:
+				self._detach(node)
+
+
+	def riForSrn(self, srn:str) -> Optional[str]:
+		"""	Resolve a structured resource name.
+
+			Args:
+				srn: The structured resource name.
+
+			Return:
+				The resource ID, or None if the resource is not in the trie.
+		"""
+		if (node := self._find(srn)) is not None:
+			return node.ri
+		return None
+
+
+	def srnForRi(self, ri:str) -> Optional[str]:
+		"""	Build the structured resource name of a resource.
+
+			Args:
+				ri: The resource ID.
+
+			Return:
+				The structured resource name, or None if the resource is not in the trie.
+		"""
+		if (node := self._nodes.get(ri)) is not None:
+			return node.srn()
+		return None
+
+
+	def identifier(self, ri:Optional[str] = None, srn:Optional[str] = None) -> Optional[JSON]:
+		"""	Return the identifier mapping of a resource by either its resource ID or its structured resource name.
+
+			Args:
+				ri: The resource ID.
+				srn: The structured resource name. This takes precedence over *ri*.
+
+			Return:
+				The identifier mapping with the *ri*, *rn*, *srn*, and *ty* attributes, or None if the resource is not in the trie.
+		"""
+		node = self._find(srn) if srn else self._nodes.get(ri) if ri else None
+		if node is None or node.ri is None:
+			return None
+		return { 'ri': node.ri,
+				 'rn': node.rn,
+				 'srn': srn if srn else node.srn(),
+				 'ty': node.ty }
+
+
+	def ancestors(self, ri:str) -> list[str]:
+		"""	Return the resource IDs of the ancestors of a resource.
+
+			Args:
+				ri: The resource ID.
+
+			Return:
+				The resource IDs of the known ancestors, starting with the parent. The list is empty if the resource is not in the trie.
+		"""
+		result:list[str] = []
+		node = self._nodes.get(ri)
+		while node is not None and (node := node.parent) is not None:
+			if node.ri is not None:
+				result.append(node.ri)
+		return result
+
+
+	def __contains__(self, ri:object) -> bool:
+		return ri in self._nodes
+
+
+	def _find(self, srn:str) -> Optional[_Node]:
+		"""	Find the node for a structured resource name.
+
+			Args:
+				srn: The structured resource name.
+
+			Return:
+				The node, or None.
+		"""
+		names = srn.split('/')
+		if (node := self._roots.get(names[0])) is None:
+			return None
+		for rn in names[1:]:
+			if not node.children or (node := node.children.get(rn)) is None:	# type:ignore[assignment]
+				return None
+		return node
+
+
+	def _add(self, ri:str, srn:str, ty:Optional[int]) -> None:
+		"""	Add or replace a resource. The caller must hold the lock.
+
+			Missing parent nodes are created without a resource ID. They are completed when the
+			parent resources are added.
+
+			Args:
+				ri: The resource ID.
+				srn: The structured resource name.
+				ty: The resource type.
+		"""
+		# Remove a resource that was known under another structured resource name
+		if (previous := self._nodes.get(ri)) is not None and previous.srn() != srn:
+			self._detach(previous)
+
+		names = srn.split('/')
+		if (node := self._roots.get(names[0])) is None:
+			node = self._roots[names[0]] = _Node(names[0], None)
+		for rn in names[1:]:
+			if node.children is None:
+				node.children = {}
+			if (child := node.children.get(rn)) is None:
+				child = node.children[rn] = _Node(rn, node)
+			node = child
+
+		if node.ri is not None and node.ri != ri:	# Another resource with the same name was replaced
+			self._nodes.pop(node.ri, None)
+		node.ri = ri
+		node.ty = ty
+		self._nodes[ri] = node
+
+
+	def _detach(self, node:_Node) -> None:
+		"""	Remove a node and its descendants. The caller must hold the lock.
+
+			Args:
+				node: The node.
+		"""
+		if node.parent is None:
+			self._roots.pop(node.rn, None)
+		elif node.parent.children is not None:
+			node.parent.children.pop(node.rn, None)
+			if not node.parent.children:
+				node.parent.children = None
+
+		stack = [ node ]
+		while stack:
+			each = stack.pop()
+			if each.ri is not None and self._nodes.get(each.ri) is each:
+				del self._nodes[each.ri]
+			if each.children:
+				stack.extend(each.children.values())
@@ -0,0 +1,116 @@
+#
+#	InstanceIndex.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+"""	An index of instance resources, ordered by their creation time, per parent resource and type.
+"""
+
+from __future__ import annotations
+from typing import Optional
+from bisect import bisect_left, bisect_right
+
+
+class InstanceIndex():
+	"""	An index of instance resources per parent resource and resource type.
+
+		For each parent resource and resource type the index keeps a list of (ct, ri) tuples
+		that is ordered by the creation timestamps. Instances with the same creation timestamp
+		are kept in the order in which they were added. Though it is meant for instance resources,
+		the index can hold child resources of any type.
+
+		Since instances are usually added in the order of their creation times, adding an
+		instance is an append operation in most cases. Looking up the oldest, the latest,
+		or the n-th instance is an O(1) operation.
+
+		The index is not thread-safe. Callers must synchronize access.
+	"""
+
+	__slots__ = (
+		'_instances',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self) -> None:
+		"""	Initialize an empty instance index.
+		"""
+		self._instances:dict[tuple[str, int], list[tuple[str, str]]] = {}
+		""" The ordered lists of (ct, ri) tuples, keyed by (pi, ty). """
+
+
+	def add(self, pi:str, ty:int, ri:str, ct:str) -> None:
+		"""	Add an instance resource to the index.
+
+			Args:
+				pi: The parent resource's resource ID.
+				ty: The instance resource's type.
+				ri: The instance resource's resource ID.
+				ct: The instance resource's creation timestamp.
+		"""
+		entries = self._instances.setdefault((pi, ty), [])
+		if not entries or entries[-1][0] <= ct:
+			entries.append((ct, ri))	# the common case
+		else:
+			entries.insert(bisect_right(entries, ct, key = lambda e: e[0]), (ct, ri))
+
+
+	def remove(self, pi:str, ty:int, ri:str, ct:str) -> None:
+		"""	Remove an instance resource from the index.
+
+			Args:
+				pi: The parent resource's resource ID.
+				ty: The instance resource's type.
+				ri: The instance resource's resource ID.
+				ct: The instance resource's creation timestamp.
+		"""
+		if not (entries := self._instances.get((pi, ty))):
+			return
+		if entries[0][1] == ri:	# the common case: the oldest instance is removed
+			del entries[0]
+		else:
+			for i in range(bisect_left(entries, ct, key = lambda e: e[0]), len(entries)):
+				if entries[i][1] == ri:
+					del entries[i]
+					break
+		if not entries:
+			del self._instances[(pi, ty)]
+
+
+	def get(self, pi:str, ty:int, index:int) -> Optional[str]:
+		"""	Return the resource ID of an instance resource by its position in the creation time order.
+
+			Args:
+				pi: The parent resource's resource ID.
+				ty: The instance resource's type.
+				index: The position of the instance. 0 is the oldest instance, -1 is the latest instance.
+
+			Return:
+				The resource ID of the instance resource, or None if there is no instance at that position.
+		"""
+		if not (entries := self._instances.get((pi, ty))):
+			return None
+		try:
+			return entries[index][1]
+		except IndexError:
+			return None
+
+
+	def count(self, pi:str, ty:int) -> int:
+		"""	Return the number of instance resources of a parent resource.
+
+			Args:
+				pi: The parent resource's resource ID.
+				ty: The instance resource's type.
+
+			Return:
+				The number of instance resources.
+		"""
+		return len(self._instances.get((pi, ty), ()))
+
+
+	def clear(self) -> None:
+		"""	Remove all entries from the index.
+		"""
+		self._instances.clear()
@@ -0,0 +1,718 @@
+#
+#	InstanceStore.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+"""	An append-only store for instance resources, organized in segments per parent resource.
+"""
+
+from __future__ import annotations
+from typing import Optional, Any, Iterator, Sequence
+
+import json, os, shutil
+from copy import deepcopy
+from itertools import islice
+from urllib.parse import quote
+
+from ..etc.Types import JSON
+from ..etc.Constants import Constants
+from .BackupSnapshots import linkUnchanged
+
+
+_sharedAttributes = (
+	'pi',
+	'ty',
+	'et',
+	Constants.attrRtype,
+	Constants.attrRvi,
+	Constants.attrOriginator,
+	Constants.attrAnnouncedTo,
+)
+""" The attributes whose values are usually the same for all instances of a parent resource. """
+
+
+class _Segment():
+	"""	A segment of a series. It holds a limited number of records in insertion order.
+	"""
+
+	__slots__ = (
+		'number',
+		'header',
+		'records',
+		'appended',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self, number:int, header:JSON) -> None:
+		"""	Initialize an empty segment.
+
+			Args:
+				number: The number of the segment within its series.
+				header: The shared attribute values of the segment's instances.
+		"""
+		self.number = number
+		""" The number of the segment within its series. """
+
+		self.header = header
+		""" The shared attribute values of the segment's instances. They are not repeated in the records. """
+
+		self.records:dict[str, JSON] = {}
+		""" The compact records of the live instances, keyed by their resource IDs, in insertion order. """
+
+		self.appended = 0
+		""" The number of records that were appended to the segment. """
+
+
+class _Series():
+	"""	The instances of one type of a parent resource.
+	"""
+
+	__slots__ = (
+		'pi',
+		'ty',
+		'prefix',
+		'directory',
+		'segments',
+		'names',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self, pi:str, ty:int, prefix:Optional[str], directory:Optional[str]) -> None:
+		"""	Initialize an empty series.
+
+			Args:
+				pi: The resource ID of the parent resource.
+				ty: The resource type of the instances.
+				prefix: The structured resource name of the parent resource, or None if unknown.
+				directory: The directory of the segment files, or None if the series is not persisted.
+		"""
+		self.pi = pi
+		""" The resource ID of the parent resource. """
+
+		self.ty = ty
+		""" The resource type of the instances. """
+
+		self.prefix = prefix
+		""" The structured resource name of the parent resource, or None if unknown. """
+
+		self.directory = directory
+		""" The directory of the segment files, or None if the series is not persisted. """
+
+		self.segments:list[_Segment] = []
+		""" The segments of the series, oldest first. """
+
+		self.names:dict[str, str] = {}
+		""" The resource IDs of the instances, keyed by their resource names. """
+
+
+	def __len__(self) -> int:
+		return sum(len(segment.records) for segment in self.segments)
+
+
+class InstanceStore():
+	"""	An append-only store for instance resources.
+
+		The instances of one resource type of a parent resource form a *series*. A series is
+		divided into *segments* of a limited number of records. New instances are always appended
+		to the latest segment, and a new segment is started when it is full.
+
+		The records are compact: the resource ID, the attribute values that are shared by the
+		instances of a segment (the *header*), the structured resource name, and a *lt* that is
+		equal to the *ct* are not stored in the records. The header of a new segment is taken from
+		the latest instance of the series. A record is expanded to the full resource document only
+		when it is retrieved.
+
+		The order of the records is their insertion order, which is the order of the creation times
+		of the instances. Looking up the oldest or the latest instance of a series is an O(1) operation.
+
+		When the store has a directory then each segment is persisted in its own file. Changes are
+		appended to the segment file that holds the record. A segment whose instances are all
+		removed, e.g. when a container removes its oldest instances, is dropped as a whole by deleting
+		its file. The latest segment of a series is only dropped together with the whole series.
+
+		Each segment file starts with a header line with the parent resource ID, the resource type,
+		the shared attribute values of the segment, and the structured resource name of the parent. The following
+		lines are JSON arrays:
+
+		- *["+", "ri", {record}]* : A record was added or replaced.
+		- *["~", "ri", {changes}, [removed]]* : A record was changed, and the listed attributes were removed.
+		- *["-", "ri"]* : A record was removed.
+
+		The store is not thread-safe. Callers must synchronize access.
+	"""
+
+	__slots__ = (
+		'_path',
+		'_segmentSize',
+		'_series',
+		'_locations',
+		'_prefixes',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self, path:Optional[str], segmentSize:int) -> None:
+		"""	Initialize an empty store.
+
+			Args:
+				path: The directory for the segment files. If None, then the store is kept in memory only.
+				segmentSize: The maximum number of records per segment. Must be greater than 0.
+		"""
+		self._path = path
+		""" The directory for the segment files, or None. """
+
+		self._segmentSize = segmentSize
+		""" The maximum number of records per segment. """
+
+		self._series:dict[tuple[str, int], _Series] = {}
+		""" The series, keyed by (pi, ty). """
+
+		self._locations:dict[str, tuple[_Series, _Segment]] = {}
+		""" The series and segment of each instance, keyed by the resource IDs. """
+
+		self._prefixes:dict[str, list[_Series]] = {}
+		""" The series, keyed by the structured resource names of their parent resources. """
+
+
+	#
+	#	Records
+	#
+
+	def add(self, doc:JSON) -> None:
+		"""	Add an instance resource to the store. An existing instance with the same resource ID is replaced.
+
+			Args:
+				doc: The resource document. It must contain the *ri*, *pi*, and *ty* attributes.
+		"""
+		ri = doc['ri']
+		if ri in self._locations:
+			self.update(ri, { **{ k: None for k in self._expand(ri) }, **doc })
+			return
+
+		if (series := self._series.get((doc['pi'], doc['ty']))) is None:
+			series = self._createSeries(doc)
+		if not series.segments:
+			self._createSegment(series, 1, doc)
+		elif (latest := series.segments[-1]).appended >= self._segmentSize:
+			if latest.records:
+				self._createSegment(series, latest.number + 1, self._expand(next(reversed(latest.records))))
+			else:
+				self._createSegment(series, latest.number + 1, doc)
+				self._dropSegment(series, latest)
+		segment = series.segments[-1]
+		record = self._compact(series, segment, doc)
+		segment.records[ri] = record
+		segment.appended += 1
+		self._locations[ri] = (series, segment)
+		if (rn := doc.get('rn')):
+			series.names[rn] = ri
+		self._write(series, segment, [ '+', ri, record ])
+
+
+	def update(self, ri:str, changes:JSON) -> None:
+		"""	Update an instance resource. Attributes with a *None* value are removed.
+
+			Args:
+				ri: The resource ID.
+				changes: The changed attributes.
+
+			Raises:
+				KeyError: If the instance doesn't exist.
+		"""
+		series, segment = self._locations[ri]
+		doc = self._expand(ri)
+		doc.update(changes)
+		record = self._compact(series, segment, { k: v for k, v in doc.items() if v is not None })
+		old = segment.records[ri]
+		if record == old:
+			return
+		if (rn := old.get('rn')) and series.names.get(rn) == ri:
+			del series.names[rn]
+		if (rn := record.get('rn')):
+			series.names[rn] = ri
+		segment.records[ri] = record
+		self._write(series, segment, [ '~',
+									   ri,
+									   { k: v for k, v in record.items() if k not in old or old[k] != v },
+									   [ k for k in old if k not in record ] ])
+
+
+	def remove(self, ri:str) -> None:
+		"""	Remove an instance resource. Segments without instances are dropped.
+
+			Args:
+				ri: The resource ID.
+
+			Raises:
+				KeyError: If the instance doesn't exist.
+		"""
+		series, segment = self._locations.pop(ri)
+		record = segment.records.pop(ri)
+		if (rn := record.get('rn')) and series.names.get(rn) == ri:
+			del series.names[rn]
+
+		if segment.records or segment is series.segments[-1]:
+			if not any(s.records for s in series.segments):
+				self._dropSeries(series)
+			else:
+				self._write(series, segment, [ '-', ri ])
+		else:
+			self._dropSegment(series, segment)
+
+
+	def get(self, ri:str) -> Optional[JSON]:
+		"""	Return the full resource document of an instance.
+
+			Args:
+				ri: The resource ID.
+
+			Return:
+				A new resource document, or None if the instance doesn't exist. The attribute values are shared with the store and must not be modified in place.
+		"""
+		return self._expand(ri) if ri in self._locations else None
+
+
+	def identifier(self, ri:str) -> Optional[JSON]:
+		"""	Return the identifier mapping of an instance.
+
+			Args:
+				ri: The resource ID.
+
+			Return:
+				A dictionary with the *ri*, *rn*, *srn*, and *ty* of the instance, or None if the instance doesn't exist.
+		"""
+		if not (doc := self.get(ri)):
+			return None
+		return { 'ri': ri, 'rn': doc.get('rn'), 'srn': doc.get(Constants.attrSrn), 'ty': doc.get('ty') }
+
+
+	def riForSrn(self, srn:str) -> Optional[str]:
+		"""	Return the resource ID of an instance by its structured resource name.
+
+			Args:
+				srn: The structured resource name.
+
+			Return:
+				The resource ID, or None if no instance with this structured resource name exists.
+		"""
+		prefix, _, rn = srn.rpartition('/')
+		for series in self._prefixes.get(prefix, ()):
+			if (ri := series.names.get(rn)):
+				return ri
+		return None
+
+
+	def ris(self, pi:str, types:Optional[Sequence[int]] = None) -> list[str]:
+		"""	Return the resource IDs of the instances of a parent resource.
+
+			Args:
+				pi: The resource ID of the parent resource.
+				types: The resource types of the instances. If None, then instances of all types are returned.
+
+			Return:
+				The resource IDs in creation order, grouped by resource type. The list may be empty.
+		"""
+		return [ ri
+				 for series in self._seriesFor(pi, types)
+				 for segment in series.segments
+				 for ri in segment.records ]
+
+
+	def documents(self, pi:Optional[str] = None, ty:Optional[int] = None) -> Iterator[JSON]:
+		"""	Return the full resource documents of the instances.
+
+			Args:
+				pi: The resource ID of the parent resource. If None, then the instances of all parent resources are returned.
+				ty: The resource type of the instances. If None, then instances of all types are returned.
+
+			Return:
+				An iterator over new resource documents. The attribute values are shared with the store and must not be modified in place.
+		"""
+		if pi is not None:
+			allSeries:list[_Series] = self._seriesFor(pi, None if ty is None else [ ty ])
+		else:
+			allSeries = [ s for s in self._series.values() if ty is None or s.ty == ty ]
+		for series in allSeries:
+			for segment in series.segments:
+				for ri in list(segment.records):
+					yield self._expand(ri)
+
+
+	def instance(self, pi:str, ty:int, index:int) -> Optional[str]:
+		"""	Return the resource ID of an instance by its position in the creation order.
+
+			Args:
+				pi: The resource ID of the parent resource.
+				ty: The resource type of the instance.
+				index: The position of the instance. 0 is the oldest instance, -1 is the latest instance.
+
+			Return:
+				The resource ID, or None if there is no instance at that position.
+		"""
+		if not (series := self._series.get((pi, ty))):
+			return None
+		if index < 0:
+			index += len(series)
+		for segment in series.segments:
+			if 0 <= index < len(segment.records):
+				if index == len(segment.records) - 1:	# the common case for the latest instance
+					return next(reversed(segment.records))
+				return next(islice(segment.records, index, None))
+			index -= len(segment.records)
+		return None
+
+
+	def count(self, pi:str, ty:int) -> int:
+		"""	Return the number of instances of a parent resource.
+
+			Args:
+				pi: The resource ID of the parent resource.
+				ty: The resource type of the instances.
+
+			Return:
+				The number of instances.
+		"""
+		return len(series) if (series := self._series.get((pi, ty))) else 0
+
+
+	def hasType(self, ty:int) -> bool:
+		"""	Check whether instances of a resource type exist.
+
+			Args:
+				ty: The resource type.
+
+			Return:
+				True if at least one instance of the resource type exists.
+		"""
+		return any(series.ty == ty for series in self._series.values())
+
+
+	def expirations(self) -> Iterator[tuple[str, Optional[str]]]:
+		"""	Return the expiration timestamps of all instances.
+
+			Return:
+				An iterator over (ri, et) tuples.
+		"""
+		for series in self._series.values():
+			for segment in series.segments:
+				for ri, record in segment.records.items():
+					yield ri, record.get('et', segment.header.get('et'))
+
+
+	def parents(self) -> list[str]:
+		"""	Return the resource IDs of the parent resources that have instances in the store.
+
+			Return:
+				The list of resource IDs.
+		"""
+		return list({ pi: None for pi, _ in self._series })
+
+
+	def removeInstances(self, pi:str) -> None:
+		"""	Remove all instances of a parent resource.
+
+			Args:
+				pi: The resource ID of the parent resource.
+		"""
+		for series in self._seriesFor(pi, None):
+			self._dropSeries(series)
+
+
+	def __contains__(self, ri:object) -> bool:
+		return ri in self._locations
+
+
+	def __len__(self) -> int:
+		return len(self._locations)
+
+
+	#
+	#	Persistence
+	#
+
+	def load(self) -> None:
+		"""	Load the segment files from the store's directory.
+
+			Incomplete records at the end of a segment file, e.g. after a crash, are ignored.
+			Segments without instances are dropped.
+		"""
+		self._series.clear()
+		self._locations.clear()
+		self._prefixes.clear()
+		if not self._path:
+			return
+		os.makedirs(self._path, exist_ok = True)
+
+		for entry in sorted(os.scandir(self._path), key = lambda e: e.name):
+			if not entry.is_dir():
+				continue
+			series:Optional[_Series] = None
+			for fileName in sorted(os.listdir(entry.path)):
+				if not fileName.endswith('.seg'):
+					continue
+				with open(os.path.join(entry.path, fileName), 'r', encoding = 'utf-8') as file:
+					try:
+						header = json.loads(file.readline())
+					except json.JSONDecodeError:
+						continue
+					if series is None:
+						series = _Series(header['pi'], header['ty'], header['prefix'], entry.path)
+					segment = _Segment(int(fileName[:-4]), header['header'])
+					series.segments.append(segment)
+					for line in file:
+						try:
+							op, ri, *args = json.loads(line)
+						except (json.JSONDecodeError, ValueError):
+							break	# Incomplete record
+						match op:
+							case '+':
+								segment.records[ri] = args[0]
+								segment.appended += 1
+							case '~':
+								if (record := segment.records.get(ri)) is not None:
+									record.update(args[0])
+									for k in args[1]:
+										record.pop(k, None)
+							case '-':
+								segment.records.pop(ri, None)
+			if series is None:
+				continue
+
+			# Register the series and drop the empty segments
+			self._series[(series.pi, series.ty)] = series
+			if series.prefix is not None:
+				self._prefixes.setdefault(series.prefix, []).append(series)
+			for segment in list(series.segments):
+				for ri, record in segment.records.items():
+					self._locations[ri] = (series, segment)
+					if (rn := record.get('rn')):
+						series.names[rn] = ri
+				if not segment.records and segment is not series.segments[-1]:
+					self._dropSegment(series, segment)
+			if not len(series):
+				self._dropSeries(series)
+
+
+	def clear(self) -> None:
+		"""	Remove all instances and segment files from the store.
+		"""
+		self._series.clear()
+		self._locations.clear()
+		self._prefixes.clear()
+		if self._path:
+			shutil.rmtree(self._path, ignore_errors = True)
+			os.makedirs(self._path, exist_ok = True)
+
+
+	def backup(self, dir:str, previous:Optional[str] = None) -> list[tuple[str, str, int, int]]:
+		"""	Prepare the backup of the segment files to a backup directory. The caller must hold the lock of the store.
+
+			Segment files that did not change since the previous backup are hard-linked from there. The other
+			files are only hard-linked to a temporary name, which is quick. Their content is copied afterwards
+			by `finishBackup()`, which doesn't need the lock anymore, because segment files are only ever
+			appended to or removed.
+
+			Args:
+				dir: The backup directory. The segment files are copied to a sub-directory with the name of the store's directory.
+				previous: The previous backup directory, or None.
+
+			Return:
+				The pending copies for `finishBackup()`.
+		"""
+		pending:list[tuple[str, str, int, int]] = []
+		if not self._path or not os.path.isdir(self._path):
+			return pending
+		name = os.path.basename(self._path)
+		for entry in os.scandir(self._path):
+			os.makedirs(target := os.path.join(dir, name, entry.name), exist_ok = True)
+			for file in os.scandir(entry.path):
+				stat = file.stat()
+				destination = os.path.join(target, file.name)
+				if linkUnchanged(stat, os.path.join(previous, name, entry.name, file.name) if previous else None, destination):
+					continue
+				try:
+					os.link(file.path, staged := f'{destination}.tmp')
+				except OSError:
+					shutil.copy2(file.path, destination)	# Hard links are not supported
+					continue
+				pending.append((staged, destination, stat.st_size, stat.st_mtime_ns))
+		return pending
+
+
+	def finishBackup(self, pending:list[tuple[str, str, int, int]]) -> None:
+		"""	Copy the segment files that were prepared by `backup()`. This doesn't need the lock of the store.
+
+			Only the content that a file had when the backup was prepared is copied.
+
+			Args:
+				pending: The pending copies returned by `backup()`.
+		"""
+		for staged, destination, size, mtime in pending:
+			with open(staged, 'rb') as source, open(destination, 'wb') as file:
+				file.write(source.read(size))
+			os.utime(destination, ns = (mtime, mtime))	# So that the next backup can recognize unchanged files
+			os.remove(staged)
+
+
+	#
+	#	Internal methods
+	#
+
+	def _seriesFor(self, pi:str, types:Optional[Sequence[int]]) -> list[_Series]:
+		"""	Return the series of a parent resource.
+
+			Args:
+				pi: The resource ID of the parent resource.
+				types: The resource types of the series. If None, then the series of all types are returned.
+
+			Return:
+				The list of series. It may be empty.
+		"""
+		if types is not None:
+			return [ series for ty in types if (series := self._series.get((pi, ty))) ]
+		return [ series for (_pi, _), series in self._series.items() if _pi == pi ]
+
+
+	def _compact(self, series:_Series, segment:_Segment, doc:JSON) -> JSON:
+		"""	Create the compact record for a resource document.
+
+			Args:
+				series: The series of the instance.
+				segment: The segment of the instance.
+				doc: The resource document.
+
+			Return:
+				The compact record. It is a copy, so that changes to the resource document don't change the record.
+		"""
+		header = segment.header
+		record = { k: v
+				   for k, v in doc.items()
+				   if k != 'ri' and (k not in header or header[k] != v) }
+		for k in header:	# Shared attributes that the document doesn't have
+			if k not in doc:
+				record[k] = None
+		if series.prefix is not None and record.get(Constants.attrSrn) == f'{series.prefix}/{doc.get("rn")}':
+			del record[Constants.attrSrn]
+		if 'lt' in record and record['lt'] == record.get('ct'):
+			del record['lt']
+		return deepcopy(record)
+
+
+	def _expand(self, ri:str) -> JSON:
+		"""	Expand the compact record of an instance to the full resource document.
+
+			Args:
+				ri: The resource ID.
+
+			Return:
+				A new resource document. The attribute values are shared with the record and the segment header.
+		"""
+		series, segment = self._locations[ri]
+		record = segment.records[ri]
+		doc = { **segment.header, 'ri': ri, **record }
+		if series.prefix is not None and Constants.attrSrn not in doc and (rn := doc.get('rn')):
+			doc[Constants.attrSrn] = f'{series.prefix}/{rn}'
+		if 'lt' not in doc and 'ct' in doc:
+			doc['lt'] = doc['ct']
+		return { k: v for k, v in doc.items() if v is not None }
+
+
+	def _createSeries(self, doc:JSON) -> _Series:
+		"""	Create a new series for the first instance of a type of a parent resource.
+
+			Args:
+				doc: The resource document of the first instance.
+
+			Return:
+				The new series.
+		"""
+		pi, ty = doc['pi'], doc['ty']
+		prefix = None
+		if (srn := doc.get(Constants.attrSrn)) and (rn := doc.get('rn')) and srn.endswith(f'/{rn}'):
+			prefix = srn[:-len(rn) - 1]
+		series = _Series(pi,
+						 ty,
+						 prefix,
+						 os.path.join(self._path, f'{quote(pi, safe = "")}-{ty}') if self._path else None)
+		if series.directory:
+			os.makedirs(series.directory, exist_ok = True)
+		self._series[(pi, ty)] = series
+		if prefix is not None:
+			self._prefixes.setdefault(prefix, []).append(series)
+		return series
+
+
+	def _createSegment(self, series:_Series, number:int, doc:JSON) -> None:
+		"""	Append a new segment to a series and write the header of its file.
+
+			Args:
+				series: The series.
+				number: The number of the new segment.
+				doc: The resource document from which the shared attribute values are taken.
+		"""
+		segment = _Segment(number, deepcopy({ k: doc[k] for k in _sharedAttributes if k in doc }))
+		series.segments.append(segment)
+		self._write(series, segment, { 'pi': series.pi, 'ty': series.ty, 'header': segment.header, 'prefix': series.prefix })
+
+
+	def _dropSegment(self, series:_Series, segment:_Segment) -> None:
+		"""	Remove a segment from a series and delete its file.
+
+			Args:
+				series: The series.
+				segment: The segment to remove.
+		"""
+		series.segments.remove(segment)
+		if series.directory:
+			try:
+				os.remove(self._segmentFile(series, segment))
+			except FileNotFoundError:
+				pass
+
+
+	def _dropSeries(self, series:_Series) -> None:
+		"""	Remove a series and delete its directory.
+
+			Args:
+				series: The series to remove.
+		"""
+		for segment in series.segments:
+			for ri in segment.records:
+				self._locations.pop(ri, None)
+		self._series.pop((series.pi, series.ty), None)
+		if series.prefix is not None and (prefixed := self._prefixes.get(series.prefix)):
+			if series in prefixed:
+				prefixed.remove(series)
+			if not prefixed:
+				del self._prefixes[series.prefix]
+		if series.directory:
+			shutil.rmtree(series.directory, ignore_errors = True)
+
+
+	def _segmentFile(self, series:_Series, segment:_Segment) -> str:
+		"""	Return the path of a segment file.
+
+			Args:
+				series: The series.
+				segment: The segment.
+
+			Return:
+				The path of the segment file.
+		"""
+		return os.path.join(series.directory, f'{segment.number:08d}.seg')	# type:ignore[arg-type]
+
+
+	def _write(self, series:_Series, segment:_Segment, line:Any) -> None:
+		"""	Append a line to a segment file.
+
+			Args:
+				series: The series.
+				segment: The segment.
+				line: The JSON-serializable content of the line.
+		"""
+		if series.directory:
+			with open(self._segmentFile(series, segment), 'a', encoding = 'utf-8') as file:
+				file.write(json.dumps(line, separators = (',', ':')) + '\n')
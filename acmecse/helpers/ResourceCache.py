@@ -0,0 +1,182 @@
+#
+#	ResourceCache.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+"""	A size-bounded, thread-safe LRU cache for resource documents.
+"""
+
+from __future__ import annotations
+from typing import Optional, Iterable
+
+from threading import Lock
+
+from ..etc.Types import JSON
+from ..etc.Constants import Constants
+from .ACMELRUCache import ACMELRUCache
+
+
+class ResourceCache():
+	"""	A read-through LRU cache for resource documents, keyed by the resource IDs.
+
+		The cache also maps the structured resource names of the cached resources to their
+		resource IDs. The mapping is removed when a resource is evicted from the cache.
+
+		The cached documents are shared with the callers and must not be modified. Resources that
+		are instantiated from them only copy the parts that they modify.
+
+		A document that was read from the database is only added to the cache if no resource
+		was invalidated in the meantime. This prevents that an outdated document that was read
+		before a concurrent update is added to the cache after the update. The caller gets a
+		token with `token()` before reading the document from the database, and passes it to `add()`.
+
+		The cache is thread-safe.
+	"""
+
+	__slots__ = (
+		'_documents',
+		'_structuredIDs',
+		'_types',
+		'_generation',
+		'_lock',
+		'hits',
+		'misses',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self, maxSize:int, types:Optional[Iterable[int]] = None) -> None:
+		"""	Initialize the cache.
+
+			Args:
+				maxSize: The maximum number of cached resource documents. Must be greater than 0.
+				types: The resource types that are cached. If *None* or empty, then resources of all types are cached.
+		"""
+		self._documents = ACMELRUCache(maxsize = maxSize, evict = self._evicted)
+		""" The resource documents, keyed by their resource IDs. """
+
+		self._structuredIDs:dict[str, str] = {}
+		""" The resource IDs of the cached resources, keyed by their structured resource names. """
+
+		self._types = frozenset(types) if types else None
+		""" The resource types that are cached, or None for all types. """
+
+		self._generation = 0
+		""" Counter that is increased with every invalidation. """
+
+		self._lock = Lock()
+		""" Lock to protect the cache. """
+
+		self.hits = 0
+		""" The number of successful lookups. """
+
+		self.misses = 0
+		""" The number of failed lookups. """
+
+
+	def get(self, ri:str) -> Optional[JSON]:
+		"""	Return a cached resource document.
+
+			Args:
+				ri: The resource ID.
+
+			Return:
+				The shared resource document, or None if the resource is not cached. It must not be modified.
+		"""
+		with self._lock:
+			if (doc := self._documents.get(ri)) is None:
+				self.misses += 1
+				return None
+			self.hits += 1
+		return doc
+
+
+	def riForSrn(self, srn:str) -> Optional[str]:
+		"""	Return the resource ID of a cached resource by its structured resource name.
+
+			Args:
+				srn: The structured resource name.
+
+			Return:
+				The resource ID, or None if no resource with this structured resource name is cached.
+		"""
+		with self._lock:
+			return self._structuredIDs.get(srn)
+
+
+	def token(self) -> int:
+		"""	Return a token that must be passed to `add()` for a document that is read from the database afterwards.
+
+			Return:
+				The token.
+		"""
+		return self._generation
+
+
+	def add(self, doc:JSON, token:int) -> None:
+		"""	Add a resource document to the cache.
+
+			The document is not added if its resource type is not cached, or if a resource was
+			invalidated since the token was retrieved.
+
+			Args:
+				doc: The resource document. It must contain the *ri* and *ty* attributes, and must not be modified afterwards.
+				token: The token that was retrieved with `token()` before the document was read from the database.
+		"""
+		if self._types is not None and doc.get('ty') not in self._types:
+			return
+		with self._lock:
+			if token != self._generation:
+				return
+			ri = doc['ri']
+			self._documents[ri] = doc
+			if (srn := doc.get(Constants.attrSrn)):
+				self._structuredIDs[srn] = ri
+
+
+	def invalidate(self, ri:str) -> None:
+		"""	Remove a resource from the cache.
+
+			Args:
+				ri: The resource ID.
+		"""
+		with self._lock:
+			self._generation += 1
+			if (doc := self._documents.pop(ri, None)) is not None:
+				self._evicted(ri, doc)
+
+
+	def clear(self) -> None:
+		"""	Remove all resources from the cache.
+		"""
+		with self._lock:
+			self._generation += 1
+			self._documents.clear()
+			self._structuredIDs.clear()
+
+
+	def statistics(self) -> JSON:
+		"""	Return the statistics of the cache.
+
+			Return:
+				A dictionary with the number of hits and misses, the number of cached documents, and the maximum size.
+		"""
+		with self._lock:
+			return {
+				'hits': self.hits,
+				'misses': self.misses,
+				'size': len(self._documents),
+				'maxSize': int(self._documents.maxsize),
+			}
+
+
+	def _evicted(self, ri:str, doc:JSON) -> None:
+		"""	Remove the structured resource name mapping of an evicted resource. The caller must hold the lock.
+
+			Args:
+				ri: The resource ID.
+				doc: The evicted resource document.
+		"""
+		if (srn := doc.get(Constants.attrSrn)) and self._structuredIDs.get(srn) == ri:
+			del self._structuredIDs[srn]
@@ -0,0 +1,168 @@
+#
+#	ResourceVersions.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+"""	In-memory version counters of the resources and their subtrees, and entity tags built from them.
+"""
+
+from __future__ import annotations
+from typing import Any, Iterable
+
+import os
+from hashlib import blake2b
+from threading import Lock
+
+
+class ResourceVersions():
+	"""	In-memory version counters of the resources and their subtrees.
+
+		Each change of a resource increments a single monotonic counter. Its value becomes the version
+		of the resource, and the subtree version of the resource and of all its ancestors. The access
+		version is set as well when the changed resource affects access control decisions.
+
+		The versions are not persisted. Resources that have not changed since the CSE started have
+		the version 0. Entity tags therefore include a random epoch that is chosen at startup and
+		when the versions are cleared.
+
+		Changes are serialized. Lookups don't need a lock.
+	"""
+
+	__slots__ = (
+		'_epoch',
+		'_counter',
+		'_versions',
+		'_subtreeVersions',
+		'_accessVersion',
+		'_lock',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self) -> None:
+		"""	Initialize the version counters.
+		"""
+		self._epoch = os.urandom(8)
+		""" The random epoch of the versions. """
+
+		self._counter = 0
+		""" The monotonic change counter. """
+
+		self._versions:dict[str, int] = {}
+		""" The versions of the changed resources, keyed by their resource IDs. """
+
+		self._subtreeVersions:dict[str, int] = {}
+		""" The subtree versions of the changed resources and their ancestors, keyed by their resource IDs. """
+
+		self._accessVersion = 0
+		""" The version of the last change that affects access control decisions. """
+
+		self._lock = Lock()
+		""" Lock to serialize the changes. """
+
+
+	def clear(self) -> None:
+		"""	Remove all versions and choose a new epoch.
+		"""
+		with self._lock:
+			self._epoch = os.urandom(8)
+			self._versions.clear()
+			self._subtreeVersions.clear()
+			self._accessVersion = 0
+
+
+	def changed(self, ri:str, ancestors:Iterable[str], access:bool = False) -> None:
+		"""	Record that a resource was created or updated.
+
+			Args:
+				ri: The resource ID.
+				ancestors: The resource IDs of the resource's ancestors.
+				access: Whether the change affects access control decisions.
+		"""
+		with self._lock:
+			version = self._increment(ancestors, access)
+			self._versions[ri] = version
+			self._subtreeVersions[ri] = version
+
+
+	def removed(self, ri:str, ancestors:Iterable[str], access:bool = False) -> None:
+		"""	Record that a resource was deleted.
+
+			Args:
+				ri: The resource ID.
+				ancestors: The resource IDs of the resource's ancestors.
+				access: Whether the change affects access control decisions.
+		"""
+		with self._lock:
+			self._increment(ancestors, access)
+			self._versions.pop(ri, None)
+			self._subtreeVersions.pop(ri, None)
+
+
+	def version(self, ri:str) -> int:
+		"""	Return the version of a resource.
+
+			Args:
+				ri: The resource ID.
+
+			Return:
+				The version, or 0 if the resource has not changed since the CSE started.
+		"""
+		return self._versions.get(ri, 0)
+
+
+	def subtreeVersion(self, ri:str) -> int:
+		"""	Return the subtree version of a resource. It changes with every change of the resource or any of its descendants.
+
+			Args:
+				ri: The resource ID.
+
+			Return:
+				The subtree version, or 0 if the subtree has not changed since the CSE started.
+		"""
+		return self._subtreeVersions.get(ri, 0)
+
+
+	def accessVersion(self) -> int:
+		"""	Return the version of the last change that affects access control decisions.
+
+			Return:
+				The access version.
+		"""
+		return self._accessVersion
+
+
+	def entityTag(self, *components:Any) -> str:
+		"""	Build an entity tag from the epoch and the given components, e.g. versions and originators.
+
+			Args:
+				components: The components of the entity tag.
+
+			Return:
+				The entity tag as 16 hexadecimal digits. As bytes it fits into a CoAP *ETag* option.
+		"""
+		h = blake2b(self._epoch, digest_size = 8)
+		for each in components:
+			h.update(str(each).encode())
+			h.update(b'\0')
+		return h.hexdigest()
+
+
+	def _increment(self, ancestors:Iterable[str], access:bool) -> int:
+		"""	Increment the change counter and set the subtree versions of the ancestors. The caller must hold the lock.
+
+			Args:
+				ancestors: The resource IDs of the ancestors.
+				access: Whether the change affects access control decisions.
+
+			Return:
+				The new version.
+		"""
+		self._counter += 1
+		version = self._counter
+		for each in ancestors:
+			self._subtreeVersions[each] = version
+		if access:
+			self._accessVersion = version
+		return version
@@ -0,0 +1,310 @@
+#
+#	SubscriptionIndex.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+"""	An in-memory index of the subscription representations, keyed by parent resource and event type.
+"""
+
+from __future__ import annotations
+from typing import Optional, Iterable, Any
+
+from threading import Lock
+
+from ..etc.Types import JSON, NotificationEventType
+
+
+_allSubscriptions = '*'
+""" Index key for all subscriptions of a parent resource. """
+
+_operationSubscriptions = 'om'
+""" Index key for the subscriptions of a parent resource that have an *operationMonitor*. """
+
+_retrieveEventTypes = frozenset(( NotificationEventType.blockingRetrieve, NotificationEventType.blockingRetrieveDirectChild ))
+""" The notification event types that are triggered by RETRIEVE requests. """
+
+
+class IndexedSubscription():
+	"""	A subscription representation with pre-computed matching criteria.
+
+		The subscription representation itself is shared and must not be modified.
+	"""
+
+	__slots__ = (
+		'sub',
+		'ri',
+		'pi',
+		'net',
+		'atr',
+		'chty',
+		'om',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self, sub:JSON) -> None:
+		"""	Initialize the indexed subscription.
+
+			Args:
+				sub: The subscription representation.
+		"""
+		self.sub = sub
+		""" The subscription representation. """
+
+		self.ri:str = sub['ri']
+		""" The resource ID of the subscription. """
+
+		self.pi:str = sub['pi']
+		""" The resource ID of the subscribed-to resource. """
+
+		self.net = frozenset(sub.get('net') or ())
+		""" The notification event types. """
+
+		self.atr = frozenset(atr) if (atr := sub.get('atr')) else None
+		""" The attributes that must be modified for an update notification, or None. """
+
+		self.chty = frozenset(chty) if (chty := sub.get('chty')) is not None else None
+		""" The child resource types for child notifications, or None. An empty set matches no type. """
+
+		self.om = tuple((o.get('org'), o.get('ops'), o) for o in om) if (om := sub.get('om')) is not None else None
+		""" The *operationMonitor* conditions as tuples of originator, operation, and the condition itself, or None. """
+
+
+	def matchOperation(self, operation:int, originator:str) -> Optional[JSON]:
+		"""	Find the first *operationMonitor* condition that matches an operation and originator.
+
+			Args:
+				operation: The operation.
+				originator: The originator of the request.
+
+			Return:
+				The matching condition, or None.
+		"""
+		for org, ops, o in self.om or ():
+			# Test whether a originator is set and if it is NOT the same as the originator of the request
+			if org is not None and org != originator:
+				continue
+			if ops is not None and ops != operation:
+				continue
+			return o
+		return None
+
+
+	def matchChildType(self, ty:int) -> bool:
+		"""	Test whether the subscription's *chty* condition matches a child resource type.
+
+			Args:
+				ty: The child resource type.
+
+			Return:
+				True if *chty* is not set or contains the type. An empty *chty* matches no type.
+		"""
+		return self.chty is None or ty in self.chty
+
+
+	def matchAttributes(self, modifiedAttributes:JSON) -> bool:
+		"""	Test whether any of the modified attributes is in the subscription's *atr* condition.
+
+			Args:
+				modifiedAttributes: The modified attributes.
+
+			Return:
+				True if *atr* is not set or at least one of the modified attributes is in *atr*.
+		"""
+		return self.atr is None or not self.atr.isdisjoint(modifiedAttributes)
+
+
+class SubscriptionIndex():
+	"""	In-memory index of the subscription representations.
+
+		For each parent resource the subscriptions are indexed by their notification event types,
+		and separately for the subscriptions with an *operationMonitor*. Checking an event for
+		a resource without matching subscriptions then only costs a dictionary lookup.
+
+		The index buckets are immutable tuples that are replaced when a subscription is added or
+		removed, so that they can be read without a lock. Changes are serialized.
+	"""
+
+	__slots__ = (
+		'_subscriptions',
+		'_parents',
+		'_retrieveCount',
+		'_lock',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self) -> None:
+		"""	Initialize the index.
+		"""
+		self._subscriptions:dict[str, IndexedSubscription] = {}
+		""" The indexed subscriptions, keyed by their resource IDs. """
+
+		self._parents:dict[str, dict[Any, tuple[IndexedSubscription, ...]]] = {}
+		""" The indexed subscriptions per parent resource, keyed by the event type. """
+
+		self._retrieveCount = 0
+		""" The number of subscriptions that may be triggered by RETRIEVE requests. """
+
+		self._lock = Lock()
+		""" Lock to serialize the changes. """
+
+
+	def load(self, subs:Optional[Iterable[JSON]]) -> None:
+		"""	Replace the content of the index.
+
+			Args:
+				subs: The subscription representations.
+		"""
+		with self._lock:
+			self._subscriptions.clear()
+			self._parents.clear()
+			self._retrieveCount = 0
+			for sub in subs or []:
+				self._add(IndexedSubscription(dict(sub)))
+
+
+	def clear(self) -> None:
+		"""	Remove all subscriptions from the index.
+		"""
+		with self._lock:
+			self._subscriptions.clear()
+			self._parents.clear()
+			self._retrieveCount = 0
+
+
+	def add(self, sub:JSON) -> None:
+		"""	Add a subscription representation to the index, or replace it.
+
+			Args:
+				sub: The subscription representation.
+		"""
+		entry = IndexedSubscription(dict(sub))
+		with self._lock:
+			self._remove(entry.ri)
+			self._add(entry)
+
+
+	def remove(self, ri:str) -> None:
+		"""	Remove a subscription from the index.
+
+			Args:
+				ri: The resource ID of the subscription.
+		"""
+		with self._lock:
+			self._remove(ri)
+
+
+	def get(self, ri:str) -> Optional[IndexedSubscription]:
+		"""	Return an indexed subscription.
+
+			Args:
+				ri: The resource ID of the subscription.
+
+			Return:
+				The indexed subscription, or None.
+		"""
+		return self._subscriptions.get(ri)
+
+
+	def forParent(self, pi:str) -> tuple[IndexedSubscription, ...]:
+		"""	Return all subscriptions of a parent resource.
+
+			Args:
+				pi: The resource ID of the parent resource.
+
+			Return:
+				The indexed subscriptions.
+		"""
+		if (buckets := self._parents.get(pi)) is None:
+			return ()
+		return buckets.get(_allSubscriptions, ())
+
+
+	def forEvent(self, pi:str, net:int) -> tuple[IndexedSubscription, ...]:
+		"""	Return the subscriptions of a parent resource for a notification event type.
+
+			Args:
+				pi: The resource ID of the parent resource.
+				net: The notification event type.
+
+			Return:
+				The indexed subscriptions.
+		"""
+		if (buckets := self._parents.get(pi)) is None:
+			return ()
+		return buckets.get(net, ())
+
+
+	def forOperation(self, pi:str) -> tuple[IndexedSubscription, ...]:
+		"""	Return the subscriptions of a parent resource that have an *operationMonitor*.
+
+			Args:
+				pi: The resource ID of the parent resource.
+
+			Return:
+				The indexed subscriptions.
+		"""
+		if (buckets := self._parents.get(pi)) is None:
+			return ()
+		return buckets.get(_operationSubscriptions, ())
+
+
+	def hasRetrieveSubscriptions(self) -> bool:
+		"""	Test whether any subscription may be triggered by RETRIEVE requests, ie. has an *operationMonitor* or a blocking RETRIEVE event type.
+
+			Return:
+				True if there is at least one such subscription.
+		"""
+		return self._retrieveCount > 0
+
+
+	def _add(self, entry:IndexedSubscription) -> None:
+		"""	Add an indexed subscription. The caller must hold the lock.
+
+			Args:
+				entry: The indexed subscription.
+		"""
+		self._subscriptions[entry.ri] = entry
+		if _isRetrieveSubscription(entry):
+			self._retrieveCount += 1
+		buckets = self._parents.setdefault(entry.pi, {})
+		keys:list[Any] = [ _allSubscriptions, *entry.net ]
+		if entry.om is not None:
+			keys.append(_operationSubscriptions)
+		for key in keys:
+			buckets[key] = buckets.get(key, ()) + (entry, )
+
+
+	def _remove(self, ri:str) -> None:
+		"""	Remove an indexed subscription. The caller must hold the lock.
+
+			Args:
+				ri: The resource ID of the subscription.
+		"""
+		if (entry := self._subscriptions.pop(ri, None)) is None:
+			return
+		if _isRetrieveSubscription(entry):
+			self._retrieveCount -= 1
+		buckets = self._parents[entry.pi]
+		for key, bucket in list(buckets.items()):
+			if entry in bucket:
+				if (remaining := tuple(each for each in bucket if each is not entry)):
+					buckets[key] = remaining
+				else:
+					del buckets[key]
+		if not buckets:
+			del self._parents[entry.pi]
+
+
+def _isRetrieveSubscription(entry:IndexedSubscription) -> bool:
+	"""	Test whether a subscription may be triggered by RETRIEVE requests.
+
+		Args:
+			entry: The indexed subscription.
+
+		Return:
+			True if the subscription has an *operationMonitor* or a blocking RETRIEVE event type.
+	"""
+	return entry.om is not None or not entry.net.isdisjoint(_retrieveEventTypes)
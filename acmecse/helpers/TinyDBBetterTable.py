@@ -9,6 +9,7 @@
 
 from typing import Dict, Callable, Mapping
 from tinydb.table import Table
+from .TinyDBJournalStorage import TinyDBJournalStorage, TinyDBTableChanges
 
 class TinyDBBetterTable(Table):
 	"""	This class is an add-on to TinyDB's *Table* class. It removes some computations that are not
@@ -55,6 +56,9 @@ class TinyDBBetterTable(Table):
 
 		As a further optimization, we don't convert the documents into the
 		document class, as the table data will *not* be returned to the user.
+
+		If the storage is a *TinyDBJournalStorage* then the changed documents
+		are recorded and only those changes are passed to the storage.
 		"""
 
 		tables = self._storage.read()
@@ -69,13 +73,23 @@ class TinyDBBetterTable(Table):
 			# The table does not exist yet, so it is empty
 			table = {}
 
-		# Perform the table update operation
-		updater(table) # type:ignore[arg-type]
+		if isinstance(self._storage, TinyDBJournalStorage):
+			# Perform the table update operation and record the changes
+			changes = TinyDBTableChanges(table)
+			updater(changes) # type:ignore[arg-type]
+			tables[self.name] = table
+
+			# Only write the changes to the storage
+			self._storage.writeChanges(self.name, changes)
+
+		else:
+			# Perform the table update operation
+			updater(table) # type:ignore[arg-type]
 
-		tables[self.name] = table
+			tables[self.name] = table
 
-		# Write the newly updated data back to the storage
-		self._storage.write(tables)
+			# Write the newly updated data back to the storage
+			self._storage.write(tables)
 
 		# Clear the query cache, as the table contents have changed
 		self.clear_cache()
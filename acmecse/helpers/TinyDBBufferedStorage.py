@@ -8,11 +8,15 @@
 """
 
 import _thread as Thread
-from threading import Event
+import os
+from threading import Event, RLock
 from time import sleep
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
+from contextlib import contextmanager
 from tinydb.storages import JSONStorage
 
+from .TinyDBStreamReader import TinyDBStreamReader
+
 
 class TinyDBBufferedStorage(JSONStorage):
 	"""	Storage driver class for TinyDB that implements a buffered disk write.
@@ -26,6 +30,9 @@ class TinyDBBufferedStorage(JSONStorage):
 		'_shutting_down',
 		'_changed',
 		'_data',
+		'_batchLock',
+		'_batchDepth',
+		'generation',
 	)
 	""" Define slots for instance variables. """
 	
@@ -60,8 +67,20 @@ class TinyDBBufferedStorage(JSONStorage):
 		self._data:Dict[str, Dict[str, Any]] = {}
 		""" The actual database data, which is also strored in memory as a buffer. """
 
-		# finishing init. Read the data for the first time
-		self._data = super().read()
+		self._batchLock = RLock()
+		""" Lock that prevents the file writer from writing the data during a batch of writes. """
+
+		self._batchDepth = 0
+		""" The nesting depth of the current batch of writes. 0 if no batch is active. """
+
+		self.generation = 0
+		""" The number of writes to the database. It changes whenever the data changes, e.g. to detect unchanged databases for backups. """
+
+		# finishing init. Read the data for the first time. The file is parsed incrementally.
+		self._handle.seek(0, os.SEEK_END)
+		if self._handle.tell():
+			self._handle.seek(0)
+			self._data = TinyDBStreamReader(self._handle).read()
 
 		# only start the file write thread at all if the access mode is not read only
 		if self._mode == 'r+':
@@ -81,14 +100,32 @@ class TinyDBBufferedStorage(JSONStorage):
 			raise PermissionError('DB Storage is openend as read-only')
 		self._data = data
 		self._changed = True
-		self._writeEvent.set()
+		self.generation += 1
+		if not self._batchDepth:
+			self._writeEvent.set()
+
+
+	@contextmanager
+	def batch(self) -> Iterator[None]:
+		"""	Context manager for a batch of writes.
+
+			The data is not written to the file while the batch is active, so that only the state
+			after all writes of the batch is written. Batches can be nested.
+		"""
+		with self._batchLock:
+			self._batchDepth += 1
+			try:
+				yield
+			finally:
+				self._batchDepth -= 1
+				if not self._batchDepth and self._changed:
+					self._writeEvent.set()
 
 
 	def _fileWriter(self) -> None:
 		"""	Worker for the file writer thread.
 		"""
 		self._shutdownLock.acquire()
-		self._writeEvent.clear()
 		while self._running:
 
 			if self._writeEvent.wait() and self._changed:
@@ -100,14 +137,33 @@ class TinyDBBufferedStorage(JSONStorage):
 					if self._shutting_down:
 						break
 					sleep(1)
-						
-				self._changed = False
-				super().write(self._data)
 				self._writeEvent.clear()
 
+				# Only take a snapshot of the data while a batch is prevented. The snapshot is
+				# serialized and written without holding the lock, so that writes are not blocked.
+				with self._batchLock:
+					self._changed = False
+					data = self.snapshot()
+				super().write(data)
+
 		self._shutdownLock.release()
 
 
+	def snapshot(self) -> Dict[str, Dict[str, Any]]:
+		"""	Return a copy of the current state of the database.
+
+			The tables and their documents are copied, but not the attribute values of the documents.
+			Documents are changed in place, but their attribute values are never changed in place.
+			The caller must prevent a batch of writes, e.g. by holding the locks of the database
+			or by entering a batch, if the snapshot must include only complete batches.
+
+			Return:
+				A copy of the database data.
+		"""
+		return { tableName: { id: dict(doc) for id, doc in dict(table).items() }
+				 for tableName, table in dict(self._data).items() }
+
+
 	def read(self) -> Optional[Dict[str, Dict[str, Any]]]:
 		"""	Read the current state.
 
@@ -129,6 +185,7 @@ class TinyDBBufferedStorage(JSONStorage):
 		while self._changed:
 			...
 		self._running = False			# terminate _fileWriter loop
+		self._writeEvent.set()			# wake up the _fileWriter loop if it is waiting again
 		self._shutdownLock.acquire()	# Wait for the _fileWriter loop to finish
 		if self._handle != None:
 			self._handle.flush()
@@ -0,0 +1,524 @@
+#
+#	TinyDBJournalStorage.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+"""	This module provides a storage driver class for TinyDB that writes the changes to the
+	database to an append-only journal file.
+"""
+
+from __future__ import annotations
+from typing import Optional, Dict, Any, Iterator, KeysView, ItemsView
+
+import _thread as Thread
+import json, os
+from threading import Event, Lock, RLock, get_ident
+from time import sleep
+from contextlib import contextmanager
+from tinydb.storages import Storage
+
+from .TinyDBStreamReader import TinyDBStreamReader
+
+
+class TinyDBTableChanges():
+	"""	A proxy for the raw data of a TinyDB table that records the IDs of the changed documents.
+
+		An instance of this class is passed to TinyDB's table update functions instead of the
+		table's dictionary. All operations are passed on to the dictionary. Documents that are
+		accessed by their ID are recorded as changed, because TinyDB updates documents in place.
+	"""
+
+	__slots__ = (
+		'table',
+		'ids',
+		'cleared',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self, table:Dict[str, Any]) -> None:
+		"""	Initialization of the proxy.
+
+			Args:
+				table: The raw data of the TinyDB table.
+		"""
+		self.table = table
+		""" The raw data of the TinyDB table. """
+		self.ids:dict[str, None] = {}
+		""" The IDs of the changed documents. The dictionary is used as an ordered set. """
+		self.cleared = False
+		""" Indicator that the table has been cleared. """
+
+
+	def __contains__(self, id:str) -> bool:
+		return id in self.table
+
+
+	def __getitem__(self, id:str) -> Any:
+		self.ids[id] = None
+		return self.table[id]
+
+
+	def __setitem__(self, id:str, doc:Any) -> None:
+		self.ids[id] = None
+		self.table[id] = doc
+
+
+	def __delitem__(self, id:str) -> None:
+		self.ids[id] = None
+		del self.table[id]
+
+
+	def __iter__(self) -> Iterator[str]:
+		return iter(self.table)
+
+
+	def __len__(self) -> int:
+		return len(self.table)
+
+
+	def get(self, id:str, default:Optional[Any] = None) -> Any:
+		return self.table.get(id, default)
+
+
+	def pop(self, id:str, *args:Any) -> Any:
+		self.ids[id] = None
+		return self.table.pop(id, *args)
+
+
+	def keys(self) -> KeysView[str]:
+		return self.table.keys()
+
+
+	def items(self) -> ItemsView[str, Any]:
+		return self.table.items()
+
+
+	def clear(self) -> None:
+		self.table.clear()
+		self.ids.clear()
+		self.cleared = True
+
+
+class TinyDBJournalStorage(Storage):
+	"""	Storage driver class for TinyDB that writes the changes to the database to an append-only journal.
+
+		The database is kept in memory. Every change to a document is recorded as a single line in
+		a journal file next to the database file, so the cost of a write is proportional to the size
+		of the change and not to the size of the database. The records are written in the background
+		after a short delay, and several changes to the same document during that delay are written
+		as a single record.
+
+		When the journal grows too large it is compacted in the background: the whole database is
+		written to the database file (the *snapshot*) and a new, empty journal is started.
+		When the database is opened the snapshot is read and the journal is replayed.
+
+		The snapshot has the same format as the file of TinyDB's *JSONStorage*, so existing database
+		files can be used with this storage driver and vice versa. The database is compacted when it
+		is closed.
+
+		Each journal starts with a header record that identifies the snapshot it belongs to. A journal that
+		doesn't belong to the snapshot, e.g. after an interrupted compaction, is ignored, because all its
+		changes are already part of the snapshot.
+
+		Journal records are JSON arrays:
+
+		- *["table", "id", {document}]* : A document was inserted or updated.
+		- *["table", "id", null]* : A document was removed.
+		- *["table", null, null]* : The table was cleared.
+	"""
+
+	__slots__ = (
+		'_path',
+		'_journalPath',
+		'_encoding',
+		'_mode',
+		'_data',
+		'_journal',
+		'_journalRecords',
+		'_compactionThreshold',
+		'_compactionRequested',
+		'_pending',
+		'_pendingLock',
+		'_batch',
+		'_batchLock',
+		'_batchDepth',
+		'_batchOwner',
+		'_writeEvent',
+		'_writeDelay',
+		'_shutdownLock',
+		'_running',
+		'_shutting_down',
+		'generation',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self, path:str,
+					   create_dirs:bool = False,
+					   encoding:str = None,
+					   access_mode:str = 'r+',
+					   write_delay:int = 1,
+					   compaction_threshold:int = 10000,
+					   **kwargs:Any) -> None:
+		"""	Initialization of the storage driver.
+
+			Args:
+				path: Where to store the JSON data. The journal is stored in the same directory with the extension *.journal* added.
+				create_dirs: Whether the directory structure to the database file should be created or not.
+				encoding: The encoding character set for the database file
+				access_mode: Mode in which the database is opened. Either 'r' or 'r+'.
+				write_delay: Time to wait before writing the changes to the journal, in seconds.
+				compaction_threshold: Number of journal records after which the journal is compacted.
+				kwargs: Any other argument.
+		"""
+		super().__init__()
+
+		if access_mode not in ('r', 'r+'):
+			raise ValueError(f'Unsupported access mode: {access_mode}')
+		if create_dirs:
+			os.makedirs(os.path.dirname(path) or '.', exist_ok = True)
+
+		self._path = path
+		""" Path of the database file (the snapshot). """
+		self._journalPath = f'{path}.journal'
+		""" Path of the journal file. """
+		self._encoding = encoding
+		""" The encoding character set for the database files. """
+		self._mode = access_mode
+		""" Mode in which the database is opened. """
+		self._journal = None
+		""" File handle of the journal. """
+		self._journalRecords = 0
+		""" The number of records in the journal. """
+		self._compactionThreshold = compaction_threshold
+		""" Number of journal records after which the journal is compacted. """
+		self._compactionRequested = False
+		""" Indicator that the database should be compacted, e.g. because it was written as a whole. """
+		self._pending:dict[tuple[str, Optional[str]], str] = {}
+		""" The serialized journal records that have not been written yet, keyed by (table, document ID). """
+		self._pendingLock = Lock()
+		""" Lock for the pending journal records. """
+		self._batch:dict[tuple[str, Optional[str]], str] = {}
+		""" The serialized journal records of the current batch of writes, keyed by (table, document ID). """
+		self._batchLock = RLock()
+		""" Lock for the current batch of writes. """
+		self._batchDepth = 0
+		""" The nesting depth of the current batch of writes. 0 if no batch is active. """
+		self._batchOwner:Optional[int] = None
+		""" The ident of the thread that owns the current batch of writes. """
+		self._writeEvent = Event()
+		""" Event instance to notify when a write happened. """
+		self._writeDelay:int = write_delay
+		""" Time to wait before writing the changes to the journal, in seconds. """
+		self._shutdownLock = Thread.allocate_lock()
+		""" Internal lock when shutting down the database. """
+		self._running = True
+		""" Indicating that the database is open and in use. """
+		self._shutting_down = False
+		""" Indicator that the database is closing. This is different from `_running`. """
+		self.generation = 0
+		""" The number of writes to the database. It changes whenever the data changes, e.g. to detect unchanged databases for backups. """
+
+		# Read the snapshot and replay the journal
+		self._data:Dict[str, Dict[str, Any]] = self._load()
+		""" The actual database data. """
+
+		# Only start the journal writer thread if the access mode is not read only.
+		# The database is only compacted when the journal is missing, doesn't belong to the snapshot,
+		# or contains incomplete records. Otherwise the existing journal is continued.
+		if self._mode == 'r+':
+			if self._compactionRequested:
+				self._compact()
+			else:
+				self._journal = open(self._journalPath, 'a', encoding = self._encoding)
+			Thread.start_new_thread(self._fileWriter, ())
+
+
+	def read(self) -> Optional[Dict[str, Dict[str, Any]]]:
+		"""	Read the current state.
+
+			This just returns the in-memory representation of the database.
+
+			Return:
+				Return the current state.
+		"""
+		return self._data
+
+
+	def snapshot(self) -> Dict[str, Dict[str, Any]]:
+		"""	Return a copy of the current state of the database.
+
+			The tables and their documents are copied, but not the attribute values of the documents.
+			The caller must prevent writes to the database, e.g. by holding the locks of the database,
+			if the snapshot must be consistent.
+
+			Return:
+				A copy of the database data.
+		"""
+		return { tableName: { id: dict(doc) for id, doc in dict(table).items() }
+				 for tableName, table in dict(self._data).items() }
+
+
+	def write(self, data:Dict[str, Dict[str, Any]]) -> None:
+		"""	Write the complete state of the database to the storage.
+
+			This is only used when TinyDB doesn't provide the changes to single documents.
+			The database is compacted during the next phase of the buffered write.
+
+			Args:
+				data: The current state of the database.
+		"""
+		if not self._mode == 'r+':
+			raise PermissionError('DB Storage is openend as read-only')
+		self._data = data
+		self._compactionRequested = True
+		self.generation += 1
+		self._writeEvent.set()
+
+
+	def writeChanges(self, tableName:str, changes:TinyDBTableChanges) -> None:
+		"""	Record the changes to a table.
+
+			The changed documents are serialized immediately and written to the journal during the
+			next phase of the buffered write.
+
+			Args:
+				tableName: The name of the changed table.
+				changes: The recorded changes to the table.
+		"""
+		if not self._mode == 'r+':
+			raise PermissionError('DB Storage is openend as read-only')
+		self.generation += 1
+		if self._batchDepth and self._batchOwner == get_ident():
+			self._recordChanges(self._batch, tableName, changes)
+			return
+		with self._pendingLock:
+			self._recordChanges(self._pending, tableName, changes)
+		self._writeEvent.set()
+
+
+	@contextmanager
+	def batch(self) -> Iterator[None]:
+		"""	Context manager for a batch of writes.
+
+			The changes of the batch are collected and added to the pending journal records together
+			when the batch ends, so that they are always written to the same journal write.
+			Batches can be nested.
+		"""
+		with self._batchLock:
+			self._batchDepth += 1
+			self._batchOwner = get_ident()
+			try:
+				yield
+			finally:
+				self._batchDepth -= 1
+				if not self._batchDepth:
+					self._batchOwner = None
+					if self._batch:
+						with self._pendingLock:
+							# Remove pending changes for the tables that were cleared in the batch
+							for tableName in [ k[0] for k in self._batch if k[1] is None ]:
+								for key in [ k for k in self._pending if k[0] == tableName ]:
+									del self._pending[key]
+							self._pending.update(self._batch)
+						self._batch = {}
+						self._writeEvent.set()
+
+
+	def _recordChanges(self, records:dict[tuple[str, Optional[str]], str], tableName:str, changes:TinyDBTableChanges) -> None:
+		"""	Serialize the changes to a table into journal records.
+
+			Args:
+				records: The journal records to add the changes to, keyed by (table, document ID).
+				tableName: The name of the changed table.
+				changes: The recorded changes to the table.
+		"""
+		table = changes.table
+		if changes.cleared:
+			# Remove recorded changes for this table. They are obsolete now.
+			for key in [ k for k in records if k[0] == tableName ]:
+				del records[key]
+			records[(tableName, None)] = json.dumps([tableName, None, None])
+		for id in changes.ids:
+			records[(tableName, id)] = json.dumps([tableName, id, table.get(id)])
+
+
+	def close(self) -> None:
+		"""	Write any pending changes, compact the database, and close all handles.
+		"""
+		if self._mode == 'r+':
+			self._shutting_down = True
+			self._running = False			# terminate _fileWriter loop
+			self._writeEvent.set()			# send event
+			self._shutdownLock.acquire()	# Wait for the _fileWriter loop to finish
+			self._flush()
+			try:
+				self._compact()
+			except RuntimeError:
+				pass	# The database was changed during the compaction. The journal is still valid.
+		if self._journal:
+			self._journal.close()
+			self._journal = None
+
+
+	def _fileWriter(self) -> None:
+		"""	Worker for the journal writer thread.
+		"""
+		self._shutdownLock.acquire()
+		while self._running:
+			if self._writeEvent.wait() and self._running:
+				# Wait a short time to collect more changes
+				for _ in range(int(self._writeDelay)):
+					if self._shutting_down:
+						break
+					sleep(1)
+				self._writeEvent.clear()
+				self._flush()
+
+				# Compact the journal if it has grown too large
+				if self._compactionRequested or self._journalRecords > self._compactionThreshold:
+					try:
+						self._compact()
+					except RuntimeError:
+						pass	# The database was changed during the compaction. Try again later.
+		self._shutdownLock.release()
+
+
+	def _flush(self) -> None:
+		"""	Append the pending records to the journal.
+		"""
+		with self._pendingLock:
+			if not self._pending:
+				return
+			records = list(self._pending.values())
+			self._pending = {}
+		self._writeRecords(records)
+
+
+	def _writeRecords(self, records:list[str]) -> None:
+		"""	Append records to the journal.
+
+			Args:
+				records: The serialized journal records.
+		"""
+		if not self._journal or not records:
+			return
+		self._journal.write('\n'.join(records) + '\n')
+		self._journal.flush()
+		os.fsync(self._journal.fileno())
+		self._journalRecords += len(records)
+
+
+	def _compact(self) -> None:
+		"""	Write the whole database to the snapshot file and start a new journal.
+
+			The new snapshot and journal are written to temporary files first. The snapshot is replaced
+			before the journal. If the compaction is interrupted in between, the old journal doesn't match
+			the new snapshot anymore and is ignored when the database is loaded.
+
+			Only a shallow copy of the tables is taken while the pending records are locked, and the
+			copy is serialized afterwards, so that writes are not blocked during the serialization.
+			Documents that are changed after the copy are written to the new journal, because their
+			records are pending again.
+
+			Raises:
+				RuntimeError: If the database was changed during serialization.
+		"""
+		with self._pendingLock:
+			# All pending changes are part of the snapshot
+			tables = { tableName: dict(table) for tableName, table in dict(self._data).items() }
+			records = list(self._pending.values())
+			self._pending = {}
+			self._compactionRequested = False
+		try:
+			snapshot = json.dumps(tables)
+		except RuntimeError:
+			# A document was changed during the serialization. The old journal is still valid,
+			# so append the records that were taken for the snapshot, and try again later.
+			self._compactionRequested = True
+			self._writeRecords(records)
+			raise
+
+		# Write the new snapshot to a temporary file
+		tmpSnapshotPath = f'{self._path}.tmp'
+		with open(tmpSnapshotPath, 'w', encoding = self._encoding) as file:
+			file.write(snapshot)
+			file.flush()
+			os.fsync(file.fileno())
+
+		# Write a new journal with a header for the new snapshot
+		tmpJournalPath = f'{self._journalPath}.tmp'
+		with open(tmpJournalPath, 'w', encoding = self._encoding) as file:
+			file.write(json.dumps(self._snapshotID(tmpSnapshotPath)) + '\n')
+			file.flush()
+			os.fsync(file.fileno())
+
+		# Replace the old files
+		if self._journal:
+			self._journal.close()
+		os.replace(tmpSnapshotPath, self._path)
+		os.replace(tmpJournalPath, self._journalPath)
+		self._journal = open(self._journalPath, 'a', encoding = self._encoding)
+		self._journalRecords = 0
+
+
+	def _load(self) -> Dict[str, Dict[str, Any]]:
+		"""	Read the snapshot and replay the journal.
+
+			The snapshot is parsed incrementally. Incomplete records at the end of the journal, e.g. after a crash,
+			are ignored. A compaction is requested if the journal can't be continued.
+
+			Return:
+				The database data.
+		"""
+		data:Dict[str, Dict[str, Any]] = {}
+		if os.path.isfile(self._path) and os.path.getsize(self._path) > 0:
+			with open(self._path, 'r', encoding = self._encoding) as file:
+				data = TinyDBStreamReader(file).read()
+
+		if not os.path.isfile(self._journalPath):
+			self._compactionRequested = True
+			return data
+		with open(self._journalPath, 'r', encoding = self._encoding) as file:
+			try:
+				if json.loads(file.readline()) != self._snapshotID(self._path):
+					self._compactionRequested = True
+					return data	# The journal doesn't belong to this snapshot
+			except json.JSONDecodeError:
+				self._compactionRequested = True
+				return data
+			for line in file:
+				try:
+					tableName, id, doc = json.loads(line)
+				except (json.JSONDecodeError, ValueError):
+					self._compactionRequested = True
+					break	# Incomplete record
+				if not line.endswith('\n'):
+					self._compactionRequested = True	# New records must not be appended to this line
+				table = data.setdefault(tableName, {})
+				if id is None:
+					table.clear()
+				elif doc is None:
+					table.pop(id, None)
+				else:
+					table[id] = doc
+				self._journalRecords += 1
+		return data
+
+
+	def _snapshotID(self, path:str) -> list[int]:
+		"""	Return an identification of a snapshot file.
+
+			Args:
+				path: The path of the snapshot file.
+
+			Return:
+				A list with the size and the modification time of the file, or an empty list if the file doesn't exist.
+		"""
+		try:
+			stat = os.stat(path)
+			return [ stat.st_size, stat.st_mtime_ns ]
+		except FileNotFoundError:
+			return []
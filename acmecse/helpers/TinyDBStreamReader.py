@@ -0,0 +1,245 @@
+#
+#	TinyDBStreamReader.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+"""	This module provides an incremental reader for TinyDB database files.
+"""
+
+from __future__ import annotations
+from typing import Dict, Any, TextIO
+
+import gc, json, re
+
+
+_whitespace = ' \t\n\r'
+""" JSON whitespace characters. """
+
+_delimiter = re.compile(r'[ \t\n\r,\]}]')
+""" Characters that terminate a number or literal. """
+
+_simpleMember = re.compile(r'\s*"([^"\\]*)"\s*:\s*')
+""" A member name without escape sequences, and the following colon. """
+
+_separator = re.compile(r'\s*([,}])')
+""" The separator after a member, or the end of the object. """
+
+
+class TinyDBStreamReader():
+	"""	Incremental reader for TinyDB database files.
+
+		A TinyDB database file is a JSON object with the tables as members. Each table is a
+		JSON object with the documents as members. Instead of reading the whole file into a
+		string and parsing it at once, the file is read in chunks and the documents are parsed
+		one by one. Only the current chunk and the parsed documents are kept in memory.
+
+		Example:
+
+			::
+
+				with open(path, 'r') as file:
+					data = TinyDBStreamReader(file).read()
+	"""
+
+	__slots__ = (
+		'_file',
+		'_chunkSize',
+		'_buffer',
+		'_pos',
+		'_eof',
+		'_decoder',
+	)
+	""" Define slots for instance variables. """
+
+
+	def __init__(self, file:TextIO, chunkSize:int = 1024 * 1024) -> None:
+		"""	Initialize the reader.
+
+			Args:
+				file: The file to read from. It is read from its current position.
+				chunkSize: The number of characters that are read from the file at once.
+		"""
+		self._file = file
+		""" The file to read from. """
+		self._chunkSize = chunkSize
+		""" The number of characters that are read from the file at once. """
+		self._buffer = ''
+		""" The characters that have been read but not parsed yet, starting at *_pos*. """
+		self._pos = 0
+		""" The current parse position in the buffer. """
+		self._eof = False
+		""" Indicator that the end of the file has been reached. """
+		self._decoder = json.JSONDecoder()
+		""" The decoder for single JSON values. """
+
+
+	def read(self) -> Dict[str, Dict[str, Any]]:
+		"""	Read and parse the database file.
+
+			Return:
+				The tables of the database, keyed by their names.
+
+			Raises:
+				json.JSONDecodeError: If the file is not a valid TinyDB database file.
+		"""
+		data:Dict[str, Dict[str, Any]] = {}
+
+		# The garbage collector is paused while reading, because it would otherwise run
+		# many times while the documents are created, without finding anything to collect.
+		gcEnabled = gc.isenabled()
+		gc.disable()
+		try:
+			self._expect('{')
+			if not self._consume('}'):
+				while True:
+					tableName = self._name()
+					self._expect('{')
+					data[tableName] = self._documents()
+					if self._consume('}'):
+						break
+					self._expect(',')
+			self._skipWhitespace()
+			if self._pos < len(self._buffer):
+				raise json.JSONDecodeError('Extra data', self._buffer, self._pos)
+		finally:
+			if gcEnabled:
+				gc.enable()
+		return data
+
+
+	def _documents(self) -> Dict[str, Any]:
+		"""	Parse the documents of a table. The opening brace of the table has already been consumed.
+
+			Return:
+				The documents of the table, keyed by their IDs.
+
+			Raises:
+				json.JSONDecodeError: If the table is not valid JSON.
+		"""
+		documents:Dict[str, Any] = {}
+		decode = self._decoder.raw_decode
+		if self._consume('}'):
+			return documents
+		while True:
+			# Keep at least half a chunk in the buffer, so that most documents are completely in the buffer
+			if not self._eof and len(self._buffer) - self._pos < self._chunkSize // 2:
+				self._fill()
+
+			# Fast path for a document with a simple ID that is completely in the buffer
+			end = -1
+			if (m := _simpleMember.match(self._buffer, self._pos)):
+				try:
+					document, end = decode(self._buffer, m.end())
+				except json.JSONDecodeError:
+					pass
+			if 0 <= end < len(self._buffer):
+				documents[m.group(1)] = document	# type:ignore[union-attr]
+				self._pos = end
+			else:
+				id = self._name()
+				documents[id] = self._value()
+
+			if (m := _separator.match(self._buffer, self._pos)):
+				self._pos = m.end()
+				if m.group(1) == '}':
+					return documents
+			else:
+				if self._consume('}'):
+					return documents
+				self._expect(',')
+
+
+	def _fill(self) -> bool:
+		"""	Read the next chunk from the file into the buffer. The already parsed characters are removed from the buffer.
+
+			Return:
+				False if the end of the file has been reached before.
+		"""
+		if self._eof:
+			return False
+		chunk = self._file.read(self._chunkSize)
+		if not chunk:
+			self._eof = True
+		self._buffer = self._buffer[self._pos:] + chunk
+		self._pos = 0
+		return True
+
+
+	def _skipWhitespace(self) -> None:
+		"""	Skip whitespace characters, and read more chunks if necessary.
+		"""
+		while True:
+			while self._pos < len(self._buffer) and self._buffer[self._pos] in _whitespace:
+				self._pos += 1
+			if self._pos < len(self._buffer) or not self._fill():
+				return
+
+
+	def _consume(self, char:str) -> bool:
+		"""	Consume a character if it is the next non-whitespace character.
+
+			Args:
+				char: The character.
+
+			Return:
+				True if the character was consumed.
+		"""
+		self._skipWhitespace()
+		if self._buffer.startswith(char, self._pos):
+			self._pos += 1
+			return True
+		return False
+
+
+	def _expect(self, char:str) -> None:
+		"""	Consume a character that must be the next non-whitespace character.
+
+			Args:
+				char: The character.
+
+			Raises:
+				json.JSONDecodeError: If the next character is a different one.
+		"""
+		if not self._consume(char):
+			raise json.JSONDecodeError(f'Expecting {char!r}', self._buffer, self._pos)
+
+
+	def _name(self) -> str:
+		"""	Parse the next member name and the following colon.
+
+			Return:
+				The member name.
+
+			Raises:
+				json.JSONDecodeError: If the next value is not a string or is not followed by a colon.
+		"""
+		self._skipWhitespace()
+		if not self._buffer.startswith('"', self._pos):
+			raise json.JSONDecodeError('Expecting property name enclosed in double quotes', self._buffer, self._pos)
+		name = self._value()
+		self._expect(':')
+		return name
+
+
+	def _value(self) -> Any:
+		"""	Parse the next JSON value. More chunks are read until the value is complete.
+
+			Return:
+				The parsed value.
+
+			Raises:
+				json.JSONDecodeError: If the value is not valid JSON.
+		"""
+		self._skipWhitespace()
+		if not self._buffer.startswith(('{', '[', '"'), self._pos):
+			# Numbers and literals are not delimited. Make sure that they are completely in the buffer.
+			while not _delimiter.search(self._buffer, self._pos) and self._fill():
+				pass
+		while True:
+			try:
+				value, self._pos = self._decoder.raw_decode(self._buffer, self._pos)
+				return value
+			except json.JSONDecodeError:
+				if not self._fill():
+					raise
@@ -46,11 +46,15 @@
 ;;,				  "${get-config \"cse.cseID\"}/acpRetrieveCSEBase" s
 
 ;;
-;;	Allow all originators to create (only) <ACP> and <NTP> under the CSEBase
+;;	The following resources under the CSEBase are created together in one batch
 ;;
 
 (import-raw 
 	cse-originator
+
+	;;
+	;;	Allow all originators to create (only) <ACP> and <NTP> under the CSEBase
+	;;
 	{ "m2m:acp": {
 		"rn": "acpCreateRootResources",
 		"ri": "acpCreateRootResources",
@@ -70,11 +74,8 @@
 				}
 			]
 		}
-	}})
-
+	}}
 
-(import-raw 
-	cse-originator
 	{ "m2m:acp": {
 		"rn": "acpRetrieveCSEBase",
 		"ri": "acpRetrieveCSEBase",
@@ -93,15 +94,11 @@
 				}
 			]
 		}
-	}})
-
-
-;;
-;;	Default admin AE
-;;
+	}}
 
-(import-raw 
-	cse-originator
+	;;
+	;;	Default admin AE
+	;;
 	{ "m2m:ae": {
 		"ri":  "${cse-originator}",
 		"rn":  "${cse-originator}",
@@ -110,14 +107,11 @@
 		"api": "N${cse-originator}",
 		"aei": "${cse-originator}",
 		"csz": [ "application/json", "application/cbor" ]
-	}})
-
+	}}
 
-;;
-;;	Default <NotificationTargetPolicy> resource
-;;
-(import-raw 
-	cse-originator
+	;;
+	;;	Default <NotificationTargetPolicy> resource
+	;;
 	{ "m2m:ntp": {
 		"ri":  "defaultNTP",
 		"rn":  "defaultNTP",
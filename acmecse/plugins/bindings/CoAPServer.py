@@ -299,6 +299,10 @@ class ACMECoAPHandler():
 				case defines.OptionRegistry.oneM2M_OT.number:	# type:ignore[attr-defined]
 					req['ot'] = options.getOne(option)
 
+				# etag. Entity tags of cached representations for a validation request
+				case defines.OptionRegistry.ETAG.number:
+					cseRequest.ifNoneMatch = [ each.hex() if isinstance(each, bytes) else str(each) for each in options.get(option, []) ]
+
 				# rtu / RTURI
 				case defines.OptionRegistry.oneM2M_RTURI.number:	# type:ignore[attr-defined]
 					rtu = options.getOne(option)
@@ -383,7 +387,7 @@ class ACMECoAPHandler():
 			result.request.rset = originalRequest.rset
 		
 		#	Transform request to oneM2M request
-		outResult = self.requestManager.requestFromResult(result, isResponse=True, originalRequest=originalRequest)
+		outResult = self.requestManager.requestFromResult(result, isResponse=True, originalRequest=originalRequest, sharedContent=True)
 
 		#
 		# 	Transform oneM2M request to CoAP message
@@ -402,7 +406,19 @@ class ACMECoAPHandler():
 			response.add_option(newCoAPOption(defines.OptionRegistry.oneM2M_VSI.number, vsi))					# type:ignore[attr-defined]
 		if rset := findXPath(cast(JSON, outResult.data), 'rset'):
 			response.add_option(newCoAPOption(defines.OptionRegistry.oneM2M_RSET.number, rset))					# type:ignore[attr-defined]
+		if cnst := findXPath(cast(JSON, outResult.data), 'cnst'):
+			response.add_option(newCoAPOption(defines.OptionRegistry.oneM2M_CTS.number, f'{cnst}'))				# type:ignore[attr-defined]
+		if cnot := findXPath(cast(JSON, outResult.data), 'cnot'):
+			response.add_option(newCoAPOption(defines.OptionRegistry.oneM2M_CTO.number, f'{cnot}'))				# type:ignore[attr-defined]
 		response.add_option(newCoAPOption(defines.OptionRegistry.oneM2M_OT.number, getResourceDate()))			# type:ignore[attr-defined]
+		if result.etag:
+			response.add_option(newCoAPOption(defines.OptionRegistry.ETAG.number, bytes.fromhex(result.etag)))	# type:ignore[arg-type]
+
+		# A validation request for an unchanged representation is answered without content
+		if result.notModified:
+			response.code = defines.Codes.VALID.number
+			L.isDebug and L.logDebug(f'<== CoAP Response (2.03 Valid):\nOptions: {optionsToDict(response.options)}')
+			return response
 
 		# CoAP status code
 		response.code = result.rsc.coapStatusCode().number
@@ -691,7 +691,7 @@ class HttpServer(object):
 		#
 		#	Transform request to oneM2M request
 		#
-		outResult = self.requestManager.requestFromResult(result, isResponse=True, originalRequest=originalRequest)
+		outResult = self.requestManager.requestFromResult(result, isResponse=True, originalRequest=originalRequest, sharedContent=True)
 
 		#
 		#	Transform oneM2M request to http message
@@ -712,7 +712,18 @@ class HttpServer(object):
 			headers[Constants().hfVSI] = vsi
 		if rset := findXPath(cast(JSON, outResult.data), 'rset'):
 			headers[Constants().hfRST] = rset
+		if cnst := findXPath(cast(JSON, outResult.data), 'cnst'):
+			headers[Constants().hfCTS] = f'{cnst}'
+		if cnot := findXPath(cast(JSON, outResult.data), 'cnot'):
+			headers[Constants().hfCTO] = f'{cnot}'
 		headers[Constants().hfOT] = getResourceDate()
+		if result.etag:
+			headers['ETag'] = f'W/"{result.etag}"'	# weak, because the representation depends on the serialization
+
+		# A conditional request for an unchanged representation is answered without content
+		if result.notModified:
+			L.isDebug and L.logDebug(f'<== HTTP Response (304 Not Modified):\nHeaders: {str(headers)}')
+			return Response(status = 304, headers = headers)
 
 		# HTTP status code
 		statusCode = result.rsc.httpStatusCode()
@@ -827,6 +838,10 @@ class HttpServer(object):
 		for h in _headers.getlist('accept'):
 			cseRequest.httpAccept.extend([ a.strip() for a in h.split(',') if not a.startswith('*/*')])
 
+		# parse If-None-Match header for conditional RETRIEVE requests. Weak and strong entity tags are treated the same
+		if (ifNoneMatch := request.if_none_match):
+			cseRequest.ifNoneMatch = [ '*' ] if ifNoneMatch.star_tag else list(ifNoneMatch.as_set(include_weak = True))
+
 		# Copy the request arguments into an own multi-dict
 		_args = MultiDict()	
 		for k,v in request.args.items(multi=True): # multi=True returns a list of values for each key
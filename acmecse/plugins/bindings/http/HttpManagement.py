@@ -89,6 +89,31 @@ class HttpManagement:
 				L.isInfo and L.log(f'Management request: {command}{"(" + param + ")" if param else ""}')
 				match command:
 
+					case 'backup':
+						if param is None:
+							return Response(response=self.managementSupport.backupDB(), 
+											headers=self.httpServer._responseHeaders)
+						else:
+							match param.lower():
+								case 'list':
+									return Response(response=self.managementSupport.getBackups(), 
+													mimetype='application/json', 
+													headers=self.httpServer._responseHeaders)
+								case 'help':
+									return Response(response='''ACME oneM2M CSE Management Backup Commands
+							
+(no command)  Create a database backup snapshot in the background
+list          Get the list of backup snapshots
+help          Show this help message
+''',
+										status=200,
+										headers=self.httpServer._responseHeaders)
+								case _:
+									L.isWarn and L.logWarn(f'Unknown management backup command: {param}')
+									return Response(response=f'Unknown management backup command: {param}.\nUse "backup/help" for a list of commands.', 
+													status=422, 
+													headers=self.httpServer._responseHeaders)
+
 					case 'config':
 						return Response(response=self.managementSupport.getConfig(), mimetype='application/json',	headers=self.httpServer._responseHeaders)
 				
@@ -225,6 +250,7 @@ help          Show this help message
 					case 'help':
 						return Response(response='''ACME oneM2M CSE Management Commands
 
+backup         Create a database backup snapshot or list the snapshots (.../list)
 config         Get the current configuration
 log            Stream the live log output
 loglevel       Get or set the log level (.../{info|debug|warning|error|off})
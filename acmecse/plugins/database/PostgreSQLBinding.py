@@ -13,7 +13,9 @@
 """
 
 from __future__ import annotations
-from typing import Optional, Callable, Sequence, Any, Tuple
+from typing import Optional, Callable, Sequence, Any, Tuple, Iterator
+from threading import Lock, local
+from contextlib import contextmanager
 
 from psycopg2 import connect, Error
 from psycopg2.extras import Json as PsyJson
@@ -21,17 +23,35 @@ from psycopg2.extensions import cursor as PsyCursor, connection as PsyConnection
 
 from acmecse.runtime.DBBinding import DBBinding
 from acmecse.etc.Constants import Constants as C
-from acmecse.etc.Types import JSON, ResourceTypes, OriginatorType
+from acmecse.etc.Types import JSON, ResourceTypes, OriginatorType, FilterCriteria, FilterOperation
 from acmecse.etc.ResponseStatusCodes import INTERNAL_SERVER_ERROR
 from acmecse.runtime.Logging import Logging as L
 from acmecse.runtime.Configuration import Configuration, ConfigurationError
 from acmecse.runtime.PluginSupport import plugin, start, configure, validate
 from acmecse.helpers.NetworkTools import isValidPort
+from acmecse.helpers.ConnectionPool import ConnectionPool
 
 
 
 # TODO Add error handling ansd exceptions to fetch methods?
 
+class _TransactionState(local):
+	"""	The state of the current thread's transaction.
+	"""
+
+	def __init__(self) -> None:
+		"""	Initialize the state for a thread without a transaction.
+		"""
+		self.depth = 0
+		""" The nesting depth of the transaction. 0 if no transaction is active. """
+
+		self.statements:list[bytes] = []
+		""" The queued write statements that have not been sent to the database yet. """
+
+		self.begun = False
+		""" Indicator that an explicit transaction has been started in the database. """
+
+
 @plugin(property='postgresqlBinding', tags=['acme', 'database'])
 class PostgreSQLBinding(DBBinding):
 	"""	PostgreSQLBinding class.
@@ -55,6 +75,9 @@ class PostgreSQLBinding(DBBinding):
 	tableRequests = 'requests'
 	"""	The name of the table to store requests and responses. """
 
+	tableSchemaVersions = 'schemaVersions'
+	"""	The name of the table for the applied schema migrations. """
+
 	tableResources = 'resources'
 	"""	The name of the table for resources. """
 
@@ -67,6 +90,9 @@ class PostgreSQLBinding(DBBinding):
 	tableSubscriptions = 'subscriptions'
 	"""	The name of the table for subscription mappings. """
 
+	discoveryFetchSize = 100
+	"""	The number of rows that are fetched at a time from the server-side cursor for discovery. """
+
 
 					# if _disablePostgreSQL:
 					# 	raise RuntimeError('Configuration conflict: Use of PostgreSQL is disabled in the environment, but enabled in the configuration.')
@@ -103,28 +129,45 @@ class PostgreSQLBinding(DBBinding):
 		self.dbSchema = Configuration.database_postgresql_schema
 		"""	The schema to use in the database. """
 
-		self.dbConnection:Optional[PsyConnection] = None
-		"""	The database connection object. """
+		self.requestsCount = 0
+		"""	The number of requests in the requests table. It is used to decide how many of the oldest
+			requests must be removed when a new request is inserted. Protected by *lockRequestsCount*. """
 
-		# Connect to the database
-		self._checkOpenConnection()
+		self.lockRequestsCount = Lock()
+		"""	Lock for the number of requests. """
 
-		# Create and upgrade the tables if necessary. Prepare the statements.
-		self.createTables()
-		self.upgradeTables()
-		self.prepareStatements()
+		self.transactionState = _TransactionState()
+		"""	The state of the transactions, one for each thread. """
+
+		# Create and upgrade the tables if necessary, using a separate connection
+		connection = self._connect()
+		try:
+			self.createTables(connection)
+			self.upgradeTables(connection)
+			with connection.cursor() as cursor:
+				cursor.execute(f'SELECT COUNT(*) FROM {self.tableRequests}')
+				self.requestsCount = cursor.fetchone()[0]
+		finally:
+			connection.close()
+
+		self.dbPool = ConnectionPool(connect = self._connectAndPrepare,
+									 check = self._checkConnection,
+									 isClosed = lambda c: c.closed != 0,
+									 close = lambda c: c.close(),
+									 minSize = Configuration.database_postgresql_minConnections,
+									 maxSize = Configuration.database_postgresql_maxConnections)
+		"""	The pool of database connections. Each connection has its own prepared statements. """
+		self.dbPool.open()
 
 
 	def closeDB(self) -> None:
-		if self.dbConnection is not None:
-			# L.isDebug and L.logDebug('Closing database connection')
-			self.dbConnection.close()
-			self.dbConnection = None
+		# L.isDebug and L.logDebug('Closing database connections')
+		self.dbPool.close()
 
 
 	def purgeDB(self) -> None:
 		# L.isDebug and L.logDebug('Purging database')
-		with self.dbConnection.cursor() as cursor:
+		with self.dbPool.connection() as connection, connection.cursor() as cursor:
 			cursor.execute(f'''
 				TRUNCATE TABLE {self.tableActions};
 				TRUNCATE TABLE {self.tableBatchNotifications};
@@ -137,13 +180,20 @@ class PostgreSQLBinding(DBBinding):
 				TRUNCATE TABLE {self.tableStatistics};
 				TRUNCATE TABLE {self.tableSubscriptions};
 			''')
+		with self.lockRequestsCount:
+			self.requestsCount = 0
 	
 
-	def backupDB(self, dir:str) -> bool:
+	def backupDB(self, dir:str, previous:Optional[str] = None) -> bool:
 		# L.isDebug and L.logDebug(f'Database backup is not supported for PostgreSQL. Skipping.')
 		return True
 
 
+	def supportsBackup(self) -> bool:
+		# Database backups are not supported for PostgreSQL
+		return False
+
+
 	#
 	#	Configuration
 	#
@@ -165,6 +215,8 @@ class PostgreSQLBinding(DBBinding):
 		config.database_postgresql_password = parser.get('database.postgresql', 'password', fallback=None)
 		config.database_postgresql_database = parser.get('database.postgresql', 'database', fallback='acmecse')
 		config.database_postgresql_schema = parser.get('database.postgresql', 'schema', fallback='acmecse')
+		config.database_postgresql_minConnections = parser.getint('database.postgresql', 'minConnections', fallback=1)
+		config.database_postgresql_maxConnections = parser.getint('database.postgresql', 'maxConnections', fallback=10)
 
 
 	@validate
@@ -179,19 +231,26 @@ class PostgreSQLBinding(DBBinding):
 		"""
 		if not isValidPort(config.database_postgresql_port):
 			raise ConfigurationError(fr'Invalid port number for [i]\[database.postgresql]:port[/i]: {config.database_postgresql_port}')
+		if config.database_postgresql_minConnections < 0:
+			raise ConfigurationError(fr'[i]\[database.postgresql]:minConnections[/i] must be >= 0')
+		if config.database_postgresql_maxConnections < max(1, config.database_postgresql_minConnections):
+			raise ConfigurationError(fr'[i]\[database.postgresql]:maxConnections[/i] must be > 0 and >= [i]minConnections[/i]')
 
 
 
 	###########################################################################
 
 
-	def createTables(self) -> None:
+	def createTables(self, connection:PsyConnection) -> None:
 		"""	Create the necessary schema and tables if they do not exist.
+
+			Args:
+				connection: The database connection to use.
 		"""
 
 		# L.isDebug and L.logDebug('Creating database tables')
 		
-		with self.dbConnection.cursor() as cursor:
+		with connection.cursor() as cursor:
 
 			# Create the schema
 			cursor.execute(f'''
@@ -222,7 +281,8 @@ class PostgreSQLBinding(DBBinding):
 					id SERIAL PRIMARY KEY,
 					pi TEXT NOT NULL,
 					childRi TEXT NOT NULL UNIQUE,	-- automatic index
-					childTy INTEGER NOT NULL
+					childTy INTEGER NOT NULL,
+					childCt TEXT
 				);
 			''')
 
@@ -282,13 +342,98 @@ class PostgreSQLBinding(DBBinding):
 			''')
 
 	
-	def upgradeTables(self) -> None:
+	def upgradeTables(self, connection:PsyConnection) -> None:
 		"""	Upgrade the tables if necessary.
+
+			The applied migrations are recorded in the schema versions table. Each migration from
+			`schemaMigrations()` with a higher version than the current schema version is applied
+			in version order. A migration and the record of its version are executed in a single
+			query string, which PostgreSQL runs as one implicit transaction. A failed migration is
+			therefore rolled back completely and is retried with the next start.
+
+			Args:
+				connection: The database connection to use.
 		"""
-		pass
+		with connection.cursor() as cursor:
+			cursor.execute(f'''
+				CREATE TABLE IF NOT EXISTS {self.tableSchemaVersions} (
+					version INTEGER PRIMARY KEY,
+					description TEXT NOT NULL,
+					applied TIMESTAMPTZ NOT NULL DEFAULT now()
+				)
+			''')
+			cursor.execute(f'SELECT COALESCE(MAX(version), 0) FROM {self.tableSchemaVersions}')
+			currentVersion = cursor.fetchone()[0]
+
+			migrations = sorted(self.schemaMigrations(), key = lambda m: m[0])
+			if migrations and currentVersion > migrations[-1][0]:
+				L.isWarn and L.logWarn(f'Database schema version {currentVersion} is newer than the supported version {migrations[-1][0]}')
+				return
+
+			for version, description, sql in migrations:
+				if version <= currentVersion:
+					continue
+				L.isInfo and L.log(f'Upgrading database schema to version {version}: {description}')
+				cursor.execute(f'''
+					{sql}
+					INSERT INTO {self.tableSchemaVersions} (version, description) VALUES (%s, %s);
+				''', (version, description))
 
 
-	def prepareStatements(self) -> None:
+	def schemaMigrations(self) -> list[Tuple[int, str, str]]:
+		"""	Return the schema migrations.
+
+			New migrations must be appended with a higher version number. Already released
+			migrations must not be changed, because they are not applied again to existing
+			databases. The SQL statements must not contain a "%" character, because the statements
+			are executed together with query parameters.
+
+			Return:
+				A list of (version, description, SQL statements) tuples.
+		"""
+		return [
+			(1, 'Add the creation time of child resources',
+				f'''
+				ALTER TABLE {self.tableChildResources} ADD COLUMN IF NOT EXISTS childCt TEXT;
+				UPDATE {self.tableChildResources} c 
+					SET childCt = r.resource->>'ct' 
+					FROM {self.tableResources} r 
+					WHERE c.childCt IS NULL AND r.ri = c.childRi;
+				CREATE INDEX IF NOT EXISTS {self.tableChildResources}_instances_idx 
+					ON {self.tableChildResources} (pi, childTy, childCt, id);
+				'''),
+
+			(2, 'Add indexes for the lookups by attributes',
+				f'''
+				CREATE INDEX IF NOT EXISTS {self.tableChildResources}_pi_idx 
+					ON {self.tableChildResources} (pi, id);
+				CREATE INDEX IF NOT EXISTS {self.tableResources}_pi_idx 
+					ON {self.tableResources} ((resource->>'pi'));
+				CREATE INDEX IF NOT EXISTS {self.tableResources}_ty_idx 
+					ON {self.tableResources} ((resource->>'ty'));
+				CREATE INDEX IF NOT EXISTS {self.tableResources}_aei_idx 
+					ON {self.tableResources} ((resource->>'aei')) WHERE resource->>'aei' IS NOT NULL;
+				CREATE INDEX IF NOT EXISTS {self.tableResources}_csi_idx 
+					ON {self.tableResources} ((resource->>'csi')) WHERE resource->>'csi' IS NOT NULL;
+				CREATE INDEX IF NOT EXISTS {self.tableResources}_et_idx 
+					ON {self.tableResources} ((resource->>'et'));
+				CREATE INDEX IF NOT EXISTS {self.tableResources}_lbl_idx 
+					ON {self.tableResources} USING GIN ((resource->'lbl'));
+				CREATE INDEX IF NOT EXISTS {self.tableBatchNotifications}_ri_nu_idx 
+					ON {self.tableBatchNotifications} ((batch->>'ri'), (batch->>'nu'));
+				CREATE INDEX IF NOT EXISTS {self.tableSubscriptions}_pi_idx 
+					ON {self.tableSubscriptions} ((subscription->>'pi'));
+				CREATE INDEX IF NOT EXISTS {self.tableActions}_subject_idx 
+					ON {self.tableActions} ((action->>'subject'));
+				CREATE INDEX IF NOT EXISTS {self.tableRequests}_ri_idx 
+					ON {self.tableRequests} ((request->>'ri'));
+				CREATE INDEX IF NOT EXISTS {self.tableSchedules}_pi_idx 
+					ON {self.tableSchedules} ((schedule->>'pi'));
+				'''),
+		]
+
+
+	def prepareStatements(self, connection:PsyConnection) -> None:
 		"""	Prepare the PreparedStatements for various SQL operations. 
 		
 			This method is called after the database connection is established and
@@ -298,10 +443,13 @@ class PostgreSQLBinding(DBBinding):
 			subscriptions.
 
 			Note that prepared statements are only usable within the same connection.
-			Therefore, this method should be called after the connection is established.
+			Therefore, this method is called for each new connection in the connection pool.
+
+			Args:
+				connection: The database connection to prepare the statements for.
 		"""
 		# L.isDebug and L.logDebug('Preparing SQL statements')
-		with self.dbConnection.cursor() as cur:
+		with connection.cursor() as cur:
 
 			# Prepare resource operations
    
@@ -322,6 +470,10 @@ class PostgreSQLBinding(DBBinding):
 				PREPARE getResourceByRI AS
 					SELECT resource FROM {self.tableResources} 
 					WHERE ri = $1;
+				PREPARE getResourcesByRIs AS
+					SELECT r.resource FROM {self.tableResources} r
+					JOIN unnest($1::text[]) WITH ORDINALITY AS ids(ri, pos) ON r.ri = ids.ri
+					ORDER BY ids.pos;
 				PREPARE getResourceByAEI AS
 					SELECT resource FROM {self.tableResources} 
 					WHERE resource->>'aei' = $1;
@@ -337,6 +489,11 @@ class PostgreSQLBinding(DBBinding):
 				PREPARE getResourcesByPIandTY AS
 					SELECT resource FROM {self.tableResources} 
 					WHERE resource->>'pi' = $1 AND resource->>'ty' = $2;
+				PREPARE getExpiredResources AS
+					SELECT resource FROM {self.tableResources} 
+					WHERE resource->>'et' < $1
+					ORDER BY resource->>'et' 
+					LIMIT $2;
 
 				PREPARE countResources AS
 					SELECT COUNT(*) FROM {self.tableResources};
@@ -362,15 +519,28 @@ class PostgreSQLBinding(DBBinding):
 				PREPARE getIdentifierByRI AS
 					SELECT ri, srn FROM {self.tableIdentidiers} 
 					WHERE ri = $1;
+				PREPARE getIdentifiers AS
+					SELECT ri, rn, srn, ty FROM {self.tableIdentidiers}
+					WHERE NOT (ty = ANY($1));
 				PREPARE deleteIdentifier AS
 					DELETE FROM {self.tableIdentidiers} 
 					WHERE ri = $1;
 
 				PREPARE insertChildResource AS
-					INSERT into {self.tableChildResources} (pi, childRi, childTy) VALUES ($1, $2, $3);
+					INSERT into {self.tableChildResources} (pi, childRi, childTy, childCt) VALUES ($1, $2, $3, $4);
 				PREPARE getChildResourcesByPI AS
 					SELECT childRi, childTy FROM {self.tableChildResources} 
 					WHERE pi = $1;
+				PREPARE getInstanceByIndexAsc AS
+					SELECT childRi FROM {self.tableChildResources} 
+					WHERE pi = $1 AND childTy = $2
+					ORDER BY childCt ASC, id ASC
+					OFFSET $3 LIMIT 1;
+				PREPARE getInstanceByIndexDesc AS
+					SELECT childRi FROM {self.tableChildResources} 
+					WHERE pi = $1 AND childTy = $2
+					ORDER BY childCt DESC, id DESC
+					OFFSET $3 LIMIT 1;
 				PREPARE deleteChildResource AS
 					DELETE FROM {self.tableChildResources} 
 					WHERE pi = $1 AND childRi = $2;
@@ -389,6 +559,8 @@ class PostgreSQLBinding(DBBinding):
 				PREPARE getSubscriptionByPI AS
 					SELECT subscription FROM {self.tableSubscriptions} 
 					WHERE subscription->>'pi' = $1;
+				PREPARE getSubscriptions AS
+					SELECT subscription FROM {self.tableSubscriptions};
 				PREPARE deleteSubscription AS
 					DELETE FROM {self.tableSubscriptions} 
 					WHERE ri = $1;
@@ -461,13 +633,9 @@ class PostgreSQLBinding(DBBinding):
 
 				PREPARE insertRequest AS
 					INSERT INTO {self.tableRequests} (ts, request) VALUES ($1, $2);
-				PREPARE selectMaxRequests AS
-					SELECT ts FROM {self.tableRequests} 
-					ORDER BY ts DESC OFFSET $1;
-				
-				PREPARE deleteOldRequests AS
+				PREPARE deleteOldestRequests AS
 					DELETE FROM {self.tableRequests} 
-					WHERE ts <= $1;
+					WHERE ts <= (SELECT ts FROM {self.tableRequests} ORDER BY ts OFFSET $1 - 1 LIMIT 1);
 				PREPARE deleteRequestsByRI AS
 					DELETE FROM {self.tableRequests}
 					WHERE request->>'ri' = $1;
@@ -513,28 +681,59 @@ class PostgreSQLBinding(DBBinding):
 
 				   
 	
-	def _checkOpenConnection(self) -> None:
-		"""	Check if the database connection is open.
+	def _connect(self) -> PsyConnection:
+		"""	Open a new connection to the database.
 
-			Try to reconnect if the connection is closed.
+			Return:
+				The new database connection.
+		"""
+		try:
+			# L.isDebug and L.logDebug('Connecting to database')
+			connection = connect(
+				database=self.dbDatabase,
+				user=self.dbUser,
+				password=self.dbPassword,
+				host=self.dbHost,
+				port=self.dbPort,
+				options=f'-c search_path={self.dbSchema}'	# schema path
+			)
+			connection.autocommit = True
+			return connection
+		except Error:
+			L.logErr(f'Error connecting to postgreSQL database at {self.dbHost}:{self.dbPort} as "{self.dbUser}" with database "{self.dbDatabase}"')
+			raise
+
+
+	def _connectAndPrepare(self) -> PsyConnection:
+		"""	Open a new connection for the connection pool and prepare the statements for it.
 
+			Return:
+				The new database connection.
 		"""
-		if not self.dbConnection or self.dbConnection.closed:
-			try:
-				# L.isDebug and L.logDebug('Reconnecting to database')
-				self.dbConnection=connect(
-					database=self.dbDatabase,
-					user=self.dbUser,
-					password=self.dbPassword,
-					host=self.dbHost,
-					port=self.dbPort,
-					options=f'-c search_path={self.dbSchema}'	# schema path
-				)
-				self.dbConnection.autocommit = True
-				# L.isDebug and L.logDebug(f'Reconnected to database: {self.dbConnection}')
-			except Error:
-				L.logErr(f'Error reconnecting to postgreSQL database at {self.dbHost}:{self.dbPort} as "{self.dbUser}" with database "{self.dbDatabase}"')
-				raise
+		connection = self._connect()
+		try:
+			self.prepareStatements(connection)
+		except Error:
+			connection.close()
+			raise
+		return connection
+
+
+	def _checkConnection(self, connection:PsyConnection) -> bool:
+		"""	Check whether an idle connection of the connection pool is still usable.
+
+			Args:
+				connection: The database connection to check.
+
+			Return:
+				True if the connection is usable, False otherwise.
+		"""
+		try:
+			with connection.cursor() as cursor:
+				cursor.execute('SELECT 1')
+			return True
+		except Error:
+			return False
 
 
 	def _executePrepared(self, statement:str, args:Tuple, closure:Optional[Callable] = None) -> Any:
@@ -556,9 +755,23 @@ class PostgreSQLBinding(DBBinding):
 				The result of the closure, if one is provided, or True if no closure is provided.
 		"""
 		try:
-			self._checkOpenConnection()
+			with self.dbPool.connection() as connection, connection.cursor() as cursor:
+				if (_tx := self.transactionState).depth:
+
+					# Queue write statements in a transaction. They are sent together when the transaction ends
+					if not closure:
+						_tx.statements.append(cursor.mogrify(f'EXECUTE {statement}', args))
+						return True
+					
+					# A query needs its result now. Start an explicit transaction and send the
+					# queued statements together with the query.
+					cursor.execute(b';'.join(([] if _tx.begun else [b'BEGIN']) + 
+											 _tx.statements + 
+											 [ cursor.mogrify(f'EXECUTE {statement}', args) ]))
+					_tx.begun = True
+					_tx.statements = []
+					return closure(cursor)
 
-			with self.dbConnection.cursor() as cursor:
 				cursor.execute(f'EXECUTE {statement}', args)
 				if closure:
 					return closure(cursor)
@@ -567,6 +780,67 @@ class PostgreSQLBinding(DBBinding):
 			raise INTERNAL_SERVER_ERROR(dbg = L.logErr(f'Error executing prepared statement: {e}'))
 
 
+	def _executeValues(self, statement:str, template:str, rows:Sequence[Tuple]) -> None:
+		"""	Execute an INSERT statement with multiple rows of values in a single query.
+
+			In a transaction the statement is queued like the prepared statements.
+
+			Args:
+				statement: The INSERT statement up to and including the *VALUES* keyword.
+				template: The template for the values of a single row, e.g. "(%s, %s)".
+				rows: The values for the rows. Each row is a tuple.
+		"""
+		if not rows:
+			return
+		try:
+			with self.dbPool.connection() as connection, connection.cursor() as cursor:
+				query = statement.encode() + b' ' + b','.join(cursor.mogrify(template, row) for row in rows)
+				if (_tx := self.transactionState).depth:
+					_tx.statements.append(query)
+					return
+				cursor.execute(query)
+		except Exception as e:
+			raise INTERNAL_SERVER_ERROR(dbg = L.logErr(f'Error executing statement: {e}'))
+
+
+	@contextmanager
+	def transaction(self) -> Iterator[None]:
+		# The write statements are queued and sent in a single round trip when the transaction ends.
+		# PostgreSQL executes the statements of a single query string in one implicit transaction.
+		_tx = self.transactionState
+		if _tx.depth:	# nested transaction
+			_tx.depth += 1
+			try:
+				yield
+			finally:
+				_tx.depth -= 1
+			return
+
+		# Keep the connection checked out, so that all statements use the same connection
+		with self.dbPool.connection() as connection:
+			_tx.depth = 1
+			try:
+				yield
+				if _tx.statements or _tx.begun:
+					try:
+						with connection.cursor() as cursor:
+							cursor.execute(b';'.join(_tx.statements + ([b'COMMIT'] if _tx.begun else [])))
+					except Exception as e:
+						raise INTERNAL_SERVER_ERROR(dbg = L.logErr(f'Error committing transaction: {e}'))
+			except Exception:
+				if _tx.begun:
+					try:
+						with connection.cursor() as cursor:
+							cursor.execute('ROLLBACK')
+					except Error:
+						pass	# The connection is broken. The transaction is rolled back by the server.
+				raise
+			finally:
+				_tx.depth = 0
+				_tx.statements = []
+				_tx.begun = False
+
+
 	def _fetchSingleRow(self, cursor:PsyCursor, asList:bool = True) -> Any|list[Any]:
 		"""	Fetch the first element from the first row from the database cursor.
 
@@ -617,6 +891,17 @@ class PostgreSQLBinding(DBBinding):
 		self._executePrepared('insertResource (%s, %s)', (ri, PsyJson(resource)))
 
 
+	def insertResources(self, records:Sequence[Tuple[JSON, JSON, JSON, JSON]]) -> None:
+		# One multi-row INSERT per table, sent together in the transaction
+		with self.transaction():
+			self._executeValues(f'INSERT INTO {self.tableResources} (ri, resource) VALUES', '(%s, %s)',
+								[ (r[0]['ri'], PsyJson(r[0])) for r in records ])
+			self._executeValues(f'INSERT INTO {self.tableIdentidiers} (ri, rn, srn, ty) VALUES', '(%s, %s, %s, %s)',
+								[ (r[1]['ri'], r[1]['rn'], r[2]['srn'], r[1]['ty']) for r in records ])
+			self._executeValues(f'INSERT INTO {self.tableChildResources} (pi, childRi, childTy, childCt) VALUES', '(%s, %s, %s, %s)',
+								[ (r[3]['pi'], r[3]['ri'], r[3]['ty'], r[3].get('ct')) for r in records ])
+
+
 	def upsertResource(self, resource:JSON, ri:str) -> None:
 		# L.isDebug and L.logDebug(f'Upserting resource {ri} into database: {resource}')
 		_resource = PsyJson(resource)
@@ -686,12 +971,146 @@ class PostgreSQLBinding(DBBinding):
 				return self.searchResources(ri = identifiers[0]['ri'])
 
 		return []
+
+
+	def searchResourcesByRIs(self, ris:Sequence[str]) -> list[JSON]:
+		if not ris:
+			return []
+		return self._executePrepared('getResourcesByRIs (%s)', (list(ris),), 
+									 lambda c: self._fetchAllRows(c))
 	
 
 	def discoverResourcesByFilter(self, func:Callable[[JSON], bool]) -> list[JSON]:
 		# L.isDebug and L.logDebug(f'Discovering resources by filter')
 		return self._executePrepared('getResources', (), 
 									 lambda c: [ r[0] for r in c if func(r[0]) ])
+
+
+	def discoverResourcesInSubtree(self, ri:str,
+										 level:int,
+										 offset:int,
+										 limit:int,
+										 filterCriteria:FilterCriteria,
+										 fo:FilterOperation) -> Optional[Iterator[JSON]]:
+		# L.isDebug and L.logDebug(f'Discovering resources in subtree of {ri}')
+		where, whereArgs = self._filterCriteriaCondition(filterCriteria, fo)
+
+		# Walk the subtree with a recursive query over the childResources table. The path of the
+		# childResources IDs is used to return the resources in depth-first order.
+		return self._streamRows(f'''
+			WITH RECURSIVE tree (ri, lvl, path) AS (
+				(SELECT childRi, 1, ARRAY[id] FROM {self.tableChildResources}
+				 WHERE pi = %s
+				 ORDER BY id
+				 OFFSET %s LIMIT %s)
+				UNION ALL
+				SELECT c.childRi, t.lvl + 1, t.path || c.id 
+				FROM {self.tableChildResources} c JOIN tree t ON c.pi = t.ri
+				WHERE t.lvl < %s
+			)
+			SELECT r.resource FROM tree t JOIN {self.tableResources} r ON r.ri = t.ri
+			{f'WHERE {where}' if where else ''}
+			ORDER BY t.path
+		''', (ri, max(offset - 1, 0), limit, level) + whereArgs)	# Cannot be a prepared statement. It is constructued dynamically
+
+
+	def _streamRows(self, query:str, args:Tuple[Any, ...]) -> Iterator[JSON]:
+		"""	Execute a query with a server-side cursor and return the first elements of the rows one by one.
+
+			The rows are fetched in batches of `discoveryFetchSize` rows while the caller iterates, so
+			the caller can stop early without transferring the whole result. The cursor uses its own
+			connection and a read-only transaction, which ends when the iteration is finished or the
+			iterator is closed. Statements that the caller executes in between use other connections.
+
+			Args:
+				query: The SQL query to execute.
+				args: The arguments for the parameters of the query.
+
+			Return:
+				An iterator over the first elements of the result rows.
+
+			Raises:
+				INTERNAL_SERVER_ERROR: If the query fails.
+		"""
+		try:
+			with self.dbPool.dedicatedConnection() as connection:
+				connection.autocommit = False	# Named cursors only exist inside a transaction
+				try:
+					with connection.cursor(name = 'discovery') as cursor:
+						cursor.execute(query, args)
+						while (rows := cursor.fetchmany(self.discoveryFetchSize)):
+							for row in rows:
+								yield row[0]
+				finally:
+					connection.rollback()	# Only read, so just end the transaction
+					connection.autocommit = True
+		except Exception as e:
+			raise INTERNAL_SERVER_ERROR(dbg = L.logErr(f'Error discovering resources: {e}'))
+
+
+	def _filterCriteriaCondition(self, filterCriteria:FilterCriteria, fo:FilterOperation) -> Tuple[Optional[str], Tuple[Any, ...]]:
+		"""	Translate the filter criteria to an SQL condition for the *resource* column of the resources table.
+
+			Only the criteria that can be expressed in SQL are translated. The condition is a pre-filter:
+			it never excludes a resource that matches the filter criteria, so the criteria must still be
+			evaluated for the resulting resources. Criteria that cannot be expressed in SQL, e.g. advanced
+			queries or geo queries, are left out for the AND filter operation. For the OR filter operation
+			no condition is returned in this case.
+
+			Args:
+				filterCriteria: The filter criteria.
+				fo: The filter operation for the filter criteria.
+
+			Return:
+				A tuple with the SQL condition and its arguments, or (None, ()) if no condition can be applied.
+		"""
+		conditions:list[str] = []
+		args:Tuple[Any, ...] = ()
+		residual = False	# Indicates criteria that cannot be expressed in SQL
+
+		def _add(condition:str, *conditionArgs:Any) -> None:
+			nonlocal args
+			conditions.append(f'({condition})')
+			args += conditionArgs
+
+		def _compareTimestamp(attribute:str, op:str, value:Optional[str]) -> None:
+			if value:	# Timestamps are compared byte-wise like in Python
+				_add(f"(r.resource->>'{attribute}') COLLATE \"C\" {op} %s", value)
+
+		def _compareNumber(attribute:str, op:str, value:Optional[int]) -> None:
+			if value is not None:
+				_add(f"jsonb_typeof(r.resource->'{attribute}') = 'number' AND (r.resource->'{attribute}')::numeric {op} %s", value)
+
+		if tys := filterCriteria.ty:
+			_add("r.resource->>'ty' = ANY(%s)", [ str(int(ty)) for ty in tys ])
+		_compareTimestamp('ct', '<', filterCriteria.crb)
+		_compareTimestamp('ct', '>', filterCriteria.cra)
+		_compareTimestamp('lt', '>', filterCriteria.ms)
+		_compareTimestamp('lt', '<', filterCriteria.us)
+		_compareNumber('st', '>', filterCriteria.sts)
+		_compareNumber('st', '<', filterCriteria.stb)
+		_compareTimestamp('et', '<', filterCriteria.exb)
+		_compareTimestamp('et', '>', filterCriteria.exa)
+		if lbls := filterCriteria.lbl:
+			_add("r.resource->'lbl' ?| %s", list(lbls))
+		_compareNumber('cs', '>=', filterCriteria.sza)
+		_compareNumber('cs', '<', filterCriteria.szb)
+		if ctys := filterCriteria.cty:
+			_add(f"r.resource->>'ty' = '{int(ResourceTypes.CIN)}' AND r.resource->>'cnf' = ANY(%s)", list(ctys))
+
+		# Attributes. Only string values can be compared exactly like in Python.
+		for name, value in filterCriteria.attributes.items():
+			if '/' in name or (isinstance(value, str) and '*' in value):
+				residual = True
+				continue
+			_add("r.resource->>%s = %s OR jsonb_typeof(r.resource->%s) <> 'string'", name, str(value), name)
+
+		if filterCriteria.aq or filterCriteria.geom:
+			residual = True
+
+		if not conditions or (fo == FilterOperation.OR and residual):
+			return (None, ())
+		return (f' {"OR" if fo == FilterOperation.OR else "AND"} '.join(conditions), args)
 			
 
 	def hasResource(self, ri:Optional[str] = None, 
@@ -730,13 +1149,19 @@ class PostgreSQLBinding(DBBinding):
 			args += (str(v),)
 
 		try:
-			with self.dbConnection.cursor() as cursor:
+			with self.dbPool.connection() as connection, connection.cursor() as cursor:
 				cursor.execute(f'SELECT resource FROM {self.tableResources} WHERE {" AND ".join(where)}',
 							   args)	# Cannot be a prepared statement. It is constructued dynamically
 				return self._fetchAllRows(cursor)
 		except Exception as e:
 			raise INTERNAL_SERVER_ERROR(dbg = L.logErr(f'Error searching by fragment: {e}'))
 
+
+	def searchExpiredResources(self, now:str, limit:Optional[int] = None) -> list[JSON]:
+		# L.isDebug and L.logDebug(f'Searching expired resources before {now}')
+		return self._executePrepared('getExpiredResources (%s, %s)', (now, limit),	# LIMIT NULL means no limit
+									 lambda c: self._fetchAllRows(c))
+
 	#
 	#	Identifiers, Structured RI, Child Resources operations
 	#
@@ -769,12 +1194,21 @@ class PostgreSQLBinding(DBBinding):
 										 _cl)
 		else:
 			raise ValueError('Either ri or srn must be given')
+
+
+	def getAllIdentifiers(self, excludeTypes:Optional[Sequence[int]] = None) -> list[JSON]:
+
+		def _cl(cursor:PsyCursor) -> list[JSON]:
+			return [ { 'ri': _row[0], 'rn': _row[1], 'srn': _row[2], 'ty': _row[3] } for _row in cursor.fetchall() ]
+
+		return self._executePrepared('getIdentifiers (%s::integer[])', (list(excludeTypes or []),),
+									 _cl)
 		
 
 	def upsertChildResource(self, childResource:JSON, ri:str) -> None:
 		# L.isDebug and L.logDebug(f'Upserting child resource {childResource} for resource {ri}')
   		# Add a record to the childResources table for this resource
-		self._executePrepared('insertChildResource (%s, %s, %s)', (childResource['pi'], childResource['ri'], childResource['ty']))
+		self._executePrepared('insertChildResource (%s, %s, %s, %s)', (childResource['pi'], childResource['ri'], childResource['ty'], childResource.get('ct')))
 
 			
 	def removeChildResource(self, ri:str, pi:str) -> None:
@@ -799,6 +1233,15 @@ class PostgreSQLBinding(DBBinding):
 		return self._executePrepared('getChildResourcesByPI (%s)', (pi,), 
 									 _cl)
 
+
+	def searchInstanceResourceIDByIndex(self, pi:str, ty:ResourceTypes, index:int) -> Optional[str]:
+		# L.isDebug and L.logDebug(f'Searching instance resource for parent resource {pi}, type {ty}, and index {index}')
+		if index >= 0:
+			return self._executePrepared('getInstanceByIndexAsc (%s, %s, %s)', (pi, int(ty), index),
+										 lambda c: self._fetchSingleRow(c, False))
+		return self._executePrepared('getInstanceByIndexDesc (%s, %s, %s)', (pi, int(ty), -index - 1),
+									 lambda c: self._fetchSingleRow(c, False))
+
 	#
 	#	Subscription operations
 	#
@@ -815,6 +1258,12 @@ class PostgreSQLBinding(DBBinding):
 		return None
 
 
+	def getAllSubscriptionReprs(self) -> list[JSON]:
+		# L.isDebug and L.logDebug('Getting all subscription representations from database')
+		return self._executePrepared('getSubscriptions', (),
+									 lambda c: self._fetchAllRows(c))
+
+
 	def upsertSubscriptionRepr(self, subscription:JSON, ri:str) -> bool:
 		# L.isDebug and L.logDebug(f'Upserting subscription representation {subscription} for resource {ri}')
 		_subscription = PsyJson(subscription)
@@ -917,20 +1366,25 @@ class PostgreSQLBinding(DBBinding):
 	#	Request operations
 	#
 
-	def insertRequest(self, req:JSON, ts:float) -> bool:
+	def insertRequest(self, req:JSON, ts:float, maxRequests:int) -> bool:
 		# L.isDebug and L.logDebug(f'Inserting request/response for ts: {ts}')
-		return self._executePrepared('insertRequest (%s, %s)', (ts, PsyJson(req)))
-
-	
-	def removeOldRequests(self, maxRequests:int) -> None:
-		# L.isDebug and L.logDebug(f'Removing old requests from the database')
-		def _cl(cursor:PsyCursor) -> None:
-			if cursor.rowcount > 0:
-				_ts = cursor.fetchone()[0]
-				cursor.execute(f'EXECUTE deleteOldRequests (%s)', (_ts,))
+		self._executePrepared('insertRequest (%s, %s)', (ts, PsyJson(req)))
+
+		# Determine the number of requests to remove. The counter is decreased before the
+		# requests are removed and corrected afterwards, so that concurrent inserts don't remove
+		# the same requests twice.
+		with self.lockRequestsCount:
+			self.requestsCount += 1
+			if (_excess := self.requestsCount - max(maxRequests, 0)) <= 0:
+				return True
+			self.requestsCount -= _excess
 
-		self._executePrepared('selectMaxRequests (%s)', (maxRequests,), 
-							  _cl)
+		# Remove the oldest requests by their timestamp range
+		_removed = self._executePrepared('deleteOldestRequests (%s)', (_excess,), 
+										 lambda c: c.rowcount)
+		with self.lockRequestsCount:
+			self.requestsCount += _excess - _removed
+		return True
 
 
 	def getRequests(self, ri:Optional[str] = None) -> list[JSON]:
@@ -946,9 +1400,14 @@ class PostgreSQLBinding(DBBinding):
 	def deleteRequests(self, ri:Optional[str] = None) -> None:
 		# L.isDebug and L.logDebug(f'Deleting requests for resource {ri}')
 		if ri:
-			self._executePrepared('deleteRequestsByRI (%s)', (ri,))
+			_removed = self._executePrepared('deleteRequestsByRI (%s)', (ri,), 
+											 lambda c: c.rowcount)
+			with self.lockRequestsCount:
+				self.requestsCount = max(self.requestsCount - _removed, 0)
 		else:
 			self._executePrepared('deleteRequests', ())
+			with self.lockRequestsCount:
+				self.requestsCount = 0
 
 	#
 	#	Schedule operations
@@ -0,0 +1,1054 @@
+#
+#	SQLiteBinding.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Database Binding for SQLite
+#
+"""	This module provides the database binding for SQLite. It implements the
+	DBBinding interface and stores all data in a single SQLite database file.
+	The module uses the *sqlite3* module of the Python standard library, so no
+	separate database server is needed.
+
+	The database is opened in WAL (write-ahead logging) mode. Changes are appended
+	to the WAL file and are persisted incrementally and crash-safe, and readers are
+	not blocked by a writer.
+"""
+
+from __future__ import annotations
+from typing import Optional, Callable, Sequence, Any, Tuple, Iterator
+
+import os, json, sqlite3
+from threading import Lock, local
+from contextlib import contextmanager
+
+from acmecse.runtime.DBBinding import DBBinding
+from acmecse.etc.Constants import RuntimeConstants as RC
+from acmecse.etc.Types import JSON, ResourceTypes, OriginatorType, FilterCriteria, FilterOperation
+from acmecse.etc.ResponseStatusCodes import INTERNAL_SERVER_ERROR
+from acmecse.runtime.Logging import Logging as L
+from acmecse.runtime.Configuration import Configuration, ConfigurationError
+from acmecse.runtime.PluginSupport import plugin, start, configure, validate
+from acmecse.helpers.ConnectionPool import ConnectionPool
+
+
+class _TransactionState(local):
+	"""	The state of the current thread's transaction.
+	"""
+
+	def __init__(self) -> None:
+		"""	Initialize the state for a thread without a transaction.
+		"""
+		self.depth = 0
+		""" The nesting depth of the transaction. 0 if no transaction is active. """
+
+
+@plugin(property='sqliteBinding', tags=['acme', 'database'])
+class SQLiteBinding(DBBinding):
+	"""	SQLiteBinding class.
+	"""
+
+	tableActions = 'actions'
+	"""	The name of the table for actions. """
+
+	tableBatchNotifications = 'batchNotifications'
+	"""	The name of the table for batch notifications. """
+
+	tableChildResources = 'childResources'
+	"""	The name of the table for child resource mappings. """
+
+	tableIdentifiers = 'identifiers'
+	"""	The name of the table for identifier mappings. """
+
+	tableOriginators = 'originators'
+	"""	The name of the table for originators. """
+
+	tableRequests = 'requests'
+	"""	The name of the table to store requests and responses. """
+
+	tableResources = 'resources'
+	"""	The name of the table for resources. """
+
+	tableSchedules = 'schedules'
+	"""	The name of the table for schedules. """
+
+	tableStatistics = 'statistics'
+	"""	The name of the table for statistic information. """
+
+	tableSubscriptions = 'subscriptions'
+	"""	The name of the table for subscription mappings. """
+
+	busyTimeout = 30.0
+	"""	The time in seconds a connection waits for the write lock of the database. """
+
+
+	@start
+	def start(self) -> None:
+		""" Start the SQLiteBinding.
+		"""
+
+		self.path = Configuration.database_sqlite_path
+		"""	Path to the database directory. """
+
+		self.file = f'{self.path}/acmecse-{RC.cseSPIDSlashLess}-{RC.cseCsiSlashLess}.db'
+		"""	Filename of the database file. """
+
+		self.requestsCount = 0
+		"""	The number of requests in the requests table. It is used to decide how many of the oldest
+			requests must be removed when a new request is inserted. Protected by *lockRequestsCount*. """
+
+		self.lockRequestsCount = Lock()
+		"""	Lock for the number of requests. """
+
+		self.transactionState = _TransactionState()
+		"""	The state of the transactions, one for each thread. """
+
+		L.isInfo and L.log(f'DB in file system. Database file: {self.file}')
+		os.makedirs(self.path, exist_ok = True)
+
+		# Create the tables if necessary, using a separate connection
+		connection = self._connect()
+		try:
+			self.createTables(connection)
+			self.requestsCount = connection.execute(f'SELECT COUNT(*) FROM {self.tableRequests}').fetchone()[0]
+		finally:
+			connection.close()
+
+		self.dbPool = ConnectionPool(connect = self._connect,
+									 check = self._checkConnection,
+									 isClosed = self._isClosed,
+									 close = lambda c: c.close(),
+									 minSize = 1,
+									 maxSize = Configuration.database_sqlite_maxConnections)
+		"""	The pool of database connections. A thread keeps its connection while it executes a transaction. """
+		self.dbPool.open()
+
+
+	def closeDB(self) -> None:
+		L.isInfo and L.log('Closing DB')
+		self.dbPool.close()
+
+
+	def purgeDB(self) -> None:
+		L.isInfo and L.log('Purging DB')
+		with self.transaction():
+			for table in (self.tableActions,
+						  self.tableBatchNotifications,
+						  self.tableChildResources,
+						  self.tableIdentifiers,
+						  self.tableOriginators,
+						  self.tableRequests,
+						  self.tableResources,
+						  self.tableSchedules,
+						  self.tableStatistics,
+						  self.tableSubscriptions):
+				self._execute(f'DELETE FROM {table}')
+		with self.lockRequestsCount:
+			self.requestsCount = 0
+
+
+	def backupDB(self, dir:str, previous:Optional[str] = None) -> bool:
+		L.isDebug and L.logDebug(f'Creating DB backup in directory: {dir}')
+		os.makedirs(dir, exist_ok = True)
+
+		# The backup API copies a consistent snapshot of the database, including the WAL
+		try:
+			backup = sqlite3.connect(f'{dir}/{os.path.basename(self.file)}')
+			try:
+				with self.dbPool.connection() as connection:
+					connection.backup(backup)
+			finally:
+				backup.close()
+		except Exception as e:
+			L.logErr(f'Error creating DB backup: {e}', exc = e)
+			return False
+		L.isDebug and L.logDebug('DB backup done')
+		return True
+
+
+	#
+	#	Configuration
+	#
+
+	@configure
+	def configure(self, config: Configuration) -> None:
+		"""	Configure the SQLiteBinding with the provided configuration.
+
+			Args:
+				config: The configuration object containing the settings for the SQLiteBinding.
+		"""
+		parser = config.configParser
+
+		#	Database SQLite
+
+		config.database_sqlite_path = parser.get('database.sqlite', 'path', fallback='./data')
+		config.database_sqlite_maxConnections = parser.getint('database.sqlite', 'maxConnections', fallback=10)
+
+
+	@validate
+	def validate(self, config: Configuration) -> None:
+		"""	Validate the configuration for the SQLiteBinding.
+
+			Args:
+				config: The configuration object containing the settings for the SQLiteBinding.
+
+			Raises:
+				ConfigurationError: If the configuration is invalid.
+		"""
+		# override configuration with command line arguments
+		if config._args_DBDataDirectory is not None:
+			config.database_sqlite_path = config._args_DBDataDirectory
+
+		if config.database_sqlite_maxConnections < 1:
+			raise ConfigurationError(fr'[i]\[database.sqlite]:maxConnections[/i] must be > 0')
+
+
+	###########################################################################
+
+
+	def createTables(self, connection:sqlite3.Connection) -> None:
+		"""	Create the necessary tables and indexes if they do not exist.
+
+			The attributes that are used for lookups are stored in their own indexed columns
+			next to the JSON document.
+
+			Args:
+				connection: The database connection to use.
+		"""
+		connection.executescript(f'''
+			BEGIN;
+
+			CREATE TABLE IF NOT EXISTS {self.tableResources} (
+				ri TEXT PRIMARY KEY,
+				pi TEXT,
+				ty INTEGER,
+				et TEXT,
+				aei TEXT,
+				csi TEXT,
+				resource TEXT NOT NULL
+			);
+			CREATE INDEX IF NOT EXISTS {self.tableResources}_pi_ty_idx ON {self.tableResources} (pi, ty);
+			CREATE INDEX IF NOT EXISTS {self.tableResources}_ty_idx ON {self.tableResources} (ty);
+			CREATE INDEX IF NOT EXISTS {self.tableResources}_et_idx ON {self.tableResources} (et) WHERE et IS NOT NULL;
+			CREATE INDEX IF NOT EXISTS {self.tableResources}_aei_idx ON {self.tableResources} (aei) WHERE aei IS NOT NULL;
+			CREATE INDEX IF NOT EXISTS {self.tableResources}_csi_idx ON {self.tableResources} (csi) WHERE csi IS NOT NULL;
+
+			CREATE TABLE IF NOT EXISTS {self.tableIdentifiers} (
+				ri TEXT PRIMARY KEY,
+				rn TEXT NOT NULL,
+				srn TEXT NOT NULL UNIQUE,	-- automatic index
+				ty INTEGER NOT NULL
+			);
+
+			CREATE TABLE IF NOT EXISTS {self.tableChildResources} (
+				id INTEGER PRIMARY KEY AUTOINCREMENT,
+				pi TEXT,
+				childRi TEXT NOT NULL UNIQUE,	-- automatic index
+				childTy INTEGER NOT NULL,
+				childCt TEXT
+			);
+			CREATE INDEX IF NOT EXISTS {self.tableChildResources}_pi_idx ON {self.tableChildResources} (pi, id);
+			CREATE INDEX IF NOT EXISTS {self.tableChildResources}_instances_idx ON {self.tableChildResources} (pi, childTy, childCt, id);
+
+			CREATE TABLE IF NOT EXISTS {self.tableStatistics} (
+				id INTEGER PRIMARY KEY,
+				statistics TEXT NOT NULL
+			);
+
+			CREATE TABLE IF NOT EXISTS {self.tableSubscriptions} (
+				ri TEXT PRIMARY KEY,
+				pi TEXT,
+				subscription TEXT NOT NULL
+			);
+			CREATE INDEX IF NOT EXISTS {self.tableSubscriptions}_pi_idx ON {self.tableSubscriptions} (pi);
+
+			CREATE TABLE IF NOT EXISTS {self.tableActions} (
+				ri TEXT PRIMARY KEY,
+				subject TEXT,
+				action TEXT NOT NULL
+			);
+			CREATE INDEX IF NOT EXISTS {self.tableActions}_subject_idx ON {self.tableActions} (subject);
+
+			CREATE TABLE IF NOT EXISTS {self.tableBatchNotifications} (
+				id INTEGER PRIMARY KEY AUTOINCREMENT,
+				ri TEXT,
+				nu TEXT,
+				batch TEXT NOT NULL
+			);
+			CREATE INDEX IF NOT EXISTS {self.tableBatchNotifications}_ri_nu_idx ON {self.tableBatchNotifications} (ri, nu);
+
+			CREATE TABLE IF NOT EXISTS {self.tableSchedules} (
+				ri TEXT PRIMARY KEY,
+				pi TEXT,
+				schedule TEXT NOT NULL
+			);
+			CREATE INDEX IF NOT EXISTS {self.tableSchedules}_pi_idx ON {self.tableSchedules} (pi);
+
+			CREATE TABLE IF NOT EXISTS {self.tableRequests} (
+				ts REAL PRIMARY KEY,
+				ri TEXT,
+				request TEXT NOT NULL
+			);
+			CREATE INDEX IF NOT EXISTS {self.tableRequests}_ri_idx ON {self.tableRequests} (ri);
+
+			CREATE TABLE IF NOT EXISTS {self.tableOriginators} (
+				originator TEXT PRIMARY KEY,
+				info TEXT NOT NULL
+			);
+
+			COMMIT;
+		''')
+
+
+	def _connect(self) -> sqlite3.Connection:
+		"""	Open a new connection to the database and configure it.
+
+			The connections are in autocommit mode. Explicit transactions are started by `transaction()`.
+			The connections may be used by different threads, but only by one thread at a time.
+
+			Return:
+				The new database connection.
+		"""
+		try:
+			connection = sqlite3.connect(self.file,
+										 timeout = self.busyTimeout,
+										 isolation_level = None,		# autocommit
+										 check_same_thread = False,
+										 cached_statements = 256)		# prepared statements per connection
+			connection.execute('PRAGMA journal_mode = WAL')
+			connection.execute('PRAGMA synchronous = NORMAL')	# crash-safe in WAL mode
+			return connection
+		except sqlite3.Error:
+			L.logErr(f'Error opening SQLite database: {self.file}')
+			raise
+
+
+	def _checkConnection(self, connection:sqlite3.Connection) -> bool:
+		"""	Check whether an idle connection of the connection pool is still usable.
+
+			Args:
+				connection: The database connection to check.
+
+			Return:
+				True if the connection is usable, False otherwise.
+		"""
+		try:
+			connection.execute('SELECT 1')
+			return True
+		except sqlite3.Error:
+			return False
+
+
+	def _isClosed(self, connection:sqlite3.Connection) -> bool:
+		"""	Check whether a connection has been closed.
+
+			Args:
+				connection: The database connection to check.
+
+			Return:
+				True if the connection is closed, False otherwise.
+		"""
+		try:
+			connection.in_transaction
+			return False
+		except sqlite3.ProgrammingError:
+			return True
+
+
+	def _execute(self, sql:str, args:Sequence[Any] = (), closure:Optional[Callable[[sqlite3.Cursor], Any]] = None) -> Any:
+		"""	Execute an SQL statement.
+
+			This is the main method to execute a statement. SQLite caches the compiled statements
+			per connection, so the statements are only compiled once.
+
+			Args:
+				sql: The SQL statement to execute.
+				args: The arguments for the parameters of the statement.
+				closure: An optional closure callback to process the result of the query. This closure will be
+							passed the cursor object and should return the result of the query.
+
+			Return:
+				The result of the closure, if one is provided, or True if no closure is provided.
+		"""
+		try:
+			with self.dbPool.connection() as connection:
+				cursor = connection.execute(sql, args)
+				if closure:
+					return closure(cursor)
+				return True
+		except Exception as e:
+			raise INTERNAL_SERVER_ERROR(dbg = L.logErr(f'Error executing SQL statement: {e}'))
+
+
+	def _executeMany(self, sql:str, rows:Sequence[Sequence[Any]]) -> None:
+		"""	Execute an SQL statement once for each row of arguments.
+
+			Args:
+				sql: The SQL statement to execute.
+				rows: The arguments for the parameters of the statement, one sequence for each execution.
+		"""
+		try:
+			with self.dbPool.connection() as connection:
+				connection.executemany(sql, rows)
+		except Exception as e:
+			raise INTERNAL_SERVER_ERROR(dbg = L.logErr(f'Error executing SQL statement: {e}'))
+
+
+	@contextmanager
+	def transaction(self) -> Iterator[None]:
+		# The write lock is acquired at the start of the transaction, so that the read-modify-write
+		# operations in the transaction cannot fail with a lock upgrade conflict.
+		_tx = self.transactionState
+		if _tx.depth:	# nested transaction
+			_tx.depth += 1
+			try:
+				yield
+			finally:
+				_tx.depth -= 1
+			return
+
+		# Keep the connection checked out, so that all statements use the same connection
+		with self.dbPool.connection() as connection:
+			try:
+				connection.execute('BEGIN IMMEDIATE')
+			except sqlite3.Error as e:
+				raise INTERNAL_SERVER_ERROR(dbg = L.logErr(f'Error starting transaction: {e}'))
+			_tx.depth = 1
+			try:
+				yield
+				try:
+					connection.execute('COMMIT')
+				except sqlite3.Error as e:
+					raise INTERNAL_SERVER_ERROR(dbg = L.logErr(f'Error committing transaction: {e}'))
+			except Exception:
+				if connection.in_transaction:
+					try:
+						connection.execute('ROLLBACK')
+					except sqlite3.Error:
+						pass
+				raise
+			finally:
+				_tx.depth = 0
+
+
+	def _dumps(self, doc:JSON) -> str:
+		"""	Serialize a document for storing it in the database.
+
+			Args:
+				doc: The document to serialize.
+
+			Return:
+				The JSON string.
+		"""
+		return json.dumps(doc, separators = (',', ':'))
+
+
+	def _fetchSingleRow(self, cursor:sqlite3.Cursor, asList:bool = True) -> JSON|list[JSON]:
+		"""	Fetch and deserialize the document from the first row from the database cursor.
+
+			Args:
+				cursor: The database cursor to fetch the row from.
+				asList: Whether to return the document as a list or not.
+
+			Return:
+				The fetched document as a single object or in a list, or None or an empty list if no row was fetched.
+		"""
+		if (row := cursor.fetchone()):
+			doc = json.loads(row[0])
+			return [ doc ] if asList else doc
+		return [] if asList else None
+
+
+	def _fetchAllRows(self, cursor:sqlite3.Cursor) -> list[JSON]:
+		"""	Fetch and deserialize the documents from all rows from the database cursor.
+
+			Args:
+				cursor: The database cursor to fetch the rows from.
+
+			Return:
+				The fetched documents, or an empty list if no rows were fetched.
+		"""
+		return [ json.loads(r[0]) for r in cursor ]
+
+
+	def _fetchNumber(self, cursor:sqlite3.Cursor) -> int:
+		"""	Fetch one number from the database cursor.
+
+			Args:
+				cursor: The database cursor to fetch the number from.
+
+			Return:
+				The fetched number, or None if no number was fetched.
+		"""
+		if (row := cursor.fetchone()):
+			return int(row[0])
+		return None
+
+
+	def _updateDocument(self, table:str, column:str, key:str, doc:JSON,
+						keyColumn:str = 'ri',
+						stripNone:bool = False,
+						insert:bool = True) -> Optional[JSON]:
+		"""	Merge the top-level attributes of a document into a stored document, or insert it.
+
+			Args:
+				table: The name of the table.
+				column: The name of the column with the JSON document.
+				key: The primary key of the document.
+				doc: The document with the attributes to merge.
+				keyColumn: The name of the primary key column.
+				stripNone: Remove the top-level attributes with a None value from the merged document.
+				insert: Insert the document if it doesn't exist yet.
+
+			Return:
+				The merged document, or None if it doesn't exist and *insert* is False.
+		"""
+		with self.transaction():
+			if (_stored := self._execute(f'SELECT {column} FROM {table} WHERE {keyColumn} = ?', (key,),
+										 lambda c: self._fetchSingleRow(c, False))) is None:
+				if not insert:
+					return None
+				_stored = {}
+			_stored.update(doc)
+			if stripNone:
+				_stored = { k: v for k, v in _stored.items() if v is not None }
+			return _stored
+
+
+	#
+	#	Resource operations
+	#
+
+	def _resourceRow(self, resource:JSON, ri:str) -> Tuple[Any, ...]:
+		"""	Return the column values for a resource row.
+
+			Args:
+				resource: The resource document.
+				ri: The resource ID.
+
+			Return:
+				A tuple with the values for the columns ri, pi, ty, et, aei, csi, and resource.
+		"""
+		return (ri,
+		  		resource.get('pi'),
+				resource.get('ty'),
+				resource.get('et'),
+				resource.get('aei'),
+				resource.get('csi'),
+				self._dumps(resource))
+
+
+	def insertResource(self, resource:JSON, ri:str) -> None:
+		self._execute(f'INSERT INTO {self.tableResources} (ri, pi, ty, et, aei, csi, resource) VALUES (?, ?, ?, ?, ?, ?, ?)',
+					  self._resourceRow(resource, ri))
+
+
+	def insertResources(self, records:Sequence[Tuple[JSON, JSON, JSON, JSON]]) -> None:
+		with self.transaction():
+			self._executeMany(f'INSERT INTO {self.tableResources} (ri, pi, ty, et, aei, csi, resource) VALUES (?, ?, ?, ?, ?, ?, ?)',
+							  [ self._resourceRow(r[0], r[0]['ri']) for r in records ])
+			self._executeMany(f'INSERT OR REPLACE INTO {self.tableIdentifiers} (ri, rn, srn, ty) VALUES (?, ?, ?, ?)',
+							  [ (r[1]['ri'], r[1]['rn'], r[2]['srn'], r[1]['ty']) for r in records ])
+			self._executeMany(f'''INSERT INTO {self.tableChildResources} (pi, childRi, childTy, childCt) VALUES (?, ?, ?, ?)
+								  ON CONFLICT (childRi) DO
+								  	UPDATE SET pi = excluded.pi, childTy = excluded.childTy, childCt = excluded.childCt''',
+							  [ (r[3]['pi'], r[3]['ri'], r[3]['ty'], r[3].get('ct')) for r in records ])
+
+
+	def upsertResource(self, resource:JSON, ri:str) -> None:
+		with self.transaction():
+			_resource = self._updateDocument(self.tableResources, 'resource', ri, resource, stripNone = True)
+			self._execute(f'INSERT OR REPLACE INTO {self.tableResources} (ri, pi, ty, et, aei, csi, resource) VALUES (?, ?, ?, ?, ?, ?, ?)',
+						  self._resourceRow(_resource, ri))
+
+
+	def updateResource(self, resource:JSON, ri:str) -> JSON:
+		with self.transaction():
+			if (_resource := self._updateDocument(self.tableResources, 'resource', ri, resource, stripNone = True, insert = False)) is None:
+				raise KeyError(ri)
+			self._execute(f'UPDATE {self.tableResources} SET pi = ?, ty = ?, et = ?, aei = ?, csi = ?, resource = ? WHERE ri = ?',
+						  self._resourceRow(_resource, ri)[1:] + (ri,))
+			return _resource
+
+
+	def deleteResource(self, ri:str) -> None:
+		self._execute(f'DELETE FROM {self.tableResources} WHERE ri = ?', (ri,))
+
+
+	def searchResources(self, ri:Optional[str] = None,
+							  csi:Optional[str] = None,
+							  srn:Optional[str] = None,
+							  pi:Optional[str] = None,
+							  ty:Optional[int] = None,
+							  aei:Optional[str] = None) -> list[JSON]:
+		if srn:
+			return self._execute(f'''SELECT r.resource FROM {self.tableResources} r
+									 JOIN {self.tableIdentifiers} i ON i.ri = r.ri
+									 WHERE i.srn = ?''', (srn,),
+								 lambda c: self._fetchSingleRow(c))
+		if ri:
+			return self._execute(f'SELECT resource FROM {self.tableResources} WHERE ri = ?', (ri,),
+								 lambda c: self._fetchSingleRow(c))
+		elif csi:
+			return self._execute(f'SELECT resource FROM {self.tableResources} WHERE csi = ?', (csi,),
+								 lambda c: self._fetchSingleRow(c))
+		elif pi:
+			if ty is not None:	# ty is an int
+				return self._execute(f'SELECT resource FROM {self.tableResources} WHERE pi = ? AND ty = ?', (pi, int(ty)),
+									 lambda c: self._fetchAllRows(c))
+			return self._execute(f'SELECT resource FROM {self.tableResources} WHERE pi = ?', (pi,),
+								 lambda c: self._fetchAllRows(c))
+		elif ty is not None:	# ty is an int
+			return self._execute(f'SELECT resource FROM {self.tableResources} WHERE ty = ?', (int(ty),),
+								 lambda c: self._fetchAllRows(c))
+		elif aei:
+			return self._execute(f'SELECT resource FROM {self.tableResources} WHERE aei = ?', (aei,),
+								 lambda c: self._fetchAllRows(c))
+		return []
+
+
+	def searchResourcesByRIs(self, ris:Sequence[str]) -> list[JSON]:
+		if not ris:
+			return []
+		# Retrieve all resources in a single statement, in the order of the given resource IDs
+		return self._execute(f'''SELECT r.resource FROM json_each(?) ids
+								 JOIN {self.tableResources} r ON r.ri = ids.value
+								 ORDER BY ids.key''', (json.dumps(list(ris)),),
+							 lambda c: self._fetchAllRows(c))
+
+
+	def discoverResourcesByFilter(self, func:Callable[[JSON], bool]) -> list[JSON]:
+		return self._execute(f'SELECT resource FROM {self.tableResources}', (),
+							 lambda c: [ r for r in self._fetchAllRows(c) if func(r) ])
+
+
+	def discoverResourcesInSubtree(self, ri:str,
+										 level:int,
+										 offset:int,
+										 limit:int,
+										 filterCriteria:FilterCriteria,
+										 fo:FilterOperation) -> Optional[Iterator[JSON]]:
+		where, whereArgs = self._filterCriteriaCondition(filterCriteria, fo)
+
+		# Walk the subtree with a recursive query over the childResources table. The path of the
+		# zero-padded childResources IDs is used to return the resources in depth-first order.
+		# SQLite runs in-process, so the rows are fetched at once and the connection is not held
+		# while the caller iterates.
+		return iter(self._execute(f'''
+			WITH RECURSIVE tree (ri, lvl, path) AS (
+				SELECT childRi, 1, printf('%020d', id) FROM (
+					SELECT childRi, id FROM {self.tableChildResources}
+					WHERE pi = ?
+					ORDER BY id
+					LIMIT ? OFFSET ?)
+				UNION ALL
+				SELECT c.childRi, t.lvl + 1, t.path || '/' || printf('%020d', c.id)
+				FROM {self.tableChildResources} c JOIN tree t ON c.pi = t.ri
+				WHERE t.lvl < ?
+			)
+			SELECT r.resource FROM tree t JOIN {self.tableResources} r ON r.ri = t.ri
+			{f'WHERE {where}' if where else ''}
+			ORDER BY t.path
+		''', (ri, limit, max(offset - 1, 0), level) + whereArgs,
+		lambda c: self._fetchAllRows(c)))
+
+
+	def _filterCriteriaCondition(self, filterCriteria:FilterCriteria, fo:FilterOperation) -> Tuple[Optional[str], Tuple[Any, ...]]:
+		"""	Translate the filter criteria to an SQL condition for the resources table.
+
+			Only the criteria that can be expressed in SQL are translated. The condition is a pre-filter:
+			it never excludes a resource that matches the filter criteria, so the criteria must still be
+			evaluated for the resulting resources. Criteria that cannot be expressed in SQL, e.g. advanced
+			queries or geo queries, are left out for the AND filter operation. For the OR filter operation
+			no condition is returned in this case.
+
+			Args:
+				filterCriteria: The filter criteria.
+				fo: The filter operation for the filter criteria.
+
+			Return:
+				A tuple with the SQL condition and its arguments, or (None, ()) if no condition can be applied.
+		"""
+		conditions:list[str] = []
+		args:Tuple[Any, ...] = ()
+		residual = False	# Indicates criteria that cannot be expressed in SQL
+
+		def _add(condition:str, *conditionArgs:Any) -> None:
+			nonlocal args
+			conditions.append(f'({condition})')
+			args += conditionArgs
+
+		def _compareTimestamp(attribute:str, op:str, value:Optional[str]) -> None:
+			if value:	# Text is compared byte-wise like in Python
+				_add(f"json_extract(r.resource, '$.{attribute}') {op} ?", value)
+
+		def _compareNumber(attribute:str, op:str, value:Optional[int]) -> None:
+			if value is not None:
+				_add(f"json_type(r.resource, '$.{attribute}') IN ('integer', 'real') AND json_extract(r.resource, '$.{attribute}') {op} ?", value)
+
+		if tys := filterCriteria.ty:
+			_add(f'r.ty IN ({", ".join("?" * len(tys))})', *[ int(ty) for ty in tys ])
+		_compareTimestamp('ct', '<', filterCriteria.crb)
+		_compareTimestamp('ct', '>', filterCriteria.cra)
+		_compareTimestamp('lt', '>', filterCriteria.ms)
+		_compareTimestamp('lt', '<', filterCriteria.us)
+		_compareNumber('st', '>', filterCriteria.sts)
+		_compareNumber('st', '<', filterCriteria.stb)
+		_compareTimestamp('et', '<', filterCriteria.exb)
+		_compareTimestamp('et', '>', filterCriteria.exa)
+		if lbls := filterCriteria.lbl:
+			_add(f"EXISTS (SELECT 1 FROM json_each(r.resource, '$.lbl') WHERE value IN ({', '.join('?' * len(lbls))}))", *lbls)
+		_compareNumber('cs', '>=', filterCriteria.sza)
+		_compareNumber('cs', '<', filterCriteria.szb)
+		if ctys := filterCriteria.cty:
+			_add(f"r.ty = {int(ResourceTypes.CIN)} AND json_extract(r.resource, '$.cnf') IN ({', '.join('?' * len(ctys))})", *ctys)
+
+		# Attributes. Only string values can be compared exactly like in Python.
+		for name, value in filterCriteria.attributes.items():
+			if '/' in name or '"' in name or (isinstance(value, str) and '*' in value):
+				residual = True
+				continue
+			_path = f'$."{name}"'
+			_add("json_extract(r.resource, ?) = ? OR json_type(r.resource, ?) <> 'text'", _path, str(value), _path)
+
+		if filterCriteria.aq or filterCriteria.geom:
+			residual = True
+
+		if not conditions or (fo == FilterOperation.OR and residual):
+			return (None, ())
+		return (f' {"OR" if fo == FilterOperation.OR else "AND"} '.join(conditions), args)
+
+
+	def hasResource(self, ri:Optional[str] = None,
+						  srn:Optional[str] = None,
+						  ty:Optional[int] = None) -> bool:
+		if srn:
+			return self._execute(f'''SELECT 1 FROM {self.tableResources} r
+									 JOIN {self.tableIdentifiers} i ON i.ri = r.ri
+									 WHERE i.srn = ?''', (srn,),
+								 lambda c: c.fetchone() is not None)
+		if ri:
+			return self._execute(f'SELECT 1 FROM {self.tableResources} WHERE ri = ?', (ri,),
+								 lambda c: c.fetchone() is not None)
+		elif ty is not None:	# ty is an int
+			return self._execute(f'SELECT 1 FROM {self.tableResources} WHERE ty = ? LIMIT 1', (int(ty),),
+								 lambda c: c.fetchone() is not None)
+		return False
+
+
+	def countResources(self) -> int:
+		return self._execute(f'SELECT COUNT(*) FROM {self.tableResources}', (),
+							 lambda c: self._fetchNumber(c))
+
+
+	def searchByFragment(self, dct:dict) -> list[JSON]:
+		# Use the indexed columns and the comparable values as a pre-filter. The documents are
+		# compared with the fragment afterwards.
+		where:list[str] = []
+		args:list[Any] = []
+		for k, v in dct.items():
+			if k in ('ri', 'pi', 'ty', 'et', 'aei', 'csi'):
+				where.append(f'{k} = ?')
+				args.append(v)
+			elif isinstance(v, str) and '"' not in k:
+				where.append("json_extract(resource, ?) = ?")
+				args += [ f'$."{k}"', v ]
+
+		_where = ' AND '.join(where)
+		return self._execute(f'SELECT resource FROM {self.tableResources} {f"WHERE {_where}" if _where else ""}',
+							 args,
+							 lambda c: [ r
+										 for r in self._fetchAllRows(c)
+										 if all(k in r and r[k] == v for k, v in dct.items()) ])
+
+
+	def searchExpiredResources(self, now:str, limit:Optional[int] = None) -> list[JSON]:
+		return self._execute(f'SELECT resource FROM {self.tableResources} WHERE et < ? ORDER BY et LIMIT ?',
+							 (now, limit if limit is not None else -1),	# LIMIT -1 means no limit
+							 lambda c: self._fetchAllRows(c))
+
+	#
+	#	Identifiers, Structured RI, Child Resources operations
+	#
+
+	def upsertIdentifier(self, identifierMapping:JSON, structuredPathMapping:JSON, ri:str, srn:str) -> None:
+		self._execute(f'INSERT OR REPLACE INTO {self.tableIdentifiers} (ri, rn, srn, ty) VALUES (?, ?, ?, ?)',
+					  (ri, identifierMapping['rn'], srn, identifierMapping['ty']))
+
+
+	def deleteIdentifier(self, ri:str, srn:str) -> None:
+		self._execute(f'DELETE FROM {self.tableIdentifiers} WHERE ri = ?', (ri,))
+
+
+	def searchIdentifiers(self, ri:Optional[str] = None,
+								srn:Optional[str] = None) -> list[JSON]:
+
+		def _cl(cursor:sqlite3.Cursor) -> list[JSON]:
+			if (_row := cursor.fetchone()):
+				return [ { 'ri': _row[0], 'rn': _row[1], 'srn': _row[2], 'ty': _row[3] } ]
+			return []
+
+		if srn:
+			return self._execute(f'SELECT ri, rn, srn, ty FROM {self.tableIdentifiers} WHERE srn = ?', (srn,),
+								 _cl)
+		elif ri:
+			return self._execute(f'SELECT ri, rn, srn, ty FROM {self.tableIdentifiers} WHERE ri = ?', (ri,),
+								 _cl)
+		else:
+			raise ValueError('Either ri or srn must be given')
+
+
+	def getAllIdentifiers(self, excludeTypes:Optional[Sequence[int]] = None) -> list[JSON]:
+
+		def _cl(cursor:sqlite3.Cursor) -> list[JSON]:
+			return [ { 'ri': _row[0], 'rn': _row[1], 'srn': _row[2], 'ty': _row[3] } for _row in cursor.fetchall() ]
+
+		if excludeTypes:
+			return self._execute(f'SELECT ri, rn, srn, ty FROM {self.tableIdentifiers} WHERE ty NOT IN ({", ".join("?" * len(excludeTypes))})',
+								 tuple(excludeTypes),
+								 _cl)
+		return self._execute(f'SELECT ri, rn, srn, ty FROM {self.tableIdentifiers}', (), _cl)
+
+
+	def upsertChildResource(self, childResource:JSON, ri:str) -> None:
+		# An existing record keeps its ID, and so its position among the parent's child resources
+		self._execute(f'''INSERT INTO {self.tableChildResources} (pi, childRi, childTy, childCt) VALUES (?, ?, ?, ?)
+						  ON CONFLICT (childRi) DO
+						  	UPDATE SET pi = excluded.pi, childTy = excluded.childTy, childCt = excluded.childCt''',
+					  (childResource['pi'], childResource['ri'], childResource['ty'], childResource.get('ct')))
+
+
+	def removeChildResource(self, ri:str, pi:str) -> None:
+		self._execute(f'DELETE FROM {self.tableChildResources} WHERE pi = ? AND childRi = ?', (pi, ri))
+
+
+	def searchChildResourceIDsByParentRIAndType(self, pi:str, ty:Optional[ResourceTypes|list[ResourceTypes]] = None) -> list[str]:
+		if isinstance(ty, int):
+			ty = [ty]
+		if ty is None:
+			return self._execute(f'SELECT childRi FROM {self.tableChildResources} WHERE pi = ? ORDER BY id', (pi,),
+								 lambda c: [ r[0] for r in c ])
+		return self._execute(f'''SELECT childRi FROM {self.tableChildResources}
+								 WHERE pi = ? AND childTy IN ({", ".join("?" * len(ty))})
+								 ORDER BY id''', (pi, *[ int(t) for t in ty ]),
+							 lambda c: [ r[0] for r in c ])
+
+
+	def searchInstanceResourceIDByIndex(self, pi:str, ty:ResourceTypes, index:int) -> Optional[str]:
+		_order = 'ASC' if index >= 0 else 'DESC'
+		return self._execute(f'''SELECT childRi FROM {self.tableChildResources}
+								 WHERE pi = ? AND childTy = ?
+								 ORDER BY childCt {_order}, id {_order}
+								 LIMIT 1 OFFSET ?''', (pi, int(ty), index if index >= 0 else -index - 1),
+							 lambda c: (_row := c.fetchone()) and _row[0])
+
+	#
+	#	Subscription operations
+	#
+
+	def searchSubscriptionReprs(self, ri:Optional[str] = None,
+								  pi:Optional[str] = None) -> Optional[list[JSON]]:
+		if ri:
+			return self._execute(f'SELECT subscription FROM {self.tableSubscriptions} WHERE ri = ?', (ri,),
+								 lambda c: self._fetchAllRows(c))
+		elif pi:
+			return self._execute(f'SELECT subscription FROM {self.tableSubscriptions} WHERE pi = ?', (pi,),
+								 lambda c: self._fetchAllRows(c))
+		return None
+
+
+	def getAllSubscriptionReprs(self) -> list[JSON]:
+		return self._execute(f'SELECT subscription FROM {self.tableSubscriptions}', (),
+							 lambda c: self._fetchAllRows(c))
+
+
+	def upsertSubscriptionRepr(self, subscription:JSON, ri:str) -> bool:
+		with self.transaction():
+			_subscription = self._updateDocument(self.tableSubscriptions, 'subscription', ri, subscription)
+			return self._execute(f'INSERT OR REPLACE INTO {self.tableSubscriptions} (ri, pi, subscription) VALUES (?, ?, ?)',
+								 (ri, _subscription.get('pi'), self._dumps(_subscription)))
+
+
+	def removeSubscriptionRepr(self, ri:str) -> bool:
+		return self._execute(f'DELETE FROM {self.tableSubscriptions} WHERE ri = ?', (ri,),
+							 lambda c: c.rowcount > 0)
+
+	#
+	#	BatchNotification operations
+	#
+
+	def addBatchNotification(self, batchRecord:JSON) -> bool:
+		return self._execute(f'INSERT INTO {self.tableBatchNotifications} (ri, nu, batch) VALUES (?, ?, ?)',
+							 (batchRecord.get('ri'), batchRecord.get('nu'), self._dumps(batchRecord)))
+
+
+	def countBatchNotifications(self, ri:str, nu:str) -> int:
+		return self._execute(f'SELECT COUNT(*) FROM {self.tableBatchNotifications} WHERE ri = ? AND nu = ?', (ri, nu),
+							 lambda c: self._fetchNumber(c))
+
+
+	def getBatchNotifications(self, ri:str, nu:str) -> list[JSON]:
+		return self._execute(f'SELECT batch FROM {self.tableBatchNotifications} WHERE ri = ? AND nu = ? ORDER BY id', (ri, nu),
+							 lambda c: self._fetchAllRows(c))
+
+
+	def removeBatchNotifications(self, ri:str, nu:str) -> bool:
+		return self._execute(f'DELETE FROM {self.tableBatchNotifications} WHERE ri = ? AND nu = ?', (ri, nu),
+							 lambda c: c.rowcount > 0)
+
+	#
+	#	Statistic operations
+	#
+
+	def searchStatistics(self) -> JSON:
+		return self._execute(f'SELECT statistics FROM {self.tableStatistics} WHERE id = 1', (),
+							 lambda c: self._fetchSingleRow(c, False) or {})
+
+
+	def upsertStatistics(self, stats:JSON) -> bool:
+		with self.transaction():
+			_stats = self._updateDocument(self.tableStatistics, 'statistics', 1, stats, keyColumn = 'id', stripNone = True)	# type:ignore[arg-type]
+			return self._execute(f'INSERT OR REPLACE INTO {self.tableStatistics} (id, statistics) VALUES (1, ?)',
+								 (self._dumps(_stats),))
+
+
+	def purgeStatistics(self) -> None:
+		L.isDebug and L.logDebug('Purging statistics')
+		self._execute(f'DELETE FROM {self.tableStatistics}')
+
+	#
+	#	Action operations
+	#
+
+	def getAllActionReprs(self) -> list[JSON]:
+		return self._execute(f'SELECT action FROM {self.tableActions}', (),
+							 lambda c: self._fetchAllRows(c))
+
+
+	def getActionRep(self, ri:str) -> Optional[JSON]:
+		return self._execute(f'SELECT action FROM {self.tableActions} WHERE ri = ?', (ri,),
+							 lambda c: self._fetchSingleRow(c, False))
+
+
+	def searchActionsReprsForSubject(self, subjectRi:str) -> Sequence[JSON]:
+		return self._execute(f'SELECT action FROM {self.tableActions} WHERE subject = ?', (subjectRi,),
+							 lambda c: self._fetchAllRows(c))
+
+
+	def upsertActionRepr(self, actionRepr:JSON, ri:str) -> bool:
+		with self.transaction():
+			_action = self._updateDocument(self.tableActions, 'action', ri, actionRepr)
+			return self._execute(f'INSERT OR REPLACE INTO {self.tableActions} (ri, subject, action) VALUES (?, ?, ?)',
+								 (ri, _action.get('subject'), self._dumps(_action)))
+
+
+	def updateActionRepr(self, actionRepr:JSON) -> bool:
+		ri = actionRepr['ri']
+		with self.transaction():
+			if (_action := self._updateDocument(self.tableActions, 'action', ri, actionRepr, insert = False)) is None:
+				return False
+			return self._execute(f'UPDATE {self.tableActions} SET subject = ?, action = ? WHERE ri = ?',
+								 (_action.get('subject'), self._dumps(_action), ri))
+
+
+	def removeActionRepr(self, ri:str) -> bool:
+		return self._execute(f'DELETE FROM {self.tableActions} WHERE ri = ?', (ri,),
+							 lambda c: c.rowcount > 0)
+
+	#
+	#	Request operations
+	#
+
+	def insertRequest(self, req:JSON, ts:float, maxRequests:int) -> bool:
+		try:
+			self._execute(f'INSERT INTO {self.tableRequests} (ts, ri, request) VALUES (?, ?, ?)',
+						  (ts, req.get('ri'), self._dumps(req)))
+		except INTERNAL_SERVER_ERROR:
+			return False
+
+		# Determine the number of requests to remove. The counter is decreased before the
+		# requests are removed and corrected afterwards, so that concurrent inserts don't remove
+		# the same requests twice.
+		with self.lockRequestsCount:
+			self.requestsCount += 1
+			if (_excess := self.requestsCount - max(maxRequests, 0)) <= 0:
+				return True
+			self.requestsCount -= _excess
+
+		# Remove the oldest requests by their timestamp range
+		_removed = self._execute(f'''DELETE FROM {self.tableRequests}
+									 WHERE ts <= (SELECT ts FROM {self.tableRequests} ORDER BY ts LIMIT 1 OFFSET ?)''',
+								 (_excess - 1,),
+								 lambda c: c.rowcount)
+		with self.lockRequestsCount:
+			self.requestsCount += _excess - _removed
+		return True
+
+
+	def getRequests(self, ri:Optional[str] = None) -> list[JSON]:
+		if ri:
+			return self._execute(f'SELECT request FROM {self.tableRequests} WHERE ri = ? ORDER BY ts', (ri,),
+								 lambda c: self._fetchAllRows(c))
+		return self._execute(f'SELECT request FROM {self.tableRequests} ORDER BY ts', (),
+							 lambda c: self._fetchAllRows(c))
+
+
+	def deleteRequests(self, ri:Optional[str] = None) -> None:
+		if ri:
+			_removed = self._execute(f'DELETE FROM {self.tableRequests} WHERE ri = ?', (ri,),
+									 lambda c: c.rowcount)
+			with self.lockRequestsCount:
+				self.requestsCount = max(self.requestsCount - _removed, 0)
+		else:
+			self._execute(f'DELETE FROM {self.tableRequests}')
+			with self.lockRequestsCount:
+				self.requestsCount = 0
+
+	#
+	#	Schedule operations
+	#
+
+	def getSchedules(self) -> list[JSON]:
+		return self._execute(f'SELECT schedule FROM {self.tableSchedules}', (),
+							 lambda c: self._fetchAllRows(c))
+
+
+	def getSchedule(self, ri:str) -> Optional[JSON]:
+		return self._execute(f'SELECT schedule FROM {self.tableSchedules} WHERE ri = ?', (ri,),
+							 lambda c: self._fetchSingleRow(c, False))
+
+
+	def searchSchedulesForParent(self, pi:str) -> list[JSON]:
+		return self._execute(f'SELECT schedule FROM {self.tableSchedules} WHERE pi = ?', (pi,),
+							 lambda c: self._fetchAllRows(c))
+
+
+	def upsertSchedule(self, schedule:JSON, ri:str) -> bool:
+		with self.transaction():
+			_schedule = self._updateDocument(self.tableSchedules, 'schedule', ri, schedule)
+			return self._execute(f'INSERT OR REPLACE INTO {self.tableSchedules} (ri, pi, schedule) VALUES (?, ?, ?)',
+								 (ri, _schedule.get('pi'), self._dumps(_schedule)))
+
+
+	def removeSchedule(self, ri:str) -> bool:
+		return self._execute(f'DELETE FROM {self.tableSchedules} WHERE ri = ?', (ri,),
+							 lambda c: c.rowcount > 0)
+
+	#
+	#	Originator operations
+	#
+
+	def getOriginator(self, originator: str) -> Optional[Tuple[str, OriginatorType]]:
+		return self._execute(f'SELECT info FROM {self.tableOriginators} WHERE originator = ?', (originator,),
+							 lambda c: self._fetchSingleRow(c, False))
+
+
+	def addOriginator(self, originatorStructure: JSON, originator: str) -> bool:
+		return self._execute(f'INSERT INTO {self.tableOriginators} (originator, info) VALUES (?, ?)',
+							 (originator, self._dumps(originatorStructure)))
+
+
+	def removeOriginator(self, originator: str) -> bool:
+		return self._execute(f'DELETE FROM {self.tableOriginators} WHERE originator = ?', (originator,),
+							 lambda c: c.rowcount > 0)
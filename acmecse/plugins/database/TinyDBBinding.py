@@ -10,25 +10,35 @@
 """
 
 from __future__ import annotations
-from typing import Optional, Callable, Sequence, Tuple, cast
+from typing import Optional, Callable, Sequence, Tuple, Any, Iterator, cast
 
-import shutil, os
-from threading import Lock
+import shutil, os, json
+from copy import deepcopy
+from threading import Lock, RLock
 from pathlib import Path
+from contextlib import contextmanager, ExitStack
 
 from acmecse.etc.Types import JSON, ResourceTypes, OriginatorType
 from acmecse.etc.Constants import RuntimeConstants as RC
 from acmecse.helpers.TinyDBBufferedStorage import TinyDBBufferedStorage
+from acmecse.helpers.TinyDBJournalStorage import TinyDBJournalStorage
 from acmecse.helpers.TinyDBBetterTable import TinyDBBetterTable
+from acmecse.helpers.ExpirationIndex import ExpirationIndex
+from acmecse.helpers.InstanceIndex import InstanceIndex
+from acmecse.helpers.AttributeIndex import AttributeIndex
+from acmecse.helpers.CappedCollection import CappedCollection
+from acmecse.helpers.InstanceStore import InstanceStore
+from acmecse.helpers.BackupSnapshots import linkUnchanged
+from acmecse.helpers.PerfTimer import perfTimer
 
 from acmecse.runtime.DBBinding import DBBinding
 from acmecse.runtime.Logging import Logging as L
-from acmecse.runtime.Configuration import Configuration
+from acmecse.runtime.Configuration import Configuration, ConfigurationError
 from acmecse.runtime.PluginSupport import plugin, init, start, configure, validate
 
 from tinydb import TinyDB, Query
-from tinydb.table import Document
-from tinydb.storages import MemoryStorage
+from tinydb.table import Document, Table
+from tinydb.storages import MemoryStorage, Storage
 from tinydb.operations import delete 
 
 
@@ -60,6 +70,9 @@ _requests = 'requests'
 _schedules = 'schedules'
 """ Name of the schedules table. """
 
+_instances = 'instances'
+""" Name of the instance store directory. """
+
 
 @plugin(property='tinyDBBinding', tags=['acme', 'database'])
 class TinyDBBinding(DBBinding):
@@ -70,6 +83,8 @@ class TinyDBBinding(DBBinding):
 		'path',
 		'cacheSize',
 		'writeDelay',
+		'storageClass',
+		'storageArgs',
 		'postfix',
 		
 		'lockResources',
@@ -120,6 +135,13 @@ class TinyDBBinding(DBBinding):
 		'actionsQuery',
 		'requestsQuery',
 		'schedulesQuery',
+
+		'expirationIndex',
+		'instanceIndex',
+		'resourceIndex',
+		'requestsCollection',
+		'instanceStore',
+		'_backupFiles',
 	)
 	""" Define slots for instance variables. """
 
@@ -133,16 +155,16 @@ class TinyDBBinding(DBBinding):
 		#	Create transaction locks
 		#
 
-		self.lockResources = Lock()
+		self.lockResources = RLock()
 		""" Lock for the resources table."""
 
-		self.lockIdentifiers = Lock()
+		self.lockIdentifiers = RLock()
 		""" Lock for the identifiers table."""
 
-		self.lockChildResources = Lock()
+		self.lockChildResources = RLock()
 		""" Lock for the childResources table."""
 
-		self.lockStructuredIDs = Lock()
+		self.lockStructuredIDs = RLock()
 		""" Lock for the structuredIDs table."""
 
 		self.lockSubscriptions = Lock()
@@ -166,6 +188,25 @@ class TinyDBBinding(DBBinding):
 		self.lockOriginators = Lock()
 		""" Lock for the originators. """
 
+		#
+		#	Create indexes
+		#
+
+		self.expirationIndex = ExpirationIndex()
+		""" Index of the resources' expiration timestamps. Protected by *lockResources*. """
+
+		self.instanceIndex = InstanceIndex()
+		""" Index of the child resources per parent and type, ordered by their creation times. Protected by *lockChildResources*. """
+
+		self.resourceIndex = AttributeIndex(('pi', 'ty', 'csi', 'aei'))
+		""" Index of the resources' *pi*, *ty*, *csi*, and *aei* attributes. Protected by *lockResources*. """
+
+		self.requestsCollection = CappedCollection()
+		""" The recorded requests in insertion order, indexed by their target resource IDs. Protected by *lockRequests*. """
+
+		self._backupFiles:dict[str, Tuple[Storage, int, int, int]] = {}
+		""" The storage, its write generation, and the device and inode of the file of each database in the last backup. """
+
 		L.isInfo and L.log('TinyDBBinding initialized')
 
 
@@ -183,10 +224,22 @@ class TinyDBBinding(DBBinding):
 		self.cacheSize = Configuration.database_tinydb_cacheSize
 		""" Size of the cache for the TinyDB tables. """
 
-		self.writeDelay = Configuration.database_tinydb_cacheSize
+		self.writeDelay = Configuration.database_tinydb_writeDelay
 		""" Delay for writing to the database. """
 
+		# The TinyDB storage driver class for the database files, and its arguments
+		self.storageClass:type[Storage]
+		match Configuration.database_tinydb_storage:
+			case 'journal':
+				self.storageClass = TinyDBJournalStorage
+				self.storageArgs = { 'write_delay': self.writeDelay,
+									 'compaction_threshold': Configuration.database_tinydb_compactionThreshold }
+			case _:
+				self.storageClass = TinyDBBufferedStorage
+				self.storageArgs = { 'write_delay': self.writeDelay }
+
 		L.isDebug and L.logDebug(f'Cache Size: {self.cacheSize:d}')
+		L.isDebug and L.logDebug(f'Storage: {Configuration.database_tinydb_storage}')
 
 		# All databases/tables will use the smart query cache
 		if not self.path:
@@ -201,18 +254,12 @@ class TinyDBBinding(DBBinding):
 			self.dbSubscriptions = TinyDB(storage=MemoryStorage)
 			""" The TinyDB database for the subscriptions table."""
 
-			self.dbBatchNotifications = TinyDB(storage=MemoryStorage)
-			""" The TinyDB database for the batchNotifications table."""
-
 			self.dbStatistics = TinyDB(storage=MemoryStorage)
 			""" The TinyDB database for the statistics table."""
 
 			self.dbActions = TinyDB(storage=MemoryStorage)
 			""" The TinyDB database for the actions table."""
 
-			self.dbRequests = TinyDB(storage=MemoryStorage)
-			""" The TinyDB database for the requests table."""
-			
 			self.dbSchedules = TinyDB(storage=MemoryStorage)
 			""" The TinyDB database for the schedules table."""
 
@@ -256,36 +303,36 @@ class TinyDBBinding(DBBinding):
 			""" Filename for the originators table."""
 
 			#
-			#	Open/Create databases
+			#	Open/Create databases. The rarely used requests and batchNotifications
+			#	databases are opened on first access.
 			#
 
-			self.dbResources = TinyDB(self.fileResources, storage=TinyDBBufferedStorage, write_delay=self.writeDelay)
+			self.dbResources = self._openDB(self.fileResources)
 			""" The TinyDB database for the resources table."""
 
-			self.dbIdentifiers = TinyDB(self.fileIdentifiers, storage=TinyDBBufferedStorage, write_delay=self.writeDelay)
+			self.dbIdentifiers = self._openDB(self.fileIdentifiers)
 			""" The TinyDB database for the identifiers table."""
 
-			self.dbSubscriptions = TinyDB(self.fileSubscriptions, storage=TinyDBBufferedStorage, write_delay=self.writeDelay)
+			self.dbSubscriptions = self._openDB(self.fileSubscriptions)
 			""" The TinyDB database for the subscriptions table."""
 
-			self.dbBatchNotifications = TinyDB(self.fileBatchNotifications, storage=TinyDBBufferedStorage, write_delay=self.writeDelay)
-			""" The TinyDB database for the batchNotifications table."""
-
-			self.dbStatistics = TinyDB(self.fileStatistics, storage=TinyDBBufferedStorage, write_delay=self.writeDelay)
+			self.dbStatistics = self._openDB(self.fileStatistics)
 			""" The TinyDB database for the statistics table."""
 
-			self.dbActions = TinyDB(self.fileActions, storage=TinyDBBufferedStorage, write_delay=self.writeDelay)
+			self.dbActions = self._openDB(self.fileActions)
 			""" The TinyDB database for the actions table."""
 
-			self.dbRequests = TinyDB(self.fileRequests, storage=TinyDBBufferedStorage, write_delay=self.writeDelay)
-			""" The TinyDB database for the requests table."""
-
-			self.dbSchedules = TinyDB(self.fileSchedules, storage=TinyDBBufferedStorage, write_delay=self.writeDelay)
+			self.dbSchedules = self._openDB(self.fileSchedules)
 			""" The TinyDB database for the schedules table."""
 
-			self.dbOriginators = TinyDB(self.fileOriginators, storage=TinyDBBufferedStorage, write_delay=self.writeDelay)
+			self.dbOriginators = self._openDB(self.fileOriginators)
 			""" The TinyDB database for the originators table."""
 
+		self.dbBatchNotifications:Optional[TinyDB] = None
+		""" The TinyDB database for the batchNotifications table, or None if not opened yet."""
+
+		self.dbRequests:Optional[TinyDB] = None
+		""" The TinyDB database for the requests table, or None if not opened yet."""
 		
 		#
 		#	Open/Create tables
@@ -310,9 +357,8 @@ class TinyDBBinding(DBBinding):
 		""" The TinyDB table for the subscriptions table."""
 		TinyDBBetterTable.assign(self.tabSubscriptions)
 		
-		self.tabBatchNotifications = self.dbBatchNotifications.table(_batchNotifications, cache_size=self.cacheSize)
-		""" The TinyDB table for the batchNotifications table."""
-		TinyDBBetterTable.assign(self.tabBatchNotifications)
+		self.tabBatchNotifications:Optional[Table] = None
+		""" The TinyDB table for the batchNotifications table, or None if not opened yet. Use `_batchNotificationsTable()` to access it."""
 		
 		self.tabStatistics = self.dbStatistics.table(_statistics, cache_size=self.cacheSize)
 		""" The TinyDB table for the statistics table."""
@@ -322,9 +368,8 @@ class TinyDBBinding(DBBinding):
 		""" The TinyDB table for the actions table."""
 		TinyDBBetterTable.assign(self.tabActions)
 
-		self.tabRequests = self.dbRequests.table(_requests, cache_size=self.cacheSize)
-		""" The TinyDB table for the requests table."""
-		TinyDBBetterTable.assign(self.tabRequests)
+		self.tabRequests:Optional[Table] = None
+		""" The TinyDB table for the requests table, or None if not opened yet. Use `_requestsTable()` to access it."""
 
 		self.tabSchedules = self.dbSchedules.table(_schedules, cache_size=self.cacheSize)
 		""" The TinyDB table for the schedules table."""
@@ -362,6 +407,98 @@ class TinyDBBinding(DBBinding):
 		self.originatorsQuery = Query()
 		""" The TinyDB query object for the originators table."""
 
+		#
+		#	Open the instance store
+		#
+		self.instanceStore = None
+		""" The store for instance resources, or None if disabled. Protected by *lockResources*. """
+		if Configuration.database_tinydb_instanceSegmentSize > 0:
+			self.instanceStore = InstanceStore(f'{self.path}/{_instances}-{self.postfix}' if self.path else None,
+											   Configuration.database_tinydb_instanceSegmentSize)
+			self.instanceStore.load()
+
+		#
+		#	Build the indexes from the loaded tables
+		#
+		self._buildIndexes()
+
+
+	def _buildIndexes(self) -> None:
+		"""	Build the in-memory indexes from the current content of the tables.
+		"""
+		with self.lockResources:
+			self.expirationIndex.clear()
+			self.resourceIndex.clear()
+			for ri, doc in self.tabResources._read_table().items():
+				self.expirationIndex.set(ri, doc.get('et'))
+				self.resourceIndex.add(ri, cast(JSON, doc))	# the raw table stores plain dicts
+			if self.instanceStore:
+				# Remove the instances of parent resources that don't exist anymore, e.g. after a crash
+				for pi in self.instanceStore.parents():
+					if not self.tabResources.contains(doc_id = pi):	# type:ignore[arg-type]
+						L.isWarn and L.logWarn(f'Removing instances of non-existing parent resource: {pi}')
+						self.instanceStore.removeInstances(pi)
+				for ri, et in self.instanceStore.expirations():
+					self.expirationIndex.set(ri, et)
+		
+		# All child resources are added to the instance index, because the resource type
+		# definitions are not available yet when the database is loaded.
+		with self.lockChildResources:
+			self.instanceIndex.clear()
+			for ri, doc in self.tabChildResources._read_table().items():
+				if (ct := doc.get('ct')) is None:	# older records don't contain the creation time
+					ct = _r.get('ct', '') if (_r := cast(Optional[Document], self.tabResources.get(doc_id = ri))) else ''	# type:ignore[arg-type]
+				if doc['pi']:	# ATN: CSE has no parent
+					self.instanceIndex.add(doc['pi'], doc['ty'], ri, ct)
+
+
+	def _openDB(self, fileName:Optional[str]) -> TinyDB:
+		"""	Open or create a database file, and log the time it took to load it.
+
+			Args:
+				fileName: The name of the database file, or None for an in-memory database.
+
+			Return:
+				The TinyDB database.
+		"""
+		if not fileName:
+			return TinyDB(storage=MemoryStorage)
+		with perfTimer(lambda ms: L.isDebug and L.logDebug(f'Loaded database file: {fileName} ({ms:.2f} ms)')):
+			return TinyDB(fileName, storage=self.storageClass, **self.storageArgs)
+
+
+	def _batchNotificationsTable(self) -> Table:
+		"""	Return the batchNotifications table. The database is opened on first access.
+			The caller must hold *lockBatchNotifications*.
+
+			Return:
+				The TinyDB table for the batchNotifications table.
+		"""
+		if (table := self.tabBatchNotifications) is None:
+			self.dbBatchNotifications = db = self._openDB(self.fileBatchNotifications if self.path else None)
+			self.tabBatchNotifications = table = db.table(_batchNotifications, cache_size=self.cacheSize)
+			TinyDBBetterTable.assign(table)
+		return table
+
+
+	def _requestsTable(self) -> Table:
+		"""	Return the requests table. The database is opened and the recorded requests are indexed on first access.
+			The caller must hold *lockRequests*.
+
+			Return:
+				The TinyDB table for the requests table.
+		"""
+		if (table := self.tabRequests) is None:
+			self.dbRequests = db = self._openDB(self.fileRequests if self.path else None)
+			self.tabRequests = table = db.table(_requests, cache_size=self.cacheSize)
+			TinyDBBetterTable.assign(table)
+
+			# The requests are stored in the table in insertion order. Their document IDs are their timestamps.
+			self.requestsCollection.clear()
+			for ts, doc in table._read_table().items():
+				self.requestsCollection.add(ts, doc.get('ri'), cast(JSON, doc))
+		return table
+
 
 	def closeDB(self) -> None:
 		L.isInfo and L.log('Closing DBs')
@@ -372,13 +509,15 @@ class TinyDBBinding(DBBinding):
 		with self.lockSubscriptions:
 			self.dbSubscriptions.close()
 		with self.lockBatchNotifications:
-			self.dbBatchNotifications.close()
+			if self.dbBatchNotifications:
+				self.dbBatchNotifications.close()
 		with self.lockStatistics:
 			self.dbStatistics.close()
 		with self.lockActions:
 			self.dbActions.close()
 		with self.lockRequests:
-			self.dbRequests.close()
+			if self.dbRequests:
+				self.dbRequests.close()
 		with self.lockSchedules:
 			self.dbSchedules.close()
 		with self.lockOriginators:
@@ -387,44 +526,109 @@ class TinyDBBinding(DBBinding):
 
 	def purgeDB(self) -> None:
 		L.isInfo and L.log('Purging DBs')
-		self.tabResources.truncate()
+		with self.lockResources:
+			self.tabResources.truncate()
+			self.expirationIndex.clear()
+			self.resourceIndex.clear()
+			if self.instanceStore:
+				self.instanceStore.clear()
 		self.tabIdentifiers.truncate()
-		self.tabChildResources.truncate()
+		with self.lockChildResources:
+			self.tabChildResources.truncate()
+			self.instanceIndex.clear()
 		self.tabStructuredIDs.truncate()
 		self.tabSubscriptions.truncate()
-		self.tabBatchNotifications.truncate()
+		with self.lockBatchNotifications:
+			self._batchNotificationsTable().truncate()
 		self.tabStatistics.truncate()
 		self.tabActions.truncate()
-		self.tabRequests.truncate()
+		with self.lockRequests:
+			self._requestsTable().truncate()
+			self.requestsCollection.clear()
 		self.tabSchedules.truncate()
 		self.tabOriginators.truncate()
 	
 
-	def backupDB(self, dir:str) -> bool:
-		if not self.path:
-			L.isDebug and L.logDebug('In-memory database backup is not supported. Skipping.')
-			return True
-		
+	def backupDB(self, dir:str, previous:Optional[str] = None) -> bool:
 		L.isDebug and L.logDebug(f'Creating DB backup in directory: {dir}')
 		# Create the directory if it does not exist
 		os.makedirs(dir, exist_ok = True)
 
-		for fn in [	self.fileResources,
-					self.fileIdentifiers,
-					self.fileSubscriptions,
-					self.fileBatchNotifications,
-					self.fileStatistics,
-					self.fileActions,
-					self.fileRequests,
-					self.fileSchedules,
-					self.fileOriginators
-				  ]:
-			if Path(fn).is_file():
-				shutil.copy2(fn, dir)
+		# Only snapshots of the in-memory databases are taken while the locks are held. They are
+		# written to the backup directory afterwards. The database files themselves are not copied,
+		# because they may be rewritten at the same time. Databases that were not written to since
+		# the previous backup are hard-linked from there instead.
+		snapshots:list[Tuple[str, Storage, int, JSON]] = []
+
+		# The resources, the identifiers, and the instance store must be consistent with each other
+		pending:list[Tuple[str, str, int, int]] = []
+		with self.transaction():
+			self._backupSnapshot(dir, previous, self.fileResources, self.dbResources, snapshots)
+			self._backupSnapshot(dir, previous, self.fileIdentifiers, self.dbIdentifiers, snapshots)
+			if self.instanceStore:
+				pending = self.instanceStore.backup(dir, previous)
+
+		for lock, fileName, db in ((self.lockSubscriptions, self.fileSubscriptions, self.dbSubscriptions),
+								   (self.lockBatchNotifications, self.fileBatchNotifications, self.dbBatchNotifications),
+								   (self.lockStatistics, self.fileStatistics, self.dbStatistics),
+								   (self.lockActions, self.fileActions, self.dbActions),
+								   (self.lockRequests, self.fileRequests, self.dbRequests),
+								   (self.lockSchedules, self.fileSchedules, self.dbSchedules),
+								   (self.lockOriginators, self.fileOriginators, self.dbOriginators)):
+			with lock:
+				if db:
+					self._backupSnapshot(dir, previous, fileName, db, snapshots)
+				else:
+					# The database is not opened yet, so its files are not written
+					for f in (fileName, f'{fileName}.journal'):
+						if Path(f).is_file() and not linkUnchanged(os.stat(f),
+																	os.path.join(previous, os.path.basename(f)) if previous else None,
+																	os.path.join(dir, os.path.basename(f))):
+							shutil.copy2(f, dir)
+
+		# Copy and write everything else outside of the locks
+		if self.instanceStore:
+			self.instanceStore.finishBackup(pending)
+		for fileName, storage, generation, data in snapshots:
+			with open(target := os.path.join(dir, os.path.basename(fileName)), 'w', encoding = 'utf-8') as file:
+				json.dump(data, file)
+			stat = os.stat(target)
+			self._backupFiles[fileName] = (storage, generation, stat.st_dev, stat.st_ino)
 		L.isDebug and L.logDebug('DB backup done')
 		return True
 
 
+	def supportsBackup(self) -> bool:
+		# In-memory database backup is not supported
+		return self.path is not None
+
+
+	def _backupSnapshot(self, dir:str, previous:Optional[str], fileName:str, db:TinyDB, snapshots:list[Tuple[str, Storage, int, JSON]]) -> None:
+		"""	Back up a database. The caller must hold the locks of the database.
+
+			If the database was not written to since it was written to the previous backup, then the
+			file is hard-linked from the previous backup. Otherwise a copy of the current state of the
+			database is added to *snapshots*, to be written after the locks are released.
+
+			Args:
+				dir: The backup directory.
+				previous: The previous backup directory, or None.
+				fileName: The database file name.
+				db: The TinyDB database. It must use a buffered or journal storage.
+				snapshots: The list of snapshots to write.
+		"""
+		storage = cast(TinyDBBufferedStorage|TinyDBJournalStorage, db.storage)
+		if previous and (known := self._backupFiles.get(fileName)) and known[0] is storage and known[1] == storage.generation:
+			try:
+				source = os.path.join(previous, os.path.basename(fileName))
+				if (stat := os.stat(source)) and (stat.st_dev, stat.st_ino) == known[2:]:
+					os.link(source, os.path.join(dir, os.path.basename(fileName)))
+					return
+			except OSError:
+				pass	# Not in the previous backup, or hard links are not supported
+		snapshots.append((fileName, storage, storage.generation, storage.snapshot()))
+
+
 	#
 	#	Configuration
 	#
@@ -441,6 +645,9 @@ class TinyDBBinding(DBBinding):
 		config.database_tinydb_path = parser.get('database.tinydb', 'path', fallback='./data')
 		config.database_tinydb_cacheSize = parser.getint('database.tinydb', 'cacheSize', fallback=0)		# Default: no caching
 		config.database_tinydb_writeDelay = parser.getint('database.tinydb', 'writeDelay', fallback=1)		# Default: 1 second
+		config.database_tinydb_storage = parser.get('database.tinydb', 'storage', fallback='buffered')
+		config.database_tinydb_compactionThreshold = parser.getint('database.tinydb', 'compactionThreshold', fallback=10000)
+		config.database_tinydb_instanceSegmentSize = parser.getint('database.tinydb', 'instanceSegmentSize', fallback=0)		# Default: instance store disabled
 
 
 	@validate
@@ -449,11 +656,33 @@ class TinyDBBinding(DBBinding):
 		
 			Args:
 				config: The configuration object containing the configuration settings for the plugin.
+
+			Raises:
+				ConfigurationError: If the configuration is invalid.
 		"""
 		# override configuration with command line arguments
 		if config._args_DBDataDirectory is not None:
 			config.database_tinydb_path = config._args_DBDataDirectory
 
+		if config.database_tinydb_storage not in ['journal', 'buffered']:
+			raise ConfigurationError(fr'[i]\[database.tinydb]:storage[/i] must be "journal" or "buffered"')
+		if config.database_tinydb_compactionThreshold < 1:
+			raise ConfigurationError(fr'[i]\[database.tinydb]:compactionThreshold[/i] must be > 0')
+		if config.database_tinydb_instanceSegmentSize < 0:
+			raise ConfigurationError(fr'[i]\[database.tinydb]:instanceSegmentSize[/i] must be >= 0')
+
+
+	@contextmanager
+	def transaction(self) -> Iterator[None]:
+		# Acquire the locks always in the same order to prevent deadlocks. The locks are re-entrant,
+		# so the single operations can acquire them again.
+		with self.lockResources, self.lockIdentifiers, self.lockStructuredIDs, self.lockChildResources:
+			with ExitStack() as stack:
+				for db in (self.dbResources, self.dbIdentifiers):
+					if isinstance(db.storage, (TinyDBBufferedStorage, TinyDBJournalStorage)):
+						stack.enter_context(db.storage.batch())
+				yield
+
 
 	#########################################################################
 
@@ -463,23 +692,98 @@ class TinyDBBinding(DBBinding):
 
 	def insertResource(self, resource:JSON, ri:str) -> None:
 		with self.lockResources:
-			self.tabResources.insert(Document(resource, ri))	# type:ignore[arg-type]
+			if self._isStoredInstance(resource):
+				self.instanceStore.add(resource)	# type:ignore[union-attr]
+			else:
+				# Store a copy. The stored documents are handed out without copying and must never be changed in place
+				self.tabResources.insert(Document(deepcopy(resource), ri))	# type:ignore[arg-type]
+				self.resourceIndex.add(ri, resource)
+			self.expirationIndex.set(ri, resource.get('et'))
 	
 
+	def insertResources(self, records:Sequence[Tuple[JSON, JSON, JSON, JSON]]) -> None:
+		with self.transaction():
+			# Instance resources are added to the instance store, which resolves the identifiers
+			# and child resources itself. All other records are written with one update per table.
+			_records:list[Tuple[JSON, JSON, JSON, JSON]] = []
+			for record in records:
+				_resource = record[0]
+				_ri = _resource['ri']
+				if self._isStoredInstance(_resource):
+					self.instanceStore.add(_resource)	# type:ignore[union-attr]
+				else:
+					_records.append(record)
+					self.resourceIndex.add(_ri, _resource)
+				self.expirationIndex.set(_ri, _resource.get('et'))
+			if not _records:
+				return
+
+			def _insertResources(table:dict) -> None:
+				for resource, _, _, _ in _records:
+					table[resource['ri']] = deepcopy(resource)
+			self.tabResources._update_table(_insertResources)
+
+			def _upsertIdentifiers(table:dict) -> None:
+				for _, identifierMapping, _, _ in _records:
+					table[identifierMapping['ri']] = dict(identifierMapping)
+			self.tabIdentifiers._update_table(_upsertIdentifiers)
+
+			def _upsertStructuredIDs(table:dict) -> None:
+				for _, _, structuredPathMapping, _ in _records:
+					table[structuredPathMapping['srn']] = dict(structuredPathMapping)
+			self.tabStructuredIDs._update_table(_upsertStructuredIDs)
+
+			# Add the child resource records, and then the new children to each parent's record once
+			def _upsertChildResources(table:dict) -> None:
+				_children:dict[str, list[list]] = {}
+				for _, _, _, childResource in _records:
+					_ri = childResource['ri']
+					table[_ri] = dict(childResource)
+					if (_pi := childResource['pi']):	# ATN: CSE has no parent
+						_children.setdefault(_pi, []).append([_ri, childResource['ty']])
+						self.instanceIndex.add(_pi, childResource['ty'], _ri, childResource.get('ct', ''))
+				for _pi, _ch in _children.items():
+					if _pi in table:
+						_r = table[_pi]
+						table[_pi] = { **_r, 'ch': _r['ch'] + _ch }
+			self.tabChildResources._update_table(_upsertChildResources)
+
+
 	def upsertResource(self, resource:JSON, ri:str) -> None:
 		#L.logDebug(resource)
 		with self.lockResources:
+			if self.instanceStore and (ri in self.instanceStore or
+									   (self._isStoredInstance(resource) and not self.tabResources.contains(doc_id = ri))):	# type:ignore[arg-type]
+				self.instanceStore.add(resource)
+				self.expirationIndex.set(ri, resource.get('et'))
+				return
+
+			_indexed = self.resourceIndex.values(self._rawResource(ri))
+
 			# Update existing or insert new when overwriting
-			self.tabResources.upsert(Document(resource, doc_id = ri))	# type:ignore[arg-type]
+			self.tabResources.upsert(Document(deepcopy(resource), doc_id = ri))	# type:ignore[arg-type]
+			self.expirationIndex.set(ri, resource.get('et'))
+			self.resourceIndex.update(ri, _indexed, self.resourceIndex.values(self._rawResource(ri)))
 	
 
 	def updateResource(self, resource:JSON, ri:str) -> JSON:
 		#L.logDebug(resource)
 		with self.lockResources:
+			if self.instanceStore and ri in self.instanceStore:
+				self.instanceStore.update(ri, resource)
+				if 'et' in resource:	# None removes the resource from the index
+					self.expirationIndex.set(ri, resource['et'])
+				for k in [ k for k, v in resource.items() if v is None ]:
+					del resource[k]
+				return resource
+
+			_indexed = self.resourceIndex.values(self._rawResource(ri))
 
 			# TinyDB update() updates the record, but does not remove fields that are None. It also
 			# updates the fields and doesnot update the whole document.
-			self.tabResources.update(resource, doc_ids = [ri])	# type:ignore[call-arg, list-item]
+			self.tabResources.update(deepcopy(resource), doc_ids = [ri])	# type:ignore[call-arg, list-item]
+			if 'et' in resource:	# None removes the resource from the index
+				self.expirationIndex.set(ri, resource['et'])
 
 			# remove nullified fields from db and resource
 			for k in list(resource):
@@ -487,12 +791,21 @@ class TinyDBBinding(DBBinding):
 					# The delete() method removes a field from the document
 					self.tabResources.update(delete(k), doc_ids = [ri])	# type: ignore[no-untyped-call, call-arg, list-item]
 					del resource[k]
+			self.resourceIndex.update(ri, _indexed, self.resourceIndex.values(self._rawResource(ri)))
 			return resource
 
 
 	def deleteResource(self, ri:str) -> None:
 		with self.lockResources:
+			if self.instanceStore and ri in self.instanceStore:
+				self.instanceStore.remove(ri)
+				self.expirationIndex.remove(ri)
+				return
+
+			_indexed = self.resourceIndex.values(self._rawResource(ri))
 			self.tabResources.remove(doc_ids = [ri])	# type:ignore[arg-type, list-item]
+			self.expirationIndex.remove(ri)
+			self.resourceIndex.remove(ri, _indexed)
 	
 
 	def searchResources(self, ri:Optional[str] = None, 
@@ -505,18 +818,18 @@ class TinyDBBinding(DBBinding):
 		if not srn:
 			with self.lockResources:
 				if ri:
-					_r = self.tabResources.get(doc_id = ri)	# type:ignore[arg-type]
+					_r = self.tabResources.get(doc_id = ri) or self._storedInstance(ri)	# type:ignore[arg-type]
 					return [_r] if _r else [] 	# type:ignore[list-item]
 				elif csi:
-					return cast(list[JSON], self.tabResources.search(self.resourceQuery.csi == csi))
+					return self._resourcesByIndex('csi', csi)
 				elif pi:
 					if ty is not None:	# ty is an int
-						return cast(list[JSON], self.tabResources.search((self.resourceQuery.pi == pi) & (self.resourceQuery.ty == ty)))
-					return cast(list[JSON], self.tabResources.search(self.resourceQuery.pi == pi))
+						return [ _r for _r in self._resourcesByIndex('pi', pi) if _r.get('ty') == ty ] + self._storedInstances(pi, ty)
+					return self._resourcesByIndex('pi', pi) + self._storedInstances(pi)
 				elif ty is not None:	# ty is an int
-					return cast(list[JSON], self.tabResources.search(self.resourceQuery.ty == ty))
+					return self._resourcesByIndex('ty', ty) + self._storedInstances(ty = ty)
 				elif aei:
-					return cast(list[JSON], self.tabResources.search(self.resourceQuery.aei == aei))
+					return self._resourcesByIndex('aei', aei)
 		
 		else:
 			# for SRN find the ri first and then try again recursively (outside the lock!!)
@@ -526,9 +839,17 @@ class TinyDBBinding(DBBinding):
 		return []
 
 
+	def searchResourcesByRIs(self, ris:Sequence[str]) -> list[JSON]:
+		with self.lockResources:
+			_table = self.tabResources._read_table()
+			return [ _r
+					 for ri in ris
+					 if (_r := Document(_table[ri], ri) if ri in _table else self._storedInstance(ri)) ]	# type:ignore[arg-type] # The tables' document_id_class is str (see TinyDBBetterTable)
+
+
 	def discoverResourcesByFilter(self, func:Callable[[JSON], bool]) -> list[JSON]:
 		with self.lockResources:
-			return cast(list[JSON], self.tabResources.search(func))	# type: ignore [arg-type]
+			return cast(list[JSON], self.tabResources.search(func)) + [ _r for _r in self._storedInstances() if func(_r) ]	# type: ignore [arg-type]
 
 
 	def hasResource(self, ri:Optional[str] = None, 
@@ -537,9 +858,9 @@ class TinyDBBinding(DBBinding):
 		if not srn:
 			with self.lockResources:
 				if ri:
-					return self.tabResources.contains(doc_id = ri)	# type: ignore [arg-type]
+					return self.tabResources.contains(doc_id = ri) or (self.instanceStore is not None and ri in self.instanceStore)	# type: ignore [arg-type]
 				elif ty is not None:	# ty is an int
-					return self.tabResources.contains(self.resourceQuery.ty == ty)
+					return len(self.resourceIndex.get('ty', ty)) > 0 or (self.instanceStore is not None and self.instanceStore.hasType(ty))	# type:ignore[arg-type]
 		else:
 			# find the ri first and then try again recursively
 			if len((identifiers := self.searchIdentifiers(srn = srn))) == 1:
@@ -549,18 +870,114 @@ class TinyDBBinding(DBBinding):
 
 	def countResources(self) -> int:
 		with self.lockResources:
-			return len(self.tabResources)
+			return len(self.tabResources) + (len(self.instanceStore) if self.instanceStore else 0)
 
 
 	def searchByFragment(self, dct:dict) -> list[JSON]:
 		with self.lockResources:
-			return cast(list[JSON], self.tabResources.search(self.resourceQuery.fragment(dct)))
+			_instances = [ _r
+						   for _r in self._storedInstances(dct.get('pi'), dct.get('ty'))
+						   if all(k in _r and _r[k] == v for k, v in dct.items()) ]
+
+			# Use the resource index if the fragment contains an indexed attribute
+			for attribute in self.resourceIndex.attributes:
+				if (value := dct.get(attribute)) is not None:
+					return [ _r 
+							 for _r in self._resourcesByIndex(attribute, value) 
+							 if all(k in _r and _r[k] == v for k, v in dct.items()) ] + _instances
+			return cast(list[JSON], self.tabResources.search(self.resourceQuery.fragment(dct))) + _instances
+
+
+	def _rawResource(self, ri:str) -> Optional[JSON]:
+		"""	Return the raw, stored resource document. 
+		
+			The document must not be modified or returned to the caller. The caller must hold *lockResources*.
+
+			Args:
+				ri: The resource ID.
+			
+			Return:
+				The raw resource document, or None if not found.
+		"""
+		return cast(Optional[JSON], self.tabResources._read_table().get(ri))
+
+
+	def _resourcesByIndex(self, attribute:str, value:Any) -> list[JSON]:
+		"""	Return the resource documents for an attribute value from the resource index.
+		
+			The caller must hold *lockResources*.
+
+			Args:
+				attribute: The indexed attribute.
+				value: The attribute value to search for.
+			
+			Return:
+				The list of resource documents. It may be empty.
+		"""
+		_table = self.tabResources._read_table()
+		return [ Document(_table[ri], ri)	# type:ignore[arg-type]
+				 for ri in self.resourceIndex.get(attribute, value) ]
+
+
+	def _isStoredInstance(self, resource:JSON) -> bool:
+		"""	Check whether a new resource is stored in the instance store.
+
+			Args:
+				resource: The resource document.
+			
+			Return:
+				True if the instance store is enabled and the resource is an instance resource with a parent.
+		"""
+		return self.instanceStore is not None and bool(resource.get('pi')) and ResourceTypes.isInstanceResource(resource.get('ty'))
+
+
+	def _storedInstance(self, ri:str) -> Optional[JSON]:
+		"""	Return an instance resource from the instance store.
+
+			The caller must hold *lockResources*.
+
+			Args:
+				ri: The resource ID.
+			
+			Return:
+				The resource document, or None if the instance store doesn't contain the resource.
+		"""
+		if self.instanceStore is None or (_r := self.instanceStore.get(ri)) is None:
+			return None
+		return Document(_r, ri)	# type:ignore[arg-type]
+
+
+	def _storedInstances(self, pi:Optional[str] = None, ty:Optional[int] = None) -> list[JSON]:
+		"""	Return the instance resources from the instance store.
+
+			The caller must hold *lockResources*.
+
+			Args:
+				pi: The resource ID of the parent resource. If None, then the instances of all parent resources are returned.
+				ty: The resource type of the instances. If None, then instances of all types are returned.
+			
+			Return:
+				The list of resource documents. It may be empty.
+		"""
+		if self.instanceStore is None:
+			return []
+		return [ Document(_r, _r['ri']) for _r in self.instanceStore.documents(pi, ty) ]	# type:ignore[arg-type]
+
+
+	def searchExpiredResources(self, now:str, limit:Optional[int] = None) -> list[JSON]:
+		with self.lockResources:
+			return [ _r
+					 for ri in self.expirationIndex.expired(now, limit)
+					 if (_r := cast(Optional[Document], self.tabResources.get(doc_id = ri)) or self._storedInstance(ri)) ]	# type:ignore[arg-type]
 
 	#
 	#	Identifiers, Structured RI, Child Resources
 	#
 
 	def upsertIdentifier(self, identifierMapping:JSON, structuredPathMapping:JSON, ri:str, srn:str) -> None:
+		with self.lockResources:
+			if self.instanceStore and ri in self.instanceStore:	# The instance store resolves the identifiers itself
+				return
 		with self.lockIdentifiers:
 			self.tabIdentifiers.upsert(Document(identifierMapping, ri))	# type:ignore[arg-type]
 		with self.lockStructuredIDs:
@@ -569,6 +986,8 @@ class TinyDBBinding(DBBinding):
 
 	def deleteIdentifier(self, ri:str, srn:str) -> None:
 		with self.lockIdentifiers:
+			if not self.tabIdentifiers.contains(doc_id = ri):	# type:ignore[arg-type]
+				return	# An instance resource from the instance store
 			self.tabIdentifiers.remove(doc_ids = [ri])		# type:ignore[arg-type,list-item]
 		with self.lockStructuredIDs:
 			self.tabStructuredIDs.remove(doc_ids = [srn])	# type:ignore[arg-type,list-item]
@@ -582,18 +1001,36 @@ class TinyDBBinding(DBBinding):
 		if srn:
 			if (_r := self.tabStructuredIDs.get(doc_id = srn)):	# type:ignore[arg-type, assignment]
 				ri = _r['ri'] if _r else None 
+			elif self.instanceStore:
+				with self.lockResources:
+					ri = self.instanceStore.riForSrn(srn)
 			else:
 				return []
 		if ri:
 			with self.lockIdentifiers:
 				_r = self.tabIdentifiers.get(doc_id = ri)	# type:ignore[arg-type, assignment]
-				return cast(list[JSON], [_r]) if _r else []
+			if not _r and self.instanceStore:
+				with self.lockResources:
+					_r = self.instanceStore.identifier(ri)	# type:ignore[assignment]
+			return cast(list[JSON], [_r]) if _r else []
 		return []
 
 
+	def getAllIdentifiers(self, excludeTypes:Optional[Sequence[int]] = None) -> list[JSON]:
+		# Instance resources in the instance store have no identifier documents
+		with self.lockIdentifiers:
+			identifiers = self.tabIdentifiers.all()
+		if excludeTypes:
+			return [ each for each in identifiers if each.get('ty') not in excludeTypes ]
+		return cast(list[JSON], identifiers)
+
+
 	def upsertChildResource(self, childResource:JSON, ri:str) -> None:
 		# L.isDebug and L.logDebug(f'insertChildResource ri:{ri}')
 
+		with self.lockResources:
+			if self.instanceStore and ri in self.instanceStore:	# The instance store keeps the instances per parent
+				return
 		with self.lockChildResources:
 
 			# First add a new record
@@ -606,16 +1043,24 @@ class TinyDBBinding(DBBinding):
 				_r = self.tabChildResources.get(doc_id = _pi) # type:ignore[arg-type, assignment]
 				_ch = _r['ch']
 				if not any(ri == _slist[0] for _slist in _ch):
-					_ch.append( [ri, childResource['ty']] )
-					_r['ch'] = _ch
+					_ty = childResource['ty']
+					_r['ch'] = _ch + [ [ri, _ty] ]	# A new list, because the stored list may be written by a backup at the same time
 					self.tabChildResources.update(_r, doc_ids = [_pi])	# type:ignore[arg-type, list-item]
 
+					# Add the child resource to the instance index
+					self.instanceIndex.add(_pi, _ty, ri, childResource.get('ct', ''))
+
 			
 	def removeChildResource(self, ri:str, pi:str) -> None:
 
 		# L.isDebug and L.logDebug(f'removeChildResource ri:{ri} pi:{pi}')		
 		with self.lockChildResources:
 
+			# Remove the child resource from the instance index
+			if not (_c := cast(Optional[Document], self.tabChildResources.get(doc_id = ri))):	# type:ignore[arg-type]
+				return	# An instance resource from the instance store
+			self.instanceIndex.remove(pi, _c['ty'], ri, _c.get('ct', ''))
+
 			# First remove the record
 			self.tabChildResources.remove(doc_ids = [ri])	# type:ignore[arg-type, list-item]
 
@@ -624,8 +1069,7 @@ class TinyDBBinding(DBBinding):
 			_ch = _r['ch']
 			for _slist in _ch:
 				if _slist[0] == ri:
-					_ch.remove(_slist)
-					_r['ch'] = _ch
+					_r['ch'] = [ _s for _s in _ch if _s is not _slist ]	# A new list, see upsertChildResource()
 					# L.isDebug and L.logDebug(f'removeChildResource _r:{_r}')		
 					self.tabChildResources.update(_r, doc_ids = [pi])	# type:ignore[arg-type, list-item]
 					break
@@ -635,12 +1079,31 @@ class TinyDBBinding(DBBinding):
 		# First convert ty to a list if it is just an int
 		if isinstance(ty, int):
 			ty = [ty]
+		_instances:list[str] = []
+		if self.instanceStore:
+			with self.lockResources:
+				_instances = self.instanceStore.ris(pi, ty)
 		_r:Document = self.tabChildResources.get(doc_id = pi) #type:ignore[arg-type, assignment]
 		if _r:
 			if ty is None:	# optimization: only check ty once for None (meaining all types are valid)
-				return [ c[0] for c in _r['ch'] ]
-			return [ c[0] for c in _r['ch'] if c[1] in ty]	# c is a tuple (ri, ty)
-		return []
+				return [ c[0] for c in _r['ch'] ] + _instances
+			return [ c[0] for c in _r['ch'] if c[1] in ty] + _instances	# c is a tuple (ri, ty)
+		return _instances
+
+
+	def searchInstanceResourceIDByIndex(self, pi:str, ty:ResourceTypes, index:int) -> Optional[str]:
+		if not self.instanceStore:
+			with self.lockChildResources:
+				return self.instanceIndex.get(pi, ty, index)
+
+		# Instances in the resources table are older than those in the instance store
+		with self.lockResources, self.lockChildResources:
+			_count = self.instanceIndex.count(pi, ty)
+			if index < 0:
+				index += _count + self.instanceStore.count(pi, ty)
+			if 0 <= index < _count:
+				return self.instanceIndex.get(pi, ty, index)
+			return self.instanceStore.instance(pi, ty, index - _count) if index >= 0 else None
 
 	#
 	#	Subscriptions
@@ -657,6 +1120,11 @@ class TinyDBBinding(DBBinding):
 			return None
 
 
+	def getAllSubscriptionReprs(self) -> list[JSON]:
+		with self.lockSubscriptions:
+			return cast(list[JSON], self.tabSubscriptions.all())
+
+
 	def upsertSubscriptionRepr(self, subscription:JSON, ri:str) -> bool:
 		with self.lockSubscriptions:
 			return self.tabSubscriptions.upsert(Document(subscription, ri)) is not None 	# type:ignore[arg-type]
@@ -674,22 +1142,22 @@ class TinyDBBinding(DBBinding):
 	def addBatchNotification(self, batchRecord:JSON) -> bool:
 	# def addBatchNotification(self, ri:str, nu:str, notificationRequest:JSON) -> bool:
 		with self.lockBatchNotifications:
-			return self.tabBatchNotifications.insert(batchRecord) is not None
+			return self._batchNotificationsTable().insert(batchRecord) is not None
 
 
 	def countBatchNotifications(self, ri:str, nu:str) -> int:
 		with self.lockBatchNotifications:
-			return self.tabBatchNotifications.count((self.batchNotificationQuery.ri == ri) & (self.batchNotificationQuery.nu == nu))
+			return self._batchNotificationsTable().count((self.batchNotificationQuery.ri == ri) & (self.batchNotificationQuery.nu == nu))
 
 
 	def getBatchNotifications(self, ri:str, nu:str) -> list[JSON]:
 		with self.lockBatchNotifications:
-			return cast(list[JSON], self.tabBatchNotifications.search((self.batchNotificationQuery.ri == ri) & (self.batchNotificationQuery.nu == nu)))
+			return cast(list[JSON], self._batchNotificationsTable().search((self.batchNotificationQuery.ri == ri) & (self.batchNotificationQuery.nu == nu)))
 
 
 	def removeBatchNotifications(self, ri:str, nu:str) -> bool:
 		with self.lockBatchNotifications:
-			return len(self.tabBatchNotifications.remove((self.batchNotificationQuery.ri == ri) & (self.batchNotificationQuery.nu == nu))) > 0
+			return len(self._batchNotificationsTable().remove((self.batchNotificationQuery.ri == ri) & (self.batchNotificationQuery.nu == nu))) > 0
 
 
 	#
@@ -757,11 +1225,24 @@ class TinyDBBinding(DBBinding):
 	#	Requests
 	#
 
-	def insertRequest(self, req:JSON, ts:float) -> bool:
+	def insertRequest(self, req:JSON, ts:float, maxRequests:int) -> bool:
 		with self.lockRequests:
 			try:
-				# Insert the request, using the timestamp as the document id
-				self.tabRequests.insert(Document(req, self.tabRequests.document_id_class(ts)))	# type:ignore[arg-type]
+				# Use the timestamp as the document id. Add the request and remove the
+				# evicted requests from the table in a single table update.
+				tabRequests = self._requestsTable()
+				_id = cast(str, tabRequests.document_id_class(ts))	# The tables' document_id_class is str (see TinyDBBetterTable)
+				if _id in self.requestsCollection:
+					raise ValueError(f'Document with ID {_id} already exists')
+				evicted = self.requestsCollection.add(_id, req.get('ri'), req, maxRequests)
+
+				def _updater(table:dict) -> None:
+					for e in evicted:
+						if e in table:
+							del table[e]
+					if _id not in evicted:
+						table[_id] = req
+				tabRequests._update_table(_updater)
 
 			except Exception as e:
 				L.logErr(f'Exception inserting request/response for ts: {ts}', exc = e)
@@ -769,31 +1250,21 @@ class TinyDBBinding(DBBinding):
 		return True
 	
 
-	def removeOldRequests(self, maxRequests:int) -> None:
-		with self.lockRequests:
-			# Remove the oldest requests if we have more than maxRequests
-			# We could use the len() function instead of retrieving all requests, but 
-			# this would actually create a small overhead because most of the time we have 
-			# to retrieve all requests anyway.
-			if (_a := self.tabRequests.all()):
-				if len(_a) >= maxRequests:
-					self.tabRequests.remove(doc_ids = [_a[0].doc_id])
-	
-
 	def getRequests(self, ri:Optional[str] = None) -> list[JSON]:
 		with self.lockRequests:
-			if not ri:
-				return cast(list[JSON], self.tabRequests.all())
-			return cast(list[JSON], self.tabRequests.search(self.requestsQuery.ri == ri))
+			self._requestsTable()	# Index the recorded requests
+			return [ dict(r) for r in self.requestsCollection.get(ri) ]
 
 
 	def deleteRequests(self, ri:Optional[str] = None) -> None:
-		if ri:
-			with self.lockRequests:
-				self.tabRequests.remove(self.requestsQuery.ri == ri)
-		else:
-			with self.lockRequests:
-				self.tabRequests.truncate()
+		with self.lockRequests:
+			tabRequests = self._requestsTable()
+			if ri:
+				if (_ids := self.requestsCollection.remove(ri)):
+					tabRequests.remove(doc_ids = _ids)	# type:ignore[arg-type]
+			else:
+				self.requestsCollection.clear()
+				tabRequests.truncate()
 
 	#
 	#	Schedules
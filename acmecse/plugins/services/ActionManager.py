@@ -11,7 +11,7 @@
 from __future__ import annotations
 from typing import Any, cast, TYPE_CHECKING
 
-import sys, copy
+import copy
 
 from acmecse.etc.Types import EvalMode, EvalCriteriaOperator, JSON, CSERequest, BasicType, ResourceTypes, Permission
 from acmecse.etc.ResponseStatusCodes import ResponseException, INTERNAL_SERVER_ERROR, BAD_REQUEST, NOT_FOUND
@@ -97,16 +97,15 @@ class ActionManager():
 		if resource.isVirtual():
 			return
 		
-		_now = utcTime()
-		L.isDebug and L.logDebug(f'Looking for resource actions for resource: {realRi}')
+		# Get the IDs of the actions from the index, already sorted by action priority.
+		# Remember, these are NOT <action> resources
+		if not (actionRIs := self.storage.getActionRIsForSubject(realRi)):
+			return
 
-		# Get actions. Remember, these are NOT <action> resources
-		actions = self.storage.searchActionReprsForSubject(realRi)		
-		# sort by action priority
-		actions = sorted(actions, key = lambda x: x['apy'] if x['apy'] is not None else sys.maxsize)
-		L.isDebug and L.logDebug(f'Found {len(actions)} actions for resource: {realRi}')
+		_now = utcTime()
+		L.isDebug and L.logDebug(f'Found {len(actionRIs)} actions for resource: {realRi}')
 
-		for action in actions:
+		for ri in actionRIs:
 
 			# Some explanation why this is done in a critical section:
 			# It might be that an action is triggered multiple times for a single resource change.
@@ -114,7 +113,7 @@ class ActionManager():
 			# while it is being executed. Other actions for the same or other resources are not affected.
 			# When the next action is allowed to execute, it is checked if the action is still valid
 			# and is allowed to execute (e.g. in the same period). If not, it is skipped.
-			with CriticalSection(ri := action['ri'], 'execution'):
+			with CriticalSection(ri, 'execution'):
 				# L.logWarn(f'Enter {ri}')
 				
 				# re-read the action document because it might have changed while waiting for the lock
@@ -17,7 +17,7 @@ from acmecse.etc.Types import CSERequest, JSON, ResponseType
 from acmecse.etc.ResponseStatusCodes import MAX_NUMBER_OF_MEMBER_EXCEEDED, INVALID_ARGUMENTS, NOT_FOUND, RECEIVER_HAS_NO_PRIVILEGES
 from acmecse.etc.ResponseStatusCodes import ResponseStatusCode, GROUP_MEMBER_TYPE_INCONSISTENT, ORIGINATOR_HAS_NO_PRIVILEGE, REQUEST_TIMEOUT
 from acmecse.etc.ACMEUtils import structuredPathFromRI
-from acmecse.etc.IDUtils import isSPRelative, csiFromSPRelative
+from acmecse.etc.IDUtils import isSPRelative, csiFromSPRelative, localResourceID, isStructured
 from acmecse.etc.DateUtils import utcTime
 from acmecse.etc.Constants import RuntimeConstants as RC
 from acmecse.runtime.PluginSupport import plugin, start, stop, restart, configure, validate, requires
@@ -158,6 +158,13 @@ class GroupManager():
 		remoteResource:JSON = None
 		rsc 				= 0
 
+		# Retrieve the local members that are addressed by their resource ID with a single database operation
+		memberRIs = []
+		for mid in group.mid:
+			if (_ri := localResourceID(mid.removesuffix('/fopt'))) and not isStructured(_ri):
+				memberRIs.append(_ri)
+		localMembers = { r.ri: r for r in self.storage.retrieveResourcesByRIs(memberRIs) }
+
 		for mid in group.mid:
 			isLocalResource = True
 			#Check whether it is a local resource or not
@@ -179,7 +186,8 @@ class GroupManager():
 			if isLocalResource:
 				hasFopt = mid.endswith('/fopt')
 				id = mid[:-5] if len(mid) > 5 and hasFopt else mid 	# remove /fopt to retrieve the resource
-				resource = self.dispatcher.retrieveResource(id)
+				if not (resource := localMembers.get(localResourceID(id))):	# type:ignore[arg-type]
+					resource = self.dispatcher.retrieveResource(id)
 			else:
 				if not remoteResult.data or len(remoteResult.data) == 0:
 					if remoteResult.rsc == ResponseStatusCode.ORIGINATOR_HAS_NO_PRIVILEGE:  # CSE has no privileges for retrieving the member
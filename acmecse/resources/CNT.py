@@ -10,7 +10,7 @@
 """
 
 from __future__ import annotations
-from typing import Optional, cast, TYPE_CHECKING
+from typing import Optional, Sequence, cast, TYPE_CHECKING
 
 from ..etc.Types import ResourceTypes, JSON, JSONLIST
 from ..etc.ResponseStatusCodes import NOT_ACCEPTABLE
@@ -137,19 +137,7 @@ class CNT(ContainerResource):
 		L.isDebug and L.logDebug(f'Child resource added: {childResource.ri}')
 		super().childAdded(childResource, originator)
 		if childResource.ty == ResourceTypes.CIN:	# Validate if child is CIN
-
-			# Check for mia handling. This sets the et attribute in the CIN
-			if (mia := self.mia) is not None:
-				# Take either mia or the maxExpirationDelta, whatever is smaller. 
-				# Don't change if maxExpirationDelta is 0.
-				maxEt = getResourceDate(mia 
-									    if mia <= self.requestManager.maxExpirationDelta 
-									    else self.requestManager.maxExpirationDelta)
-				# Only replace the childresource's et if it is greater than the calculated maxEt
-				if childResource.et > maxEt:
-					childResource.setAttribute('et', maxEt)
-					childResource.dbUpdate()
-
+			self._limitInstanceExpiration(childResource)
 			self.instanceAdded(childResource)
 			self.validate(originator)
 			self.updateLaOlLatestTimestamp()	# EXPERIMENTAL TODO Also do in FCNT and TS
@@ -159,6 +147,46 @@ class CNT(ContainerResource):
 			eventManager.changeResource(EventData(payload=(childResource, self.getLatestRI())))	 # type: ignore [attr-defined]
 
 
+	# Handle the addition of multiple CIN at once. Validate and update the container only once.
+	def childrenAdded(self, childResources:Sequence[Resource], originator:str) -> None:
+		instances:list[Resource] = []
+		for childResource in childResources:
+			if childResource.ty != ResourceTypes.CIN:
+				self.childAdded(childResource, originator)
+				continue
+			L.isDebug and L.logDebug(f'Child resource added: {childResource.ri}')
+			super().childAdded(childResource, originator)
+			self._limitInstanceExpiration(childResource)
+			instances.append(childResource)
+		if not instances:
+			return
+
+		self.instancesAdded(instances)
+		self.validate(originator)
+		self.updateLaOlLatestTimestamp()
+
+		# Send a single update event on behalf of the latest resource
+		eventManager.changeResource(EventData(payload=(instances[-1], self.getLatestRI())))	 # type: ignore [attr-defined]
+
+
+	def _limitInstanceExpiration(self, instance:Resource) -> None:
+		"""	Check for mia handling. This sets the *et* attribute of a new instance.
+
+			Args:
+				instance: The new instance.
+		"""
+		if (mia := self.mia) is not None:
+			# Take either mia or the maxExpirationDelta, whatever is smaller. 
+			# Don't change if maxExpirationDelta is 0.
+			maxEt = getResourceDate(mia 
+								    if mia <= self.requestManager.maxExpirationDelta 
+								    else self.requestManager.maxExpirationDelta)
+			# Only replace the childresource's et if it is greater than the calculated maxEt
+			if instance.et > maxEt:
+				instance.setAttribute('et', maxEt)
+				instance.dbUpdate()
+
+
 
 	# Handle the removal of a CIN. 
 	def childRemoved(self, childResource:Resource, originator:str) -> None:
@@ -11,7 +11,7 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import Sequence, TYPE_CHECKING
 
 from ..etc.DateUtils import getResourceDate
 from ..etc.Constants import Constants
@@ -92,9 +92,18 @@ class ContainerResource(AnnounceableResource):
 			Args:
 				instance: The instance that was added.
 		"""
+		self.instancesAdded([ instance ])
+
+
+	def instancesAdded(self, instances:Sequence[Resource]) -> None:
+		"""	Multiple instances were added to the container. Update the *cni* and *cbs* attributes only once.
+		
+			Args:
+				instances: The instances that were added.
+		"""
 		try:
-			self.setAttribute('cni', self.cni + 1)	# Increment cni because an instance is added
-			self.setAttribute('cbs', self.cbs + instance.cs) # Add to sum of cbs
+			self.setAttribute('cni', self.cni + len(instances))	# Increment cni because instances are added
+			self.setAttribute('cbs', self.cbs + sum(instance.cs for instance in instances)) # Add to sum of cbs
 			self.dbUpdate(True)
 		except TypeError:
 			pass # Ignore if cni or cbs is not set
@@ -10,7 +10,7 @@
 
 # The following import allows to use "Resource" inside a method typing definition
 from __future__ import annotations
-from typing import Any, Callable, cast, Optional, List, Tuple, TYPE_CHECKING
+from typing import Any, Callable, cast, Optional, List, Tuple, Sequence, TYPE_CHECKING
 
 from copy import deepcopy
 
@@ -108,7 +108,8 @@ class Resource(object):
 		'resourceType',
 		'mgmtType',
 		'resourceName',		# Used for virtual resources
-		'dict',
+		'_dict',
+		'_sharedDict',
 		'_attributes',
 		'_allowedChildResourceTypes',
 		'_originalDict',
@@ -126,15 +127,17 @@ class Resource(object):
 				dct: Mandatory resource attributes.
 		"""
 
-		self.dict 		= {}
-		"""	Dictionary for public and internal resource attributes. """
-		# self._originalDict = {}
-		# """	When retrieved from the database: Holds a temporary version of the resource attributes as they were read from the database. """
+		self._dict:JSON = {}
+		"""	Dictionary for public and internal resource attributes. It may be the shared document, see `dict`. """
+
+		self._sharedDict:Optional[JSON] = None
+		"""	The shared document the resource was instantiated from, or None if the resource doesn't share any values with it anymore. It is never modified. """
 
 		if dct is not None: 
-			self.dict = deepcopy(dct.get(self.typeShortname))	# type:ignore[has-type]
-			if not self.dict:
-				self.dict = deepcopy(dct)
+			if not (_dct := dct.get(self.typeShortname)):	# type:ignore[has-type]
+				_dct = dct
+			# Share the document until the first modification instead of copying it
+			self._dict = self._sharedDict = _dct
 		else:
 			# no Dict, so the resource is instantiated programmatically
 			self.setAttribute(Constants.attrIsManuallyInstantiated, True)
@@ -142,10 +145,37 @@ class Resource(object):
 		# The original dictionary is only set when the resource is created. It is not
 		# required later
 		if create:
-			self._originalDict = deepcopy(self.dict)	# keep for validation in activate() later
+			self._originalDict = _dct if dct is not None else deepcopy(self._dict)	# keep for validation in activate() later
 			"""	Original dictionary as it was created. This is used for validation in activate() later. """
 
 
+	@property
+	def dict(self) -> JSON:
+		"""	Dictionary for public and internal resource attributes.
+
+			A resource shares the document it was instantiated from, e.g. a document from the database,
+			and only copies the parts that are modified or handed out. Accessing this dictionary directly
+			copies all remaining shared values first, so that it can be modified freely.
+
+			Return:
+				The resource's own attribute dictionary.
+		"""
+		if self._sharedDict is not None:
+			self._unshare()
+		return self._dict
+
+
+	@dict.setter
+	def dict(self, value:JSON) -> None:
+		"""	Replace the dictionary for public and internal resource attributes.
+
+			Args:
+				value: The new attribute dictionary. It is owned by the resource afterwards.
+		"""
+		self._dict = value
+		self._sharedDict = None
+
+
 
 	def initialize(self, pi: str) -> None:
 		""" This method is called when a new resource is created and before written to the database.
@@ -304,7 +334,8 @@ class Resource(object):
 				`BAD_REQUEST`: In case of an invalid attribute.
 				`INTERNAL_SERVER_ERROR`: In case the parent resource coudln't be retrieved.
 		"""
-		dictOrg = deepcopy(self.dict)	# Save for later for notification
+		# Save for later for notification. A still shared document is unchanged and can be used directly
+		dictOrg = self._sharedDict if self._dict is self._sharedDict else deepcopy(self._dict)
 
 		updatedAttributes:dict[str, Any] = None
 		if dct:
@@ -356,7 +387,7 @@ class Resource(object):
 			
 
 		# Update lt for those resources that have these attributes
-		if 'lt' in self.dict:	# Update the lastModifiedTime
+		if 'lt' in self._dict:	# Update the lastModifiedTime
 			self['lt'] = getResourceDate()
 
 		# Remove empty / null attributes from dict
@@ -473,6 +504,20 @@ class Resource(object):
 
 
 
+	def childrenAdded(self, childResources:Sequence[Resource], originator:str) -> None:
+		""" Called after multiple child resources were added to the resource at once.
+
+			The default implementation calls `childAdded()` for each child resource.
+			Sub-classes may override this method to do their bookkeeping only once.
+
+			Args:
+				childResources: The child resources that were added to the resource, in the order of their creation.
+				originator: The request originator.
+		"""
+		for childResource in childResources:
+			self.childAdded(childResource, originator)
+
+
 	def childUpdated(self, childResource: Resource, updatedAttributes: JSON, originator: str) -> None:
 		"""	Called when a child resource was updated.
 					
@@ -585,19 +630,22 @@ class Resource(object):
 	def asDict(self, embedded:Optional[bool] = True, 
 					 update:Optional[bool] = False, 
 					 noACP:Optional[bool] = False,
-					 sort:bool = False) -> JSON:
+					 sort:bool = False,
+					 shared:bool = False) -> JSON:
 		"""	Get the JSON resource representation.
-		
+
 			Args:
 				embedded: Optional indicator whether the resource should be embedded in another resource structure. In this case it is *not* embedded in its own "domain:name" structure.
 				update: Optional indicator whether only the updated attributes shall be included in the result.
 				noACP: Optional indicator whether the *acpi* attribute shall be included in the result.
-			
+				sort: Optional indicator whether the attributes shall be sorted by their names.
+				shared: Optional indicator whether the attribute values are shared with the resource instead of being copied. The result must then not be modified, and should only be serialized or recorded right away.
+
 			Return:
 				A `JSON` object with the resource representation.
 		"""
 		# remove (from a copy) all internal attributes before printing
-		dct = { k:deepcopy(v) for k,v in self.dict.items() 				# Copy k:v to the new dictionary, ...
+		dct = { k:(v if shared else deepcopy(v)) for k,v in self._dict.items() 	# Copy k:v to the new dictionary, ...
 					if k not in internalAttributes 				# if k is not in internal attributes (starting with __), AND
 					and not (noACP and k == 'acpi')						# if not noACP is True and k is 'acpi', AND
 					and not (update and k in self._excludeFromUpdate) 	# if not update is True and k is in _excludeFromUpdate)
@@ -754,10 +802,20 @@ class Resource(object):
 				value: Value to assign to the attribute.
 				overwrite: Overwrite the value if already set.
 		"""
-		if key in self.dict and overwrite:
-			self.dict[key] = value
+		if key in self._dict:
+			if not overwrite:
+				return
+			if self._sharedDict is not None:
+				self._ownAttribute()
+			self._dict[key] = value
 			return
-		setXPath(self.dict, key, value, overwrite)
+		if self._sharedDict is not None:
+			# A path modifies the value of the top-level attribute in place
+			if '{' in key:
+				self._unshare()
+			else:
+				self._ownAttribute(key.partition('/')[0] if '/' in key else None)
+		setXPath(self._dict, key, value, overwrite)
 
 
 	def attribute(self, key:str, 
@@ -771,9 +829,21 @@ class Resource(object):
 				The attribute's value, the *default* value, or None
 		"""
 		try:
-			return self.dict[key]
+			value = self._dict[key]
 		except KeyError:
-			return findXPath(self.dict, key, default)
+			if self._sharedDict is not None and ('/' in key or '{' in key):
+				# A path may return a nested value, which must not be shared
+				if '{' in (top := key.partition('/')[0]):
+					self._unshare()
+				else:
+					self._ownAttribute(top)
+			return findXPath(self._dict, key, default)
+
+		# Callers may modify a returned list or dictionary in place, so it must not be shared
+		if self._sharedDict is not None and isinstance(value, (dict, list)):
+			self._ownAttribute(key)
+			return self._dict[key]
+		return value
 
 
 	def hasAttribute(self, key:str) -> bool:
@@ -785,7 +855,7 @@ class Resource(object):
 				Boolean, indicating the existens of an attribute
 		"""
 		# TODO check sub-elements as well via findXPath
-		return key in self.dict
+		return key in self._dict
 
 
 	def delAttribute(self, key:str, 
@@ -799,13 +869,15 @@ class Resource(object):
 						  deleted from the resource instance's internal dictionary.
 		"""
 		if self.hasAttribute(key):
+			if self._sharedDict is not None:
+				self._ownAttribute()
 			if setNone:
-				self.dict[key] = None
+				self._dict[key] = None
 			else:
-				del self.dict[key]
+				del self._dict[key]
 	
 
-	def getAttributes(self, includingInternal:bool = False) -> dict[str, Any]:
+	def getAttributes(self, includingInternal:bool = False) -> JSON:
 		""" Get all attributes of the resource. 
 
 			Args:
@@ -814,7 +886,7 @@ class Resource(object):
 			Return:
 				Dictionary with a copy of all attributes.
 		"""
-		_dct = deepcopy(self.dict)
+		_dct = deepcopy(self._dict)
 		if not includingInternal:
 			for key in internalAttributes:
 				if key in _dct:
@@ -891,6 +963,34 @@ class Resource(object):
 		return self.hasAttribute(key)
 
 
+	def _ownAttribute(self, key:Optional[str] = None) -> None:
+		"""	Copy the attribute dictionary, and optionally the value of one attribute, from the shared document.
+
+			The caller must make sure that the resource still shares a document.
+
+			Args:
+				key: Optional name of a top-level attribute whose value is copied as well.
+		"""
+		shared = cast(JSON, self._sharedDict)
+		if self._dict is shared:
+			self._dict = dict(shared)	# Shallow copy. The values are still shared
+		if key is not None and isinstance(value := self._dict.get(key), (dict, list)) and shared.get(key) is value:
+			self._dict[key] = deepcopy(value)
+
+
+	def _unshare(self) -> None:
+		"""	Copy all values that are still shared with the shared document.
+		"""
+		shared = cast(JSON, self._sharedDict)
+		self._sharedDict = None
+		if self._dict is shared:
+			self._dict = deepcopy(shared)
+			return
+		for key, value in self._dict.items():
+			if isinstance(value, (dict, list)) and shared.get(key) is value:
+				self._dict[key] = deepcopy(value)
+
+
 	def __getattr__(self, key: str) -> Any:
 		""" Map the normal object attribute access to the internal resource attribute dictionary.
 
@@ -1031,7 +1131,8 @@ class Resource(object):
 				Updated Resource instance.	
 		 """
 		resource = self.storage.retrieveResource(ri = self.ri)
-		self.dict = resource.dict
+		self._dict = resource._dict
+		self._sharedDict = resource._sharedDict
 		return self
 
 	#########################################################################
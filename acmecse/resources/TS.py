@@ -10,7 +10,7 @@
 """
 
 from __future__ import annotations
-from typing import Optional, Any, TYPE_CHECKING
+from typing import Optional, Any, Sequence, TYPE_CHECKING
 
 from ..etc.Types import ResourceTypes, JSON
 from ..etc.ResponseStatusCodes import BAD_REQUEST, OPERATION_NOT_ALLOWED, NOT_ACCEPTABLE, CONFLICT, NOT_IMPLEMENTED
@@ -240,26 +240,11 @@ class TS(ContainerResource):
 		super().childAdded(childResource, originator)
 		match childResource.ty:
 			case ResourceTypes.TSI:
-				# Check for mia handling. This sets the et attribute in the TSI
-				if self.mia is not None:
-					# Take either mia or the maxExpirationDelta, whatever is smaller
-					maxEt = getResourceDate(self.mia 
-											if self.mia <= self.requestManager.maxExpirationDelta 
-											else self.requestManager.maxExpirationDelta)
-					# Only replace the childresource's et if it is greater than the calculated maxEt
-					if childResource.et > maxEt:
-						childResource.setAttribute('et', maxEt)
-						childResource.dbUpdate(True)
-
+				self._limitInstanceExpiration(childResource)
 				self.instanceAdded(childResource)
 				self.validate(originator)	# Handle old TSI removals
 				self.updateLaOlLatestTimestamp()	# EXPERIMENTAL
-
-				# Add to monitoring if this is enabled for this TS (mdd & pei & mdt are not None, and mdd==True)
-				if self.mdd and self.pei is not None and self.mdt is not None:
-					if not self.timeSeriesManager:
-						raise NOT_IMPLEMENTED(L.logWarn('TimeSeriesManager plugin is disabled, cannot handle timeSeries update request.'))
-					self.timeSeriesManager.updateTimeSeries(self, childResource)
+				self._monitorInstances([ childResource ])
 			
 				# Send update event on behalf of the latest resources.
 				# The oldest resource might not be changed. That is handled in the validate() method.
@@ -274,6 +259,59 @@ class TS(ContainerResource):
 
 
 
+	# Handle the addition of multiple TSI at once. Validate and update the timeSeries only once.
+	def childrenAdded(self, childResources:Sequence[Resource], originator:str) -> None:
+		instances:list[Resource] = []
+		for childResource in childResources:
+			if childResource.ty != ResourceTypes.TSI:
+				self.childAdded(childResource, originator)
+				continue
+			L.isDebug and L.logDebug(f'Child resource added: {childResource.ri}')
+			super().childAdded(childResource, originator)
+			self._limitInstanceExpiration(childResource)
+			instances.append(childResource)
+		if not instances:
+			return
+
+		self.instancesAdded(instances)
+		self.validate(originator)	# Handle old TSI removals
+		self.updateLaOlLatestTimestamp()
+		self._monitorInstances(instances)
+
+		# Send a single update event on behalf of the latest resource
+		eventManager.changeResource(EventData(payload=(instances[-1], self.getLatestRI())))	 # type: ignore [attr-defined]
+
+
+	def _limitInstanceExpiration(self, instance:Resource) -> None:
+		"""	Check for mia handling. This sets the *et* attribute of a new TSI.
+
+			Args:
+				instance: The new TSI.
+		"""
+		if self.mia is not None:
+			# Take either mia or the maxExpirationDelta, whatever is smaller
+			maxEt = getResourceDate(self.mia 
+									if self.mia <= self.requestManager.maxExpirationDelta 
+									else self.requestManager.maxExpirationDelta)
+			# Only replace the childresource's et if it is greater than the calculated maxEt
+			if instance.et > maxEt:
+				instance.setAttribute('et', maxEt)
+				instance.dbUpdate(True)
+
+
+	def _monitorInstances(self, instances:Sequence[Resource]) -> None:
+		"""	Add new TSI to the monitoring if this is enabled for this TS (mdd & pei & mdt are not None, and mdd==True).
+
+			Args:
+				instances: The new TSI, in the order of their creation.
+		"""
+		if self.mdd and self.pei is not None and self.mdt is not None:
+			if not self.timeSeriesManager:
+				raise NOT_IMPLEMENTED(L.logWarn('TimeSeriesManager plugin is disabled, cannot handle timeSeries update request.'))
+			for instance in instances:
+				self.timeSeriesManager.updateTimeSeries(self, instance)
+
+
 	# Handle the removal of a TSI. 
 	def childRemoved(self, childResource: Resource, originator: str) -> None:
 		L.isDebug and L.logDebug(f'Child resource removed: {childResource.ri}')
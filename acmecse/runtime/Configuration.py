@@ -23,7 +23,7 @@ from rich.console import Console as RichConsole
 
 
 from ..etc.Constants import Constants as C
-from ..etc.Types import CSEType, ContentSerializationType, LogLevel, TreeMode, CSERegistrar
+from ..etc.Types import CSEType, ContentSerializationType, LogLevel, TreeMode, CSERegistrar, ResourceTypes
 from ..helpers.NetworkTools import getIPAddress
 from ..helpers.Zookeeper import Zookeeper
 from ..helpers.ACMEConfiguration import ACMEConfiguration
@@ -279,6 +279,15 @@ class Configuration(object):
 	database_backupPath:str = None
 	"""	The path for the database backup. """
 
+	database_backupRetention:int = None
+	"""	The number of database backup snapshots to keep. """
+
+	database_cacheSize:int = None
+	"""	The maximum number of resources in the resource cache. 0 disables the cache. """
+
+	database_cacheResourceTypes:list[ResourceTypes] = None
+	"""	The resource types that are cached in the resource cache. An empty list means all resource types. """
+
 
 	database_tinydb_path:str = None
 	"""	The path to the TinyDB database. """
@@ -289,6 +298,22 @@ class Configuration(object):
 	database_tinydb_writeDelay:int = None
 	"""	The write delay for the TinyDB database. """
 
+	database_tinydb_storage:str = None
+	"""	The storage driver for the TinyDB database files. Either "journal" or "buffered". """
+
+	database_tinydb_compactionThreshold:int = None
+	"""	The number of journal records after which the TinyDB journal is compacted. """
+
+	database_tinydb_instanceSegmentSize:int = None
+	"""	The maximum number of records per segment of the TinyDB instance store. 0 disables the instance store. """
+
+
+	database_sqlite_path:str = None
+	"""	The path to the SQLite database directory. """
+
+	database_sqlite_maxConnections:int = None
+	"""	The maximum number of connections to the SQLite database. """
+
 
 	database_postgresql_host:str = None
 	"""	The host of the PostgreSQL database. """
@@ -308,6 +333,12 @@ class Configuration(object):
 	database_postgresql_schema:str = None
 	"""	The schema of the PostgreSQL database. """
 
+	database_postgresql_minConnections:int = None
+	"""	The minimum number of connections in the PostgreSQL connection pool. """
+
+	database_postgresql_maxConnections:int = None
+	"""	The maximum number of connections in the PostgreSQL connection pool. """
+
 
 	http_address:str = None
 	"""	The address to listen on for HTTP the http server. """
@@ -10,10 +10,11 @@
 """
 
 from __future__ import annotations
-from typing import Optional, Callable, Sequence, Tuple
+from typing import Optional, Callable, Iterator, Sequence, Tuple
 from abc import ABC, abstractmethod
+from contextlib import AbstractContextManager
 
-from ..etc.Types import JSON, ResourceTypes, OriginatorType
+from ..etc.Types import JSON, ResourceTypes, OriginatorType, FilterCriteria, FilterOperation
 
 
 class DBBinding(ABC):
@@ -39,11 +40,12 @@ class DBBinding(ABC):
 	
 
 	@abstractmethod
-	def backupDB(self, dir:str) -> bool:
+	def backupDB(self, dir:str, previous:Optional[str] = None) -> bool:
 		"""	Backup the database to a directory.
 		
 			Args:
 				dir: The directory to backup to.
+				previous: The directory of the previous backup, or None. Files that did not change since then may be hard-linked from there.
 
 			Return:
 				Boolean value to indicate success or failure.
@@ -51,6 +53,35 @@ class DBBinding(ABC):
 		...
 
 
+	def supportsBackup(self) -> bool:
+		"""	Return whether the database can be backed up with `backupDB()`.
+
+			The default implementation returns True.
+
+			Return:
+				True if the database can be backed up, False if there is nothing to back up, e.g. for an in-memory database.
+		"""
+		return True
+
+
+	@abstractmethod
+	def transaction(self) -> AbstractContextManager[None]:
+		"""	Return a context manager for a unit of work that consists of several write operations.
+
+			The write operations for the *resources*, *identifiers*, and *childResources* tables
+			that are executed in the context are batched and applied together, as far as the
+			database supports it. Write operations of other threads to these tables are not
+			interleaved with them. Transactions can be nested.
+
+			Read operations in the context are supported, but they may reduce the benefit of
+			batching the write operations.
+
+			Return:
+				A context manager.
+		"""
+		...
+
+
 	#
 	#	Resource operations
 	#
@@ -66,6 +97,23 @@ class DBBinding(ABC):
 		...
 
 
+	def insertResources(self, records:Sequence[Tuple[JSON, JSON, JSON, JSON]]) -> None:
+		"""	Insert several new resources into the database, together with their identifiers and child resource records.
+
+			The default implementation inserts the records one by one in a transaction. Database bindings
+			should override this method with batched database operations.
+
+			Args:
+				records: A sequence of tuples, one for each resource, with the resource, the identifier mapping, the structured path mapping, and the child resource record. See `insertResource()`, `upsertIdentifier()`, and `upsertChildResource()`.
+		"""
+		with self.transaction():
+			for resource, identifierMapping, structuredPathMapping, childResource in records:
+				_ri = resource['ri']
+				self.insertResource(resource, _ri)
+				self.upsertIdentifier(identifierMapping, structuredPathMapping, _ri, structuredPathMapping['srn'])
+				self.upsertChildResource(childResource, _ri)
+
+
 	@abstractmethod
 	def upsertResource(self, resource:JSON, ri:str) -> None:
 		"""	Update or insert a resource into the database.
@@ -125,6 +173,20 @@ class DBBinding(ABC):
 				A list of found resource documents, or an empty list.
 		"""
 		...
+
+
+	@abstractmethod
+	def searchResourcesByRIs(self, ris:Sequence[str]) -> list[JSON]:
+		"""	Search for multiple resources by their resource IDs in a single database operation.
+
+			Args:
+				ris: A list of resource IDs.
+
+			Return:
+				A list of found resource documents in the order of the resource IDs. Resources that
+				are not found are skipped.
+		"""
+		...
 	
 
 	@abstractmethod
@@ -142,6 +204,39 @@ class DBBinding(ABC):
 		...
 
 
+	def discoverResourcesInSubtree(self, ri:str,
+										 level:int,
+										 offset:int,
+										 limit:int,
+										 filterCriteria:FilterCriteria,
+										 fo:FilterOperation) -> Optional[Iterator[JSON]]:
+		"""	Discover the resources in the subtree of a resource and pre-filter them in the database.
+
+			The result must contain all resources of the subtree up to the given level that match the filter
+			criteria, in the order of a depth-first walk of the resource tree. It may contain other resources
+			as well, because the caller evaluates the filter criteria again for each resource. Only the
+			criteria that can be evaluated efficiently by the database need to be applied.
+
+			The caller may stop iterating before the end of the result, e.g. when a page of results is
+			complete. Implementations should therefore fetch the resources lazily where possible.
+
+			This method is optional. The default implementation returns None, and the caller then walks the
+			resource tree itself.
+
+			Args:
+				ri: The resource ID of the root resource of the subtree. The root resource is not part of the result.
+				level: The maximum depth of the subtree. The direct child resources are at level 1.
+				offset: The offset (starting with 1) of the first direct child resource of the root resource to include.
+				limit: The maximum number of direct child resources of the root resource to include.
+				filterCriteria: The filter criteria.
+				fo: The filter operation for the filter criteria.
+
+			Return:
+				An iterator over the resource documents, or None if this is not supported by the database binding.
+		"""
+		return None
+
+
 	@abstractmethod
 	def hasResource(self, ri:Optional[str] = None, 
 						  srn:Optional[str] = None,
@@ -185,6 +280,23 @@ class DBBinding(ABC):
 		...
 
 
+	@abstractmethod
+	def searchExpiredResources(self, now:str, limit:Optional[int] = None) -> list[JSON]:
+		"""	Search for resources with an *expirationTime* before a timestamp.
+
+			Implementations shall use an index for the expiration timestamps and must not
+			scan all resources.
+
+			Args:
+				now: The timestamp (in oneM2M timestamp format) to compare the *expirationTime* with.
+				limit: Optional maximum number of resources to return.
+
+			Return:
+				A list of found resource documents, ordered by their *expirationTime*, or an empty list.
+		"""
+		...
+
+
 	#
 	#	Identifiers, Structured RI, Child Resources operations
 	#
@@ -231,6 +343,18 @@ class DBBinding(ABC):
 		...
 
 
+	@abstractmethod
+	def getAllIdentifiers(self, excludeTypes:Optional[Sequence[int]] = None) -> list[JSON]:
+		"""	Return all identifier documents from the identifiers DB.
+
+			Args:
+				excludeTypes: Optional list of resource types whose identifier documents are not returned.
+			Return:
+				A list of identifier documents (see `upsertIdentifier`). Each document contains at least the *ri*, *srn*, and *ty* attributes.
+		"""
+		...
+
+
 	@abstractmethod
 	def upsertChildResource(self, childResource:JSON, ri:str) -> None:
 		"""	Add a child resource to the childResources DB.
@@ -267,6 +391,25 @@ class DBBinding(ABC):
 		...
 
 
+	@abstractmethod
+	def searchInstanceResourceIDByIndex(self, pi:str, ty:ResourceTypes, index:int) -> Optional[str]:
+		"""	Search for an instance resource of a parent resource by its position in the creation time order.
+
+			Implementations shall use an index for the instance resources' creation times and must not
+			scan all resources.
+
+			Args:
+				pi: The parent resource ID.
+				ty: The instance resource type, e.g. *CIN*, *TSI*, or *FCI*.
+				index: The position of the instance resource. 0 is the oldest, -1 is the latest instance.
+					Negative values count from the latest instance.
+
+			Return:
+				The resource ID of the instance resource, or None if not found.
+		"""
+		...
+
+
 	#
 	#	Subscription operations
 	#
@@ -288,6 +431,16 @@ class DBBinding(ABC):
 		...
 
 
+	@abstractmethod
+	def getAllSubscriptionReprs(self) -> list[JSON]:
+		"""	Return all subscription representations.
+		
+			Return:
+				A list of subscription representations.
+		"""
+		...
+
+
 	@abstractmethod
 	def upsertSubscriptionRepr(self, subscription:JSON, ri:str) -> bool:
 		"""	Update or insert a subscription representation into the database.
@@ -496,28 +649,22 @@ class DBBinding(ABC):
 	# TODO Move request handling to Storage module. This is too detailed here
 
 	@abstractmethod
-	def insertRequest(self, req:JSON, ts:float) -> bool:
+	def insertRequest(self, req:JSON, ts:float, maxRequests:int) -> bool:
 		"""	Add a request to the *requests* database.
 
+			The *requests* database is a capped collection. If it holds more than *maxRequests* requests
+			after the insert, then the oldest requests are removed.
+
 			Args:
 				req: The request to store.
 				ts: The timestamp of the request.
+				maxRequests: The maximum number of requests to keep.
 
 			Return:
 				Boolean value to indicate success or failure.
 		"""
 		...
 	
-	
-	@abstractmethod
-	def removeOldRequests(self, maxRequests:int) -> None:
-		"""	Remove old requests from the database.
-
-			Args:
-				maxRequests: The maximum number of requests to keep.
-		"""
-		...
-	
 
 	@abstractmethod
 	def getRequests(self, ri:Optional[str] = None) -> list[JSON]:
@@ -194,10 +194,10 @@ class Logging:
 	_basenames:dict[str, str]		= {}
 	""" Dictionary to store the basenames of the source files. This is used to optimize the log output. """
 
-	_eventLogError					= None
+	_eventLogError:Optional[Callable[[str], None]]	= None
 	""" Event handler for logging errors. This is used to trigger an event when an error is logged. """
 
-	_eventLogWarning				= None
+	_eventLogWarning:Optional[Callable[[str], None]]	= None
 	""" Event handler for logging warnings. This is used to trigger an event when a warning is logged. """
 
 	terminalStyle:Style				= Style(color = terminalColorDark)
@@ -604,6 +604,7 @@ skinparam BoxPadding 60
 				'configFile': str(Configuration.configfile) if Configuration.configfile else 'Zookeeper (' + Configuration._args_zkHost + ' - ' + Configuration._args_zkRoot + ')' if Configuration._args_zkHost else 'Unknown',
 				'database': {
 					'type': Configuration.database_type,
+					'cache': self.storage.resourceCache.statistics() if self.storage.resourceCache else None,
 				},
 				'load': os.getloadavg() if hasattr(os, 'getloadavg') else [],
 				'threads': {
@@ -638,6 +639,10 @@ skinparam BoxPadding 60
 					status['runtime']['database']['tinydb'] = {
 						'path': f'./{os.path.relpath(Configuration.database_tinydb_path, Configuration.baseDirectory)}',
 					} 
+				case 'sqlite':
+					status['runtime']['database']['sqlite'] = {
+						'path': f'./{os.path.relpath(Configuration.database_sqlite_path, Configuration.baseDirectory)}',
+					} 
 				case 'postgresql':
 					status['runtime']['database']['postgresql'] = {
 						'host': f'{Configuration.database_postgresql_host}:{Configuration.database_postgresql_port}',
@@ -800,8 +805,8 @@ Role     : {_db["role"]}
 Database : {_db["database"]}
 Schema   : {_db["schema"]}'''
 				
-				case 'tinydb':
-					_db = status["runtime"]["database"]["tinydb"]						
+				case 'tinydb' | 'sqlite':
+					_db = status["runtime"]["database"][_dbType]
 					miscDB += \
 f'''
 Type     : {_dbType}
@@ -1573,6 +1578,25 @@ function createResource() {{
 		self.cseForceShutdown()	# This might not return (e.g. under Windows)
 
 
+	def backupDB(self) -> str:
+		"""Create a backup snapshot of the database in the background.
+
+			Returns:
+				A message that the backup was started.
+		"""
+		BackgroundWorkerPool.runJob(self.storage.backupDB, name = 'DBBackup')
+		return 'Database backup started'
+
+
+	def getBackups(self) -> str:
+		"""Get the list of the database backup snapshots.
+
+			Returns:
+				The names of the backup snapshots, oldest first, in JSON format.
+		"""
+		return json.dumps(self.storage.backups.snapshots(), indent=4)
+
+
 
 
 
@@ -574,6 +574,8 @@ def buildUserConfigFile(configFile:Optional[str],
 			  								   value = 'memory'),
 		  								Choice(name = 'TinyDB     - Simple but fast file-based database', 
 		   									   value = 'tinydb'),
+		  								Choice(name = 'SQLite     - Indexed file-based database, no separate server needed', 
+		   									   value = 'sqlite'),
 		  								Choice(name = 'PostgreSQL - Data is stored in a separate PostgreSQL database', 
 		   									   value = 'postgresql'),
 									  ],
@@ -33,6 +33,7 @@ class PluginManager(PM):
 		'acmecse.plugins.bindings.http.HttpUpperTester':lambda : Configuration._cse_operation_plugins_enabledComponents.get('http_enableUpperTesterEndpoint', False),
 		'acmecse.plugins.bindings.http.HttpWebUI':		lambda : Configuration._cse_operation_plugins_enabledComponents.get('webui_enable', False),
 		'acmecse.plugins.database.PostgreSQLBinding':	lambda : Configuration.database_type == 'postgresql',
+		'acmecse.plugins.database.SQLiteBinding':		lambda : Configuration.database_type == 'sqlite',
 		'acmecse.plugins.database.TinyDBBinding':		lambda : Configuration.database_type in ('tinydb', 'memory'),
 		'acmecse.plugins.runtime.Console':				lambda : Configuration.console_type == 'rich',
 		'acmecse.plugins.runtime.MinimalConsole':		lambda : Configuration.console_type == 'simple',
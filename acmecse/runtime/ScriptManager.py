@@ -12,6 +12,7 @@ from typing import Callable, Dict, Union, Any, Tuple, cast, Optional, List, TYPE
 
 from pathlib import Path
 import json, os, fnmatch, traceback, shlex
+from datetime import datetime, timedelta
 import requests, webbrowser
 from decimal import Decimal
 from rich.text import Text
@@ -20,7 +21,7 @@ from rich.text import Text
 from ..etc.Types import JSON, ACMEIntEnum, CSERequest, Operation, ResourceTypes, Result,\
 	BasicType, AttributePolicy, LogLevel
 from ..etc.ResponseStatusCodes import ResponseException
-from ..etc.DateUtils import cronMatchesTimestamp, getResourceDate, utcDatetime
+from ..etc.DateUtils import cronNextMatch, getResourceDate, utcDatetime
 from ..etc.IDUtils import uniqueRI, uniqueID
 from ..etc.JSONUtils import pureResource
 from ..etc.Utils import runsInIPython, isURL
@@ -82,6 +83,9 @@ _metaOnKey = 'onKey'
 _metaPromptlessEvents = [ _metaInit, _metaOnStartup, _metaOnRestart, _metaOnShutdown, _metaAt, _metaOnNotification ]
 """ Events for which the "prompt" meta tag is to be ignored. """
 
+_cronMaxInterval = 60
+""" Maximum interval in seconds between two runs of the cron scheduler. """
+
 _storageTypes = (SType.tString, SType.tNumber, SType.tBool, SType.tJson, SType.tLambda, SType.tList,
 				 SType.tListQuote, SType.tNIL, SType.tSymbol, SType.tSymbolQuote)
 """ Allowed types to put into storage. """
@@ -742,13 +746,16 @@ class ACMEPContext(PContext):
 
 
 	def doImportRaw(self, pcontext:PContext, symbol:SSymbol) -> PContext:
-		"""	Import a raw resource. Not much verification is done, and a full resource
+		"""	Import one or more raw resources. Not much verification is done, and a full resource
 			representation, including, for example, the parent resource ID, must be provided.
+
+			Several resources are created together in one batch. Their parent resources must already
+			exist and must not be part of the batch. The result is then a list of the created resources.
 		
 			Example:
 				::
 
-					(import-raw <originator> <resource JSON> )
+					(import-raw <originator> <resource JSON> [<resource JSON>]* )
 
 			Args:
 				pcontext: `PContext` object of the running script.
@@ -760,36 +767,45 @@ class ACMEPContext(PContext):
 			Raises:
 				`PRuntimeError`: In case an error during the import and create is encountered.
 		"""
-		assertSymbol(pcontext, symbol, 3)
+		assertSymbol(pcontext, symbol, minLength = 3)
 		
 		# originator
 		pcontext, _originator = valueFromArgument(pcontext, symbol, 1, SType.tString)
 
-		# resource object
-		pcontext, _resource = valueFromArgument(pcontext, symbol, 2, SType.tJson)
-		_resource = self.factory.resourceFromDict(cast(dict, _resource), create=True)
-
-		# Get a potential parent resource
-		parentResource:Resource = None
-		if _resource.pi:
+		# resource objects
+		_resources:list[Resource] = []
+		for idx in range(2, symbol.length):
+			pcontext, _resource = valueFromArgument(pcontext, symbol, idx, SType.tJson)
+			_resources.append(self.factory.resourceFromDict(cast(dict, _resource), create=True))
+
+		# Get the parent resources and check the resource registrations
+		parentResources:dict[str, Resource] = {}
+		parentResource:Optional[Resource]
+		for _resource in _resources:
+			if not _resource.pi:
+				if len(_resources) > 1:
+					raise PRuntimeError(self.setError(PError.runtime, 'Resources without a parent resource cannot be imported in a batch'))
+				parentResource = None
+			elif not (parentResource := parentResources.get(_resource.pi)):
+				try:
+					parentResources[_resource.pi] = parentResource = self.dispatcher.retrieveLocalResource(ri=_resource.pi)
+				except ResponseException as e:
+					raise PRuntimeError(self.setError(PError.runtime, e.dbg))
 			try:
-				parentResource = self.dispatcher.retrieveLocalResource(ri=_resource.pi)
+				self.registration.checkResourceCreation(_resource, _originator, parentResource)
 			except ResponseException as e:
 				raise PRuntimeError(self.setError(PError.runtime, e.dbg))
 
-		# Check resource registration
+		# Create the resource, or all resources in one batch
 		try:
-			self.registration.checkResourceCreation(_resource, _originator, parentResource)
-		except ResponseException as e:
-			raise PRuntimeError(self.setError(PError.runtime, e.dbg))
-
-		# Create the resource
-		try:
-			resource = self.dispatcher.createLocalResource(_resource, parentResource, originator=_originator)
+			if len(_resources) == 1:
+				_resource = _resources[0]
+				resource = self.dispatcher.createLocalResource(_resource, parentResources.get(_resource.pi), originator=_originator)
+				return pcontext.setResult(SJsonSymbol(jsn=resource.asDict()))
+			resources = self.dispatcher.createLocalResources(_resources, originator=_originator)
 		except ResponseException as e:
 			raise PRuntimeError(self.setError(PError.runtime, L.logErr(f'Error during import: {e.dbg}', showStackTrace = False)))
-		# return self._pcontextFromRequestResult(pcontext, result)
-		return pcontext.setResult(SJsonSymbol(jsn=resource.asDict()))
+		return pcontext.setResult(SListQuoteSymbol([ SJsonSymbol(jsn=resource.asDict()) for resource in resources ]))
 
 
 	def doLogDivider(self, pcontext:PContext, symbol:SSymbol) -> PContext:
@@ -1786,6 +1802,7 @@ class ScriptManager(metaclass=Singleton):
 		'storage',
 		'scriptUpdatesMonitor',
 		'scriptCronWorker',
+		'cronLastCheck',
 
 		'categoryDescriptions',
 	)
@@ -1809,6 +1826,9 @@ class ScriptManager(metaclass=Singleton):
 		self.scriptCronWorker:BackgroundWorker = None
 		""" `BackgroundWorker` worker to run cron-enabled scripts. """
 
+		self.cronLastCheck:datetime = None
+		""" The last full second up to which the cron-enabled scripts were checked. """
+
 
 	def initialize(self) -> None:
 		"""	Initializer for the ScriptManager class.
@@ -1881,10 +1901,12 @@ class ScriptManager(metaclass=Singleton):
 		if Configuration.scripting_fileMonitoringInterval > 0.0:
 			self.scriptUpdatesMonitor.start()
 
-		# Add a worker to check scheduled script, fixed interval of 1 second
+		# Add a worker to check scheduled script. It sets its own interval until the next scheduled run.
+		self.cronLastCheck = utcDatetime().replace(microsecond = 0) - timedelta(seconds = 1)
 		self.scriptCronWorker = BackgroundWorkerPool.newWorker(1, 
 							 								   self.cronMonitor, 
-															   'scriptCronMonitor').start()
+															   'scriptCronMonitor',
+															   runOnTime = False).start()
 
 		# Look for the startup script(s) and run them. 
 		self.runEventScripts(_metaOnStartup)
@@ -1985,26 +2007,51 @@ class ScriptManager(metaclass=Singleton):
 		return True
 
 
-	def cronMonitor(self) -> bool:
+	def cronMonitor(self, _worker:BackgroundWorker) -> bool:
 		"""	This is the callback for the cron scheduler.
 		
 			It looks for scripts with an *@at* meta tag and takes the argument as a cron pattern.
-			Scripts that are scheduled to run now will be run, one after the other.
+			Scripts that were scheduled to run since the last check will be run, one after the other.
+			Afterwards the worker's interval is set to the time until the next scheduled run, but
+			at most `_cronMaxInterval` seconds. The worker is run earlier when a script is loaded.
+
+			Args:
+				_worker: The worker that runs this callback.
 			
 			Return:
 				Boolean. Usually *True* to continue with monitoring.
 		"""
 		#L.isDebug and L.logDebug(f'Looking for scheduled scripts')
-		_ts = utcDatetime()
+		_ts = utcDatetime().replace(microsecond = 0)
+		_since = self.cronLastCheck + timedelta(seconds = 1)
+		self.cronLastCheck = _ts
 		for each in self.findScripts(meta = _metaAt):
 			try:
-				if cronMatchesTimestamp(at := each.meta.get(_metaAt), _ts):
+				if (match := cronNextMatch(at := each.meta.get(_metaAt), _since)) and match <= _ts:
 					L.isDebug and L.logDebug(f'Running script: {each.scriptName} at: {at}')
 					self.runScript(each)
 			except ValueError as e:
 				L.logErr(f'Error in script: {each.scriptName} - {str(e)}')
+
+		# Determine the next scheduled run. This includes scripts that were loaded in the meantime.
+		_next = _ts + timedelta(seconds = _cronMaxInterval)
+		for each in self.findScripts(meta = _metaAt):
+			try:
+				if (match := cronNextMatch(each.meta.get(_metaAt), _ts + timedelta(seconds = 1))) and match < _next:
+					_next = match
+			except ValueError:
+				pass	# Already logged above
+		_worker.interval = max((_next - utcDatetime()).total_seconds(), 0.0)
 		return True
 
+
+	def rescheduleCronMonitor(self) -> None:
+		"""	Run the cron scheduler now to determine the next scheduled run again, e.g. after a script was loaded.
+			Scripts are not run twice for the same time.
+		"""
+		if self.scriptCronWorker and self.scriptCronWorker.running and not self.scriptCronWorker.executing:
+			self.scriptCronWorker.workNow()
+
 	##########################################################################
 
 
@@ -2105,6 +2152,8 @@ class ScriptManager(metaclass=Singleton):
 		if not pcontext.scriptFilename:							# Add filename to meta data
 			pcontext.scriptFilename = filename
 		self.scripts[name] = pcontext
+		if _metaAt in pcontext.meta:
+			self.rescheduleCronMonitor()
 		return pcontext
 	
 
@@ -21,11 +21,18 @@
 """
 
 from __future__ import annotations
-from typing import Callable, cast, List, Optional, Sequence, Tuple, Any, TYPE_CHECKING
-from ..etc.Types import ResourceTypes, JSON, Operation, ResponseStatusCode, OriginatorType
+from typing import Callable, cast, Iterator, List, Optional, Sequence, Tuple, Any, TYPE_CHECKING
+from ..etc.Types import ResourceTypes, JSON, Operation, ResponseStatusCode, OriginatorType, FilterCriteria, FilterOperation
 from ..etc.ResponseStatusCodes import NOT_FOUND, INTERNAL_SERVER_ERROR, CONFLICT
-from ..etc.DateUtils import utcTime, fromDuration
+from ..etc.DateUtils import utcTime, fromDuration, getResourceDate
 from ..helpers.Singleton import Singleton
+from ..helpers.ResourceCache import ResourceCache
+from ..helpers.BackupSnapshots import BackupSnapshots
+from ..helpers.SubscriptionIndex import SubscriptionIndex, IndexedSubscription
+from ..helpers.ActionIndex import ActionIndex
+from ..helpers.IdentifierTrie import IdentifierTrie
+from ..helpers.ResourceVersions import ResourceVersions
+from ..helpers.BackgroundWorker import BackgroundWorkerPool
 from .Configuration import Configuration
 from .Logging import Logging as L
 from ..runtime.PluginSupport import requires
@@ -38,6 +45,7 @@ if TYPE_CHECKING:
 	from ..runtime.Factory import Factory
 	from ..plugins.database.TinyDBBinding import TinyDBBinding
 	from ..plugins.database.PostgreSQLBinding import PostgreSQLBinding
+	from ..plugins.database.SQLiteBinding import SQLiteBinding
 
 
 # Constants for database and table names
@@ -60,9 +68,16 @@ _requests = 'requests'
 _schedules = 'schedules'
 """ Name of the schedules table. """
 
+_instanceResourceTypes = [ int(ty) for ty in ResourceTypes if ResourceTypes.isInstanceResource(ty) ]
+""" The instance resource types. They are not added to the identifier trie. """
+
+_accessResourceTypes = ( ResourceTypes.ACP, ResourceTypes.ACPAnnc, ResourceTypes.DAC )
+""" The resource types whose changes may change access control decisions for any resource. """
+
 
 @requires(tinyDBBinding='acmecse.plugins.database.TinyDBBinding', required=False)
 @requires(postgreSQLBinding='acmecse.plugins.database.PostgreSQLBinding', required=False)
+@requires(sqliteBinding='acmecse.plugins.database.SQLiteBinding', required=False)
 @requires(factory='acmecse.runtime.Factory')
 class Storage(metaclass=Singleton):
 	"""	This class implements the entry points to the CSE's underlying database functions.
@@ -74,11 +89,20 @@ class Storage(metaclass=Singleton):
 	postgreSQLBinding: PostgreSQLBinding = None
 	""" Injected PostgreSQLBinding instance. """
 
+	sqliteBinding: SQLiteBinding = None
+	""" Injected SQLiteBinding instance. """
+
 	factory: Factory = None
 	""" Injected Factory instance. """
 
 	__slots__ = (
 		'db',
+		'resourceCache',
+		'subscriptionIndex',
+		'actionIndex',
+		'identifierTrie',
+		'resourceVersions',
+		'backups',
 		'_resourceFromDict',
 	)
 	""" Define slots for instance variables. """
@@ -93,6 +117,26 @@ class Storage(metaclass=Singleton):
 
 		self.db:DBBinding = None
 		""" The database object. """
+
+		self.resourceCache:Optional[ResourceCache] = None
+		""" The cache for resource documents, or None if caching is disabled. """
+		if Configuration.database_cacheSize > 0:
+			self.resourceCache = ResourceCache(Configuration.database_cacheSize, Configuration.database_cacheResourceTypes)
+
+		self.subscriptionIndex = SubscriptionIndex()
+		""" The in-memory index of the subscription representations. It is loaded when the database is validated. """
+
+		self.actionIndex = ActionIndex()
+		""" The in-memory index of the action representations by their subject resources. It is loaded when the database is validated. """
+
+		self.identifierTrie = IdentifierTrie()
+		""" The in-memory path trie of the non-instance resources for resolving resource IDs and structured resource names. It is loaded when the database is validated. """
+
+		self.resourceVersions = ResourceVersions()
+		""" The in-memory version counters of the resources and their subtrees. They are not persisted. """
+
+		self.backups = BackupSnapshots(Configuration.database_backupPath, Configuration.database_backupRetention)
+		""" The incremental backup snapshots of the database. """
 	
 		# Create the database object and connect to the database
 		try:
@@ -109,6 +153,10 @@ class Storage(metaclass=Singleton):
 					# create PostgreSQL object and connect to the DB
 					self.db = self.postgreSQLBinding
 
+				case 'sqlite':
+					# create SQLite object and open the DB file
+					self.db = self.sqliteBinding
+
 				case _:
 					L.logErr('Unknown database type')
 					quit()
@@ -129,10 +177,9 @@ class Storage(metaclass=Singleton):
 			if not self._validateDB():
 				raise RuntimeError('DB error. Please check or remove database files.')
 		
-			# Make backup *after* validation, only when *not* reset
-			if not self.backupDB():
-				self.db.closeDB()
-				raise RuntimeError('DB Error')
+			# Make backup *after* validation, only when *not* reset.
+			# The backup runs in the background to not delay the startup.
+			BackgroundWorkerPool.runJob(self.backupDB, name = 'DBBackup')
 		
 		L.isInfo and L.log('Storage initialized')
 
@@ -154,6 +201,12 @@ class Storage(metaclass=Singleton):
 		"""
 		try:
 			self.db.purgeDB()
+			if self.resourceCache:
+				self.resourceCache.clear()
+			self.subscriptionIndex.clear()
+			self.actionIndex.clear()
+			self.identifierTrie.clear()
+			self.resourceVersions.clear()
 		except Exception as e:
 			L.logErr(f'Exception during purge: {e}', exc=e)
 			quit()
@@ -175,16 +228,16 @@ class Storage(metaclass=Singleton):
 			dbFile = _resources
 			self.hasResource('_')
 			dbFile = _identifiers
-			self.structuredIdentifier('_')
+			self.identifierTrie.load(self.db.getAllIdentifiers(_instanceResourceTypes))
 			self.directChildResources('_')
 			dbFile = _subscriptions
-			self.getSubscription('_')
+			self.subscriptionIndex.load(self.db.getAllSubscriptionReprs())
 			dbFile = _batchNotifications
 			self.countBatchNotifications('_', '_')
 			dbFile = _statistics
 			self.getStatistics()
 			dbFile = _actions
-			self.getAllActionReprs()
+			self.actionIndex.load(self.getAllActionReprs())
 			dbFile = _schedules
 			self.getSchedules()
 
@@ -197,12 +250,26 @@ class Storage(metaclass=Singleton):
 	
 
 	def backupDB(self) -> bool:
-		"""	Creating a backup from the DB to a sub directory.
+		"""	Create an incremental backup snapshot of the DB in a sub directory of the backup directory.
+
+			The database binding writes the backup to the new snapshot directory. Files that have not
+			changed since the previous snapshot are hard-linked instead of being stored again.
+			The oldest snapshots are removed according to the retention setting.
 
 			Return:
 				Boolean indicating the success of the backup operation.
 		"""
-		return self.db.backupDB(Configuration.database_backupPath)
+		try:
+			if not self.db.supportsBackup():
+				return True	# Nothing to back up
+			if not (snapshot := self.backups.create(writer = self.db.backupDB)):
+				L.logErr('Error creating DB backup')
+				return False
+			L.isInfo and L.log(f'DB backup created: {snapshot}')
+			return True
+		except Exception as e:
+			L.logErr(f'Error creating DB backup: {e}', exc = e)
+			return False
 		
 
 	#########################################################################
@@ -221,39 +288,153 @@ class Storage(metaclass=Singleton):
 				CONFLICT: In case the resource already exists and *overwrite* is "False".
 		"""
 		_ri  = resource.ri
-		_pi = resource.pi
-		_ty = resource.ty
 		_srn = resource.getSrn()
+		identifierMapping, structuredPathMapping, childResource = self._resourceRecords(resource)
+		
+		# Write the resource, its identifiers and the child resource record in one unit of work
+		with self.db.transaction():
+			if overwrite:
+				L.isDebug and L.logDebug('Resource enforced overwrite')
+				self.db.upsertResource(resource.dict, _ri)
+			else: 
+				if not self.hasResource(_ri, _srn):	# Only when resource with same ri or srn does not exist yet
+					self.db.insertResource(resource.dict, _ri)
+				else:
+					raise CONFLICT(L.logWarn(f'Resource already exists (Skipping): {resource} ri: {_ri} srn:{_srn}'))
+
+			# Add path to identifiers db
+			self.db.upsertIdentifier(identifierMapping, structuredPathMapping, _ri, _srn)
+
+			# Add record to childResources db.
+			self.db.upsertChildResource(childResource, _ri)
+
+		self._addIdentifier(resource)
+		self._resourceChanged(resource)
+
+		# An overwritten resource may be cached
+		if self.resourceCache:
+			self.resourceCache.invalidate(_ri)
+
+
+	def createResources(self, resources:Sequence[Resource]) -> None:
+		"""	Create several new resources in the database in one batch.
+
+			The resources, their identifiers and their child resource records are written with
+			batched database operations in one unit of work. Existing resources are not overwritten.
+		
+			Args:
+				resources: The resources to store in the database.
+			
+			Raises:
+				CONFLICT: In case a resource already exists, or the resources contain the same ri or srn more than once.
+		"""
+		records:list[Tuple[JSON, JSON, JSON, JSON]] = []
+		_ris:set[str] = set()
+		_srns:set[str] = set()
+		for resource in resources:
+			_ri = resource.ri
+			_srn = resource.getSrn()
+			if _ri in _ris or _srn in _srns:
+				raise CONFLICT(L.logWarn(f'Resource is contained more than once: {resource} ri: {_ri} srn:{_srn}'))
+			_ris.add(_ri)
+			_srns.add(_srn)
+			records.append((resource.dict, *self._resourceRecords(resource)))
+
+		with self.db.transaction():
+			for resource in resources:
+				if self.hasResource(resource.ri, resource.getSrn()):
+					raise CONFLICT(L.logWarn(f'Resource already exists (Skipping): {resource} ri: {resource.ri} srn:{resource.getSrn()}'))
+			self.db.insertResources(records)
+
+		for resource in resources:
+			self._addIdentifier(resource)
+			self._resourceChanged(resource)
+			if self.resourceCache:
+				self.resourceCache.invalidate(resource.ri)
+
+
+	def _addIdentifier(self, resource:Resource) -> None:
+		"""	Add a resource to the identifier trie. Instance resources are not added to keep the trie small.
+
+			Args:
+				resource: The resource.
+		"""
+		if not ResourceTypes.isInstanceResource(resource.ty):
+			self.identifierTrie.add(resource.ri, resource.getSrn(), resource.ty)
+
+
+	def _resourceChanged(self, resource:Resource, removed:bool = False) -> None:
+		"""	Increment the version of a resource and the subtree versions of its ancestors.
+
+			Args:
+				resource: The created, updated, or deleted resource.
+				removed: Whether the resource was deleted.
+		"""
+		ancestors = [ pi, *self.identifierTrie.ancestors(pi) ] if (pi := resource.pi) else []
+		access = resource.ty in _accessResourceTypes	# These resources may change access control decisions anywhere
+		if removed:
+			self.resourceVersions.removed(resource.ri, ancestors, access)
+		else:
+			self.resourceVersions.changed(resource.ri, ancestors, access)
+
+
+	def resourceEntityTag(self, ri:str, *components:Any) -> str:
+		"""	Return an entity tag for a representation of a resource. It changes with every change of the resource.
+
+			Args:
+				ri: The resource ID.
+				components: Further components that the representation depends on.
+
+			Return:
+				The entity tag.
+		"""
+		_versions = self.resourceVersions
+		return _versions.entityTag('resource', ri, _versions.version(ri), *components)
+
+
+	def subtreeEntityTag(self, ri:str, *components:Any) -> str:
+		"""	Return an entity tag for a representation of a resource's subtree, e.g. a discovery result.
 		
-		if overwrite:
-			L.isDebug and L.logDebug('Resource enforced overwrite')
-			self.db.upsertResource(resource.dict, _ri)
-		else: 
-			if not self.hasResource(_ri, _srn):	# Only when resource with same ri or srn does not exist yet
-				self.db.insertResource(resource.dict, _ri)
-			else:
-				raise CONFLICT(L.logWarn(f'Resource already exists (Skipping): {resource} ri: {_ri} srn:{_srn}'))
-
-		# Add path to identifiers db
-		self.db.upsertIdentifier(
-			# identifier mapping
-			{ 'ri' : _ri, 
-			  'rn' : resource.rn, 
-			  'srn' : _srn,
-			  'ty' : _ty
-			}, 
-			{ 'srn': _srn,
-			  'ri' : _ri 
-			}, 
-			_ri, _srn)	# type:ignore[arg-type]
-
-		# Add record to childResources db
-		self.db.upsertChildResource(
-			{ 'ri' : _ri,
-			  'pi' : _pi,
-			  'ty' : _ty,
-			  'ch' : [] 
-			}, _ri)
+			It changes with every change of the resource, any of its descendants, or any resource that may
+			change access control decisions.
+
+			Args:
+				ri: The resource ID of the root resource of the subtree.
+				components: Further components that the representation depends on, e.g. the originator.
+
+			Return:
+				The entity tag.
+		"""
+		_versions = self.resourceVersions
+		return _versions.entityTag('subtree', ri, _versions.subtreeVersion(ri), _versions.accessVersion(), *components)
+
+
+	def _resourceRecords(self, resource:Resource) -> Tuple[JSON, JSON, JSON]:
+		"""	Return the identifier mapping, the structured path mapping and the child resource record for a resource.
+
+			Args:
+				resource: The resource.
+
+			Return:
+				Tuple with the identifier mapping, the structured path mapping, and the child resource record.
+		"""
+		_srn = resource.getSrn()
+		return ({ 'ri' : resource.ri,		# identifier mapping
+				  'rn' : resource.rn, 
+				  'srn' : _srn,
+				  'ty' : resource.ty
+				}, 
+				{ 'srn': _srn,				# structured path mapping
+				  'ri' : resource.ri 
+				},
+				# The ct is usually set later during activation. Until then the current time is used 
+				# to order instance resources by their creation.
+				{ 'ri' : resource.ri,		# child resource record
+				  'pi' : resource.pi,
+				  'ty' : resource.ty,
+				  'ct' : resource.ct or getResourceDate(),
+				  'ch' : [] 
+				})
 
 
 	def hasResource(self, ri:Optional[str] = None, srn:Optional[str] = None) -> bool:
@@ -268,7 +449,9 @@ class Storage(metaclass=Singleton):
 			Returns:
 				True when a resource with the ID or name exists.
 		"""
-		return (ri is not None and self.db.hasResource(ri = ri)) or (srn is not None and self.db.hasResource(srn = srn))
+		_trie = self.identifierTrie
+		return (ri is not None and (ri in _trie or self.db.hasResource(ri = ri))) or \
+			   (srn is not None and (_trie.riForSrn(srn) is not None or self.db.hasResource(srn = srn)))
 
 
 	def retrieveResource(self,	ri:Optional[str] = None, 
@@ -294,6 +477,18 @@ class Storage(metaclass=Singleton):
 		"""
 		resources = []
 
+		# Resolve the structured resource name with the identifier trie
+		if srn and not ri:
+			ri = self.identifierTrie.riForSrn(srn)
+
+		# Try the cache first for the resource ID or the structured resource name
+		if (_cache := self.resourceCache):
+			if srn and not ri:
+				ri = _cache.riForSrn(srn)
+			if ri and (doc := _cache.get(ri)):
+				return self.factory.resourceFromDict(doc)
+			_token = _cache.token()
+
 		if ri:		# get a resource by its ri
 			# L.logDebug(f'Retrieving resource ri: {ri}')
 			resources = self.db.searchResources(ri = ri)
@@ -312,6 +507,8 @@ class Storage(metaclass=Singleton):
 
 		match len(resources):
 			case 1:
+				if _cache:
+					_cache.add(resources[0], _token)
 				return self.factory.resourceFromDict(resources[0])
 			case 0:
 				raise NOT_FOUND('resource not found')
@@ -342,6 +539,20 @@ class Storage(metaclass=Singleton):
 		raise INTERNAL_SERVER_ERROR('database inconsistency')
 
 
+	def retrieveResourcesByRIs(self, ris:Sequence[str]) -> list[Resource]:
+		"""	Return multiple resources by their resource IDs with a single database operation.
+
+			Args:
+				ris: List of resource IDs.
+
+			Returns:
+				List of `Resource` objects in the order of the resource IDs. Resources that don't exist are skipped.
+		"""
+		return [ res	for each in self.db.searchResourcesByRIs(ris)
+						if (res := self.factory.resourceFromDict(each))
+			   ]
+
+
 	def retrieveResourcesByType(self, ty:ResourceTypes) -> list[JSON]:
 		""" Return all resources of a certain type. 
 
@@ -371,6 +582,10 @@ class Storage(metaclass=Singleton):
 			resource.dict = self.db.updateResource(resource.dict, resource.ri)
 		except KeyError:
 			raise NOT_FOUND(L.logWarn(f'Cannot update: {resource.ri} (NOT_FOUND). Could be an expected error.'))
+		finally:
+			if self.resourceCache:
+				self.resourceCache.invalidate(resource.ri)
+		self._resourceChanged(resource)
 		# L.logDebug(str(resource.dict))
 		return resource
 
@@ -388,11 +603,17 @@ class Storage(metaclass=Singleton):
 		try:
 			_ri = resource.ri
 			_pi = resource.pi
-			self.db.deleteResource(_ri)
-			self.db.deleteIdentifier(_ri, resource.getSrn())
-			self.db.removeChildResource(_ri, _pi)
+			with self.db.transaction():
+				self.db.deleteResource(_ri)
+				self.db.deleteIdentifier(_ri, resource.getSrn())
+				self.db.removeChildResource(_ri, _pi)
 		except KeyError:
 			raise NOT_FOUND(L.logDebug(f'Cannot remove: {resource.ri} (NOT_FOUND). Could be an expected error.'))
+		finally:
+			self._resourceChanged(resource, removed = True)	# before the resource is removed from the identifier trie
+			self.identifierTrie.remove(resource.ri)
+			if self.resourceCache:
+				self.resourceCache.invalidate(resource.ri)
 
 
 	# TODO split this into two methods (one for resources, one for raw resources)
@@ -411,10 +632,7 @@ class Storage(metaclass=Singleton):
 				Return a list of resources, or a list of raw resource dictionaries.
 		"""
 		if (_ris := self.db.searchChildResourceIDsByParentRIAndType(pi, ty)):
-			# docs = [self.db.searchResources(ri = _ri)[0] for _ri in _ris ]
-			docs = [_r[0] 
-		   			for _ri in _ris 
-					if (_r := self.db.searchResources(ri=_ri))]	# get the resource documents for the child resource IDs, only when they exist
+			docs = self.db.searchResourcesByRIs(_ris)	# get the resource documents for the child resource IDs, only when they exist
 			return docs if raw else cast(List, list(map(lambda x: self.factory.resourceFromDict(x), docs)))
 		return []	# type:ignore[return-value]
 	
@@ -433,6 +651,20 @@ class Storage(metaclass=Singleton):
 		return self.db.searchChildResourceIDsByParentRIAndType(pi, ty)
 
 
+	def instanceResourceRI(self, pi:str, ty:ResourceTypes, index:int) -> Optional[str]:
+		"""	Return the resource ID of an instance resource by its position in the creation time order.
+
+			Args:
+				pi: The parent resource's Resource ID.
+				ty: The instance resource type, e.g. *CIN*, *TSI*, or *FCI*.
+				index: The position of the instance resource. 0 is the oldest, -1 is the latest instance.
+
+			Returns:
+				The resource ID of the instance resource, or None if not found.
+		"""
+		return self.db.searchInstanceResourceIDByIndex(pi, ty, index)
+
+
 	def countDirectChildResources(self, pi:str, ty:Optional[ResourceTypes] = None) -> int:
 		"""	Count the number of direct child resources.
 
@@ -464,6 +696,8 @@ class Storage(metaclass=Singleton):
 			Return:
 				List of found resources identifier mappings, or an empty list.
 		"""
+		if (mapping := self.identifierTrie.identifier(ri = ri)):
+			return [ mapping ]
 		return self.db.searchIdentifiers(ri = ri)
 
 
@@ -476,6 +710,8 @@ class Storage(metaclass=Singleton):
 			Return:
 				List of found resources identifier mappings, or an empty list.
 		"""
+		if (mapping := self.identifierTrie.identifier(srn = srn)):
+			return [ mapping ]
 		return self.db.searchIdentifiers(srn = srn)
 
 
@@ -508,25 +744,75 @@ class Storage(metaclass=Singleton):
 				]
 
 
+	def discoverResourcesInSubtree(self, ri:str,
+										 level:int,
+										 offset:int,
+										 limit:int,
+										 filterCriteria:FilterCriteria,
+										 fo:FilterOperation,
+										 raw:Optional[bool] = False) -> Optional[Iterator[JSON]|Iterator[Resource]]:
+		"""	Return the resources in the subtree of a resource, pre-filtered by the database.
+
+			The resources are returned in the order of a depth-first walk of the resource tree. The result may
+			contain resources that don't match the filter criteria, so the criteria must still be evaluated.
+			The resources are fetched from the database while the caller iterates.
+
+			Args:
+				ri: The resource ID of the root resource of the subtree.
+				level: The maximum depth of the subtree.
+				offset: The offset (starting with 1) of the first direct child resource of the root resource to include.
+				limit: The maximum number of direct child resources of the root resource to include.
+				filterCriteria: The filter criteria.
+				fo: The filter operation for the filter criteria.
+				raw: When "True" then return the resources as resource dictionaries instead of resources.
+
+			Return:
+				Iterator over `Resource` objects or raw resource dictionaries, or None if the database doesn't support this.
+		"""
+		if (docs := self.db.discoverResourcesInSubtree(ri, level, offset, limit, filterCriteria, fo)) is None:
+			return None
+		if raw:
+			return docs
+		return	( res	for each in docs
+						if (res := self.factory.resourceFromDict(each))
+				)
+
+
+	def searchExpiredResources(self, now:str, limit:Optional[int] = None) -> list[Resource]:
+		"""	Return a list of resources whose *expirationTime* is before a timestamp.
+
+			This uses the database's expiration index and does not scan all resources.
+
+			Args:
+				now: The timestamp to compare the *expirationTime* with.
+				limit: Optional maximum number of resources to return.
+
+			Return:
+				List of `Resource` objects, ordered by their *expirationTime*.
+		"""
+		return	[ res	for each in self.db.searchExpiredResources(now, limit)
+						if (res := self.factory.resourceFromDict(each))
+				]
+
+
 	#########################################################################
 	##
 	##	Subscriptions
 	##
 
 	def getSubscription(self, ri:str) -> Optional[JSON]:
-		"""	Retrieve a subscription representation (not a oneM2M `Resource` object) from the DB.
+		"""	Retrieve a subscription representation (not a oneM2M `Resource` object) from the subscription index.
 
 			Args:
 				ri: The subscription's resource ID.
 
 			Return:
-				The subscription as a JSON dictionary, or None.
+				The subscription as a JSON dictionary, or None. It must not be modified.
 		"""
 		# L.logDebug(f'Retrieving subscription: {ri}')
-		subs = self.db.searchSubscriptionReprs(ri = ri)
-		if not subs or len(subs) != 1:
+		if (entry := self.subscriptionIndex.get(ri)) is None:
 			return None
-		return subs[0]
+		return entry.sub
 
 
 	def getSubscriptionsForParent(self, pi:str) -> list[JSON]:
@@ -536,9 +822,38 @@ class Storage(metaclass=Singleton):
 				pi: The parent resource's resource ID.
 
 			Return:
-				List of subscriptions. This is not the oneM2M Subscription resource, but the internal subscription representation.
+				List of subscriptions. This is not the oneM2M Subscription resource, but the internal subscription representation. They must not be modified.
+		"""
+		return [ entry.sub for entry in self.subscriptionIndex.forParent(pi) ]
+
+
+	def getIndexedSubscriptions(self, pi:str, 
+									  net:Optional[int] = None, 
+									  operation:Optional[bool] = False) -> Sequence[IndexedSubscription]:
+		"""	Retrieve the indexed subscriptions for a parent resource from the subscription index.
+
+			Args:
+				pi: The parent resource's resource ID.
+				net: If set, then only the subscriptions for this notification event type are returned.
+				operation: If True, then only the subscriptions with an *operationMonitor* are returned.
+
+			Return:
+				The indexed subscriptions. They include pre-computed matching criteria.
+		"""
+		if operation:
+			return self.subscriptionIndex.forOperation(pi)
+		if net is not None:
+			return self.subscriptionIndex.forEvent(pi, net)
+		return self.subscriptionIndex.forParent(pi)
+
+
+	def hasRetrieveSubscriptions(self) -> bool:
+		"""	Test whether any subscription may be triggered by RETRIEVE requests.
+
+			Return:
+				True if any subscription has an *operationMonitor* or a blocking RETRIEVE event type.
 		"""
-		return self.db.searchSubscriptionReprs(pi = pi)
+		return self.subscriptionIndex.hasRetrieveSubscriptions()
 
 
 	def upsertSubscription(self, subscription:Resource) -> bool:
@@ -552,8 +867,7 @@ class Storage(metaclass=Singleton):
 		"""
 		# L.logDebug(f'Adding subscription: {ri}')
 		ri = subscription.ri
-		return self.db.upsertSubscriptionRepr(
-			{ 'ri'  	: ri, 
+		sub = { 'ri'  	: ri, 
 			  'pi'  	: subscription.pi,
 			  'nct' 	: subscription.nct,
 			  'net' 	: subscription.attribute('enc/net'),	# TODO perhaps store enc as a whole?
@@ -570,7 +884,11 @@ class Storage(metaclass=Singleton):
 			  'ma' 		: fromDuration(subscription.ma) if subscription.ma else None, # EXPERIMENTAL ma = maxAge
 			  'nse' 	: subscription.nse,
 			  'eeno' 	: subscription.eeno,
-			 }, ri) is not None
+			 }
+		if self.db.upsertSubscriptionRepr(sub, ri) is None:
+			return False
+		self.subscriptionIndex.add(sub)
+		return True
 
 
 	def removeSubscription(self, subscription:Resource) -> bool:
@@ -590,6 +908,8 @@ class Storage(metaclass=Singleton):
 			return self.db.removeSubscriptionRepr(subscription.ri)
 		except KeyError as e:
 			raise NOT_FOUND(L.logDebug(f'Cannot subscription data for: {subscription.ri} (NOT_FOUND). Could be an expected error.'))
+		finally:
+			self.subscriptionIndex.remove(subscription.ri)
 
 
 	#########################################################################
@@ -728,6 +1048,18 @@ class Storage(metaclass=Singleton):
 		return self.db.searchActionsReprsForSubject(subjectRi)
 
 
+	def getActionRIsForSubject(self, subjectRi:str) -> Sequence[str]:
+		"""	Retrieve the resource IDs of the action representations for a subject resource from the action index.
+		
+			Args:
+				subjectRi: The subject resource's resource ID.
+			
+			Return:
+				The resource IDs of the actions, sorted by their priorities (*apy*). Actions without a priority come last.
+		"""
+		return self.actionIndex.forSubject(subjectRi)
+
+
 	def upsertAction(self, action:ACTR, periodTS:float, count:int) -> bool:
 		"""	Update or add an action as an action representation in the DB.
 		
@@ -742,18 +1074,20 @@ class Storage(metaclass=Singleton):
 		ri = action.ri
 		sri = action.sri
 
-		return self.db.upsertActionRepr(
-			{	'ri':		ri,
-				'subject':	sri if sri else action.pi,
-				'dep':		action.dep,
-				'apy':		action.apy,
-				'evm':		action.evm,
-				'evc':		action.evc,	
-				'ecp':		action.ecp,
-				'periodTS': periodTS,
-				'count':	count,
-			},
-			ri) is not None
+		actionRepr = {	'ri':		ri,
+						'subject':	sri if sri else action.pi,
+						'dep':		action.dep,
+						'apy':		action.apy,
+						'evm':		action.evm,
+						'evc':		action.evc,	
+						'ecp':		action.ecp,
+						'periodTS': periodTS,
+						'count':	count,
+					 }
+		if self.db.upsertActionRepr(actionRepr, ri) is None:
+			return False
+		self.actionIndex.add(actionRepr)
+		return True
 
 
 	def updateActionRepr(self, actionRepr:JSON) -> bool:
@@ -777,7 +1111,10 @@ class Storage(metaclass=Singleton):
 			Return:
 				Boolean value to indicate success or failure.
 		"""
-		return self.db.removeActionRepr(ri)
+		try:
+			return self.db.removeActionRepr(ri)
+		finally:
+			self.actionIndex.remove(ri)
 
 
 	#########################################################################
@@ -811,10 +1148,8 @@ class Storage(metaclass=Singleton):
 			"""
 		# return self.db.insertRequest(op, ri, srn, originator, outgoing, ot, request, response)
 
-		# Remove old requests first up to the maximum number of requests
-		self.db.removeOldRequests(Configuration.cse_operation_requests_size)
-
-		# Store the request
+		# Store the request. The oldest requests are removed by the database binding
+		# up to the maximum number of requests
 		_ts = utcTime()
 		_doc =	{ 'ri': ri,
 	  			  'srn': srn,
@@ -830,7 +1165,7 @@ class Storage(metaclass=Singleton):
 		_doc = { k: v for k, v in _doc.items() if v is not None }	# Remove remaining None values
 		if additionalCB:
 			additionalCB(_doc)
-		return self.db.insertRequest(_doc, _ts)
+		return self.db.insertRequest(_doc, _ts, Configuration.cse_operation_requests_size)
 
 
 	def getRequests(self, ri:Optional[str] = None, sortedByOt:bool = False) -> list[JSON]:
@@ -13,6 +13,7 @@ from typing import Optional
 
 import configparser
 
+from ...etc.Types import ResourceTypes
 from ...runtime.Configuration import Configuration, ConfigurationError
 from ...runtime.configurations.ModuleConfiguration import ModuleConfiguration
 
@@ -24,6 +25,9 @@ class StorageConfiguration(ModuleConfiguration):
 		config.database_type = parser.get('database', 'type', fallback='tinydb')
 		config.database_resetOnStartup = parser.getboolean('database', 'resetOnStartup', fallback=False)
 		config.database_backupPath = parser.get('database', 'backupPath', fallback='./data/backup')
+		config.database_backupRetention = parser.getint('database', 'backupRetention', fallback=5)
+		config.database_cacheSize = parser.getint('database', 'cacheSize', fallback=0)
+		config.database_cacheResourceTypes = parser.getlist('database', 'cacheResourceTypes', fallback=['CSEBase', 'AE', 'ACP', 'CNT', 'CSR', 'GRP'])	# type: ignore [attr-defined]
 
 
 	def validateConfiguration(self, config:Configuration, initial:Optional[bool]=False) -> None:
@@ -34,7 +38,20 @@ class StorageConfiguration(ModuleConfiguration):
 		if Configuration._args_DBStorageMode is not None:
 			Configuration.database_type = Configuration._args_DBStorageMode
 
-		if config.database_type not in ['tinydb', 'postgresql', 'memory']:
-			raise ConfigurationError(fr'[i]\[database]:type[/i] must be "tinydb", "postgresql", or "memory"')
-
-
+		if config.database_type not in ['tinydb', 'sqlite', 'postgresql', 'memory']:
+			raise ConfigurationError(fr'[i]\[database]:type[/i] must be "tinydb", "sqlite", "postgresql", or "memory"')
+
+		if config.database_backupRetention < 1:
+			raise ConfigurationError(fr'[i]\[database]:backupRetention[/i] must be > 0')
+
+		if config.database_cacheSize < 0:
+			raise ConfigurationError(fr'[i]\[database]:cacheSize[/i] must be >= 0')
+		_types:list[ResourceTypes] = []
+		for t in config.database_cacheResourceTypes:
+			if isinstance(t, ResourceTypes):	# already validated
+				_types.append(t)
+			elif t in ResourceTypes.__members__:
+				_types.append(ResourceTypes[t])
+			else:
+				raise ConfigurationError(fr'Unknown resource type for [i]\[database]:cacheResourceTypes[/i]: {t}')
+		config.database_cacheResourceTypes = _types
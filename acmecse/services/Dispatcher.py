@@ -13,16 +13,17 @@
 """
 
 from __future__ import annotations
-from typing import List, Tuple, cast, Sequence, Optional, Callable, TYPE_CHECKING
+from typing import Any, List, Tuple, cast, Sequence, Optional, Callable, Iterator, Generator, TYPE_CHECKING
 
-import operator
 import sys
+from itertools import islice
+from contextlib import closing
 from copy import deepcopy
 
 from ..helpers import TextTools
 from ..etc.Constants import Constants
 from ..etc.Types import FilterCriteria, FilterUsage, CSERequest, ResourceTypes, Operation
-from ..etc.Types import FilterOperation, DesiredIdentifierResultType, Permission, ResultContentType
+from ..etc.Types import FilterOperation, DesiredIdentifierResultType, Permission, ResultContentType, ContentStatus
 from ..etc.Types import Result, JSON
 from ..etc.ResponseStatusCodes import ResponseStatusCode, ResponseException, exceptionFromRSC
 from ..etc.ResponseStatusCodes import ORIGINATOR_HAS_NO_PRIVILEGE, NOT_FOUND, BAD_REQUEST
@@ -244,6 +245,7 @@ class Dispatcher(metaclass=Singleton):
 		#
 
 		rcn = request.rcn
+		resource:Optional[Resource] = None
 		# Check semantic discovery (sqi present and False)
 		if request.sqi is not None and not request.sqi:
 			if self.semanticManager is None:
@@ -280,10 +282,17 @@ class Dispatcher(metaclass=Singleton):
 						case ResultContentType.attributes:
 							# if rcn == "attributes" then we can return here, whatever the result is
 							resource.willBeRetrieved(originator, request)	# resource instance may be changed in this call
+
+							# conditional retrieve? The <CSEBase> resource contains the current time and is never unchanged
+							etag = None
+							if resource.ty != ResourceTypes.CSEBase:
+								etag = self.storage.resourceEntityTag(resource.ri, originator, request._attributeList)
+								if self._entityTagMatches(request, etag):
+									return Result(rsc = ResponseStatusCode.OK, etag = etag, notModified = True)
 							
 							# partial retrieve?
 							resource.selectAttributes(request, request._attributeList)
-							return Result(rsc = ResponseStatusCode.OK, resource = resource)
+							return Result(rsc = ResponseStatusCode.OK, resource = resource, etag = etag)
 
 						case ResultContentType.originalResource:
 							# if rcn == original-resource we retrieve the linked resource
@@ -331,7 +340,17 @@ class Dispatcher(metaclass=Singleton):
 		#
 		#	Discovery request
 		#
-		resources = self.discoverResources(id, originator, request.fc, permission = permission)
+		rootResource = resource if resource else self.retrieveResource(id)
+
+		# conditional discovery? The result can only be unchanged if no RETRIEVE request triggers a subscription,
+		# and if the filter criteria don't depend on the current time
+		etag = None
+		if not self.storage.hasRetrieveSubscriptions() and not request.fc.dependsOnTime():
+			etag = self.storage.subtreeEntityTag(rootResource.ri, originator, rcn, request.drt, request._attributeList, request.fc.canonical())
+			if self._entityTagMatches(request, etag):
+				return Result(rsc = ResponseStatusCode.OK, etag = etag, notModified = True)
+
+		resources, moreResults = self.discoverResourcesPage(id, originator, request.fc, rootResource = rootResource, permission = permission)
 
 		# check and filter by ACP. After this allowedResources only contains the resources that are allowed
 		allowedResources = []
@@ -350,32 +369,39 @@ class Dispatcher(metaclass=Singleton):
 		match rcn:
 			case ResultContentType.attributesAndChildResources:
 				self.resourceTreeDict(allowedResources, resource.dict)	# the function call add attributes to the target resource
-				return Result(rsc=ResponseStatusCode.OK, resource=resource)
+				result = Result(rsc=ResponseStatusCode.OK, resource=resource)
 		
 			case ResultContentType.attributesAndChildResourceReferences:
 				self._resourceTreeReferences(allowedResources, resource, request.drt, 'ch')	# the function call add attributes to the target resource
-				return Result(rsc=ResponseStatusCode.OK, resource=resource)
+				result = Result(rsc=ResponseStatusCode.OK, resource=resource)
 		
 			case ResultContentType.childResourceReferences:
 				childResourcesRef = self._resourceTreeReferences(allowedResources, None, request.drt, 'm2m:rrl')
-				return Result(rsc=ResponseStatusCode.OK, resource=childResourcesRef)
+				result = Result(rsc=ResponseStatusCode.OK, resource=childResourcesRef)
 
 			case ResultContentType.childResources:
 				childResources:JSON={ resource.typeShortname : {} } #  Root resource as a dict with no attribute
 				self.resourceTreeDict(allowedResources, childResources[resource.typeShortname]) # Adding just child resources
-				return Result(rsc=ResponseStatusCode.OK, resource=childResources)
+				result = Result(rsc=ResponseStatusCode.OK, resource=childResources)
 
 			case ResultContentType.discoveryResultReferences:
-				return Result(rsc=ResponseStatusCode.OK, resource=self._resourcesToURIList(allowedResources, request.drt))
+				result = Result(rsc=ResponseStatusCode.OK, resource=self._resourcesToURIList(allowedResources, request.drt))
 		
 			case ResultContentType.permissions:
 				# TODO
 				self.resourceTreeDict(allowedResources, resource.dict)	# the function call add attributes to the target resource
-				return Result(rsc=ResponseStatusCode.OK, resource=resource)
+				result = Result(rsc=ResponseStatusCode.OK, resource=resource)
 		
 			case _:
 				raise BAD_REQUEST(f'unsuppored rcn: {rcn} for RETRIEVE')
 
+		# Indicate a partial result if more resources could be discovered
+		if moreResults:
+			result.cnst = ContentStatus.partialContent
+			result.cnot = request.fc.ofst if request.fc.ofst is not None else 1
+		result.etag = etag
+		return result
+
 
 	def retrieveResource(self, id: str, 
 							   originator: Optional[str] = None, 
@@ -488,8 +514,67 @@ class Dispatcher(metaclass=Singleton):
 			Return:
 				A list of discovered resources.
 		"""
+		return self.discoverResourcesPage(id, originator, filterCriteria, rootResource, permission)[0]
+
+
+	def discoverResourcesPage(self,
+							  id:str,
+							  originator:str, 
+							  filterCriteria:Optional[FilterCriteria] = None,
+							  rootResource:Optional[Resource] = None, 
+							  permission:Optional[Permission] = Permission.DISCOVERY) -> Tuple[List[Resource], bool]:
+		"""	Discover resources and return the page of the results that is selected by the *ofst* and *lim* filter criteria.
+
+			The resource tree is only walked until the results of the page and one more result are found.
+
+			Args:
+				id: The ID of the resource to start discovery from.
+				originator: The originator of the request.
+				filterCriteria: The filter criteria.
+				rootResource: The root resource for discovery.
+				permission: The permission to use.
+
+			Return:
+				A tuple with the list of discovered resources, and a boolean that indicates whether more results exist after this page.
+		"""
 		L.isDebug and L.logDebug('Discovering resources')
 
+		if not filterCriteria:
+			filterCriteria = FilterCriteria()
+
+		# Apply defaults. This is not done in the FilterCriteria class bc there we only store he provided values
+		ofst:int = filterCriteria.ofst if filterCriteria.ofst is not None else 1
+		lim:int = filterCriteria.lim if filterCriteria.lim is not None else sys.maxsize
+
+		# Take one more result than requested to determine whether there are more results.
+		# Close the iterator afterwards, so that a database cursor is released right away.
+		with closing(self.iterateDiscoveredResources(id, originator, filterCriteria, rootResource, permission)) as resources:
+			discoveredResources = list(islice(resources, ofst - 1, min(ofst + lim, sys.maxsize)))
+		if (moreResults := len(discoveredResources) > lim):
+			discoveredResources.pop()
+		return discoveredResources, moreResults
+
+
+	def iterateDiscoveredResources(self,
+								   id:str,
+								   originator:str, 
+								   filterCriteria:Optional[FilterCriteria] = None,
+								   rootResource:Optional[Resource] = None, 
+								   permission:Optional[Permission] = Permission.DISCOVERY) -> Generator[Resource, None, None]:
+		"""	Discover resources and return them one by one while walking the resource tree.
+
+			The *ofst* and *lim* filter criteria are not applied, but the *arp* filter criteria is.
+
+			Args:
+				id: The ID of the resource to start discovery from.
+				originator: The originator of the request.
+				filterCriteria: The filter criteria.
+				rootResource: The root resource for discovery.
+				permission: The permission to use.
+
+			Return:
+				An iterator over the discovered resources.
+		"""
 		if not rootResource:
 			rootResource = self.retrieveResource(id)
 		
@@ -499,11 +584,6 @@ class Dispatcher(metaclass=Singleton):
 		# Apply defaults. This is not done in the FilterCriteria class bc there we only store he provided values
 		lvl:int = filterCriteria.lvl if filterCriteria.lvl is not None else sys.maxsize
 		fo:FilterOperation = filterCriteria.fo if filterCriteria.fo is not None else FilterOperation.AND
-		ofst:int = filterCriteria.ofst if filterCriteria.ofst is not None else 1
-		lim:int = filterCriteria.lim if filterCriteria.lim is not None else sys.maxsize
-
-		# get all direct children and slice the page (offset and limit)
-		dcrs = self.retrieveDirectChildResources(id)[ofst-1:ofst-1 + lim]	# now dcrs only contains the desired child resources for ofst and lim
 
 		# a bit of optimization. This length stays the same.
 		allLen = len(filterCriteria.attributes) if filterCriteria.attributes else 0
@@ -514,101 +594,143 @@ class Dispatcher(metaclass=Singleton):
 			  (len(_v)-1 if (_v := criteriaAttributes.get('lbl')) is not None else 0) 		# -1 : compensate for len(conditions) in line 1 
 			)
 
-		# Discover the resources
-		discoveredResources = self._discoverResources(rootResource, 
-													  originator, 
-													  level = lvl, 
-													  fo = fo, 
-													  allLen = allLen, 
-													  dcrs = dcrs, 
-													  filterCriteria = filterCriteria,
-													  permission = permission)
-
-		# NOTE: this list contains all results in the order they could be found while
+		# Let the database discover and pre-filter the resources in the subtree, if it supports this.
+		# The filter criteria and permissions are still checked for each resource.
+		discoveredResources:Iterator[Resource]
+		if lvl > 0 and (subtreeDocs := self.storage.discoverResourcesInSubtree(rootResource.ri, lvl, 1, sys.maxsize, filterCriteria, fo, raw = True)) is not None:
+			discoveredResources = ( resource 
+									for doc in cast(Iterator[JSON], subtreeDocs)
+									if (resource := self._discoverDocument(doc, originator, fo, allLen, filterCriteria, permission)) )
+		
+		else:
+			# Discover the resources
+			discoveredResources = self._discoverResources(rootResource.ri, 
+														  originator, 
+														  level = lvl, 
+														  fo = fo, 
+														  allLen = allLen, 
+														  filterCriteria = filterCriteria,
+														  permission = permission)
+
+		# NOTE: the resources are returned in the order they could be found while
 		#		walking the resource tree.
 		#		DON'T CHANGE THE ORDER. DON'T SORT.
 		#		Because otherwise the tree cannot be correctly re-constructed otherwise
 
 		# Apply ARP if provided
-		if filterCriteria.arp:
-			_resources = []
-			for resource in discoveredResources:
-				# Check existence and permissions for the .../{arp} resource
-				srn = f'{resource.getSrn()}/{filterCriteria.arp}'
-				_res = self.retrieveResource(srn)
-				if self.security.hasAccess(originator, _res, permission, resultResource = _res):
-					_resources.append(_res)
-			discoveredResources = _resources	# re-assign the new resources to discoveredResources
-
-		return discoveredResources
+		if not filterCriteria.arp:
+			yield from discoveredResources
+			return
+		for resource in discoveredResources:
+			# Check existence and permissions for the .../{arp} resource
+			srn = f'{resource.getSrn()}/{filterCriteria.arp}'
+			_res = self.retrieveResource(srn)
+			if self.security.hasAccess(originator, _res, permission, resultResource = _res):
+				yield _res
 
 
-	def _discoverResources(self, rootResource:Resource,
+	def _discoverResources(self, ri:str,
 								 originator:str, 
 								 level:int, 
 								 fo:int, 
 								 allLen:int, 
-								 dcrs:Optional[list[Resource]] = None, 
 								 filterCriteria:Optional[FilterCriteria] = None,
-								 permission:Optional[Permission] = Permission.DISCOVERY) -> list[Resource]:
-		"""	Discover resources recursively. This is a helper function for discoverResources().
+								 permission:Optional[Permission] = Permission.DISCOVERY) -> Iterator[Resource]:
+		"""	Discover resources recursively. This is a helper function for iterateDiscoveredResources().
+
+			The child resources are walked as raw resource dictionaries. Only the resources that
+			are discovered are instantiated. The walk stops when the caller stops iterating.
 
 			Args:
-				rootResource: The root resource for discovery.
+				ri: The resource ID of the root resource for discovery.
 				originator: The originator of the request.
 				level: The level of discovery.
 				fo: The filter operation.
 				allLen: The length of all filter criteria.
-				dcrs: The direct child resources of the root resource.
 				filterCriteria: The filter criteria.
 				permission: The permission to use.
 
 			Return:
-				A list of discovered resources.
+				An iterator over the discovered resources, in the order of a depth-first walk of the resource tree.
 		"""
-		if not rootResource or level == 0:		# no resource or level == 0
-			return []
-
-		# get all direct children, if not provided
-		if not dcrs:
-			if len(dcrs := self.retrieveDirectChildResources(rootResource.ri)) == 0:
-				return []
-		
+		if not ri or level == 0:		# no resource or level == 0
+			return
 
-		# Filter and add those left to the result
-		discoveredResources = []
-		for resource in dcrs:
+		# Filter and return the direct children, then walk their subtrees
+		for doc in cast(List[JSON], self.storage.directChildResources(ri, raw = True)):
 
-			# Exclude virtual resources
-			if resource.isVirtual():
+			# Exclude virtual resources, and don't walk their subtrees
+			if ResourceTypes(doc['ty']).isVirtual():
 				continue
 
-			# check permissions and filter. Only then add a resource
-			# First match then access. bc if no match then we don't need to check permissions (with all the overhead)
-			if self._matchResource(resource, 
-								   fo, 
-								   allLen, 
-								   filterCriteria) and self.security.hasAccess(originator, resource, permission, resultResource = resource):
-				discoveredResources.append(resource)
+			# check filter and permissions. Only then return a resource
+			if (resource := self._discoverDocument(doc, originator, fo, allLen, filterCriteria, permission)):
+				yield resource
 
 			# Iterate recursively over all (not only the filtered!) direct child resources
-			discoveredResources.extend(self._discoverResources(resource, 
-															   originator, 
-															   level-1, 
-															   fo, 
-															   allLen, 
-															   filterCriteria = filterCriteria,
-															   permission = permission))
+			yield from self._discoverResources(doc['ri'], 
+											   originator, 
+											   level-1, 
+											   fo, 
+											   allLen, 
+											   filterCriteria = filterCriteria,
+											   permission = permission)
+
+
+	def _discoverDocument(self, doc:JSON,
+								originator:str,
+								fo:int,
+								allLen:int,
+								filterCriteria:FilterCriteria,
+								permission:Permission) -> Optional[Resource]:
+		"""	Match a raw resource dictionary against the filter criteria and check the originator's permission.
+
+			The resource is only instantiated when it matches, or when the advanced or geo query needs it
+			for matching.
+
+			Args:
+				doc: The raw resource dictionary. It must not be modified.
+				originator: The originator of the request.
+				fo: The filter operation.
+				allLen: The length of all filter criteria.
+				filterCriteria: The filter criteria.
+				permission: The permission to use.
 
-		return discoveredResources
+			Return:
+				The discovered resource, or None if the resource is virtual, doesn't match, or the originator has no access.
+		"""
+		# Exclude virtual resources
+		if ResourceTypes(doc['ty']).isVirtual():
+			return None
+		
+		# First match then access. bc if no match then we don't need to check permissions (with all the overhead)
+		resource = self.factory.resourceFromDict(doc) if filterCriteria.aq or filterCriteria.geom else None
+		if not self._matchResource(resource if resource else doc, fo, allLen, filterCriteria):
+			return None
+		if not resource:
+			resource = self.factory.resourceFromDict(doc)
+		return resource if self.security.hasAccess(originator, resource, permission, resultResource = resource) else None
 
 
-	def _matchResource(self, r:Resource, fo:int, allLen:int, filterCriteria:FilterCriteria) -> bool:	
-		""" Match a filter to a resource. """
+	def _matchResource(self, r:Resource|JSON, fo:int, allLen:int, filterCriteria:FilterCriteria) -> bool:	
+		""" Match a filter to a resource.
+
+			Args:
+				r: The resource, or its raw resource dictionary. A raw resource dictionary can only be matched if the filter criteria don't contain an advanced or geo query.
+				fo: The filter operation.
+				allLen: The length of all filter criteria.
+				filterCriteria: The filter criteria.
+
+			Return:
+				True if the resource matches the filter criteria.
+		"""
 
 		# TODO: Implement a couple of optimizations. Can we determine earlier that a match will fail?
 
-		ty = r.ty
+		# Raw resource dictionaries are read directly
+		get:Callable[..., Any] = r.attribute if isinstance(r, Resource) else r.get
+
+		ty = get('ty')
 
 		# get the parent resource
 		#
@@ -631,21 +753,21 @@ class Dispatcher(metaclass=Singleton):
 			# ty's to found (to indicate that the whole set matches)
 			if tys := filterCriteria.ty:
 				found += len(tys) if ty in tys else 0	
-			if ct := r.ct:
+			if ct := get('ct'):
 				found += 1 if (c_crb := filterCriteria.crb) and (ct < c_crb) else 0
 				found += 1 if (c_cra := filterCriteria.cra) and (ct > c_cra) else 0
-			if lt := r.lt:
+			if lt := get('lt'):
 				found += 1 if (c_ms := filterCriteria.ms) and (lt > c_ms) else 0
 				found += 1 if (c_us := filterCriteria.us) and (lt < c_us) else 0
-			if (st := r.st) is not None:	# st is an int
+			if (st := get('st')) is not None:	# st is an int
 				found += 1 if (c_sts := filterCriteria.sts) is not None and (st > c_sts) else 0	# st is an int
 				found += 1 if (c_stb := filterCriteria.stb) is not None and (st < c_stb) else 0
-			if et := r.et:
+			if et := get('et'):
 				found += 1 if (c_exb := filterCriteria.exb) and (et < c_exb) else 0
 				found += 1 if (c_exa := filterCriteria.exa) and (et > c_exa) else 0
 
 			# Check labels similar to types
-			resourceLbl = r.lbl
+			resourceLbl = get('lbl')
 			if resourceLbl and (lbls := filterCriteria.lbl):
 				for l in lbls:
 					if l in resourceLbl:
@@ -653,7 +775,7 @@ class Dispatcher(metaclass=Singleton):
 						break
 
 			if ResourceTypes.isInstanceResource(ty):	# special handling for instance resources
-				if (cs := r.cs) is not None:	# cs is an int
+				if (cs := get('cs')) is not None:	# cs is an int
 					found += 1 if (sza := filterCriteria.sza) is not None and cs >= sza else 0	# sizes ares ints
 					found += 1 if (szb := filterCriteria.szb) is not None and cs < szb else 0
 
@@ -663,7 +785,7 @@ class Dispatcher(metaclass=Singleton):
 			# Similar to types.
 			if ty in [ ResourceTypes.CIN ]:	# special handling for CIN
 				if filterCriteria.cty:
-					found += len(filterCriteria.cty) if r.cnf in filterCriteria.cty else 0
+					found += len(filterCriteria.cty) if get('cnf') in filterCriteria.cty else 0
 
 		# TODO childLabels
 		# TODO parentLabels
@@ -672,10 +794,11 @@ class Dispatcher(metaclass=Singleton):
 
 		# Attributes:
 		for name, value in filterCriteria.attributes.items():
+			rval = r[name] if isinstance(r, Resource) else findXPath(r, name)
 			if isinstance(value, str) and '*' in value:
-				found += 1 if (rval := r[name]) is not None and TextTools.simpleMatch(str(rval), value) else 0
+				found += 1 if rval is not None and TextTools.simpleMatch(str(rval), value) else 0
 			else:
-				found += 1 if (rval := r[name]) is not None and str(value) == str(rval) else 0
+				found += 1 if rval is not None and str(value) == str(rval) else 0
 
 		# TODO childAttribute
 		# TODO parentAttribute
@@ -688,6 +811,8 @@ class Dispatcher(metaclass=Singleton):
 		if filterCriteria.geom:	# Just check one of the tree required attributes. If one is there, all are there
 			if not self.locationManager:
 				raise NOT_IMPLEMENTED(L.logWarn('LocationManager is disabled. No geo queries can be processed.'))
+			if not isinstance(r, Resource):
+				raise INTERNAL_SERVER_ERROR('geo query requires an instantiated resource')
 			allLen += 1	# Add one more criteria to check to the required count
 			if r.loc:	# Only check if the resource has a location
 				found += 1 if self.locationManager.checkGeoLocation(r, filterCriteria.gmty, filterCriteria._geom, filterCriteria.gsf) else 0
@@ -977,13 +1102,7 @@ class Dispatcher(metaclass=Singleton):
 
 		if parentResource:	# parentResource might be None if this is the root resource
 			L.isDebug and L.logDebug(f'Parent ri: {parentResource.ri}')
-			if not parentResource.canHaveChild(resource):
-				if resource.ty == ResourceTypes.SUB:
-					# This is a special case. The spec requires a different error code
-					# for the case the parent resource is not subscribable. 
-					raise TARGET_NOT_SUBSCRIBABLE(L.logWarn('Parent resource is not subscribable'))
-				else:
-					raise INVALID_CHILD_RESOURCE_TYPE(L.logWarn(f'Invalid child resource type: {ResourceTypes(resource.ty).value}'))
+			self._checkChildResource(parentResource, resource)
 			
 			# Assign the parent's originator if not provided
 			originator = originator if originator else parentResource.getOriginator()
@@ -1032,6 +1151,113 @@ class Dispatcher(metaclass=Singleton):
 		return resource
 
 
+	def createLocalResources(self, resources:Sequence[Resource], originator:Optional[str] = None) -> list[Resource]:
+		"""	Create multiple resources locally in one batch.
+
+			The resources are validated against their parent resources first, and then written to the
+			database together. Each parent resource is notified only once about all its new child
+			resources, so that its bookkeeping (e.g. *cni* and *cbs* of a container) is updated once
+			per parent instead of once per resource.
+
+			The batch is created completely or not at all: if the creation of a resource or the notification
+			of a parent resource fails then all resources of the batch that were already created are deleted again.
+
+			Args:
+				resources: The resources to create. Their parent resources must already exist, and are not part of the batch.
+				originator: The originator of the request. If not provided then the originator of the respective parent resource is used.
+
+			Return:
+				The created resources.
+			
+			Raises:
+				TARGET_NOT_SUBSCRIBABLE: If a parent resource is not subscribable.
+				INVALID_CHILD_RESOURCE_TYPE: If a child resource type is invalid.
+				CONFLICT: If a resource already exists.
+		"""
+		L.isDebug and L.logDebug(f'CREATING {len(resources)} resources')
+
+		# Retrieve each parent resource only once and validate the children
+		parentResources:dict[str, Resource] = {}
+		childResources:dict[str, list[Resource]] = {}
+		for resource in resources:
+			if (pi := resource.pi) not in parentResources:
+				parentResources[pi] = self.retrieveLocalResource(pi)
+				childResources[pi] = []
+			self._checkChildResource(parentResources[pi], resource)
+			childResources[pi].append(resource)
+
+		# add the resources to storage in one batch
+		self.storage.createResources(resources)
+
+		# Activate the resources
+		activated:list[Resource] = []
+		try:
+			for resource in resources:
+				parentResource = parentResources[resource.pi]
+				resource.activate(parentResource, originator if originator else parentResource.getOriginator())
+				activated.append(resource)
+
+			# Could be that we changed the resources in the activate, therefore write them again
+			for resource in resources:
+				resource.dbUpdate(True)	# with an event
+		except:
+			for index, resource in enumerate(resources):
+				if index < len(activated):
+					self.deleteLocalResource(resource, parentResource = parentResources[resource.pi], doDeleteCheck = False)
+				else:
+					resource.dbDelete()
+			raise
+
+		# Notify each parent resource once about all its new children
+		notified:set[str] = set()
+		try:
+			for pi, children in childResources.items():
+				notified.add(pi)
+				parentResources[pi] = parentResource = parentResources[pi].dbReload()	# Read the resource again in case it was updated in the DB
+				parentResource.childrenAdded(children, originator if originator else parentResource.getOriginator())
+		except:
+			# Delete all resources of the batch. Only the parent resources that were already notified
+			# are notified about the removal, too.
+			for resource in resources:
+				if not self.storage.hasResource(resource.ri):
+					continue	# Already removed by its parent resource, e.g. because of a container's limits
+				if resource.pi in notified:
+					self.deleteLocalResource(resource)
+				else:
+					self.deleteLocalResource(resource, parentResource = parentResources[resource.pi], doDeleteCheck = False)
+			raise
+
+		# Send events for the parent resources
+		for parentResource in parentResources.values():
+			eventManager.createChildResource(EventData(payload=parentResource))
+
+		# send the create events
+		for resource in resources:
+			eventManager.createResource(EventData(payload=resource))
+
+		return list(resources)
+
+
+	def _checkChildResource(self, parentResource:Resource, resource:Resource) -> None:
+		"""	Check whether a resource can be added as a child to a parent resource.
+
+			Args:
+				parentResource: The parent resource.
+				resource: The new child resource.
+
+			Raises:
+				TARGET_NOT_SUBSCRIBABLE: If the parent resource is not subscribable.
+				INVALID_CHILD_RESOURCE_TYPE: If the child resource type is invalid.
+		"""
+		if not parentResource.canHaveChild(resource):
+			if resource.ty == ResourceTypes.SUB:
+				# This is a special case. The spec requires a different error code
+				# for the case the parent resource is not subscribable. 
+				raise TARGET_NOT_SUBSCRIBABLE(L.logWarn('Parent resource is not subscribable'))
+			else:
+				raise INVALID_CHILD_RESOURCE_TYPE(L.logWarn(f'Invalid child resource type: {ResourceTypes(resource.ty).value}'))
+
+
 	#########################################################################
 	#
 	#	Update resources
@@ -1633,8 +1859,8 @@ class Dispatcher(metaclass=Singleton):
 										   oldest:Optional[bool] = False) -> Optional[Resource]:
 		"""	Get the latest or oldest x-Instance resource for a parent.
 
-			This is done by searching through all resources once to find the fitting resource 
-			(parent + type)	with the latest or oldest *ct* attribute.
+			This is done by looking up the instance resource in the database's instance index, which
+			keeps the instance resources of a parent ordered by their *ct* attribute.
 
 			Args:
 				pi: parent resourceIdentifier
@@ -1644,27 +1870,13 @@ class Dispatcher(metaclass=Singleton):
 			Return:
 				Resource
 		"""
-		hit:Tuple[JSON, str] = None
-		op = operator.gt if oldest else operator.lt
-
-		# This function used as a mapper to search through all resources and
-		# determines the newest CIN resource for this parent
-		# This should be a bit faster than getting all the CIN, instantiating them, 
-		# and throwig them all away etc
-		def determineLatest(res:JSON) -> bool:
-			nonlocal hit
-			if res['pi'] == pi and res['ty'] == ty:
-				ct = res['ct']
-				if not hit or op(hit[1], ct):
-					hit = ( res, ct )
-			return False
-
-		# Search through the resources with the mapping functions
-		self.storage.searchByFilter(filter = determineLatest)
-		if not hit:
+		if not (ri := self.storage.instanceResourceRI(pi, ty, 0 if oldest else -1)):
+			return None
+		try:
+			# Instantiate and return resource
+			return self.storage.retrieveResource(ri)
+		except NOT_FOUND:
 			return None
-		# Instantiate and return resource
-		return self.factory.resourceFromDict(hit[0])
 
 
 	def discoverChildren(self, id:str, 
@@ -1887,7 +2099,8 @@ class Dispatcher(metaclass=Singleton):
 				if self.sortDiscoveryResources:
 					# result.sort(key=lambda x:(x.ty, x.rn.lower()))
 					result.sort(key = lambda x: (x.ty, x.ct) if ResourceTypes.isInstanceResource(x.ty) else (x.ty, x.rn.lower()))
-				targetResource[result[0].typeShortname] = [r.asDict(embedded = False) for r in result]
+				# The child resources are only used for this tree, so their values don't need to be copied
+				targetResource[result[0].typeShortname] = [r.asDict(embedded = False, shared = True) for r in result]
 				# TODO not all child resources are lists [...] Handle just to-1 relations
 			else:
 				break # end of list, leave while loop
@@ -1976,6 +2189,18 @@ class Dispatcher(metaclass=Singleton):
 		return srnFromHybrid(request.srn, request.id) # Hybrid
 
 
+	def _entityTagMatches(self, request:CSERequest, etag:str) -> bool:
+		"""	Check whether an entity tag matches one of the entity tags of a conditional request.
+
+			Args:
+				request: The request with the optional entity tags of an *If-None-Match* condition.
+				etag: The current entity tag of the requested representation.
+
+			Return:
+				True if the representation is not modified and need not be sent again.
+		"""
+		return bool(request.ifNoneMatch) and (etag in request.ifNoneMatch or '*' in request.ifNoneMatch)	# type: ignore[operator]
+
 
 	def _getVirtualResource(self, id:str, rn:str|tuple[str, ...]) -> Optional[Resource]:
 		"""	Check whether the target is a virtual resource and return it.
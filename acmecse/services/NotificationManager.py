@@ -214,19 +214,11 @@ class NotificationManager(object):
 			Return:
 				List of storage subscription documents, NOT Subscription resources.
 			"""
-		if not (subs := self.storage.getSubscriptionsForParent(ri)):
+		if not net:
 			return []
-		result:JSONLIST = []
-		for each in subs:
-			if _n := each.get('net'):	# net might be empty of None
-				if net and any(x in net for x in _n):
-					result.append(each)
-		
-		# filter by chty if set
-		if chty:
-			result = [ each for each in result if (_chty := each['chty']) is None or chty in _chty]
-
-		return result
+		return [ each.sub 
+				 for each in self.storage.getIndexedSubscriptions(ri) 
+				 if not each.net.isdisjoint(net) and (not chty or each.matchChildType(chty)) ]
 
 
 	def checkOperationSubscription(self, resource: Resource,
@@ -286,53 +278,37 @@ class NotificationManager(object):
 		L.isDebug and L.logDebug(f'Checking subscriptions ({reason.name}({reason.value})) ri: {ri}')
 
 		# ATTN: The "subscription" returned here are NOT the <sub> resources,
-		# but an internal representation from the 'subscription' DB !!!
-		# Access to attributes is different bc the structure is flattened
-		if (subs := self.storage.getSubscriptionsForParent(ri)) is None:
-			return
+		# but an internal representation from the subscription index !!!
+		# Access to attributes is different bc the structure is flattened.
+		# Only the subscriptions for the operation resp. the event type are returned.
+		subs = list(self.storage.getIndexedSubscriptions(ri, net = reason, operation = operation is not None))
 		
 		# EXPERIMENTAL Add "subi" subscriptions to the list of subscriptions to check
 		if resource and (subi := resource.subi) is not None:
 			for eachSubi in subi:
-				if (sub := self.storage.getSubscription(eachSubi)) is None:
+				if (indexedSub := self.storage.subscriptionIndex.get(eachSubi)) is None:
 					L.logErr(f'Cannot retrieve subscription: {eachSubi}')
 					continue
 				# TODO ensure uniqueness
-				subs.append(sub)
+				subs.append(indexedSub)
 
-		for sub in subs:
+		for indexedSub in subs:
+			sub = indexedSub.sub
 
 			# Test for operationMonitor condition first. Any will match successfull.
 			# Only if the operationMonitor is set
 			foundOperationMonitor:OperationMonitor|None = None
 			if operation is not None:
-				if (om := sub.get('om')) is not None:
-					for o in om:
-						_org = o.get('org')
-						_op = o.get('ops')
-
-						# Test whether a originator is set and if it is NOT the same as the originator of the request
-						if _org is not None and _org != originator:
-							continue
-						if _op is not None and _op != operation:
-							continue
-						foundOperationMonitor = o
-						break
 				# Skip if no operationMonitor condition is found
-				if not foundOperationMonitor:
+				if not (foundOperationMonitor := indexedSub.matchOperation(operation, originator)):	# type:ignore[assignment]
 					continue
 
 			# Now test for the reason, only if no operationMonitor is set
-			if foundOperationMonitor is None:
-				net = sub.get('net')
-				# Test for the NET condition
-				if net is None:
-					continue
-				if reason not in net:
-					continue
+			elif reason not in indexedSub.net:	# Test for the NET condition
+				continue
 
 			# Prevent own notifications for subscriptions 
-			ri = sub.get('ri')
+			ri = indexedSub.ri
 
 			# Test whether reason is included in the subscription
 			if childResource and \
@@ -355,8 +331,7 @@ class NotificationManager(object):
 
 			match reason:
 				case NotificationEventType.createDirectChild | NotificationEventType.deleteDirectChild:	# reasons for child resources
-					chty = sub['chty']
-					if chty and not childResource.ty in chty:	# skip if chty is set and child.type is not in the list
+					if indexedSub.chty and childResource.ty not in indexedSub.chty:	# skip if chty is set and child.type is not in the list
 						continue
 					self._handleSubscriptionNotification(sub, 
 														 reason, 
@@ -368,12 +343,8 @@ class NotificationManager(object):
 					self.countNotificationEvents(ri)
 			
 				# Check Update and enc/atr vs the modified attributes 
-				case NotificationEventType.resourceUpdate if (atr := sub.get('atr')) and modifiedAttributes:
-					found = False
-					for k in atr:
-						if k in modifiedAttributes:
-							found = True
-					if found:	# any one found
+				case NotificationEventType.resourceUpdate if indexedSub.atr and modifiedAttributes:
+					if indexedSub.matchAttributes(modifiedAttributes):	# any one found
 						self._handleSubscriptionNotification(sub, 
 															 reason, 
 															 resource = resource, 
@@ -591,8 +591,7 @@ class RegistrationManager(metaclass=Singleton):
 				Always *True*.
 		"""
 		# L.isDebug and L.logDebug('Looking for expired resources')
-		now = getResourceDate()
-		resources = self.storage.searchByFilter(lambda r: (et := r.get('et'))  and et < now)
+		resources = self.storage.searchExpiredResources(getResourceDate())
 		for resource in resources:
 			# try to retrieve the resource first bc it might have been deleted as a child resource
 			# of an expired resource
@@ -1854,7 +1854,8 @@ class RequestManager(metaclass=Singleton):
 						   ty: Optional[ResourceTypes]=None, 
 						   op: Optional[Operation]=None, 
 						   isResponse: Optional[bool]=False,
-						   originalRequest: Optional[CSERequest]=None) -> Result:
+						   originalRequest: Optional[CSERequest]=None,
+						   sharedContent: Optional[bool]=False) -> Result:
 		"""	Convert a response request to a new *Result* object and create a new dictionary in *Result.data*
 			with the full Response structure. Recursively do this if the *embeddedRequest* is also
 			a full Request or Response.
@@ -1865,6 +1866,8 @@ class RequestManager(metaclass=Singleton):
 				ty: Optional resource type.
 				op: Optional request operation type
 				isResponse: Whether the result is actually a response, and not a request.
+				originalRequest: The original request that was received.
+				sharedContent: Whether the content of a resource in *inResult* may share its attribute values with the resource. This must only be set if the returned *data* is serialized right away and not modified.
 			
 			Return:
 				`Result` object with the response. The request or response is in *data*.
@@ -1944,6 +1947,12 @@ class RequestManager(metaclass=Singleton):
 		if inRequest.rset is not None:
 			req['rset'] = inRequest.rset
 
+		# Content Status and Content Offset of a partial result
+		if inResult.cnst is not None:
+			req['cnst'] = int(inResult.cnst)
+		if inResult.cnot is not None:
+			req['cnot'] = inResult.cnot
+
 
 		# If the response contains a request (ie. for polling), then add that request to the pc
 		pc = None
@@ -1958,7 +1967,7 @@ class RequestManager(metaclass=Singleton):
 
 		else:
 			# construct and serialize the data as JSON/dictionary. Encoding to JSON or CBOR is done later
-			pc = inResult.toData(ContentSerializationType.PLAIN)	#  type:ignore[assignment]
+			pc = inResult.toData(ContentSerializationType.PLAIN, shared = sharedContent)	#  type:ignore[assignment]
 		
 		if pc:
 			# If the request has selected attributes, then the pc content must be filtered
@@ -2032,7 +2041,7 @@ class RequestManager(metaclass=Singleton):
 			Return:
 				A tuple with an updated `Result` object and the serialized content.
 		"""
-		result = self.requestFromResult(inResult, isResponse=isResponse, originalRequest=originalRequest)
+		result = self.requestFromResult(inResult, isResponse=isResponse, originalRequest=originalRequest, sharedContent=True)
 		return (result, cast(bytes, serializeData(cast(JSON, result.data), result.request.ct)))
 
 
@@ -2058,7 +2067,7 @@ class RequestManager(metaclass=Singleton):
 		# Construct and store request & response
 		match _resource := result.resource:
 			case Resource():
-				pc = _resource.asDict()
+				pc = _resource.asDict()	# A copy, because the recorded request is kept in memory by the database
 			case dict():
 				pc = _resource
 			case x if result.data:
@@ -652,8 +652,9 @@ def sendHttpRequest(method:str, url:str, originator:str, ty:ResourceTypes=None,
 	if rc == 204:
 		rc = ResponseStatusCode.NO_CONTENT
 
-	# save last header for later
+	# save last header and status code for later
 	setLastHeaders(r.headers)	# type: ignore[arg-type]
+	setLastHttpStatus(r.status_code)
 
 	# Verbose output
 	if verboseRequests:
@@ -1073,6 +1074,22 @@ def lastHeaders() -> Parameters:
 	return _lastHeaders
 
 
+_lastHttpStatus:int = None
+
+def setLastHttpStatus(status:int) -> None:
+	"""	Set the last http response's status code.
+
+		Args:
+			status: HTTP status code, e.g. 304 for a not modified resource.
+	"""
+	global _lastHttpStatus
+	_lastHttpStatus = status
+
+
+def lastHttpStatus() -> int:
+	return _lastHttpStatus
+
+
 ###############################################################################
 #
 #	Reconfiguring CSE via the upper tester interface
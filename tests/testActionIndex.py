@@ -0,0 +1,122 @@
+#
+#	testActionIndex.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the ActionIndex, which orders the actions of a subject resource
+#	by their priorities
+#
+
+import unittest, sys
+from typing import Optional
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.etc.Types import JSON
+from acmecse.helpers.ActionIndex import ActionIndex
+from init import *
+
+
+class TestActionIndex(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.index = ActionIndex()
+
+
+	@staticmethod
+	def _action(ri:str, subject:str = 'cnt1', apy:Optional[int] = None) -> JSON:
+		"""	Return the representation of an action for a *subject* resource with the priority *apy*.
+		"""
+		return { 'ri': ri, 'subject': subject, 'apy': apy, 'evm': 1, 'count': 0 }
+
+
+	def test_sortByPriority(self) -> None:
+		"""	Sort the actions of a subject by their priorities """
+		self.index.add(self._action('actr1'))
+		self.index.add(self._action('actr2', apy = 5))
+		self.index.add(self._action('actr3', apy = 1))
+		self.index.add(self._action('actr4', apy = 5))
+		self.index.add(self._action('actr5', subject = 'cnt2'))
+		# Actions without a priority come last, actions with the same priority keep their order
+		self.assertEqual(self.index.forSubject('cnt1'), ( 'actr3', 'actr2', 'actr4', 'actr1' ))
+		self.assertEqual(self.index.forSubject('cnt2'), ( 'actr5', ))
+		self.assertEqual(self.index.forSubject('unknown'), ())
+
+
+	def test_updatePriority(self) -> None:
+		"""	Sort an updated action by its new priority, and keep its position among actions with the same priority """
+		self.index.add(self._action('actr1', apy = 1))
+		self.index.add(self._action('actr2', apy = 2))
+		self.index.add(self._action('actr3', apy = 3))
+		self.index.add(self._action('actr1', apy = 3))
+		self.assertEqual(self.index.forSubject('cnt1'), ( 'actr2', 'actr1', 'actr3' ))
+		self.index.add(self._action('actr1'))
+		self.assertEqual(self.index.forSubject('cnt1'), ( 'actr2', 'actr3', 'actr1' ))
+
+
+	def test_updateSubject(self) -> None:
+		"""	Move an updated action to its new subject """
+		self.index.add(self._action('actr1'))
+		self.index.add(self._action('actr2'))
+		self.index.add(self._action('actr1', subject = 'cnt2'))
+		self.assertEqual(self.index.forSubject('cnt1'), ( 'actr2', ))
+		self.assertEqual(self.index.forSubject('cnt2'), ( 'actr1', ))
+		self.index.add(self._action('actr2', subject = 'cnt2'))
+		self.assertEqual(self.index.forSubject('cnt1'), ())
+		self.assertNotIn('cnt1', self.index._subjects)
+		self.assertEqual(self.index.forSubject('cnt2'), ( 'actr1', 'actr2' ))
+
+
+	def test_remove(self) -> None:
+		"""	Remove an action from its subject """
+		self.index.add(self._action('actr1', apy = 1))
+		self.index.add(self._action('actr2', apy = 2))
+		self.index.remove('actr1')
+		self.assertEqual(self.index.forSubject('cnt1'), ( 'actr2', ))
+		self.index.remove('actr2')
+		self.assertEqual(self.index.forSubject('cnt1'), ())
+		self.assertEqual(self.index._subjects, {})
+		self.assertEqual(self.index._actions, {})
+
+		self.index.remove('actr2')	# Removing an unknown action is ignored
+
+		# A removed action is added again as a new action
+		self.index.add(self._action('actr3', apy = 1))
+		self.index.add(self._action('actr1', apy = 1))
+		self.assertEqual(self.index.forSubject('cnt1'), ( 'actr3', 'actr1' ))
+
+
+	def test_loadClear(self) -> None:
+		"""	Replace the content of the index, and clear it """
+		self.index.add(self._action('actr1'))
+		self.index.load([ self._action('actr2', apy = 2), self._action('actr3', apy = 1), self._action('actr4', subject = 'cnt2') ])
+		self.assertEqual(self.index.forSubject('cnt1'), ( 'actr3', 'actr2' ))
+		self.assertEqual(self.index.forSubject('cnt2'), ( 'actr4', ))
+		self.index.clear()
+		self.assertEqual(self.index.forSubject('cnt1'), ())
+		self.assertEqual(self.index.forSubject('cnt2'), ())
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestActionIndex, [
+
+		'test_sortByPriority',
+		'test_updatePriority',
+		'test_updateSubject',
+		'test_remove',
+		'test_loadClear',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
@@ -0,0 +1,110 @@
+#
+#	testAttributeIndex.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the hash index of the pi, ty, csi and aei attributes
+#
+
+import unittest, sys
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.etc.Types import ResourceTypes as T
+from acmecse.helpers.AttributeIndex import AttributeIndex
+from init import *
+
+
+class TestAttributeIndex(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.index = AttributeIndex(('pi', 'ty', 'aei'))
+		self.index.add('CAE1', { 'ri': 'CAE1', 'pi': 'cse', 'ty': int(T.AE), 'aei': 'CAE1' })
+		self.index.add('cnt1', { 'ri': 'cnt1', 'pi': 'CAE1', 'ty': int(T.CNT) })
+		self.index.add('cnt2', { 'ri': 'cnt2', 'pi': 'CAE1', 'ty': int(T.CNT), 'aei': None })
+
+
+	def test_get(self) -> None:
+		"""	Return the documents with an attribute value in insertion order """
+		self.assertEqual(list(self.index.get('pi', 'CAE1')), [ 'cnt1', 'cnt2' ])
+		self.assertEqual(list(self.index.get('ty', T.CNT)), [ 'cnt1', 'cnt2' ])	# enum values find int values
+		self.assertEqual(list(self.index.get('aei', 'CAE1')), [ 'CAE1' ])
+		self.assertEqual(list(self.index.get('pi', 'unknown')), [])
+		self.assertEqual(list(self.index.get('pi', [ 'CAE1' ])), [])		# unhashable values are never found
+		self.assertEqual(self.index._indexes['aei'], { 'CAE1': { 'CAE1': None } })	# None values are not indexed
+
+
+	def test_values(self) -> None:
+		"""	Extract the values of the indexed attributes from a document """
+		self.assertEqual(self.index.values({ 'ri': 'cnt1', 'pi': 'CAE1', 'ty': 3, 'aei': None }), { 'pi': 'CAE1', 'ty': 3 })
+		self.assertEqual(self.index.values(None), {})
+		self.assertEqual(self.index.values({}), {})
+
+
+	def test_unhashable(self) -> None:
+		"""	Don't index unhashable values """
+		self.index.add('cnt3', { 'pi': [ 'CAE1' ], 'ty': int(T.CNT) })
+		self.assertEqual(list(self.index.get('ty', T.CNT)), [ 'cnt1', 'cnt2', 'cnt3' ])
+		self.index.remove('cnt3', { 'pi': [ 'CAE1' ], 'ty': int(T.CNT) })
+		self.assertEqual(list(self.index.get('ty', T.CNT)), [ 'cnt1', 'cnt2' ])
+
+
+	def test_update(self) -> None:
+		"""	Re-index only the changed attributes of a document """
+		old = self.index.values({ 'pi': 'CAE1', 'ty': int(T.CNT) })
+		self.index.update('cnt1', old, { 'pi': 'cnt2', 'ty': int(T.CNT), 'aei': 'CAE1' })
+		self.assertEqual(list(self.index.get('pi', 'CAE1')), [ 'cnt2' ])
+		self.assertEqual(list(self.index.get('pi', 'cnt2')), [ 'cnt1' ])
+		self.assertEqual(list(self.index.get('ty', T.CNT)), [ 'cnt1', 'cnt2' ])		# unchanged, so the position is kept
+		self.assertEqual(list(self.index.get('aei', 'CAE1')), [ 'CAE1', 'cnt1' ])
+
+		# An attribute that is removed is removed from the index
+		self.index.update('cnt1', { 'pi': 'cnt2', 'ty': int(T.CNT), 'aei': 'CAE1' }, { 'pi': 'cnt2', 'ty': int(T.CNT) })
+		self.assertEqual(list(self.index.get('aei', 'CAE1')), [ 'CAE1' ])
+
+
+	def test_remove(self) -> None:
+		"""	Remove documents, and remove values without documents """
+		self.index.remove('cnt1', { 'pi': 'CAE1', 'ty': int(T.CNT) })
+		self.assertEqual(list(self.index.get('pi', 'CAE1')), [ 'cnt2' ])
+		self.index.remove('cnt2', { 'pi': 'CAE1', 'ty': int(T.CNT) })
+		self.assertNotIn('CAE1', self.index._indexes['pi'])
+		self.assertNotIn(int(T.CNT), self.index._indexes['ty'])
+		self.index.remove('unknown', { 'pi': 'CAE1', 'ty': 99 })		# Removing an unknown document is ignored
+
+		# Adding a document again appends it
+		self.index.add('cnt1', { 'pi': 'cse' })
+		self.assertEqual(list(self.index.get('pi', 'cse')), [ 'CAE1', 'cnt1' ])
+
+
+	def test_clear(self) -> None:
+		"""	Remove all entries """
+		self.index.clear()
+		self.assertEqual(list(self.index.get('pi', 'CAE1')), [])
+		self.assertEqual(self.index._indexes, { 'pi': {}, 'ty': {}, 'aei': {} })
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestAttributeIndex, [
+
+		'test_get',
+		'test_values',
+		'test_unhashable',
+		'test_update',
+		'test_remove',
+		'test_clear',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
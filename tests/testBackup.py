@@ -0,0 +1,219 @@
+#
+#	testBackup.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the incremental backup snapshots and the TinyDB database backups
+#
+
+import unittest, sys, os, json, shutil, tempfile
+from typing import Callable, Optional
+from threading import Thread, Event
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.etc.Types import ResourceTypes as T
+from acmecse.etc.Constants import RuntimeConstants as RC
+from acmecse.helpers.BackupSnapshots import BackupSnapshots
+from acmecse.runtime.Configuration import Configuration
+from acmecse.plugins.database.TinyDBBinding import TinyDBBinding
+from init import *
+
+
+class TestBackup(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.path = tempfile.mkdtemp()
+		self.snapshots = BackupSnapshots(os.path.join(self.path, 'backup'), 2)
+
+
+	def tearDown(self) -> None:
+		shutil.rmtree(self.path, ignore_errors = True)
+
+
+	def _writer(self, content:dict[str, str]) -> Callable[[str, Optional[str]], bool]:
+		"""	Return a backup writer function that writes files with the given content.
+		"""
+		def writer(dir:str, previous:Optional[str]) -> bool:
+			for fileName, data in content.items():
+				with open(os.path.join(dir, fileName), 'w', encoding = 'utf-8') as file:
+					file.write(data)
+			return True
+		return writer
+
+
+	def _open(self, path:str, storage:str) -> TinyDBBinding:
+		"""	Open a TinyDB binding with a database in a directory. *storage* is either "buffered" or "journal".
+		"""
+		Configuration.database_type = 'tinydb'
+		Configuration.database_tinydb_path = path
+		Configuration.database_tinydb_cacheSize = 0
+		Configuration.database_tinydb_writeDelay = 0
+		Configuration.database_tinydb_storage = storage
+		Configuration.database_tinydb_compactionThreshold = 100
+		Configuration.database_tinydb_instanceSegmentSize = 0
+		RC.cseSPIDSlashLess = 'acme.example.com'
+		RC.cseCsiSlashLess = 'id-in'
+		binding = TinyDBBinding()
+		binding.init()
+		binding.start()
+		return binding
+
+
+	@staticmethod
+	def _createContainer(binding:TinyDBBinding, n:int) -> None:
+		"""	Create the *n*-th <container> resource with its identifiers and child resource records.
+		"""
+		ri = f'cnt{n}'
+		srn = f'cse-in/cnt_{n}'
+		with binding.transaction():
+			binding.insertResource({ 'ri': ri, 'rn': f'cnt_{n}', 'pi': 'cse', 'ty': T.CNT, 'ct': f'{n:08d}' }, ri)
+			binding.upsertIdentifier({ 'ri': ri, 'rn': f'cnt_{n}', 'srn': srn, 'ty': T.CNT }, { 'srn': srn, 'ri': ri }, ri, srn)
+			binding.upsertChildResource({ 'ri': ri, 'ty': T.CNT, 'pi': 'cse', 'ch': [], 'ct': f'{n:08d}' }, ri)
+
+
+	def test_createRotate(self) -> None:
+		"""	Create incremental snapshots and remove the oldest ones """
+		first = self.snapshots.create(writer = self._writer({ 'a.json': 'a1', 'b.json': 'b1' }))
+		second = self.snapshots.create(writer = self._writer({ 'a.json': 'a2', 'b.json': 'b1' }))
+		self.assertIsNotNone(first)
+		self.assertIsNotNone(second)
+
+		# The unchanged file is hard-linked from the previous snapshot
+		self.assertTrue(os.path.samefile(os.path.join(first, 'b.json'), os.path.join(second, 'b.json')))
+		self.assertFalse(os.path.samefile(os.path.join(first, 'a.json'), os.path.join(second, 'a.json')))
+		with open(os.path.join(second, 'manifest.json'), 'r', encoding = 'utf-8') as file:
+			self.assertEqual(sorted(json.load(file)), [ 'a.json', 'b.json' ])
+
+		# Only the newest two snapshots are kept
+		third = self.snapshots.create(writer = self._writer({ 'a.json': 'a3', 'b.json': 'b1' }))
+		self.assertEqual(self.snapshots.snapshots(), [ os.path.basename(second), os.path.basename(third) ])
+		self.assertFalse(os.path.exists(first))
+		with open(os.path.join(third, 'b.json'), 'r', encoding = 'utf-8') as file:
+			self.assertEqual(file.read(), 'b1')
+
+
+	def test_createFromFiles(self) -> None:
+		"""	Create snapshots from files and directories """
+		data = os.path.join(self.path, 'data')
+		os.makedirs(os.path.join(data, 'dir'))
+		for fileName, content in (('a.json', 'a1'), (os.path.join('dir', 'c.seg'), 'c1')):
+			with open(os.path.join(data, fileName), 'w', encoding = 'utf-8') as file:
+				file.write(content)
+		files = [ os.path.join(data, 'a.json'), os.path.join(data, 'dir'), os.path.join(data, 'missing.json') ]
+		first = self.snapshots.create(files = files)
+		second = self.snapshots.create(files = files)
+		self.assertTrue(os.path.isfile(os.path.join(first, 'dir', 'c.seg')))
+		self.assertTrue(os.path.samefile(os.path.join(first, 'a.json'), os.path.join(second, 'a.json')))
+		self.assertTrue(os.path.samefile(os.path.join(first, 'dir', 'c.seg'), os.path.join(second, 'dir', 'c.seg')))
+
+
+	def test_writerFails(self) -> None:
+		"""	Don't keep a snapshot if the writer fails """
+		self.assertIsNone(self.snapshots.create(writer = lambda dir, previous: False))
+		self.assertEqual(self.snapshots.snapshots(), [])
+		self.assertEqual(os.listdir(self.snapshots.path), [])
+
+
+	def _backupDuringWrites(self, storage:str) -> None:
+		"""	Back up a TinyDB database while resources are created, and restore the backups.
+
+			Args:
+				storage: The storage driver, either "buffered" or "journal".
+		"""
+		count = 300
+		data = os.path.join(self.path, 'data')
+		binding = self._open(data, storage)
+		binding.upsertChildResource({ 'ri': 'cse', 'ty': T.CSEBase, 'pi': None, 'ch': [] }, 'cse')
+		self._createContainer(binding, 0)
+		stop = Event()
+
+		def writer() -> None:
+			n = 1
+			while not stop.is_set() and n < count:
+				self._createContainer(binding, n)
+				n += 1
+
+		thread = Thread(target = writer)
+		thread.start()
+		snapshots:list[str] = []
+		try:
+			while thread.is_alive() and len(snapshots) < 5:
+				snapshots.append(self.snapshots.create(writer = binding.backupDB))
+		finally:
+			stop.set()
+			thread.join()
+			binding.closeDB()
+
+		for snapshot in snapshots[-2:]:		# the retained snapshots
+			# Restore the backup into a new data directory and load it
+			restored = os.path.join(self.path, 'restored')
+			shutil.rmtree(restored, ignore_errors = True)
+			shutil.copytree(snapshot, restored)
+			os.remove(os.path.join(restored, 'manifest.json'))
+			binding = self._open(restored, storage)
+			try:
+				resources = [ r['ri'] for r in binding.searchByFragment({ 'ty': T.CNT }) ]
+				self.assertGreater(len(resources), 0)
+				# The resources and their identifiers are consistent
+				self.assertEqual(sorted(resources), sorted(i['ri'] for i in binding.getAllIdentifiers()))
+				self.assertEqual(sorted(resources), sorted(binding.searchChildResourceIDsByParentRIAndType('cse')))
+			finally:
+				binding.closeDB()
+
+
+	def test_backupUnchanged(self) -> None:
+		"""	Link the files of unchanged TinyDB databases from the previous backup """
+		binding = self._open(os.path.join(self.path, 'data'), 'buffered')
+		try:
+			binding.upsertChildResource({ 'ri': 'cse', 'ty': T.CSEBase, 'pi': None, 'ch': [] }, 'cse')
+			self._createContainer(binding, 0)
+			resources = os.path.basename(binding.fileResources)
+			first = self.snapshots.create(writer = binding.backupDB)
+			second = self.snapshots.create(writer = binding.backupDB)
+			self.assertTrue(os.path.samefile(os.path.join(first, resources), os.path.join(second, resources)))
+			self._createContainer(binding, 1)
+			third = self.snapshots.create(writer = binding.backupDB)
+		finally:
+			binding.closeDB()
+		self.assertFalse(os.path.samefile(os.path.join(second, resources), os.path.join(third, resources)))
+		subscriptions = os.path.basename(binding.fileSubscriptions)
+		self.assertTrue(os.path.samefile(os.path.join(second, subscriptions), os.path.join(third, subscriptions)))
+		with open(os.path.join(third, resources), 'r', encoding = 'utf-8') as file:
+			self.assertEqual(sorted(json.load(file)['resources']), [ 'cnt0', 'cnt1' ])
+
+
+	def test_backupDuringWritesBuffered(self) -> None:
+		"""	Back up and restore a TinyDB database with the buffered storage while it is written """
+		self._backupDuringWrites('buffered')
+
+
+	def test_backupDuringWritesJournal(self) -> None:
+		"""	Back up and restore a TinyDB database with the journal storage while it is written """
+		self._backupDuringWrites('journal')
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestBackup, [
+
+		'test_createRotate',
+		'test_createFromFiles',
+		'test_writerFails',
+		'test_backupUnchanged',
+		'test_backupDuringWritesBuffered',
+		'test_backupDuringWritesJournal',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
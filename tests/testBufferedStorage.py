@@ -0,0 +1,145 @@
+#
+#	testBufferedStorage.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the buffered TinyDB storage, which writes the database file in
+#	the background
+#
+
+import unittest, sys, os, json, shutil, tempfile
+from typing import Any
+from threading import Event, Thread
+if '..' not in sys.path:
+	sys.path.append('..')
+from tinydb import TinyDB
+from tinydb.table import Table
+from acmecse.helpers.TinyDBBufferedStorage import TinyDBBufferedStorage
+from acmecse.helpers.TinyDBBetterTable import TinyDBBetterTable
+from init import *
+
+
+_table = 'resources'
+""" The name of the test table. """
+
+
+class _BlockingFile():
+	"""	A file wrapper whose *write()* blocks until it is released.
+	"""
+
+	def __init__(self, file:Any) -> None:
+		self.file = file
+		self.writing = Event()
+		self.release = Event()
+
+
+	def write(self, data:str) -> int:
+		self.writing.set()
+		self.release.wait(10)
+		return self.file.write(data)
+
+
+	def __getattr__(self, name:str) -> Any:
+		return getattr(self.file, name)
+
+
+class TestBufferedStorage(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.path = tempfile.mkdtemp()
+		self.db, self.table = self._open()
+
+
+	def tearDown(self) -> None:
+		if self.db:
+			self.db.close()
+		shutil.rmtree(self.path, ignore_errors = True)
+
+
+	def _file(self) -> str:
+		"""	Return the path of the database file.
+		"""
+		return os.path.join(self.path, 'db.json')
+
+
+	def _open(self) -> tuple[TinyDB, Table]:
+		"""	Open the database. Changes are written without delay.
+		"""
+		db = TinyDB(self._file(), storage = TinyDBBufferedStorage, write_delay = 0)
+		table = db.table(_table)
+		TinyDBBetterTable.assign(table)
+		return db, table
+
+
+	def _storage(self) -> TinyDBBufferedStorage:
+		return self.db.storage	# type:ignore[return-value]
+
+
+	def test_writeReload(self) -> None:
+		"""	Write the database file and load it again """
+		for n in range(3):
+			self.table.insert({ 'a': n })		# The table assigns the IDs '1', '2' and '3'
+		self.table.remove(doc_ids = [ '2' ])	# type:ignore[list-item]
+		self.db.close()
+		with open(self._file(), 'r', encoding = 'utf-8') as file:
+			self.assertEqual(json.load(file), { _table: { '1': { 'a': 0 }, '3': { 'a': 2 } } })
+		self.db, self.table = self._open()
+		self.assertEqual(self._storage().read(), { _table: { '1': { 'a': 0 }, '3': { 'a': 2 } } })
+
+
+	def test_snapshot(self) -> None:
+		"""	Take a snapshot that is not changed by later writes """
+		self.table.insert({ 'a': 1 })
+		snapshot = self._storage().snapshot()
+		self.table.update({ 'a': 11 }, doc_ids = [ '1' ])	# type:ignore[list-item]
+		self.table.insert({ 'a': 2 })
+		self.assertEqual(snapshot, { _table: { '1': { 'a': 1 } } })
+
+
+	def test_batchDuringFileWrite(self) -> None:
+		"""	Don't block a batch of writes while the database file is written """
+		storage = self._storage()
+		storage._handle = blockingFile = _BlockingFile(storage._handle)
+		self.table.insert({ 'a': 1 })
+		self.assertTrue(blockingFile.writing.wait(10))	# The file writer is now writing
+
+		def batch() -> None:
+			with storage.batch():
+				self.table.insert({ 'a': 2 })
+
+		thread = Thread(target = batch)
+		thread.start()
+		thread.join(5)
+		batchFinished = not thread.is_alive()
+		blockingFile.release.set()
+		thread.join()
+		self.assertTrue(batchFinished)
+
+		self.db.close()
+		self.db = None
+		with open(self._file(), 'r', encoding = 'utf-8') as file:
+			self.assertEqual(json.load(file), { _table: { '1': { 'a': 1 }, '2': { 'a': 2 } } })
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestBufferedStorage, [
+
+		'test_writeReload',
+		'test_snapshot',
+		'test_batchDuringFileWrite',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
@@ -119,6 +119,61 @@ class TestCIN(unittest.TestCase):
 		self.assertEqual(rsc, RC.OPERATION_NOT_ALLOWED, r)
 
 
+	@unittest.skipIf(noCSE, 'No CSEBase')
+	def test_retrieveCINWithEntityTag(self) -> None:
+		""" Retrieve <CIN> with If-None-Match """
+		if BINDING not in ['http', 'https']:
+			self.skipTest('Entity tags are only checked for http')
+		r, rsc = RETRIEVE(cinURL, TestCIN.originator)
+		self.assertEqual(rsc, RC.OK, r)
+		self.assertIsNotNone(etag := lastHeaders().get('ETag'))
+
+		# Unchanged
+		r, rsc = RETRIEVE(cinURL, TestCIN.originator, headers = { 'If-None-Match': etag })
+		self.assertEqual(lastHttpStatus(), 304)
+		self.assertFalse(r)
+		self.assertEqual(lastHeaders().get('ETag'), etag)
+
+		# A different entity tag
+		r, rsc = RETRIEVE(cinURL, TestCIN.originator, headers = { 'If-None-Match': 'W/"0000000000000000"' })
+		self.assertEqual(rsc, RC.OK, r)
+		self.assertEqual(lastHttpStatus(), 200)
+		self.assertEqual(findXPath(r, 'm2m:cin/con'), 'AnyValue')
+
+
+	@unittest.skipIf(noCSE, 'No CSEBase')
+	def test_discoverCINWithEntityTag(self) -> None:
+		""" Discover <CIN> under <CNT> with If-None-Match """
+		if BINDING not in ['http', 'https']:
+			self.skipTest('Entity tags are only checked for http')
+		r, rsc = RETRIEVE(f'{cntURL}?fu=1&ty={int(T.CIN)}', TestCIN.originator)
+		self.assertEqual(rsc, RC.OK, r)
+		self.assertEqual(len(findXPath(r, 'm2m:uril')), 1)
+		self.assertIsNotNone(etag := lastHeaders().get('ETag'))
+
+		# Unchanged
+		r, rsc = RETRIEVE(f'{cntURL}?fu=1&ty={int(T.CIN)}', TestCIN.originator, headers = { 'If-None-Match': etag })
+		self.assertEqual(lastHttpStatus(), 304)
+		self.assertFalse(r)
+
+		# Different filter criteria
+		r, rsc = RETRIEVE(f'{cntURL}?fu=1&ty={int(T.CIN)}&cty=text/plain:0', TestCIN.originator, headers = { 'If-None-Match': etag })
+		self.assertEqual(rsc, RC.OK, r)
+		self.assertEqual(lastHttpStatus(), 200)
+		self.assertNotEqual(lastHeaders().get('ETag'), etag)
+
+		# Changed after another <CIN> is created
+		r, rsc = CREATE(cntURL, TestCIN.originator, T.CIN, { 'm2m:cin' : { 'rn' : f'{cinRN}2', 'con' : 'AnotherValue' }})
+		self.assertEqual(rsc, RC.CREATED, r)
+		r, rsc = RETRIEVE(f'{cntURL}?fu=1&ty={int(T.CIN)}', TestCIN.originator, headers = { 'If-None-Match': etag })
+		self.assertEqual(rsc, RC.OK, r)
+		self.assertEqual(lastHttpStatus(), 200)
+		self.assertEqual(len(findXPath(r, 'm2m:uril')), 2)
+		self.assertNotEqual(lastHeaders().get('ETag'), etag)
+		_, rsc = DELETE(f'{cinURL}2', TestCIN.originator)
+		self.assertEqual(rsc, RC.DELETED)
+
+
 	@unittest.skipIf(noCSE, 'No CSEBase')
 	def test_createCINUnderAE(self) -> None:
 		""" Create <CIN> resource under <AE> -> Fail """
@@ -366,6 +421,8 @@ def run(testFailFast:bool) -> TestResult:
 		'test_retrieveCIN',
 		'test_attributesCIN',
 		'test_updateCINFail',
+		'test_retrieveCINWithEntityTag',
+		'test_discoverCINWithEntityTag',
 		'test_createCINUnderAE',
 
 		# Various content types
@@ -0,0 +1,113 @@
+#
+#	testCappedCollection.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the CappedCollection that keeps the recorded requests
+#
+
+import unittest, sys
+from typing import Optional
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.helpers.CappedCollection import CappedCollection
+from init import *
+
+
+class TestCappedCollection(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.collection = CappedCollection()
+
+
+	def _keys(self, ri:Optional[str] = None) -> list[str]:
+		"""	Return the keys of the documents for a resource ID, or of all documents.
+		"""
+		return [ doc['key'] for doc in self.collection.get(ri) ]
+
+
+	def test_add(self) -> None:
+		"""	Add documents and return them in insertion order """
+		for n in range(4):
+			self.assertEqual(self.collection.add(f'k{n}', f'cnt{n % 2}', { 'key': f'k{n}' }), [])
+		self.collection.add('k4', None, { 'key': 'k4' })	# not indexed for a resource
+		self.assertEqual(len(self.collection), 5)
+		self.assertIn('k4', self.collection)
+		self.assertNotIn('k5', self.collection)
+		self.assertEqual(self._keys(), [ 'k0', 'k1', 'k2', 'k3', 'k4' ])
+		self.assertEqual(self._keys('cnt0'), [ 'k0', 'k2' ])
+		self.assertEqual(self._keys('cnt1'), [ 'k1', 'k3' ])
+		self.assertEqual(self._keys('unknown'), [])
+
+
+	def test_evict(self) -> None:
+		"""	Evict the oldest documents when the maximum size is exceeded """
+		for n in range(3):
+			self.collection.add(f'k{n}', 'cnt1', { 'key': f'k{n}' }, 3)
+		self.assertEqual(self.collection.add('k3', 'cnt2', { 'key': 'k3' }, 3), [ 'k0' ])
+		self.assertEqual(self._keys('cnt1'), [ 'k1', 'k2' ])
+
+		# The maximum size can change between calls
+		self.assertEqual(self.collection.add('k4', 'cnt2', { 'key': 'k4' }, 1), [ 'k1', 'k2', 'k3' ])
+		self.assertEqual(self._keys(), [ 'k4' ])
+		self.assertNotIn('cnt1', self.collection._index)
+		self.assertEqual(self.collection.add('k5', 'cnt2', { 'key': 'k5' }, 0), [ 'k4', 'k5' ])
+		self.assertEqual(len(self.collection), 0)
+		self.assertEqual(self.collection._index, {})
+
+
+	def test_replace(self) -> None:
+		"""	Replace a document with the same key and make it the newest document """
+		self.collection.add('k0', 'cnt1', { 'key': 'k0', 'n': 0 })
+		self.collection.add('k1', 'cnt1', { 'key': 'k1' })
+		self.collection.add('k0', 'cnt2', { 'key': 'k0', 'n': 1 })
+		self.assertEqual(self._keys(), [ 'k1', 'k0' ])
+		self.assertEqual(self._keys('cnt1'), [ 'k1' ])
+		self.assertEqual(self.collection.get('cnt2'), [ { 'key': 'k0', 'n': 1 } ])
+		self.assertEqual(self.collection.add('k2', 'cnt1', { 'key': 'k2' }, 2), [ 'k1' ])
+
+
+	def test_remove(self) -> None:
+		"""	Remove the documents of a resource, or all documents """
+		for n in range(4):
+			self.collection.add(f'k{n}', f'cnt{n % 2}', { 'key': f'k{n}' })
+		self.assertEqual(self.collection.remove('cnt0'), [ 'k0', 'k2' ])
+		self.assertEqual(self._keys(), [ 'k1', 'k3' ])
+		self.assertEqual(self.collection.remove('unknown'), [])
+		self.assertEqual(self.collection.remove(), [ 'k1', 'k3' ])
+		self.assertEqual(len(self.collection), 0)
+		self.assertEqual(self.collection._index, {})
+
+
+	def test_clear(self) -> None:
+		"""	Remove all documents """
+		self.collection.add('k0', 'cnt1', { 'key': 'k0' })
+		self.collection.clear()
+		self.assertEqual(self._keys(), [])
+		self.assertEqual(self._keys('cnt1'), [])
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestCappedCollection, [
+
+		'test_add',
+		'test_evict',
+		'test_replace',
+		'test_remove',
+		'test_clear',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
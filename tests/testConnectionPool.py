@@ -0,0 +1,216 @@
+#
+#	testConnectionPool.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the ConnectionPool that is used by the PostgreSQL binding
+#
+
+import unittest, sys
+from typing import Any
+from threading import Event, Thread
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.helpers.ConnectionPool import ConnectionPool
+from init import *
+
+
+class _Connection():
+	"""	A connection that records whether it was checked and closed.
+	"""
+
+	def __init__(self, number:int) -> None:
+		self.number = number
+		self.closed = False
+		self.usable = True
+		self.checks = 0
+
+
+class TestConnectionPool(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.connections:list[_Connection] = []
+		self.failConnect = False
+
+
+	def _connect(self) -> _Connection:
+		if self.failConnect:
+			raise ConnectionError('cannot connect')
+		connection = _Connection(len(self.connections))
+		self.connections.append(connection)
+		return connection
+
+
+	def _check(self, connection:_Connection) -> bool:
+		connection.checks += 1
+		return connection.usable
+
+
+	def _close(self, connection:_Connection) -> None:
+		connection.closed = True
+
+
+	def _pool(self, **kwargs:Any) -> ConnectionPool:
+		"""	Create and open a connection pool.
+		"""
+		pool = ConnectionPool(self._connect, self._check, lambda connection: connection.closed, self._close, **kwargs)
+		pool.open()
+		return pool
+
+
+	def _holdConnection(self, pool:ConnectionPool, release:Event) -> Thread:
+		"""	Check out a connection in another thread and hold it until *release* is set.
+		"""
+		holding = Event()
+		def hold() -> None:
+			with pool.connection():
+				holding.set()
+				release.wait(10)
+		thread = Thread(target = hold)
+		thread.start()
+		self.assertTrue(holding.wait(10))
+		return thread
+
+
+	def test_open(self) -> None:
+		"""	Create the minimum number of connections when the pool is opened """
+		pool = self._pool(minSize = 2, maxSize = 4)
+		self.assertEqual(len(pool), 2)
+		self.assertEqual(len(self.connections), 2)
+		with pool.connection() as connection:
+			self.assertIn(connection, self.connections)
+		self.assertEqual(len(self.connections), 2)
+
+
+	def test_nestedCheckout(self) -> None:
+		"""	Return the same connection for nested checkouts in a thread, and another one for a dedicated checkout """
+		pool = self._pool(minSize = 1, maxSize = 2)
+		with pool.connection() as outer:
+			with pool.connection() as inner:
+				self.assertIs(inner, outer)
+			with pool.dedicatedConnection() as dedicated:
+				self.assertIsNot(dedicated, outer)
+		self.assertEqual(len(pool), 2)
+
+
+	def test_threads(self) -> None:
+		"""	Hand out different connections to different threads """
+		pool = self._pool(minSize = 1, maxSize = 2)
+		release = Event()
+		thread = self._holdConnection(pool, release)
+		with pool.connection() as connection:
+			self.assertEqual(len(self.connections), 2)
+			self.assertIs(connection, self.connections[1])
+		release.set()
+		thread.join()
+
+
+	def test_timeout(self) -> None:
+		"""	Raise a TimeoutError when no connection becomes available """
+		pool = self._pool(minSize = 1, maxSize = 1, timeout = 0.2)
+		release = Event()
+		thread = self._holdConnection(pool, release)
+		with self.assertRaises(TimeoutError):
+			with pool.connection():
+				pass
+		release.set()
+		thread.join()
+
+
+	def test_waitForConnection(self) -> None:
+		"""	Wait until a connection is returned to the pool """
+		pool = self._pool(minSize = 1, maxSize = 1, timeout = 10)
+		release = Event()
+		thread = self._holdConnection(pool, release)
+		def returnConnection() -> None:
+			testSleep(0.2)
+			release.set()
+		Thread(target = returnConnection).start()
+		with pool.connection() as connection:
+			self.assertIs(connection, self.connections[0])
+		thread.join()
+
+
+	def test_discardClosed(self) -> None:
+		"""	Discard a connection that was closed while it was in use """
+		pool = self._pool(minSize = 1, maxSize = 1)
+		with pool.connection() as connection:
+			connection.closed = True	# e.g. after an error
+		self.assertEqual(len(pool), 0)
+		with pool.connection() as connection:
+			self.assertIs(connection, self.connections[1])
+		self.assertEqual(len(pool), 1)
+
+
+	def test_checkIdle(self) -> None:
+		"""	Check connections that were idle, and replace unusable connections """
+		pool = self._pool(minSize = 1, maxSize = 1, checkInterval = 0)
+		self.connections[0].usable = False
+		with pool.connection() as connection:
+			self.assertIs(connection, self.connections[1])
+		self.assertEqual(self.connections[0].checks, 1)
+		self.assertTrue(self.connections[0].closed)
+		self.assertEqual(len(pool), 1)
+
+		pool = self._pool(minSize = 1, maxSize = 1, checkInterval = 3600)
+		with pool.connection() as connection:
+			self.assertEqual(connection.checks, 0)
+
+
+	def test_connectFails(self) -> None:
+		"""	Release the reserved slot when a connection cannot be created """
+		pool = self._pool(minSize = 0, maxSize = 1)
+		self.failConnect = True
+		with self.assertRaises(ConnectionError):
+			with pool.connection():
+				pass
+		self.assertEqual(len(pool), 0)
+		self.failConnect = False
+		with pool.connection() as connection:
+			self.assertIs(connection, self.connections[0])
+
+
+	def test_close(self) -> None:
+		"""	Close idle connections, and connections in use when they are returned """
+		pool = self._pool(minSize = 2, maxSize = 2)
+		release = Event()
+		thread = self._holdConnection(pool, release)
+		pool.close()
+		self.assertEqual([ c.closed for c in self.connections ], [ True, False ])	# the most recently returned connection is in use
+		release.set()
+		thread.join()
+		self.assertTrue(self.connections[1].closed)
+		self.assertEqual(len(pool), 0)
+		with self.assertRaises(RuntimeError):
+			with pool.connection():
+				pass
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestConnectionPool, [
+
+		'test_open',
+		'test_nestedCheckout',
+		'test_threads',
+		'test_timeout',
+		'test_waitForConnection',
+		'test_discardClosed',
+		'test_checkIdle',
+		'test_connectFails',
+		'test_close',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
@@ -0,0 +1,203 @@
+#
+#	testCreateResources.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the batch creation of resources with Dispatcher.createLocalResources()
+#
+
+import unittest, sys
+from typing import Any, Optional, Sequence
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.etc.Types import ResourceTypes as T
+from acmecse.etc.ResponseStatusCodes import BAD_REQUEST
+from acmecse.services.Dispatcher import Dispatcher
+from init import *
+
+
+class _Storage():
+	"""	A minimal storage that only keeps the created resources.
+	"""
+
+	def __init__(self) -> None:
+		self.resources:dict[str, _Resource] = {}
+
+
+	def createResources(self, resources:Sequence['_Resource']) -> None:
+		for resource in resources:
+			self.resources[resource.ri] = resource
+
+
+	def hasResource(self, ri:str) -> bool:
+		return ri in self.resources
+
+
+class _Resource():
+	"""	A minimal resource that records how it is activated and notified.
+	"""
+
+	def __init__(self, ri:str, pi:Optional[str] = None, ty:T = T.CNT) -> None:
+		self.ri = ri
+		self.pi = pi
+		self.ty = ty
+		self.failActivate = False
+		self.failChildrenAdded = False
+		self.removeChild:Optional[str] = None
+		self.childrenAddedCalls:list[list[str]] = []
+
+
+	def activate(self, parentResource:'_Resource', originator:str) -> None:
+		if self.failActivate:
+			raise BAD_REQUEST('invalid attribute')
+
+
+	def childrenAdded(self, childResources:list['_Resource'], originator:str) -> None:
+		self.childrenAddedCalls.append([ r.ri for r in childResources ])
+		if self.removeChild:	# e.g. a container that removes its oldest instance
+			del _TestDispatcher.storage.resources[self.removeChild]
+		if self.failChildrenAdded:
+			raise BAD_REQUEST('cannot add children')
+
+
+	def canHaveChild(self, resource:'_Resource') -> bool:
+		return True
+
+
+	def isVirtual(self) -> bool:
+		return False
+
+
+	def dbUpdate(self, finalize:bool = False) -> '_Resource':
+		return self
+
+
+	def dbReload(self) -> '_Resource':
+		return self
+
+
+	def dbDelete(self) -> None:
+		del _TestDispatcher.storage.resources[self.ri]
+
+
+	def getOriginator(self) -> str:
+		return ORIGINATOR
+
+
+class _TestDispatcher(Dispatcher):
+	"""	Dispatcher that retrieves the parent resources from a dictionary and records the deleted resources.
+	"""
+
+	storage:_Storage	# type:ignore[assignment]
+	parentResources:dict[str, _Resource] = {}
+	deleted:list[tuple[str, bool]] = []
+
+
+	def retrieveLocalResource(self, ri:str, *args:Any, **kwargs:Any) -> _Resource:	# type:ignore[override]
+		return self.parentResources[ri]
+
+
+	def deleteLocalResource(self, resource:_Resource, 							# type:ignore[override]
+								  originator:Optional[str] = None,
+								  withDeregistration:Optional[bool] = False,
+								  parentResource:Optional[_Resource] = None,
+								  doDeleteCheck:Optional[bool] = True) -> None:
+		self.deleted.append((resource.ri, doDeleteCheck))
+		del self.storage.resources[resource.ri]
+
+
+class TestCreateResources(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.parents = [ _Resource('parent1', ty = T.AE), _Resource('parent2', ty = T.AE) ]
+		_TestDispatcher.storage = _Storage()
+		_TestDispatcher.parentResources = { parent.ri: parent for parent in self.parents }
+		_TestDispatcher.deleted = []
+		self.dispatcher = _TestDispatcher()
+
+
+	def _resources(self) -> list[_Resource]:
+		"""	Return two new resources for each parent resource.
+		"""
+		return [ _Resource(f'{parent.ri}_cnt{n}', parent.ri) for parent in self.parents for n in range(2) ]
+
+
+	def test_createBatch(self) -> None:
+		"""	Create a batch and notify each parent resource once """
+		resources = self._resources()
+		self.assertEqual(self.dispatcher.createLocalResources(resources), resources)	# type:ignore[arg-type]
+		self.assertEqual(sorted(self.dispatcher.storage.resources), sorted(r.ri for r in resources))
+		self.assertEqual(self.parents[0].childrenAddedCalls, [ [ 'parent1_cnt0', 'parent1_cnt1' ] ])
+		self.assertEqual(self.parents[1].childrenAddedCalls, [ [ 'parent2_cnt0', 'parent2_cnt1' ] ])
+		self.assertEqual(_TestDispatcher.deleted, [])
+
+
+	def test_activateFails(self) -> None:
+		"""	Delete the whole batch when a resource cannot be activated """
+		resources = self._resources()
+		resources[2].failActivate = True
+		with self.assertRaises(BAD_REQUEST):
+			self.dispatcher.createLocalResources(resources)	# type:ignore[arg-type]
+		self.assertEqual(self.dispatcher.storage.resources, {})
+		# The activated resources are deleted without notifying their parent resources
+		self.assertEqual(_TestDispatcher.deleted, [ ('parent1_cnt0', False), ('parent1_cnt1', False) ])
+		self.assertEqual(self.parents[0].childrenAddedCalls, [])
+
+
+	def test_childrenAddedFails(self) -> None:
+		"""	Delete the whole batch when a parent resource cannot add its new child resources """
+		resources = self._resources()
+		self.parents[1].failChildrenAdded = True
+		with self.assertRaises(BAD_REQUEST):
+			self.dispatcher.createLocalResources(resources)	# type:ignore[arg-type]
+		self.assertEqual(self.dispatcher.storage.resources, {})
+		# Both parent resources were notified about the new children, so both are notified about the removal, too
+		self.assertEqual(_TestDispatcher.deleted, [ (r.ri, True) for r in resources ])
+
+
+	def test_firstChildrenAddedFails(self) -> None:
+		"""	Don't notify parent resources about the removal when they were not notified about the creation """
+		resources = self._resources()
+		self.parents[0].failChildrenAdded = True
+		with self.assertRaises(BAD_REQUEST):
+			self.dispatcher.createLocalResources(resources)	# type:ignore[arg-type]
+		self.assertEqual(self.dispatcher.storage.resources, {})
+		self.assertEqual(self.parents[1].childrenAddedCalls, [])
+		self.assertEqual(_TestDispatcher.deleted, [ ('parent1_cnt0', True), ('parent1_cnt1', True), ('parent2_cnt0', False), ('parent2_cnt1', False) ])
+
+
+	def test_childRemovedByParent(self) -> None:
+		"""	Don't delete a resource again that was already removed by its parent resource """
+		resources = self._resources()
+		self.parents[0].removeChild = 'parent1_cnt0'
+		self.parents[1].failChildrenAdded = True
+		with self.assertRaises(BAD_REQUEST):
+			self.dispatcher.createLocalResources(resources)	# type:ignore[arg-type]
+		self.assertEqual(self.dispatcher.storage.resources, {})
+		self.assertEqual(_TestDispatcher.deleted, [ (r.ri, True) for r in resources[1:] ])
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestCreateResources, [
+
+		'test_createBatch',
+		'test_activateFails',
+		'test_childrenAddedFails',
+		'test_firstChildrenAddedFails',
+		'test_childRemovedByParent',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
@@ -0,0 +1,132 @@
+#
+#	testCronPattern.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the compiled cron patterns and the cron functions in DateUtils
+#
+
+import unittest, sys
+from datetime import datetime, timedelta, timezone
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.helpers.CronPattern import CronPattern, compileCronPattern
+from acmecse.etc.DateUtils import cronMatchesTimestamp, cronNextMatch, cronInPeriod
+from init import *
+
+
+class TestCronPattern(unittest.TestCase):
+
+	def test_matches(self) -> None:
+		"""	Match timestamps against patterns """
+		ts = datetime(2026, 10, 18, 12, 30, 15)	# A Sunday
+		self.assertTrue(cronMatchesTimestamp('* * * * * * *', ts))
+		self.assertTrue(cronMatchesTimestamp('15 30 12 18 10 0 2026', ts))
+		self.assertFalse(cronMatchesTimestamp('16 30 12 18 10 0 2026', ts))
+		self.assertTrue(cronMatchesTimestamp('*/5 0-30/10 10,12 * * * *', ts))
+		self.assertFalse(cronMatchesTimestamp('*/4 * * * * * *', ts))
+		self.assertTrue(cronMatchesTimestamp('* * * * * 0,6 *', ts))
+		self.assertFalse(cronMatchesTimestamp('* * * * * 1-5 *', ts))
+		self.assertTrue(cronMatchesTimestamp('* * * * * * */2', ts))
+		self.assertFalse(cronMatchesTimestamp('* * * * * * 2020-2025', ts))
+		self.assertTrue(cronMatchesTimestamp([ '15', '30', '12', '*', '*', '*', '*' ], ts))
+
+
+	def test_invalidPatterns(self) -> None:
+		"""	Reject invalid patterns """
+		for pattern in ( '', '* * * * * *', '* * * * * * * *', 'a * * * * * *', '*/0 * * * * * *', '1-5/0 * * * * * *', '5/2 * * * * * *', '1-a * * * * * *' ):
+			with self.assertRaises(ValueError, msg = pattern):
+				CronPattern(pattern)
+
+
+	def test_compileCache(self) -> None:
+		"""	Return the same compiled pattern for the same pattern """
+		self.assertIs(compileCronPattern('0 0 * * * * *'), compileCronPattern('0 0 * * * * *'))
+		self.assertIs(compileCronPattern([ '0', '0', '*', '*', '*', '*', '*' ]), compileCronPattern([ '0', '0', '*', '*', '*', '*', '*' ]))
+
+
+	def test_nextMatch(self) -> None:
+		"""	Find the next matching timestamp """
+		ts = datetime(2026, 10, 17, 12, 30, 15)
+		self.assertEqual(cronNextMatch('* * * * * * *', ts), ts)							# at the timestamp
+		self.assertEqual(cronNextMatch('* * * * * * *', ts.replace(microsecond = 1)), ts + timedelta(seconds = 1))
+		self.assertEqual(cronNextMatch('0 * * * * * *', ts), datetime(2026, 10, 17, 12, 31, 0))
+		self.assertEqual(cronNextMatch('0 0 0 * * * *', ts), datetime(2026, 10, 18, 0, 0, 0))
+		self.assertEqual(cronNextMatch('0 0 0 1 1 * *', ts), datetime(2027, 1, 1, 0, 0, 0))
+		self.assertEqual(cronNextMatch('0 0 0 29 2 * *', ts), datetime(2028, 2, 29, 0, 0, 0))	# leap day
+		self.assertEqual(cronNextMatch('0 0 0 13 * 5 *', ts), datetime(2026, 11, 13, 0, 0, 0))	# Friday 13th
+		self.assertEqual(cronNextMatch('10 20 8 * * * */5', ts), datetime(2030, 1, 1, 8, 20, 10))
+
+
+	def test_nextMatchTimezone(self) -> None:
+		"""	Keep the timezone of the timestamp """
+		ts = datetime(2026, 10, 17, 12, 30, 15, tzinfo = timezone.utc)
+		self.assertEqual(cronNextMatch('0 0 * * * * *', ts), datetime(2026, 10, 17, 13, 0, 0, tzinfo = timezone.utc))
+
+
+	def test_noNextMatch(self) -> None:
+		"""	Return None if there is no matching timestamp """
+		ts = datetime(2026, 10, 17, 12, 30, 15)
+		self.assertIsNone(cronNextMatch('0 0 0 31 2 * *', ts))
+		self.assertIsNone(cronNextMatch('* * * * * * 2020', ts))
+		self.assertIsNone(cronNextMatch('* * * * * * 2200', ts))	# later than 100 years
+
+
+	def test_nextMatchEqualsScan(self) -> None:
+		"""	Find the same next matching timestamps as a scan of every second """
+		start = datetime(2026, 2, 27, 22, 58, 30)
+		end = start + timedelta(days = 3)
+		for pattern in ( '*/15 */7 23,0-2 * * * *', '0 59 23 * * * *', '30 0 0 1,28 * * *', '0 0 12 * * 0 *' ):
+			compiled = compileCronPattern(pattern)
+			expected:list[datetime] = []
+			ts = start
+			while ts <= end:
+				if compiled.matches(ts):
+					expected.append(ts)
+				ts += timedelta(seconds = 1)
+
+			found:list[datetime] = []
+			ts = start
+			while (match := compiled.next(ts)) is not None and match <= end:
+				found.append(match)
+				ts = match + timedelta(seconds = 1)
+			self.assertGreater(len(found), 0, pattern)
+			self.assertEqual(found, expected, pattern)
+
+
+	def test_inPeriod(self) -> None:
+		"""	Check whether a pattern matches during a period """
+		start = datetime(2026, 10, 17, 12, 30, 15)
+		self.assertEqual(cronInPeriod('0 0 13 * * * *', start, start + timedelta(hours = 1)), (True, datetime(2026, 10, 17, 13, 0, 0)))
+		self.assertEqual(cronInPeriod('0 0 14 * * * *', start, start + timedelta(hours = 1)), (False, None))
+		with self.assertRaises(ValueError):
+			cronInPeriod('* * * * * * *', start, start - timedelta(seconds = 1))
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestCronPattern, [
+
+		'test_matches',
+		'test_invalidPatterns',
+		'test_compileCache',
+		'test_nextMatch',
+		'test_nextMatchTimezone',
+		'test_noNextMatch',
+		'test_nextMatchEqualsScan',
+		'test_inPeriod',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
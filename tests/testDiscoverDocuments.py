@@ -0,0 +1,254 @@
+#
+#	testDiscoverDocuments.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the resource discovery that matches the raw resource dictionaries
+#	before it instantiates the resources
+#
+
+import unittest, sys
+from copy import deepcopy
+from typing import Any
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.etc import Types
+from acmecse.etc.Types import ResourceTypes as T, FilterCriteria, FilterOperation, JSON
+from acmecse.resources.Resource import Resource
+from acmecse.services.Dispatcher import Dispatcher
+from init import *
+
+
+class _Resource(Resource):
+	"""	A resource type for the tests.
+	"""
+	typeShortname = 'm2m:tst'
+
+
+class _Storage():
+	"""	A storage that returns the raw child resource dictionaries of the test resource tree.
+	"""
+
+	def __init__(self, docs:dict[str, list[JSON]]) -> None:
+		self.docs = docs
+
+
+	def discoverResourcesInSubtree(self, *args:Any, **kwargs:Any) -> None:
+		return None		# Walk the resource tree
+
+
+	def directChildResources(self, pi:str, raw:bool = False) -> list[JSON]:
+		assert raw
+		return self.docs.get(pi, [])
+
+
+class _Factory():
+	"""	A factory that records the instantiated resources.
+	"""
+
+	def __init__(self) -> None:
+		self.instantiated:list[str] = []
+
+
+	def resourceFromDict(self, doc:JSON) -> _Resource:
+		self.instantiated.append(doc['ri'])
+		return _Resource({ 'm2m:tst': doc })
+
+
+class _Security():
+	"""	A security manager that denies access to some resources.
+	"""
+
+	def __init__(self) -> None:
+		self.denied:list[str] = []
+
+
+	def hasAccess(self, originator:str, resource:_Resource, *args:Any, **kwargs:Any) -> bool:
+		return resource.ri not in self.denied
+
+
+class _TestDispatcher(Dispatcher):
+	"""	Dispatcher that uses the test storage, factory and security manager.
+	"""
+	pass
+
+
+class TestDiscoverDocuments(unittest.TestCase):
+
+	def setUp(self) -> None:
+		# The instance and virtual resource types are usually registered by the Factory
+		self.instanceResources = Types._resourceTypesInstanceResourcesSet
+		self.virtualResources = Types._resourceTypesVirtualResourcesSet
+		Types._resourceTypesInstanceResourcesSet = [ T.CIN, T.FCI, T.TSI ]
+		Types._resourceTypesVirtualResourcesSet = [ T.CNT_LA, T.CNT_OL ]
+
+		# The raw child resource dictionaries of the test resource tree, by their parent resource IDs
+		self.docs:dict[str, list[JSON]] = {
+			'cse':  [ { 'ri': 'cnt1', 'pi': 'cse', 'ty': T.CNT, 'lbl': [ 'a', 'c' ], 'ct': '20261017T100000,000000', 'st': 1, 'et': '20271017T100000,000000', 'mni': 10 },
+					  { 'ri': 'cnt2', 'pi': 'cse', 'ty': T.CNT, 'lbl': [ 'b' ], 'ct': '20261017T120000,000000', 'st': 5, 'et': '20281017T100000,000000', 'mni': 20, 'nested': { 'a': 1 } } ],
+			'cnt1': [ { 'ri': 'cin1', 'pi': 'cnt1', 'ty': T.CIN, 'lbl': [ 'a' ], 'ct': '20261017T110000,000000', 'st': 0, 'cnf': 'text/plain:0', 'cs': 10, 'con': 'value' },
+					  { 'ri': 'la1', 'pi': 'cnt1', 'ty': T.CNT_LA } ],	# virtual resource
+			'la1':  [ { 'ri': 'cin9', 'pi': 'la1', 'ty': T.CIN, 'lbl': [ 'a' ] } ],	# the subtree of a virtual resource is not walked
+			'cin1': [],
+			'cnt2': [ { 'ri': 'cin2', 'pi': 'cnt2', 'ty': T.CIN, 'ct': '20261017T130000,000000', 'st': 0, 'cnf': 'application/json:0', 'cs': 100, 'con': 'other' } ],
+			'cin2': [],
+		}
+		self.original = deepcopy(self.docs)
+		_TestDispatcher.storage = _Storage(self.docs)			# type:ignore[assignment]
+		_TestDispatcher.factory = _Factory()					# type:ignore[assignment]
+		_TestDispatcher.security = _Security()					# type:ignore[assignment]
+		self.dispatcher = _TestDispatcher()						# type:ignore[assignment]
+
+
+	def tearDown(self) -> None:
+		Types._resourceTypesInstanceResourcesSet = self.instanceResources
+		Types._resourceTypesVirtualResourcesSet = self.virtualResources
+		self.assertEqual(self.docs, self.original)	# The raw resource dictionaries are never modified
+
+
+	def _discover(self, filterCriteria:FilterCriteria) -> list[str]:
+		"""	Discover the resources below the CSEBase and return their resource IDs.
+		"""
+		root = _Resource({ 'm2m:tst': { 'ri': 'cse', 'ty': T.CSEBase } })
+		return [ resource.ri for resource in self.dispatcher.iterateDiscoveredResources('cse', 'CAdmin', filterCriteria, rootResource = root) ]	# type:ignore[arg-type]
+
+
+	def _allLen(self, filterCriteria:FilterCriteria) -> int:
+		"""	Return the number of conditions that must match for the AND filter operation.
+		"""
+		allLen = len(filterCriteria.attributes)
+		for k, v in filterCriteria.criteriaAttributes().items():
+			allLen += len(v) if k in ( 'ty', 'cty', 'lbl' ) else 1
+		return allLen
+
+
+	def _expected(self, filterCriteria:FilterCriteria) -> list[str]:
+		"""	Match the instantiated resources of the tree, in the order of a depth-first walk.
+		"""
+		fo = filterCriteria.fo if filterCriteria.fo is not None else FilterOperation.AND
+		allLen = self._allLen(filterCriteria)
+		result:list[str] = []
+		def walk(pi:str) -> None:
+			for doc in self.original.get(pi, []):
+				if T(doc['ty']).isVirtual():
+					continue
+				if self.dispatcher._matchResource(_Resource({ 'm2m:tst': deepcopy(doc) }), fo, allLen, filterCriteria):
+					result.append(doc['ri'])
+				walk(doc['ri'])
+		walk('cse')
+		return result
+
+
+	def _assertDiscovery(self, filterCriteria:FilterCriteria, expected:list[str]) -> None:
+		"""	Discover the resources with and without instantiating them first, and only instantiate the matching resources.
+		"""
+		_TestDispatcher.factory.instantiated = []	# type:ignore[attr-defined]
+		self.assertEqual(self._expected(filterCriteria), expected)
+		self.assertEqual(self._discover(filterCriteria), expected)
+		self.assertEqual(_TestDispatcher.factory.instantiated, expected)	# type:ignore[attr-defined]
+
+
+	def test_noCriteria(self) -> None:
+		"""	Discover all resources except virtual resources """
+		self._assertDiscovery(FilterCriteria(), [ 'cnt1', 'cin1', 'cnt2', 'cin2' ])
+
+
+	def test_types(self) -> None:
+		"""	Match resource types and content types """
+		self._assertDiscovery(FilterCriteria(ty = [ T.CIN ]), [ 'cin1', 'cin2' ])
+		self._assertDiscovery(FilterCriteria(ty = [ T.CNT, T.CIN ]), [ 'cnt1', 'cin1', 'cnt2', 'cin2' ])
+		self._assertDiscovery(FilterCriteria(ty = [ T.CIN ], cty = [ 'application/json:0' ]), [ 'cin2' ])
+		self._assertDiscovery(FilterCriteria(ty = [ T.CNT_LA ]), [])
+
+
+	def test_labels(self) -> None:
+		"""	Match any of the labels """
+		self._assertDiscovery(FilterCriteria(lbl = [ 'a' ]), [ 'cnt1', 'cin1' ])
+		self._assertDiscovery(FilterCriteria(lbl = [ 'b', 'c' ]), [ 'cnt1', 'cnt2' ])
+		self._assertDiscovery(FilterCriteria(lbl = [ 'x' ]), [])
+
+
+	def test_timestamps(self) -> None:
+		"""	Match the creation, expiration and state tag conditions """
+		self._assertDiscovery(FilterCriteria(cra = '20261017T103000,000000'), [ 'cin1', 'cnt2', 'cin2' ])
+		self._assertDiscovery(FilterCriteria(cra = '20261017T103000,000000', crb = '20261017T123000,000000'), [ 'cin1', 'cnt2' ])
+		self._assertDiscovery(FilterCriteria(exb = '20280101T000000,000000'), [ 'cnt1' ])
+		self._assertDiscovery(FilterCriteria(sts = 0), [ 'cnt1', 'cnt2' ])
+		self._assertDiscovery(FilterCriteria(sts = 0, stb = 5), [ 'cnt1' ])
+
+
+	def test_sizes(self) -> None:
+		"""	Match the content sizes of instance resources """
+		self._assertDiscovery(FilterCriteria(sza = 10, szb = 100), [ 'cin1' ])
+		self._assertDiscovery(FilterCriteria(sza = 100), [ 'cin2' ])
+
+
+	def test_attributes(self) -> None:
+		"""	Match attributes, attribute paths and wildcards """
+		self._assertDiscovery(FilterCriteria(attributes = { 'mni': '10' }), [ 'cnt1' ])
+		self._assertDiscovery(FilterCriteria(attributes = { 'mni': '20' }), [ 'cnt2' ])
+		self._assertDiscovery(FilterCriteria(attributes = { 'nested/a': '1' }), [ 'cnt2' ])
+		self._assertDiscovery(FilterCriteria(attributes = { 'con': 'val*' }), [ 'cin1' ])
+		self._assertDiscovery(FilterCriteria(attributes = { 'unknown': 'x' }), [])
+
+
+	def test_filterOperations(self) -> None:
+		"""	Combine the conditions with AND and OR """
+		self._assertDiscovery(FilterCriteria(ty = [ T.CNT ], lbl = [ 'a' ]), [ 'cnt1' ])
+		self._assertDiscovery(FilterCriteria(ty = [ T.CNT ], lbl = [ 'a' ], fo = FilterOperation.OR), [ 'cnt1', 'cin1', 'cnt2' ])
+		self._assertDiscovery(FilterCriteria(ty = [ T.CNT ], attributes = { 'con': 'other' }, fo = FilterOperation.OR), [ 'cnt1', 'cnt2', 'cin2' ])
+		self._assertDiscovery(FilterCriteria(ty = [ T.CNT ], lbl = [ 'a' ], fo = FilterOperation.XOR), [])
+
+
+	def test_level(self) -> None:
+		"""	Only walk the resource tree down to the requested level """
+		self.assertEqual(self._discover(FilterCriteria(lvl = 1)), [ 'cnt1', 'cnt2' ])
+		self.assertEqual(self._discover(FilterCriteria(lvl = 0)), [])
+		self.assertEqual(_TestDispatcher.factory.instantiated, [ 'cnt1', 'cnt2' ])	# type:ignore[attr-defined]
+
+
+	def test_access(self) -> None:
+		"""	Check the access only for matching resources """
+		_TestDispatcher.security.denied = [ 'cnt1', 'cin2' ]	# type:ignore[attr-defined]
+		self.assertEqual(self._discover(FilterCriteria(ty = [ T.CNT ])), [ 'cnt2' ])
+		# The child resources of a resource without access are walked, too
+		self.assertEqual(_TestDispatcher.factory.instantiated, [ 'cnt1', 'cnt2' ])	# type:ignore[attr-defined]
+
+
+	def test_stopEarly(self) -> None:
+		"""	Only instantiate the resources that are consumed """
+		root = _Resource({ 'm2m:tst': { 'ri': 'cse', 'ty': T.CSEBase } })
+		discovered = self.dispatcher.iterateDiscoveredResources('cse', 'CAdmin', FilterCriteria(), rootResource = root)	# type:ignore[arg-type]
+		self.assertEqual(next(discovered).ri, 'cnt1')
+		self.assertEqual(_TestDispatcher.factory.instantiated, [ 'cnt1' ])	# type:ignore[attr-defined]
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestDiscoverDocuments, [
+
+		'test_noCriteria',
+		'test_types',
+		'test_labels',
+		'test_timestamps',
+		'test_sizes',
+		'test_attributes',
+		'test_filterOperations',
+		'test_level',
+		'test_access',
+		'test_stopEarly',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
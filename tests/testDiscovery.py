@@ -14,7 +14,7 @@ if '..' not in sys.path:
 	sys.path.append('..')
 from acmecse.etc.Types import ResultContentType as RCN
 from acmecse.etc.Types import ResourceTypes as T, ResponseStatusCode as RC
-from acmecse.etc.Types import DesiredIdentifierResultType, FilterOperation
+from acmecse.etc.Types import DesiredIdentifierResultType, FilterOperation, ContentStatus
 from acmecse.etc.DateUtils import getResourceDate
 from init import *
 
@@ -768,6 +768,121 @@ class TestDiscovery(unittest.TestCase):
 		self.assertEqual(len(findXPath(r, 'm2m:cnt/m2m:cin')), 5)
 
 
+	@unittest.skipIf(noCSE, 'No CSEBase')
+	def test_discoverWithLimAndOfstAcrossLevels(self) -> None:
+		""" Discover under <AE> with lim and ofst over several levels """
+		r, rsc = RETRIEVE(f'{aeURL}?fu=1', TestDiscovery.originator)
+		self.assertEqual(rsc, RC.OK, r)
+		allResults = findXPath(r, 'm2m:uril')
+		self.assertGreaterEqual(len(allResults), 12)	# 2 <CNT> with 5 <CIN> each
+		self.assertIn(f'{CSERN}/{aeRN}/{cntRN}', allResults)
+		self.assertIn(f'{CSERN}/{aeRN}/{cnt2RN}', allResults)
+
+		# Pages that start and end on different levels of the resource tree
+		for ofst, lim in [ (1, 3), (4, 5), (6, 2), (7, 6), (len(allResults), 1) ]:
+			r, rsc = RETRIEVE(f'{aeURL}?fu=1&ofst={ofst}&lim={lim}', TestDiscovery.originator)
+			self.assertEqual(rsc, RC.OK, r)
+			self.assertEqual(findXPath(r, 'm2m:uril'), allResults[ofst-1:ofst-1+lim], f'ofst={ofst} lim={lim}')
+		
+		# Pages together with a filter criteria
+		r, rsc = RETRIEVE(f'{aeURL}?fu=1&ty={int(T.CIN)}', TestDiscovery.originator)
+		self.assertEqual(rsc, RC.OK, r)
+		cinResults = findXPath(r, 'm2m:uril')
+		self.assertEqual(len(cinResults), 10)
+		r, rsc = RETRIEVE(f'{aeURL}?fu=1&ty={int(T.CIN)}&ofst=4&lim=4', TestDiscovery.originator)
+		self.assertEqual(rsc, RC.OK, r)
+		self.assertEqual(findXPath(r, 'm2m:uril'), cinResults[3:7])
+
+		# Offset after the last result
+		r, rsc = RETRIEVE(f'{aeURL}?fu=1&ofst={len(allResults)+1}', TestDiscovery.originator)
+		self.assertEqual(rsc, RC.OK, r)
+		self.assertFalse(findXPath(r, 'm2m:uril'))
+
+
+	@unittest.skipIf(noCSE, 'No CSEBase')
+	def test_discoverPartialContentStatus(self) -> None:
+		""" Discover under <AE> with lim and check the content status and offset """
+		if BINDING not in ['http', 'https']:
+			self.skipTest('Content status headers are only checked for http')
+		r, rsc = RETRIEVE(f'{aeURL}?fu=1', TestDiscovery.originator)
+		self.assertEqual(rsc, RC.OK, r)
+		allLen = len(findXPath(r, 'm2m:uril'))
+		self.assertNotIn('X-M2M-CTS', lastHeaders())
+		self.assertNotIn('X-M2M-CTO', lastHeaders())
+
+		# Partial content without and with an offset
+		r, rsc = RETRIEVE(f'{aeURL}?fu=1&lim=3', TestDiscovery.originator)
+		self.assertEqual(rsc, RC.OK, r)
+		self.assertEqual(lastHeaders().get('X-M2M-CTS'), str(int(ContentStatus.partialContent)))
+		self.assertEqual(lastHeaders().get('X-M2M-CTO'), '1')
+		r, rsc = RETRIEVE(f'{aeURL}?fu=1&ofst=5&lim=3', TestDiscovery.originator)
+		self.assertEqual(rsc, RC.OK, r)
+		self.assertEqual(lastHeaders().get('X-M2M-CTS'), str(int(ContentStatus.partialContent)))
+		self.assertEqual(lastHeaders().get('X-M2M-CTO'), '5')
+
+		# The page contains the last result
+		r, rsc = RETRIEVE(f'{aeURL}?fu=1&lim={allLen}', TestDiscovery.originator)
+		self.assertEqual(rsc, RC.OK, r)
+		self.assertNotIn('X-M2M-CTS', lastHeaders())
+		r, rsc = RETRIEVE(f'{aeURL}?fu=1&ofst={allLen}&lim=1', TestDiscovery.originator)
+		self.assertEqual(rsc, RC.OK, r)
+		self.assertNotIn('X-M2M-CTS', lastHeaders())
+
+
+	@unittest.skipIf(noCSE, 'No CSEBase')
+	def test_discoverWithEntityTag(self) -> None:
+		""" Discover under <AE> with If-None-Match and different filter criteria """
+		if BINDING not in ['http', 'https']:
+			self.skipTest('Entity tags are only checked for http')
+		r, rsc = RETRIEVE(f'{aeURL}?fu=1&ty={int(T.CIN)}', TestDiscovery.originator)
+		self.assertEqual(rsc, RC.OK, r)
+		self.assertIsNotNone(etag := lastHeaders().get('ETag'))
+
+		# Unchanged
+		r, rsc = RETRIEVE(f'{aeURL}?fu=1&ty={int(T.CIN)}', TestDiscovery.originator, headers = { 'If-None-Match': etag })
+		self.assertEqual(lastHttpStatus(), 304)
+		self.assertFalse(r)
+		self.assertEqual(lastHeaders().get('ETag'), etag)
+
+		# Different filter criteria result in different entity tags
+		etags = { etag }
+		for query in [ f'ty={int(T.CNT)}',
+					   f'ty={int(T.CIN)}&lim=2',
+					   f'ty={int(T.CIN)}&ofst=2',
+					   f'ty={int(T.CIN)}&lbl=tag:1',
+					   f'ty={int(T.CIN)}&cty=text/plain:0',
+					   f'ty={int(T.CIN)}&lvl=1',
+					   f'ty={int(T.CIN)}&con=aValue' ]:
+			r, rsc = RETRIEVE(f'{aeURL}?fu=1&{query}', TestDiscovery.originator, headers = { 'If-None-Match': etag })
+			self.assertEqual(rsc, RC.OK, r)
+			self.assertEqual(lastHttpStatus(), 200, query)
+			self.assertIsNotNone(_etag := lastHeaders().get('ETag'), query)
+			self.assertNotIn(_etag, etags, query)
+			etags.add(_etag)
+
+		# The order of the values in a list doesn't matter
+		r, rsc = RETRIEVE(f'{aeURL}?fu=1&ty={int(T.CNT)}+{int(T.CIN)}', TestDiscovery.originator)
+		self.assertEqual(rsc, RC.OK, r)
+		_etag = lastHeaders().get('ETag')
+		r, rsc = RETRIEVE(f'{aeURL}?fu=1&ty={int(T.CIN)}+{int(T.CNT)}', TestDiscovery.originator, headers = { 'If-None-Match': _etag })
+		self.assertEqual(lastHttpStatus(), 304)
+
+		# No entity tag for filter criteria that depend on the current time
+		r, rsc = RETRIEVE(f'{aeURL}?fu=1&ty={int(T.CIN)}&crb={TestDiscovery.crTimestamp2}', TestDiscovery.originator)
+		self.assertEqual(rsc, RC.OK, r)
+		self.assertNotIn('ETag', lastHeaders())
+
+		# Changed after an update
+		r, rsc = UPDATE(cntURL, TestDiscovery.originator, { 'm2m:cnt': { 'lbl': [ 'cntLbl' ] } })
+		self.assertEqual(rsc, RC.UPDATED, r)
+		r, rsc = RETRIEVE(f'{aeURL}?fu=1&ty={int(T.CIN)}', TestDiscovery.originator, headers = { 'If-None-Match': etag })
+		self.assertEqual(rsc, RC.OK, r)
+		self.assertEqual(lastHttpStatus(), 200)
+		self.assertEqual(len(findXPath(r, 'm2m:uril')), 10)
+		self.assertIsNotNone(_etag := lastHeaders().get('ETag'))
+		self.assertNotEqual(_etag, etag)
+
+
 	@unittest.skipIf(noCSE, 'No CSEBase')
 	def test_createCNTwithRCN2(self) -> None:
 		""" Create <CNT> with rcn=2"""
@@ -986,6 +1101,9 @@ def run(testFailFast:bool) -> TestResult:
 		'test_retrieveWithWrongFO',
 		'test_retrieveMgmtObjsRCN8',
 		'test_retrieveCINmatchLabel',
+		'test_discoverWithLimAndOfstAcrossLevels',
+		'test_discoverPartialContentStatus',
+		'test_discoverWithEntityTag',
 		'test_createCNTwithRCN2',
 		'test_createCNTwithRCN3',
 
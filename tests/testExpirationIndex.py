@@ -0,0 +1,122 @@
+#
+#	testExpirationIndex.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the in-memory index of resource expiration timestamps
+#
+
+import unittest, sys
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.helpers.ExpirationIndex import ExpirationIndex
+from init import *
+
+
+class TestExpirationIndex(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.index = ExpirationIndex()
+
+
+	def test_expired(self) -> None:
+		"""	Return the expired resources ordered by their expiration timestamps """
+		self.index.set('cnt1', '20261017T120000')
+		self.index.set('cnt2', '20261017T100000')
+		self.index.set('cnt3', '20261017T110000')
+		self.index.set('cnt4', '20261018T000000')
+		self.assertEqual(len(self.index), 4)
+		self.assertEqual(self.index.expired('20261017T120001'), [ 'cnt2', 'cnt3', 'cnt1' ])
+		self.assertEqual(self.index.expired('20261017T120000'), [ 'cnt2', 'cnt3' ])	# expired before the timestamp
+		self.assertEqual(self.index.expired('20261017T000000'), [])
+
+		# The entries stay in the index until the resources are removed
+		self.assertEqual(self.index.expired('20261017T120001'), [ 'cnt2', 'cnt3', 'cnt1' ])
+		self.assertEqual(len(self.index), 4)
+
+
+	def test_limit(self) -> None:
+		"""	Return at most a number of expired resources """
+		for n in range(5):
+			self.index.set(f'cnt{n}', f'2026101{n}T000000')
+		self.assertEqual(self.index.expired('20261231T000000', 2), [ 'cnt0', 'cnt1' ])
+		self.assertEqual(self.index.expired('20261231T000000', 0), [])
+		self.assertEqual(self.index.expired('20261231T000000'), [ 'cnt0', 'cnt1', 'cnt2', 'cnt3', 'cnt4' ])
+
+
+	def test_update(self) -> None:
+		"""	Use the latest expiration timestamp of an updated resource """
+		self.index.set('cnt1', '20261017T100000')
+		self.index.set('cnt2', '20261017T110000')
+		self.index.set('cnt1', '20261017T120000')
+		self.assertEqual(self.index.expired('20261017T113000'), [ 'cnt2' ])
+		self.index.set('cnt2', '20261017T090000')
+		self.assertEqual(self.index.expired('20261017T130000'), [ 'cnt2', 'cnt1' ])
+		self.assertEqual(len(self.index), 2)
+
+
+	def test_remove(self) -> None:
+		"""	Remove resources, also by setting an empty expiration timestamp """
+		self.index.set('cnt1', '20261017T100000')
+		self.index.set('cnt2', '20261017T110000')
+		self.index.set('cnt3', '20261017T120000')
+		self.index.remove('cnt1')
+		self.index.set('cnt2', None)
+		self.index.remove('unknown')	# Removing an unknown resource is ignored
+		self.assertEqual(self.index.expired('20261018T000000'), [ 'cnt3' ])
+		self.assertEqual(len(self.index), 1)
+
+
+	def test_addAgain(self) -> None:
+		"""	Return a resource only once when it is removed and added again with the same expiration timestamp """
+		self.index.set('cnt1', '20261017T100000')
+		self.index.remove('cnt1')
+		self.index.set('cnt1', '20261017T100000')
+		self.index.set('cnt1', '20261017T100000')	# Setting the same timestamp again is ignored
+		self.assertEqual(self.index.expired('20261018T000000'), [ 'cnt1' ])
+		self.assertEqual(self.index.expired('20261018T000000'), [ 'cnt1' ])
+
+
+	def test_rebuild(self) -> None:
+		"""	Remove outdated entries from the heap when there are too many of them """
+		for n in range(3000):
+			self.index.set('cnt1', f'2026{n:010d}')
+		self.assertLess(len(self.index._heap), 1100)
+		self.assertEqual(self.index.expired('2027'), [ 'cnt1' ])
+		self.assertEqual(self.index._expirations, { 'cnt1': '20260000002999' })
+
+
+	def test_clear(self) -> None:
+		"""	Remove all entries """
+		self.index.set('cnt1', '20261017T100000')
+		self.index.clear()
+		self.assertEqual(len(self.index), 0)
+		self.assertEqual(self.index.expired('20261018T000000'), [])
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestExpirationIndex, [
+
+		'test_expired',
+		'test_limit',
+		'test_update',
+		'test_remove',
+		'test_addAgain',
+		'test_rebuild',
+		'test_clear',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
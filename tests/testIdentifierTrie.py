@@ -0,0 +1,152 @@
+#
+#	testIdentifierTrie.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the IdentifierTrie, which maps structured resource names to
+#	resource IDs and back
+#
+
+import unittest, sys
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.etc.Types import ResourceTypes as T
+from acmecse.helpers.IdentifierTrie import IdentifierTrie
+from init import *
+
+
+class TestIdentifierTrie(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.trie = IdentifierTrie()
+		self.trie.add('id-in', 'cse-in', T.CSEBase)
+		self.trie.add('CAE1', 'cse-in/ae1', T.AE)
+		self.trie.add('cnt1', 'cse-in/ae1/cnt', T.CNT)
+		self.trie.add('cnt2', 'cse-in/ae1/cnt/cnt', T.CNT)
+
+
+	def test_resolve(self) -> None:
+		"""	Resolve structured resource names and resource IDs """
+		self.assertEqual(self.trie.riForSrn('cse-in/ae1/cnt'), 'cnt1')
+		self.assertEqual(self.trie.riForSrn('cse-in/ae1/cnt/cnt'), 'cnt2')
+		self.assertEqual(self.trie.riForSrn('cse-in'), 'id-in')
+		self.assertIsNone(self.trie.riForSrn('cse-in/ae2'))
+		self.assertIsNone(self.trie.riForSrn('cse-in/ae1/cnt/cnt/cnt'))
+		self.assertIsNone(self.trie.riForSrn('other'))
+		self.assertEqual(self.trie.srnForRi('cnt2'), 'cse-in/ae1/cnt/cnt')
+		self.assertIsNone(self.trie.srnForRi('unknown'))
+		self.assertIn('cnt1', self.trie)
+		self.assertNotIn('unknown', self.trie)
+
+
+	def test_identifier(self) -> None:
+		"""	Return the identifier mapping by resource ID or structured resource name """
+		expected = { 'ri': 'cnt1', 'rn': 'cnt', 'srn': 'cse-in/ae1/cnt', 'ty': T.CNT }
+		self.assertEqual(self.trie.identifier(ri = 'cnt1'), expected)
+		self.assertEqual(self.trie.identifier(srn = 'cse-in/ae1/cnt'), expected)
+		self.assertEqual(self.trie.identifier(ri = 'cnt2', srn = 'cse-in/ae1/cnt'), expected)	# srn takes precedence
+		self.assertIsNone(self.trie.identifier(ri = 'unknown'))
+		self.assertIsNone(self.trie.identifier())
+
+
+	def test_ancestors(self) -> None:
+		"""	Return the ancestors of a resource """
+		self.assertEqual(self.trie.ancestors('cnt2'), [ 'cnt1', 'CAE1', 'id-in' ])
+		self.assertEqual(self.trie.ancestors('id-in'), [])
+		self.assertEqual(self.trie.ancestors('unknown'), [])
+
+
+	def test_unknownParent(self) -> None:
+		"""	Add a resource before its parent resource """
+		self.trie.add('cin1', 'cse-in/ae2/cnt/cin', T.CIN)
+		self.assertEqual(self.trie.riForSrn('cse-in/ae2/cnt/cin'), 'cin1')
+		self.assertIsNone(self.trie.riForSrn('cse-in/ae2/cnt'))
+		self.assertIsNone(self.trie.identifier(srn = 'cse-in/ae2'))
+		self.assertEqual(self.trie.ancestors('cin1'), [ 'id-in' ])
+
+		# Complete the parent resources
+		self.trie.add('cnt3', 'cse-in/ae2/cnt', T.CNT)
+		self.trie.add('CAE2', 'cse-in/ae2', T.AE)
+		self.assertEqual(self.trie.riForSrn('cse-in/ae2/cnt'), 'cnt3')
+		self.assertEqual(self.trie.ancestors('cin1'), [ 'cnt3', 'CAE2', 'id-in' ])
+
+
+	def test_remove(self) -> None:
+		"""	Remove a resource and its descendants """
+		self.trie.remove('cnt1')
+		self.assertNotIn('cnt1', self.trie)
+		self.assertNotIn('cnt2', self.trie)
+		self.assertIsNone(self.trie.riForSrn('cse-in/ae1/cnt'))
+		self.assertIsNone(self.trie.riForSrn('cse-in/ae1/cnt/cnt'))
+		self.assertEqual(self.trie.riForSrn('cse-in/ae1'), 'CAE1')
+		self.trie.remove('unknown')	# Removing an unknown resource is ignored
+
+		# A new resource with the same name can be added again
+		self.trie.add('cnt3', 'cse-in/ae1/cnt', T.CNT)
+		self.assertEqual(self.trie.riForSrn('cse-in/ae1/cnt'), 'cnt3')
+		self.assertIsNone(self.trie.riForSrn('cse-in/ae1/cnt/cnt'))
+
+		self.trie.remove('id-in')
+		self.assertEqual(self.trie._nodes, {})
+		self.assertEqual(self.trie._roots, {})
+
+
+	def test_move(self) -> None:
+		"""	Move a resource that is added with another structured resource name """
+		self.trie.add('cnt1', 'cse-in/ae1/other', T.CNT)
+		self.assertIsNone(self.trie.riForSrn('cse-in/ae1/cnt'))
+		self.assertEqual(self.trie.riForSrn('cse-in/ae1/other'), 'cnt1')
+		self.assertEqual(self.trie.srnForRi('cnt1'), 'cse-in/ae1/other')
+		self.assertNotIn('cnt2', self.trie)		# The descendants must be added again
+
+
+	def test_replaceName(self) -> None:
+		"""	Replace a resource by another resource with the same structured resource name """
+		self.trie.add('cnt3', 'cse-in/ae1/cnt', T.CNT)
+		self.assertEqual(self.trie.riForSrn('cse-in/ae1/cnt'), 'cnt3')
+		self.assertNotIn('cnt1', self.trie)
+		self.assertEqual(self.trie.ancestors('cnt2'), [ 'cnt3', 'CAE1', 'id-in' ])
+
+		# Removing the replaced resource doesn't remove the new one
+		self.trie.remove('cnt1')
+		self.assertEqual(self.trie.riForSrn('cse-in/ae1/cnt'), 'cnt3')
+
+
+	def test_loadClear(self) -> None:
+		"""	Replace the content of the trie, and clear it """
+		self.trie.load([ { 'ri': 'id-in', 'srn': 'cse-in', 'ty': T.CSEBase },
+						 { 'ri': 'CAE3', 'srn': 'cse-in/ae3' } ])
+		self.assertNotIn('CAE1', self.trie)
+		self.assertEqual(self.trie.identifier(ri = 'CAE3'), { 'ri': 'CAE3', 'rn': 'ae3', 'srn': 'cse-in/ae3', 'ty': None })
+		self.trie.clear()
+		self.assertNotIn('id-in', self.trie)
+		self.assertIsNone(self.trie.riForSrn('cse-in'))
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestIdentifierTrie, [
+
+		'test_resolve',
+		'test_identifier',
+		'test_ancestors',
+		'test_unknownParent',
+		'test_remove',
+		'test_move',
+		'test_replaceName',
+		'test_loadClear',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
@@ -0,0 +1,118 @@
+#
+#	testInstanceIndex.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the InstanceIndex, which orders the instance resources of a
+#	container by their creation times
+#
+
+import unittest, sys
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.etc.Types import ResourceTypes as T
+from acmecse.helpers.InstanceIndex import InstanceIndex
+from init import *
+
+
+class TestInstanceIndex(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.index = InstanceIndex()
+
+
+	def _instances(self, pi:str = 'cnt1', ty:int = T.CIN) -> list[str]:
+		"""	Return the resource IDs of the instances of a parent resource in their order.
+		"""
+		return [ self.index.get(pi, ty, i) for i in range(self.index.count(pi, ty)) ]
+
+
+	def test_get(self) -> None:
+		"""	Return instances by their position in the creation time order """
+		for n in range(3):
+			self.index.add('cnt1', T.CIN, f'cin{n}', f'00{n}')
+		self.assertEqual(self.index.get('cnt1', T.CIN, 0), 'cin0')
+		self.assertEqual(self.index.get('cnt1', T.CIN, -1), 'cin2')
+		self.assertEqual(self.index.get('cnt1', T.CIN, 1), 'cin1')
+		self.assertEqual(self.index.get('cnt1', T.CIN, -3), 'cin0')
+		self.assertIsNone(self.index.get('cnt1', T.CIN, 3))
+		self.assertIsNone(self.index.get('cnt1', T.CIN, -4))
+		self.assertIsNone(self.index.get('cnt1', T.FCI, 0))
+		self.assertIsNone(self.index.get('cnt2', T.CIN, 0))
+		self.assertEqual(self.index.count('cnt1', T.CIN), 3)
+		self.assertEqual(self.index.count('cnt2', T.CIN), 0)
+
+
+	def test_order(self) -> None:
+		"""	Order instances by their creation times, and keep the order of instances with the same creation time """
+		self.index.add('cnt1', T.CIN, 'cin1', '002')
+		self.index.add('cnt1', T.CIN, 'cin2', '001')
+		self.index.add('cnt1', T.CIN, 'cin3', '003')
+		self.index.add('cnt1', T.CIN, 'cin4', '002')
+		self.index.add('cnt1', T.CIN, 'cin5', '001')
+		self.assertEqual(self._instances(), [ 'cin2', 'cin5', 'cin1', 'cin4', 'cin3' ])
+
+
+	def test_parentsTypes(self) -> None:
+		"""	Keep separate instances for each parent resource and type """
+		self.index.add('cnt1', T.CIN, 'cin1', '001')
+		self.index.add('cnt2', T.CIN, 'cin2', '001')
+		self.index.add('ts1', T.TSI, 'tsi1', '001')
+		self.index.add('cnt1', T.SUB, 'sub1', '001')
+		self.assertEqual(self._instances('cnt1'), [ 'cin1' ])
+		self.assertEqual(self._instances('cnt2'), [ 'cin2' ])
+		self.assertEqual(self._instances('ts1', T.TSI), [ 'tsi1' ])
+		self.assertEqual(self._instances('cnt1', T.SUB), [ 'sub1' ])
+
+
+	def test_remove(self) -> None:
+		"""	Remove the oldest and other instances """
+		for ri, ct in ( ('cin1', '001'), ('cin2', '002'), ('cin3', '002'), ('cin4', '003') ):
+			self.index.add('cnt1', T.CIN, ri, ct)
+		self.index.remove('cnt1', T.CIN, 'cin1', '001')
+		self.assertEqual(self._instances(), [ 'cin2', 'cin3', 'cin4' ])
+		self.index.remove('cnt1', T.CIN, 'cin3', '002')
+		self.assertEqual(self._instances(), [ 'cin2', 'cin4' ])
+
+		# Removing an unknown instance is ignored
+		self.index.remove('cnt1', T.CIN, 'unknown', '002')
+		self.index.remove('cnt2', T.CIN, 'cin2', '002')
+		self.assertEqual(self._instances(), [ 'cin2', 'cin4' ])
+
+		self.index.remove('cnt1', T.CIN, 'cin4', '003')
+		self.index.remove('cnt1', T.CIN, 'cin2', '002')
+		self.assertEqual(self.index._instances, {})
+
+
+	def test_clear(self) -> None:
+		"""	Remove all entries """
+		self.index.add('cnt1', T.CIN, 'cin1', '001')
+		self.index.clear()
+		self.assertEqual(self.index.count('cnt1', T.CIN), 0)
+		self.assertIsNone(self.index.get('cnt1', T.CIN, 0))
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestInstanceIndex, [
+
+		'test_get',
+		'test_order',
+		'test_parentsTypes',
+		'test_remove',
+		'test_clear',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
@@ -0,0 +1,248 @@
+#
+#	testInstanceStore.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the segment files in which the TinyDB binding stores instance resources
+#
+
+import unittest, sys, os, shutil, tempfile
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.etc.Types import ResourceTypes as T
+from acmecse.etc.Constants import Constants
+from acmecse.helpers.InstanceStore import InstanceStore
+from init import *
+
+
+_pi = 'cnt1234'
+""" The resource ID of the parent container. """
+
+
+def _cin(n:int) -> dict:
+	"""	Return the document of the *n*-th <contentInstance> of the parent container. """
+	ts = f'20260101T0000{n:02d},000000'
+	return {	'ri': f'cin{n}',
+				'rn': f'cin_{n}',
+				'pi': _pi,
+				'ty': T.CIN,
+				'ct': ts,
+				'lt': ts,
+				'et': '20310101T000000,000000',
+				'st': n,
+				'cs': 6,
+				'con': f'value{n}',
+				Constants.attrSrn: f'cse-in/cnt/cin_{n}',
+			}
+
+
+class TestInstanceStore(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.path = tempfile.mkdtemp()
+		self.store = InstanceStore(self.path, 2)	# 2 records per segment
+
+
+	def tearDown(self) -> None:
+		shutil.rmtree(self.path, ignore_errors = True)
+
+
+	def _reload(self) -> InstanceStore:
+		"""	Load the segment files into a new store.
+		"""
+		store = InstanceStore(self.path, 2)
+		store.load()
+		return store
+
+
+	def _segmentFiles(self) -> list[str]:
+		"""	Return the names of the segment files of the parent container.
+		"""
+		directory = os.path.join(self.path, f'{_pi}-{int(T.CIN)}')
+		return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+
+	def test_addGet(self) -> None:
+		"""	Add instances and retrieve their full documents """
+		for n in range(3):
+			self.store.add(_cin(n))
+		self.assertEqual(len(self.store), 3)
+		self.assertEqual(self.store.count(_pi, T.CIN), 3)
+		for n in range(3):
+			self.assertEqual(self.store.get(f'cin{n}'), _cin(n))
+		self.assertIsNone(self.store.get('cin9'))
+		self.assertEqual(self.store.ris(_pi), [ 'cin0', 'cin1', 'cin2' ])
+		self.assertEqual(self.store.riForSrn('cse-in/cnt/cin_1'), 'cin1')
+
+
+	def test_instance(self) -> None:
+		"""	Find instances by their position, also across segments """
+		self.assertIsNone(self.store.instance(_pi, T.CIN, -1))
+		for n in range(5):
+			self.store.add(_cin(n))
+		self.assertEqual(self.store.instance(_pi, T.CIN, 0), 'cin0')
+		self.assertEqual(self.store.instance(_pi, T.CIN, 2), 'cin2')
+		self.assertEqual(self.store.instance(_pi, T.CIN, -1), 'cin4')
+		self.assertEqual(self.store.instance(_pi, T.CIN, -2), 'cin3')
+		self.assertIsNone(self.store.instance(_pi, T.CIN, 5))
+		self.assertIsNone(self.store.instance(_pi, T.CIN, -6))
+		self.store.remove('cin4')
+		self.assertEqual(self.store.instance(_pi, T.CIN, -1), 'cin3')
+
+
+	def test_update(self) -> None:
+		"""	Update an instance, and remove an attribute """
+		self.store.add(_cin(0))
+		self.store.update('cin0', { 'lbl': [ 'a' ], 'cs': None })
+		expected = _cin(0)
+		expected['lbl'] = [ 'a' ]
+		del expected['cs']
+		self.assertEqual(self.store.get('cin0'), expected)
+		self.assertEqual(self._reload().get('cin0'), expected)
+		with self.assertRaises(KeyError):
+			self.store.update('cin9', { 'lbl': [ 'a' ] })
+
+
+	def test_remove(self) -> None:
+		"""	Remove instances """
+		for n in range(3):
+			self.store.add(_cin(n))
+		self.store.remove('cin1')
+		self.assertIsNone(self.store.get('cin1'))
+		self.assertFalse('cin1' in self.store)
+		self.assertIsNone(self.store.riForSrn('cse-in/cnt/cin_1'))
+		self.assertEqual(self.store.ris(_pi), [ 'cin0', 'cin2' ])
+		self.assertEqual(self._reload().ris(_pi), [ 'cin0', 'cin2' ])
+		with self.assertRaises(KeyError):
+			self.store.remove('cin1')
+
+
+	def test_removeAllDropsSeries(self) -> None:
+		"""	Remove all instances of a parent resource """
+		for n in range(3):
+			self.store.add(_cin(n))
+		for n in range(3):
+			self.store.remove(f'cin{n}')
+		self.assertEqual(len(self.store), 0)
+		self.assertEqual(self.store.parents(), [])
+		self.assertEqual(self._segmentFiles(), [])
+
+
+	def test_load(self) -> None:
+		"""	Load the instances from the segment files """
+		for n in range(5):
+			self.store.add(_cin(n))
+		store = self._reload()
+		self.assertEqual(len(store), 5)
+		self.assertEqual([ store.get(f'cin{n}') for n in range(5) ], [ _cin(n) for n in range(5) ])
+		self.assertEqual(store.instance(_pi, T.CIN, -1), 'cin4')
+		self.assertEqual(store.parents(), [ _pi ])
+
+		# Adding continues in the latest segment
+		store.add(_cin(5))
+		self.assertEqual(self._segmentFiles(), [ '00000001.seg', '00000002.seg', '00000003.seg' ])
+		self.assertEqual(self._reload().instance(_pi, T.CIN, -1), 'cin5')
+
+
+	def test_loadTornTail(self) -> None:
+		"""	Ignore an incomplete record at the end of a segment file """
+		for n in range(3):
+			self.store.add(_cin(n))
+		with open(os.path.join(self.path, f'{_pi}-{int(T.CIN)}', '00000002.seg'), 'a', encoding = 'utf-8') as file:
+			file.write('["+","cin3",{"con":"val')	# a crash while writing
+		store = self._reload()
+		self.assertEqual(store.ris(_pi), [ 'cin0', 'cin1', 'cin2' ])
+		self.assertIsNone(store.get('cin3'))
+		self.assertEqual(store.get('cin2'), _cin(2))
+
+
+	def test_dropSegment(self) -> None:
+		"""	Delete a segment file when all its instances are removed """
+		for n in range(5):
+			self.store.add(_cin(n))
+		self.assertEqual(self._segmentFiles(), [ '00000001.seg', '00000002.seg', '00000003.seg' ])
+		self.store.remove('cin0')
+		self.assertEqual(self._segmentFiles(), [ '00000001.seg', '00000002.seg', '00000003.seg' ])
+		self.store.remove('cin1')
+		self.assertEqual(self._segmentFiles(), [ '00000002.seg', '00000003.seg' ])
+		self.assertEqual(self.store.instance(_pi, T.CIN, 0), 'cin2')
+		self.assertEqual(self._reload().ris(_pi), [ 'cin2', 'cin3', 'cin4' ])
+
+
+	def test_dropSegmentOnLoad(self) -> None:
+		"""	Drop segments without instances when loading """
+		for n in range(3):
+			self.store.add(_cin(n))
+		# Simulate a crash before the empty segment file was deleted
+		segmentFile = os.path.join(self.path, f'{_pi}-{int(T.CIN)}', '00000001.seg')
+		with open(segmentFile, 'a', encoding = 'utf-8') as file:
+			file.write('["-","cin0"]\n["-","cin1"]\n')
+		store = self._reload()
+		self.assertEqual(store.ris(_pi), [ 'cin2' ])
+		self.assertFalse(os.path.exists(segmentFile))
+
+
+	def test_backup(self) -> None:
+		"""	Back up the segment files, and link unchanged ones from the previous backup """
+		backups = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, backups, ignore_errors = True)
+		first, second = os.path.join(backups, 'first'), os.path.join(backups, 'second')
+		directory = os.path.join(os.path.basename(self.path), f'{_pi}-{int(T.CIN)}')
+		for n in range(3):
+			self.store.add(_cin(n))
+
+		# Instances that are added after the backup was prepared are not in the backup
+		pending = self.store.backup(first)
+		self.store.add(_cin(3))
+		self.store.finishBackup(pending)
+		backup = InstanceStore(os.path.join(first, os.path.basename(self.path)), 2)
+		backup.load()
+		self.assertEqual(backup.ris(_pi), [ 'cin0', 'cin1', 'cin2' ])
+
+		# Only the changed segment is copied again
+		self.store.finishBackup(self.store.backup(second, first))
+		self.assertTrue(os.path.samefile(os.path.join(first, directory, '00000001.seg'), os.path.join(second, directory, '00000001.seg')))
+		self.assertFalse(os.path.samefile(os.path.join(first, directory, '00000002.seg'), os.path.join(second, directory, '00000002.seg')))
+		self.assertEqual(sorted(os.listdir(os.path.join(second, directory))), self._segmentFiles())
+
+
+	def test_memoryOnly(self) -> None:
+		"""	Keep the instances in memory only """
+		store = InstanceStore(None, 2)
+		for n in range(3):
+			store.add(_cin(n))
+		store.remove('cin0')
+		self.assertEqual(store.ris(_pi), [ 'cin1', 'cin2' ])
+		self.assertEqual(store.get('cin2'), _cin(2))
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestInstanceStore, [
+
+		'test_addGet',
+		'test_instance',
+		'test_update',
+		'test_remove',
+		'test_removeAllDropsSeries',
+		'test_load',
+		'test_loadTornTail',
+		'test_dropSegment',
+		'test_dropSegmentOnLoad',
+		'test_backup',
+		'test_memoryOnly',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
@@ -0,0 +1,202 @@
+#
+#	testJournalStorage.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the append-only journal storage of TinyDB
+#
+
+import unittest, sys, os, json, shutil, tempfile
+from threading import Thread
+if '..' not in sys.path:
+	sys.path.append('..')
+from tinydb import TinyDB
+from tinydb.table import Document, Table
+from acmecse.helpers.TinyDBJournalStorage import TinyDBJournalStorage
+from acmecse.helpers.TinyDBBetterTable import TinyDBBetterTable
+from init import *
+
+
+_table = 'resources'
+""" The name of the test table. """
+
+
+def _document(value:dict, docID:str) -> Document:
+	return Document(value, docID)	# type:ignore[arg-type] # The tables' document_id_class is str (see TinyDBBetterTable)
+
+
+class TestJournalStorage(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.path = tempfile.mkdtemp()
+		self.db, self.table = self._open()
+
+
+	def tearDown(self) -> None:
+		if self.db:
+			self.db.close()
+		shutil.rmtree(self.path, ignore_errors = True)
+
+
+	def _file(self) -> str:
+		"""	Return the path of the database file.
+		"""
+		return os.path.join(self.path, 'db.json')
+
+
+	def _open(self) -> tuple[TinyDB, Table]:
+		"""	Open the database. The journal is only written when the test flushes it.
+		"""
+		db = TinyDB(self._file(), storage = TinyDBJournalStorage, write_delay = 3600)
+		table = db.table(_table)
+		TinyDBBetterTable.assign(table)
+		return db, table
+
+
+	def _storage(self) -> TinyDBJournalStorage:
+		return self.db.storage	# type:ignore[return-value]
+
+
+	def _load(self) -> dict:
+		"""	Load the database files like after a crash, without closing the open database.
+		"""
+		return TinyDBJournalStorage(self._file(), access_mode = 'r').read().get(_table, {})
+
+
+	def _journalLines(self) -> list[str]:
+		with open(f'{self._file()}.journal', 'r', encoding = 'utf-8') as file:
+			return file.readlines()
+
+
+	def test_replay(self) -> None:
+		"""	Replay the journal on top of the snapshot """
+		self.table.insert(_document({ 'a': 1 }, '1'))
+		self.table.insert(_document({ 'a': 2 }, '2'))
+		self.table.insert(_document({ 'a': 3 }, '3'))
+		self.table.update({ 'a': 22 }, doc_ids = [ '2' ])	# type:ignore[list-item]
+		self.table.remove(doc_ids = [ '3' ])				# type:ignore[list-item]
+		self._storage()._flush()
+		self.assertEqual(len(self._journalLines()), 4)		# header + 1 record per document
+		self.assertEqual(self._load(), { '1': { 'a': 1 }, '2': { 'a': 22 } })
+
+
+	def test_batch(self) -> None:
+		"""	Write the changes of a batch together """
+		with self._storage().batch():
+			self.table.insert(_document({ 'a': 1 }, '1'))
+			self.table.update({ 'a': 11 }, doc_ids = [ '1' ])	# type:ignore[list-item]
+			self.assertEqual(self._storage()._pending, {})
+		self._storage()._flush()
+		self.assertEqual(len(self._journalLines()), 2)		# header + 1 record
+		self.assertEqual(self._load(), { '1': { 'a': 11 } })
+
+
+	def test_tornJournalTail(self) -> None:
+		"""	Ignore an incomplete record at the end of the journal """
+		self.table.insert(_document({ 'a': 1 }, '1'))
+		self._storage()._flush()
+		with open(f'{self._file()}.journal', 'a', encoding = 'utf-8') as file:
+			file.write('["resources", "2", {"a": ')	# a crash while writing
+		self.assertEqual(self._load(), { '1': { 'a': 1 } })
+
+
+	def test_compact(self) -> None:
+		"""	Compact the journal into the snapshot """
+		for n in range(5):
+			self.table.insert(_document({ 'a': n }, str(n)))
+		self._storage()._flush()
+		self._storage()._compact()
+		self.assertEqual(len(self._journalLines()), 1)		# header only
+		self.table.remove(doc_ids = [ '0' ])				# type:ignore[list-item]
+		self._storage()._flush()
+		self.assertEqual(self._load(), { str(n): { 'a': n } for n in range(1, 5) })
+
+
+	def test_interruptedCompaction(self) -> None:
+		"""	Ignore the old journal after an interrupted compaction """
+		self.table.insert(_document({ 'a': 1 }, '1'))
+		self.table.insert(_document({ 'a': 2 }, '2'))
+		self._storage()._flush()
+
+		# Simulate a compaction that was interrupted after the snapshot was replaced, but before the journal was replaced
+		with open(f'{self._file()}.tmp', 'w', encoding = 'utf-8') as file:
+			json.dump({ _table: { '1': { 'a': 1 }, '2': { 'a': 2 } } }, file)
+		os.replace(f'{self._file()}.tmp', self._file())
+		self.assertEqual(self._load(), { '1': { 'a': 1 }, '2': { 'a': 2 } })
+
+		# A compaction interrupted before the files were replaced leaves the old files valid
+		with open(f'{self._file()}.tmp', 'w', encoding = 'utf-8') as file:
+			file.write('{"resources": {"1": ')
+		self.assertEqual(self._load(), { '1': { 'a': 1 }, '2': { 'a': 2 } })
+
+		# Opening the database again starts a new journal for the snapshot, which is continued
+		self.db.close()
+		self.db, self.table = self._open()
+		self.assertEqual(len(self._journalLines()), 1)
+		self.table.remove(doc_ids = [ '1' ])				# type:ignore[list-item]
+		self._storage()._flush()
+		self.assertEqual(self._load(), { '2': { 'a': 2 } })
+
+
+	def test_compactDuringWrites(self) -> None:
+		"""	Keep all changes that are written during a compaction """
+		count = 2000
+
+		def writer() -> None:
+			for n in range(count):
+				self.table.insert(_document({ 'a': n }, str(n)))
+				if n % 2:
+					self.table.update({ 'b': n }, doc_ids = [ str(n - 1) ])	# type:ignore[list-item]
+
+		thread = Thread(target = writer)
+		thread.start()
+		while thread.is_alive():
+			try:
+				self._storage()._compact()
+			except RuntimeError:
+				pass	# A document was changed during the serialization
+			self._storage()._flush()
+		thread.join()
+		self._storage()._flush()
+
+		expected = { str(n): { 'a': n, 'b': n + 1 } if n % 2 == 0 else { 'a': n } for n in range(count) }
+		self.assertEqual(self._load(), expected)
+
+
+	def test_closeCompacts(self) -> None:
+		"""	Compact the database when it is closed """
+		self.table.insert(_document({ 'a': 1 }, '1'))
+		self.db.close()
+		self.db = None
+		with open(self._file(), 'r', encoding = 'utf-8') as file:
+			self.assertEqual(json.load(file), { _table: { '1': { 'a': 1 } } })
+		self.assertEqual(len(self._journalLines()), 1)
+		self.assertEqual(self._load(), { '1': { 'a': 1 } })
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestJournalStorage, [
+
+		'test_replay',
+		'test_batch',
+		'test_tornJournalTail',
+		'test_compact',
+		'test_interruptedCompaction',
+		'test_compactDuringWrites',
+		'test_closeCompacts',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
@@ -0,0 +1,153 @@
+#
+#	testPostgreSQLBinding.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the schema migrations of the PostgreSQL binding and for the
+#	translation of filter criteria to SQL. The database connection is simulated.
+#
+
+import unittest, sys
+from typing import Any, Optional
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.etc.Types import ResourceTypes as T, FilterCriteria, FilterOperation
+from acmecse.plugins.database.PostgreSQLBinding import PostgreSQLBinding
+from init import *
+
+
+class _Cursor():
+	"""	A cursor that records the executed statements and returns the current schema version.
+	"""
+
+	def __init__(self, connection:'_Connection') -> None:
+		self.connection = connection
+
+	def __enter__(self) -> '_Cursor':
+		return self
+
+	def __exit__(self, *args:Any) -> None:
+		pass
+
+	def execute(self, sql:str, args:Optional[tuple] = None) -> None:
+		self.connection.statements.append((sql, args))
+
+	def fetchone(self) -> tuple:
+		return (self.connection.version,)
+
+
+class _Connection():
+	"""	A connection to a database with a schema version.
+	"""
+
+	def __init__(self, version:int) -> None:
+		self.version = version
+		self.statements:list[tuple[str, Optional[tuple]]] = []
+
+	def cursor(self) -> _Cursor:
+		return _Cursor(self)
+
+
+class TestPostgreSQLBinding(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.binding = PostgreSQLBinding()
+
+
+	def _appliedVersions(self, version:int) -> list[int]:
+		"""	Upgrade a database with a schema version and return the versions of the applied migrations.
+		"""
+		connection = _Connection(version)
+		self.binding.upgradeTables(connection)	# type:ignore[arg-type]
+		return [ args[0] for sql, args in connection.statements if args ]
+
+
+	def test_migrations(self) -> None:
+		"""	Define migrations with increasing versions that can be executed with query parameters """
+		versions = [ m[0] for m in self.binding.schemaMigrations() ]
+		self.assertEqual(versions, list(range(1, len(versions) + 1)))
+		for version, description, sql in self.binding.schemaMigrations():
+			self.assertTrue(description, version)
+			self.assertNotIn('%', sql, version)
+
+
+	def test_upgrade(self) -> None:
+		"""	Apply and record the migrations newer than the schema version """
+		latest = self.binding.schemaMigrations()[-1][0]
+		self.assertEqual(self._appliedVersions(0), list(range(1, latest + 1)))
+		self.assertEqual(self._appliedVersions(1), list(range(2, latest + 1)))
+		self.assertEqual(self._appliedVersions(latest), [])
+		self.assertEqual(self._appliedVersions(latest + 1), [])		# A newer schema is not changed
+
+		# Each migration is executed together with the record of its version
+		connection = _Connection(latest - 1)
+		self.binding.upgradeTables(connection)	# type:ignore[arg-type]
+		sql, args = connection.statements[-1]
+		self.assertIn(self.binding.schemaMigrations()[-1][2], sql)
+		self.assertIn(f'INSERT INTO {self.binding.tableSchemaVersions}', sql)
+		self.assertEqual(args, (latest, self.binding.schemaMigrations()[-1][1]))
+
+
+	def test_filterNoCondition(self) -> None:
+		"""	Return no condition if no filter criteria can be translated """
+		self.assertEqual(self.binding._filterCriteriaCondition(FilterCriteria(), FilterOperation.AND), (None, ()))
+		self.assertEqual(self.binding._filterCriteriaCondition(FilterCriteria(aq = 'rn == "x"'), FilterOperation.AND), (None, ()))
+		self.assertEqual(self.binding._filterCriteriaCondition(FilterCriteria(attributes = { 'rn': 'cnt*' }), FilterOperation.AND), (None, ()))
+
+
+	def test_filterAnd(self) -> None:
+		"""	Combine the translated filter criteria with AND, and leave out the others """
+		where, args = self.binding._filterCriteriaCondition(FilterCriteria(ty = [ T.CNT, T.CIN ],
+																		   cra = '20261017T000000',
+																		   sts = 5,
+																		   lbl = [ 'a', 'b' ],
+																		   attributes = { 'cnf': 'text/plain:0', 'rn': 'cnt*' },
+																		   aq = 'rn == "x"'),
+															FilterOperation.AND)
+		self.assertEqual(where.count(') AND ('), 4)
+		self.assertEqual(args, ([ '3', '4' ], '20261017T000000', 5, [ 'a', 'b' ], 'cnf', 'text/plain:0', 'cnf'))
+		self.assertEqual(where.count('%s'), len(args))
+
+
+	def test_filterOr(self) -> None:
+		"""	Combine the translated filter criteria with OR, but only if all of them can be translated """
+		where, args = self.binding._filterCriteriaCondition(FilterCriteria(ty = [ T.CNT ], exb = '20261017T000000'), FilterOperation.OR)
+		self.assertEqual(where.count(') OR ('), 1)
+		self.assertEqual(args, ([ '3' ], '20261017T000000'))
+
+		for residual in ( { 'aq': 'rn == "x"' }, { 'attributes': { 'rn': 'cnt*' } }, { 'attributes': { 'm2m:cnt/rn': 'x' } } ):
+			self.assertEqual(self.binding._filterCriteriaCondition(FilterCriteria(ty = [ T.CNT ], **residual), FilterOperation.OR), (None, ()), residual)
+
+
+	def test_filterContentTypes(self) -> None:
+		"""	Restrict content types to <contentInstance> resources """
+		where, args = self.binding._filterCriteriaCondition(FilterCriteria(cty = [ 'text/plain:0' ]), FilterOperation.AND)
+		self.assertIn(f"'{int(T.CIN)}'", where)
+		self.assertEqual(args, ([ 'text/plain:0' ],))
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestPostgreSQLBinding, [
+
+		'test_migrations',
+		'test_upgrade',
+		'test_filterNoCondition',
+		'test_filterAnd',
+		'test_filterOr',
+		'test_filterContentTypes',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
@@ -0,0 +1,194 @@
+#
+#	testResource.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for resources that share their documents with the resource cache,
+#	and for their representations
+#
+
+import unittest, sys, json, cbor2
+from typing import cast
+from copy import deepcopy
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.etc.Types import JSON, Result, ContentSerializationType as CST
+from acmecse.resources.Resource import Resource
+from init import *
+
+
+class _Resource(Resource):
+	"""	A resource type for the tests.
+	"""
+	typeShortname = 'm2m:tst'
+
+
+class TestResource(unittest.TestCase):
+
+	def setUp(self) -> None:
+		# A stored resource document with nested values
+		self.doc:JSON = { 'ri': 'tst1', 'rn': 'tst', 'ty': 3, 'lbl': [ 'a' ], 'nested': { 'a': [ 1 ], 'b': 2 }, 'acpi': [ 'acp1' ], '__srn__': 'cse-in/tst' }
+		self.original = deepcopy(self.doc)
+
+
+	def tearDown(self) -> None:
+		self.assertEqual(self.doc, self.original)	# The shared document is never modified
+
+
+	def test_share(self) -> None:
+		"""	Share the document until the resource is modified """
+		resource = _Resource({ 'm2m:tst': self.doc })
+		self.assertIs(resource._dict, self.doc)
+		self.assertEqual(resource.ri, 'tst1')
+		self.assertTrue(resource.hasAttribute('lbl'))
+		self.assertEqual(resource.asDict(shared = True)['m2m:tst']['rn'], 'tst')
+		self.assertIs(resource._dict, self.doc)
+
+		# A path may return a nested list or dictionary, so the top-level value is copied
+		self.assertEqual(resource.attribute('nested/b'), 2)
+		self.assertIsNot(resource._dict['nested'], self.doc['nested'])
+		self.assertIs(resource._dict['lbl'], self.doc['lbl'])
+
+		# A document without the type shortname is shared as well
+		self.assertIs(_Resource(self.doc)._dict, self.doc)
+
+
+	def test_setAttribute(self) -> None:
+		"""	Copy the document when an attribute is set """
+		resource = _Resource(self.doc)
+		resource.setAttribute('rn', 'other')
+		resource['st'] = 1
+		self.assertEqual(resource.rn, 'other')
+		self.assertEqual(resource.st, 1)
+		self.assertIs(resource._dict['nested'], self.doc['nested'])	# Unchanged values are still shared
+
+		resource.setAttribute('nested/b', 3)
+		resource.setAttribute('nested/c', 4)
+		self.assertEqual(resource.nested, { 'a': [ 1 ], 'b': 3, 'c': 4 })
+
+
+	def test_setAttributePath(self) -> None:
+		"""	Copy the top-level value when a new attribute is set by a path """
+		resource = _Resource(self.doc)
+		resource.setAttribute('nested/c', 4)
+		self.assertEqual(resource.attribute('nested/c'), 4)
+
+		# A path with a list index
+		resource = _Resource(self.doc)
+		resource.setAttribute('nested/a/{0}', 2)
+		self.assertIsNone(resource._sharedDict)
+		self.assertEqual(resource.nested, { 'a': [ 2 ], 'b': 2 })
+
+
+	def test_delAttribute(self) -> None:
+		"""	Copy the document when an attribute is deleted """
+		resource = _Resource(self.doc)
+		resource.delAttribute('lbl')
+		self.assertIsNone(resource.lbl)
+		resource.delAttribute('rn', setNone = False)
+		self.assertFalse(resource.hasAttribute('rn'))
+
+
+	def test_attributeValues(self) -> None:
+		"""	Copy a list or dictionary value when it is returned """
+		resource = _Resource(self.doc)
+		resource.attribute('lbl').append('b')
+		resource.nested['b'] = 3
+		resource['nested/a'].append(2)
+		resource.attribute('acpi', []).append('acp2')
+		self.assertEqual(resource.lbl, [ 'a', 'b' ])
+		self.assertEqual(resource.nested, { 'a': [ 1, 2 ], 'b': 3 })
+		self.assertEqual(resource.acpi, [ 'acp1', 'acp2' ])
+
+
+	def test_dict(self) -> None:
+		"""	Copy all shared values when the dictionary is accessed directly """
+		resource = _Resource(self.doc)
+		resource.attribute('lbl')
+		resource.dict['nested']['a'].append(2)
+		resource.dict['lbl'].append('b')
+		self.assertIsNone(resource._sharedDict)
+		self.assertEqual(resource.nested['a'], [ 1, 2 ])
+		self.assertEqual(resource.lbl, [ 'a', 'b' ])
+
+		resource.dict = { 'ri': 'tst2' }
+		self.assertEqual(resource.ri, 'tst2')
+
+
+	def test_independentResources(self) -> None:
+		"""	Keep resources from the same document independent """
+		resource1 = _Resource(self.doc)
+		resource2 = _Resource(self.doc)
+		resource1.lbl.append('b')
+		resource1.setAttribute('rn', 'other')
+		self.assertEqual(resource2.lbl, [ 'a' ])
+		self.assertEqual(resource2.rn, 'tst')
+
+
+	def test_createOriginal(self) -> None:
+		"""	Keep the creation document as the original document """
+		resource = _Resource({ 'm2m:tst': self.doc }, create = True)
+		self.assertIs(resource._originalDict, self.doc)
+		resource.setAttribute('rn', 'other')
+		resource.lbl.append('b')
+		self.assertEqual(resource._originalDict, self.original)
+
+
+	def test_asDict(self) -> None:
+		"""	Return a copied or shared representation without internal attributes """
+		resource = _Resource(self.doc)
+		expected = { k: v for k, v in self.original.items() if k != '__srn__' }
+		copied = resource.asDict()['m2m:tst']
+		shared = resource.asDict(shared = True)['m2m:tst']
+		self.assertEqual(copied, expected)
+		self.assertEqual(shared, expected)
+		self.assertIsNot(copied['nested'], self.doc['nested'])
+		self.assertIs(shared['nested'], self.doc['nested'])
+		self.assertIsNot(shared, resource._dict)		# The top-level dictionary is always new
+
+		self.assertNotIn('acpi', resource.asDict(noACP = True, shared = True)['m2m:tst'])
+		self.assertEqual(sorted(resource.asDict(embedded = False, update = True, shared = True)), [ 'acpi', 'lbl', 'nested' ])
+
+
+	def test_toData(self) -> None:
+		"""	Serialize a resource result without copying the attribute values """
+		resource = _Resource(self.doc)
+		expected = { 'm2m:tst': { k: v for k, v in self.original.items() if k != '__srn__' } }
+		self.assertEqual(json.loads(cast(str, Result(resource = resource).toData(CST.JSON))), expected)
+		self.assertEqual(cbor2.loads(cast(bytes, Result(resource = resource).toData(CST.CBOR))), expected)
+		self.assertIs(resource._dict, self.doc)
+
+		# A plain representation is copied, unless it is explicitly shared
+		self.assertIsNot(cast(JSON, Result(resource = resource).toData(CST.PLAIN))['m2m:tst']['lbl'], self.doc['lbl'])
+		self.assertIs(cast(JSON, Result(resource = resource).toData(CST.PLAIN, shared = True))['m2m:tst']['lbl'], self.doc['lbl'])
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestResource, [
+
+		'test_share',
+		'test_setAttribute',
+		'test_setAttributePath',
+		'test_delAttribute',
+		'test_attributeValues',
+		'test_dict',
+		'test_independentResources',
+		'test_createOriginal',
+		'test_asDict',
+		'test_toData',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
@@ -0,0 +1,133 @@
+#
+#	testResourceCache.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the LRU cache of resource documents in Storage
+#
+
+import unittest, sys
+from typing import Optional
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.etc.Types import ResourceTypes as T
+from acmecse.etc.Constants import Constants
+from acmecse.helpers.ResourceCache import ResourceCache
+from init import *
+
+
+class TestResourceCache(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.cache = ResourceCache(2)
+
+
+	def _add(self, ri:str, ty:int = T.CNT, srn:Optional[str] = None) -> None:
+		"""	Add the document of a resource that was just read.
+		"""
+		self.cache.add({ 'ri': ri, 'rn': ri, 'ty': ty, Constants.attrSrn: srn or f'cse-in/{ri}' }, self.cache.token())
+
+
+	def test_getAdd(self) -> None:
+		"""	Add and return resource documents """
+		self.assertIsNone(self.cache.get('cnt1'))
+		doc = { 'ri': 'cnt1', 'rn': 'cnt1', 'ty': T.CNT, Constants.attrSrn: 'cse-in/cnt1' }
+		self.cache.add(doc, self.cache.token())
+		self.assertIs(self.cache.get('cnt1'), doc)		# The document is shared, not copied
+		self.assertEqual(self.cache.riForSrn('cse-in/cnt1'), 'cnt1')
+		self.assertIsNone(self.cache.riForSrn('cse-in/cnt2'))
+		self.assertEqual(self.cache.statistics(), { 'hits': 1, 'misses': 1, 'size': 1, 'maxSize': 2 })
+
+
+	def test_invalidate(self) -> None:
+		"""	Remove an invalidated resource and its structured resource name """
+		self._add('cnt1')
+		self._add('cnt2')
+		self.cache.invalidate('cnt1')
+		self.assertIsNone(self.cache.get('cnt1'))
+		self.assertIsNone(self.cache.riForSrn('cse-in/cnt1'))
+		self.assertIsNotNone(self.cache.get('cnt2'))
+		self.cache.invalidate('unknown')	# Invalidating an uncached resource is ignored
+
+
+	def test_staleToken(self) -> None:
+		"""	Don't add a document that was read before a resource was invalidated """
+		token = self.cache.token()
+		self.cache.invalidate('cnt1')	# e.g. a concurrent update
+		self.cache.add({ 'ri': 'cnt1', 'ty': T.CNT, Constants.attrSrn: 'cse-in/cnt1' }, token)
+		self.assertIsNone(self.cache.get('cnt1'))
+		self._add('cnt1')
+		self.assertIsNotNone(self.cache.get('cnt1'))
+
+		token = self.cache.token()
+		self.cache.clear()
+		self.cache.add({ 'ri': 'cnt2', 'ty': T.CNT, Constants.attrSrn: 'cse-in/cnt2' }, token)
+		self.assertIsNone(self.cache.get('cnt2'))
+
+
+	def test_evict(self) -> None:
+		"""	Evict the least recently used resource and its structured resource name """
+		self._add('cnt1')
+		self._add('cnt2')
+		self.cache.get('cnt1')
+		self._add('cnt3')
+		self.assertIsNone(self.cache.get('cnt2'))
+		self.assertIsNone(self.cache.riForSrn('cse-in/cnt2'))
+		self.assertIsNotNone(self.cache.get('cnt1'))
+		self.assertEqual(self.cache.riForSrn('cse-in/cnt3'), 'cnt3')
+		self.assertEqual(self.cache.statistics()['size'], 2)
+
+
+	def test_evictRenamed(self) -> None:
+		"""	Keep the structured resource name of another resource when a resource is evicted """
+		self._add('cnt1')
+		self._add('cnt2', srn = 'cse-in/cnt1')	# the same name after cnt1 was deleted
+		self.cache.invalidate('cnt1')
+		self.assertEqual(self.cache.riForSrn('cse-in/cnt1'), 'cnt2')
+
+
+	def test_types(self) -> None:
+		"""	Only cache resources of the configured types """
+		self.cache = ResourceCache(10, [ T.AE, T.CNT ])
+		self._add('cnt1')
+		self._add('cin1', T.CIN)
+		self.assertIsNotNone(self.cache.get('cnt1'))
+		self.assertIsNone(self.cache.get('cin1'))
+		self.assertIsNone(self.cache.riForSrn('cse-in/cin1'))
+
+
+	def test_clear(self) -> None:
+		"""	Remove all resources """
+		self._add('cnt1')
+		self.cache.clear()
+		self.assertIsNone(self.cache.get('cnt1'))
+		self.assertIsNone(self.cache.riForSrn('cse-in/cnt1'))
+		self.assertEqual(self.cache.statistics()['size'], 0)
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestResourceCache, [
+
+		'test_getAdd',
+		'test_invalidate',
+		'test_staleToken',
+		'test_evict',
+		'test_evictRenamed',
+		'test_types',
+		'test_clear',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
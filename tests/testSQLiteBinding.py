@@ -0,0 +1,372 @@
+#
+#	testSQLiteBinding.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the SQLite database binding
+#
+
+import unittest, sys, os, shutil, sqlite3, tempfile
+from typing import Any, Optional
+from threading import Thread, Event
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.etc.Types import ResourceTypes as T, FilterCriteria, FilterOperation, JSON, LogLevel
+from acmecse.etc.Constants import RuntimeConstants as RC
+from acmecse.etc.ResponseStatusCodes import INTERNAL_SERVER_ERROR
+from acmecse.runtime.Configuration import Configuration
+from acmecse.runtime.Logging import Logging
+from acmecse.plugins.database.SQLiteBinding import SQLiteBinding
+from init import *
+
+
+class TestSQLiteBinding(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.path = tempfile.mkdtemp()
+		Configuration.database_type = 'sqlite'
+		Configuration.database_sqlite_path = self.path
+		Configuration.database_sqlite_maxConnections = 4
+		RC.cseSPIDSlashLess = 'acme.example.com'
+		RC.cseCsiSlashLess = 'id-in'
+
+		# Database errors are logged. There is no event manager for the logError event.
+		Logging.logLevel = LogLevel.OFF
+		Logging._eventLogError = lambda msg: None
+
+		self.binding = SQLiteBinding()
+		self.binding.start()
+
+
+	def tearDown(self) -> None:
+		self.binding.closeDB()
+		shutil.rmtree(self.path, ignore_errors = True)
+
+
+	@staticmethod
+	def _resource(ri:str, pi:Optional[str] = 'cse', ty:int = T.CNT, ct:Optional[str] = None, **kwargs:Any) -> JSON:
+		return { 'ri': ri, 'rn': ri, 'pi': pi, 'ty': ty, 'ct': ct or ri, **kwargs }
+
+
+	def _create(self, resource:JSON, srn:str) -> None:
+		"""	Create a resource with its identifiers and child resource record, like the storage does.
+		"""
+		ri = resource['ri']
+		with self.binding.transaction():
+			self.binding.insertResource(resource, ri)
+			self.binding.upsertIdentifier({ 'ri': ri, 'rn': resource['rn'], 'srn': srn, 'ty': resource['ty'] }, { 'srn': srn, 'ri': ri }, ri, srn)
+			self.binding.upsertChildResource({ 'ri': ri, 'ty': resource['ty'], 'pi': resource['pi'], 'ct': resource['ct'] }, ri)
+
+
+	def _createTree(self) -> None:
+		"""	Create a tree of containers and content instances below *cse*.
+		"""
+		self._create(self._resource('cse', None, T.CSEBase), 'cse-in')
+		self._create(self._resource('cnt1', lbl = [ 'a' ], st = 1), 'cse-in/cnt1')
+		self._create(self._resource('cin1', 'cnt1', T.CIN, '002', cnf = 'text/plain:0', st = 5), 'cse-in/cnt1/cin1')
+		self._create(self._resource('cin2', 'cnt1', T.CIN, '001', cnf = 'application/json:0', st = 7), 'cse-in/cnt1/cin2')
+		self._create(self._resource('cnt2', 'cnt1', lbl = [ 'b' ]), 'cse-in/cnt1/cnt2')
+		self._create(self._resource('cin3', 'cnt2', T.CIN, '003'), 'cse-in/cnt1/cnt2/cin3')
+		self._create(self._resource('cnt3', lbl = [ 'a', 'b' ], et = '20261017T000000'), 'cse-in/cnt3')
+
+
+	def _discover(self, ri:str = 'cse', level:int = 10, offset:int = 1, limit:int = 100, fo:FilterOperation = FilterOperation.AND, **kwargs:Any) -> list[str]:
+		"""	Discover the resource IDs in a subtree.
+		"""
+		filterCriteria = FilterCriteria()
+		for k, v in kwargs.items():
+			setattr(filterCriteria, k, v)
+		return [ r['ri'] for r in self.binding.discoverResourcesInSubtree(ri, level, offset, limit, filterCriteria, fo) ]
+
+
+	def test_resources(self) -> None:
+		"""	Create, search, update and delete resources """
+		self._createTree()
+		self.assertEqual(self.binding.countResources(), 7)
+		self.assertEqual(self.binding.searchResources(ri = 'cnt1'), [ self._resource('cnt1', lbl = [ 'a' ], st = 1) ])
+		self.assertEqual(self.binding.searchResources(srn = 'cse-in/cnt1/cnt2')[0]['ri'], 'cnt2')
+		self.assertEqual(sorted(r['ri'] for r in self.binding.searchResources(pi = 'cnt1')), [ 'cin1', 'cin2', 'cnt2' ])
+		self.assertEqual(sorted(r['ri'] for r in self.binding.searchResources(pi = 'cnt1', ty = T.CIN)), [ 'cin1', 'cin2' ])
+		self.assertEqual(len(self.binding.searchResources(ty = T.CNT)), 3)
+		self.assertEqual(self.binding.searchResources(ri = 'unknown'), [])
+		self.assertEqual([ r['ri'] for r in self.binding.searchResourcesByRIs([ 'cnt3', 'unknown', 'cin1' ]) ], [ 'cnt3', 'cin1' ])
+		self.assertEqual([ r['ri'] for r in self.binding.searchByFragment({ 'pi': 'cnt1', 'cnf': 'text/plain:0' }) ], [ 'cin1' ])
+		self.assertEqual([ r['ri'] for r in self.binding.searchExpiredResources('20270101T000000') ], [ 'cnt3' ])
+		self.assertTrue(self.binding.hasResource(srn = 'cse-in/cnt3'))
+		self.assertTrue(self.binding.hasResource(ty = T.CIN))
+		self.assertFalse(self.binding.hasResource(ri = 'unknown'))
+
+		# Attributes are merged, and attributes with a None value are removed
+		updated = self.binding.updateResource({ 'st': 2, 'lbl': None, 'aei': 'CAE1' }, 'cnt1')
+		self.assertEqual(updated, { **self._resource('cnt1'), 'st': 2, 'aei': 'CAE1' })
+		self.assertEqual(self.binding.searchResources(aei = 'CAE1'), [ updated ])
+		with self.assertRaises(KeyError):
+			self.binding.updateResource({ 'st': 1 }, 'unknown')
+
+		self.binding.upsertResource(self._resource('cnt4'), 'cnt4')
+		self.binding.upsertResource({ 'st': 1 }, 'cnt4')
+		self.assertEqual(self.binding.searchResources(ri = 'cnt4'), [ { **self._resource('cnt4'), 'st': 1 } ])
+
+		self.binding.deleteResource('cnt3')
+		self.assertFalse(self.binding.hasResource(ri = 'cnt3'))
+		self.assertEqual(self.binding.searchExpiredResources('20270101T000000'), [])
+
+
+	def test_insertResources(self) -> None:
+		"""	Insert several resources with their identifiers and child resource records at once """
+		records = []
+		for ri in ( 'cnt1', 'cnt2' ):
+			resource = self._resource(ri)
+			records.append((resource,
+							{ 'ri': ri, 'rn': ri, 'srn': f'cse-in/{ri}', 'ty': T.CNT },
+							{ 'srn': f'cse-in/{ri}', 'ri': ri },
+							{ 'ri': ri, 'ty': T.CNT, 'pi': 'cse', 'ct': ri }))
+		self.binding.insertResources(records)
+		self.assertEqual(self.binding.searchIdentifiers(srn = 'cse-in/cnt2'), [ { 'ri': 'cnt2', 'rn': 'cnt2', 'srn': 'cse-in/cnt2', 'ty': T.CNT } ])
+		self.assertEqual(self.binding.searchChildResourceIDsByParentRIAndType('cse'), [ 'cnt1', 'cnt2' ])
+
+		# A batch with a duplicate resource is not inserted at all
+		with self.assertRaises(INTERNAL_SERVER_ERROR):
+			self.binding.insertResources([ ({ **records[0][0], 'ri': 'cnt3' }, *records[0][1:]), records[1] ])
+		self.assertFalse(self.binding.hasResource(ri = 'cnt3'))
+		self.assertEqual(self.binding.countResources(), 2)
+
+
+	def test_transaction(self) -> None:
+		"""	Commit a transaction, or roll it back after an exception, including nested transactions """
+		with self.binding.transaction():
+			self.binding.insertResource(self._resource('cnt1'), 'cnt1')
+			with self.binding.transaction():
+				self.binding.insertResource(self._resource('cnt2'), 'cnt2')
+		self.assertEqual(self.binding.countResources(), 2)
+
+		with self.assertRaises(ValueError):
+			with self.binding.transaction():
+				self.binding.deleteResource('cnt1')
+				with self.binding.transaction():
+					self.binding.insertResource(self._resource('cnt3'), 'cnt3')
+				raise ValueError()
+		self.assertTrue(self.binding.hasResource(ri = 'cnt1'))
+		self.assertFalse(self.binding.hasResource(ri = 'cnt3'))
+
+
+	def test_transactionIsolation(self) -> None:
+		"""	Hide the changes of a transaction from other threads until it is committed """
+		inserted = Event()
+		committed = Event()
+		def insert() -> None:
+			with self.binding.transaction():
+				self.binding.insertResource(self._resource('cnt1'), 'cnt1')
+				inserted.set()
+				committed.wait(10)
+		thread = Thread(target = insert)
+		thread.start()
+		self.assertTrue(inserted.wait(10))
+		self.assertFalse(self.binding.hasResource(ri = 'cnt1'))
+		committed.set()
+		thread.join()
+		self.assertTrue(self.binding.hasResource(ri = 'cnt1'))
+
+
+	def test_identifiers(self) -> None:
+		"""	Add, search, replace and delete identifier mappings """
+		self._createTree()
+		self.assertEqual(self.binding.searchIdentifiers(ri = 'cin1'), [ { 'ri': 'cin1', 'rn': 'cin1', 'srn': 'cse-in/cnt1/cin1', 'ty': T.CIN } ])
+		self.assertEqual(self.binding.searchIdentifiers(srn = 'cse-in/unknown'), [])
+		self.assertEqual(len(self.binding.getAllIdentifiers()), 7)
+		self.assertEqual(sorted(i['ri'] for i in self.binding.getAllIdentifiers([ T.CIN, T.CSEBase ])), [ 'cnt1', 'cnt2', 'cnt3' ])
+		with self.assertRaises(ValueError):
+			self.binding.searchIdentifiers()
+
+		self.binding.upsertIdentifier({ 'ri': 'cnt1', 'rn': 'other', 'ty': T.CNT }, {}, 'cnt1', 'cse-in/other')
+		self.assertEqual(self.binding.searchIdentifiers(srn = 'cse-in/other')[0]['ri'], 'cnt1')
+		self.assertEqual(self.binding.searchIdentifiers(srn = 'cse-in/cnt1'), [])
+		self.binding.deleteIdentifier('cnt1', 'cse-in/other')
+		self.assertEqual(self.binding.searchIdentifiers(ri = 'cnt1'), [])
+
+
+	def test_childResources(self) -> None:
+		"""	Keep the order of the child resources, and find instances by their index """
+		self._createTree()
+		self.assertEqual(self.binding.searchChildResourceIDsByParentRIAndType('cnt1'), [ 'cin1', 'cin2', 'cnt2' ])
+		self.assertEqual(self.binding.searchChildResourceIDsByParentRIAndType('cnt1', T.CIN), [ 'cin1', 'cin2' ])
+		self.assertEqual(self.binding.searchChildResourceIDsByParentRIAndType('cnt1', [ T.CNT, T.SUB ]), [ 'cnt2' ])
+
+		# Instances are ordered by their creation time
+		self.assertEqual(self.binding.searchInstanceResourceIDByIndex('cnt1', T.CIN, 0), 'cin2')
+		self.assertEqual(self.binding.searchInstanceResourceIDByIndex('cnt1', T.CIN, 1), 'cin1')
+		self.assertEqual(self.binding.searchInstanceResourceIDByIndex('cnt1', T.CIN, -1), 'cin1')
+		self.assertEqual(self.binding.searchInstanceResourceIDByIndex('cnt1', T.CIN, -2), 'cin2')
+		self.assertIsNone(self.binding.searchInstanceResourceIDByIndex('cnt1', T.CIN, 2))
+
+		# An updated record keeps its position
+		self.binding.upsertChildResource({ 'ri': 'cin1', 'ty': T.CIN, 'pi': 'cnt1', 'ct': '002' }, 'cin1')
+		self.assertEqual(self.binding.searchChildResourceIDsByParentRIAndType('cnt1'), [ 'cin1', 'cin2', 'cnt2' ])
+		self.binding.removeChildResource('cin1', 'cnt1')
+		self.assertEqual(self.binding.searchChildResourceIDsByParentRIAndType('cnt1'), [ 'cin2', 'cnt2' ])
+
+
+	def test_discoverSubtree(self) -> None:
+		"""	Discover the resources of a subtree in depth-first order """
+		self._createTree()
+		self.assertEqual(self._discover(), [ 'cnt1', 'cin1', 'cin2', 'cnt2', 'cin3', 'cnt3' ])
+		self.assertEqual(self._discover(level = 1), [ 'cnt1', 'cnt3' ])
+		self.assertEqual(self._discover('cnt1'), [ 'cin1', 'cin2', 'cnt2', 'cin3' ])
+		self.assertEqual(self._discover(offset = 2), [ 'cnt3' ])				# offset and limit apply to the first level
+		self.assertEqual(self._discover(limit = 1), [ 'cnt1', 'cin1', 'cin2', 'cnt2', 'cin3' ])
+		self.assertEqual(self._discover(ri = 'unknown'), [])
+
+
+	def test_discoverFilter(self) -> None:
+		"""	Pre-filter discovered resources by filter criteria, without excluding matching resources """
+		self._createTree()
+		self.assertEqual(self._discover(ty = [ T.CIN ]), [ 'cin1', 'cin2', 'cin3' ])
+		self.assertEqual(self._discover(lbl = [ 'b' ]), [ 'cnt2', 'cnt3' ])
+		self.assertEqual(self._discover(stb = 4), [ 'cnt1' ])	# like the Dispatcher: st < stb
+		self.assertEqual(self._discover(sts = 6), [ 'cin2' ])	# like the Dispatcher: st > sts
+		self.assertEqual(self._discover(cra = '002'), [ 'cnt1', 'cnt2', 'cin3', 'cnt3' ])
+		self.assertEqual(self._discover(exb = '20270101T000000'), [ 'cnt3' ])
+		self.assertEqual(self._discover(cty = [ 'application/json:0' ]), [ 'cin2' ])
+		self.assertEqual(self._discover(ty = [ T.CIN ], lbl = [ 'a' ], fo = FilterOperation.OR), [ 'cnt1', 'cin1', 'cin2', 'cin3', 'cnt3' ])
+
+		# Attributes are compared as strings. Resources with other attribute types are not excluded.
+		self.assertEqual(self._discover(attributes = { 'cnf': 'text/plain:0' }), [ 'cin1' ])
+		self.assertEqual(self._discover(attributes = { 'st': 5 }), [ 'cnt1', 'cin1', 'cin2' ])
+
+		# Criteria that cannot be expressed in SQL don't exclude resources with the OR operation
+		self.assertEqual(self._discover(ty = [ T.CIN ], attributes = { 'rn': 'cnt*' }, fo = FilterOperation.OR), [ 'cnt1', 'cin1', 'cin2', 'cnt2', 'cin3', 'cnt3' ])
+
+
+	def test_subscriptions(self) -> None:
+		"""	Add, merge, search and remove subscription representations """
+		self.binding.upsertSubscriptionRepr({ 'ri': 'sub1', 'pi': 'cnt1', 'net': [ 1 ] }, 'sub1')
+		self.binding.upsertSubscriptionRepr({ 'ri': 'sub2', 'pi': 'cnt1' }, 'sub2')
+		self.binding.upsertSubscriptionRepr({ 'net': [ 3 ] }, 'sub1')
+		self.assertEqual(self.binding.searchSubscriptionReprs(ri = 'sub1'), [ { 'ri': 'sub1', 'pi': 'cnt1', 'net': [ 3 ] } ])
+		self.assertEqual(sorted(s['ri'] for s in self.binding.searchSubscriptionReprs(pi = 'cnt1')), [ 'sub1', 'sub2' ])
+		self.assertIsNone(self.binding.searchSubscriptionReprs())
+		self.assertEqual(len(self.binding.getAllSubscriptionReprs()), 2)
+		self.assertTrue(self.binding.removeSubscriptionRepr('sub1'))
+		self.assertFalse(self.binding.removeSubscriptionRepr('sub1'))
+		self.assertEqual(self.binding.searchSubscriptionReprs(pi = 'cnt1'), [ { 'ri': 'sub2', 'pi': 'cnt1' } ])
+
+
+	def test_batchNotifications(self) -> None:
+		"""	Add, count, return and remove batch notifications in their order """
+		for n in range(3):
+			self.binding.addBatchNotification({ 'ri': 'sub1', 'nu': 'nu1', 'n': n })
+		self.binding.addBatchNotification({ 'ri': 'sub1', 'nu': 'nu2', 'n': 0 })
+		self.assertEqual(self.binding.countBatchNotifications('sub1', 'nu1'), 3)
+		self.assertEqual([ b['n'] for b in self.binding.getBatchNotifications('sub1', 'nu1') ], [ 0, 1, 2 ])
+		self.assertTrue(self.binding.removeBatchNotifications('sub1', 'nu1'))
+		self.assertEqual(self.binding.countBatchNotifications('sub1', 'nu1'), 0)
+		self.assertEqual(self.binding.countBatchNotifications('sub1', 'nu2'), 1)
+
+
+	def test_actionsSchedulesStatistics(self) -> None:
+		"""	Store actions, schedules, statistics and originators """
+		self.binding.upsertActionRepr({ 'ri': 'actr1', 'subject': 'cnt1', 'apy': 1 }, 'actr1')
+		self.assertTrue(self.binding.updateActionRepr({ 'ri': 'actr1', 'subject': 'cnt2' }))
+		self.assertFalse(self.binding.updateActionRepr({ 'ri': 'unknown' }))
+		self.assertEqual(self.binding.getActionRep('actr1'), { 'ri': 'actr1', 'subject': 'cnt2', 'apy': 1 })
+		self.assertEqual(self.binding.searchActionsReprsForSubject('cnt1'), [])
+		self.assertEqual(len(self.binding.searchActionsReprsForSubject('cnt2')), 1)
+		self.assertTrue(self.binding.removeActionRepr('actr1'))
+		self.assertEqual(self.binding.getAllActionReprs(), [])
+
+		self.binding.upsertSchedule({ 'ri': 'sch1', 'pi': 'cnt1', 'sce': [ '* * * * * * *' ] }, 'sch1')
+		self.assertEqual(self.binding.searchSchedulesForParent('cnt1'), [ self.binding.getSchedule('sch1') ])
+		self.assertTrue(self.binding.removeSchedule('sch1'))
+		self.assertEqual(self.binding.getSchedules(), [])
+
+		self.binding.upsertStatistics({ 'a': 1, 'b': 2 })
+		self.binding.upsertStatistics({ 'b': None, 'c': 3 })
+		self.assertEqual(self.binding.searchStatistics(), { 'a': 1, 'c': 3 })
+		self.binding.purgeStatistics()
+		self.assertEqual(self.binding.searchStatistics(), {})
+
+		self.binding.addOriginator({ 'originator': 'CAE1' }, 'CAE1')
+		self.assertEqual(self.binding.getOriginator('CAE1'), { 'originator': 'CAE1' })
+		self.assertTrue(self.binding.removeOriginator('CAE1'))
+		self.assertIsNone(self.binding.getOriginator('CAE1'))
+
+
+	def test_requests(self) -> None:
+		"""	Remove the oldest requests when the maximum number of requests is exceeded """
+		for n in range(10):
+			self.assertTrue(self.binding.insertRequest({ 'ri': f'cnt{n % 2}', 'n': n }, float(n), 5))
+		self.assertEqual([ r['n'] for r in self.binding.getRequests() ], [ 5, 6, 7, 8, 9 ])
+		self.assertEqual([ r['n'] for r in self.binding.getRequests('cnt1') ], [ 5, 7, 9 ])
+		self.assertFalse(self.binding.insertRequest({ 'n': 10 }, 9.0, 5))	# duplicate timestamp
+
+		self.binding.deleteRequests('cnt1')
+		self.assertEqual(self.binding.requestsCount, 2)
+		self.binding.deleteRequests()
+		self.assertEqual(self.binding.getRequests(), [])
+		self.assertEqual(self.binding.requestsCount, 0)
+
+
+	def test_reopenPurge(self) -> None:
+		"""	Keep the data after the database is reopened, and remove it when it is purged """
+		self._createTree()
+		for n in range(3):
+			self.binding.insertRequest({ 'n': n }, float(n), 10)
+		self.binding.closeDB()
+		self.binding = SQLiteBinding()
+		self.binding.start()
+		self.assertEqual(self.binding.countResources(), 7)
+		self.assertEqual(self.binding.requestsCount, 3)
+		self.assertEqual(self.binding.searchChildResourceIDsByParentRIAndType('cnt1'), [ 'cin1', 'cin2', 'cnt2' ])
+
+		self.binding.purgeDB()
+		self.assertEqual(self.binding.countResources(), 0)
+		self.assertEqual(self.binding.getAllIdentifiers(), [])
+		self.assertEqual(self.binding.requestsCount, 0)
+
+
+	def test_backup(self) -> None:
+		"""	Write a backup that can be opened as a database """
+		self._createTree()
+		backupPath = os.path.join(self.path, 'backup')
+		self.assertTrue(self.binding.backupDB(backupPath))
+		connection = sqlite3.connect(os.path.join(backupPath, os.path.basename(self.binding.file)))
+		try:
+			self.assertEqual(connection.execute('SELECT COUNT(*) FROM resources').fetchone()[0], 7)
+			self.assertEqual(connection.execute('SELECT COUNT(*) FROM identifiers').fetchone()[0], 7)
+		finally:
+			connection.close()
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestSQLiteBinding, [
+
+		'test_resources',
+		'test_insertResources',
+		'test_transaction',
+		'test_transactionIsolation',
+		'test_identifiers',
+		'test_childResources',
+		'test_discoverSubtree',
+		'test_discoverFilter',
+		'test_subscriptions',
+		'test_batchNotifications',
+		'test_actionsSchedulesStatistics',
+		'test_requests',
+		'test_reopenPurge',
+		'test_backup',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
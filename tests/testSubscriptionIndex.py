@@ -0,0 +1,170 @@
+#
+#	testSubscriptionIndex.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the SubscriptionIndex, which holds the subscriptions by their
+#	subscribed-to resources and notification event types
+#
+
+import unittest, sys
+from typing import Any, Optional
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.etc.Types import NotificationEventType as NET, Operation, ResourceTypes as T, JSON
+from acmecse.helpers.SubscriptionIndex import SubscriptionIndex
+from init import *
+
+
+class TestSubscriptionIndex(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.index = SubscriptionIndex()
+
+
+	def _ris(self, subs:tuple) -> list[str]:
+		return [ entry.ri for entry in subs ]
+
+
+	@staticmethod
+	def _sub(ri:str, pi:str = 'cnt1', net:Optional[list[int]] = None, **kwargs:Any) -> JSON:
+		"""	Return the representation of a subscription with further attributes in *kwargs*.
+		"""
+		return { 'ri': ri, 'pi': pi, 'net': net if net is not None else [ NET.resourceUpdate ], 'nus': [ 'http://localhost' ], **kwargs }
+
+
+	def test_add(self) -> None:
+		"""	Index a subscription by its parent resource and event types """
+		self.index.add(self._sub('sub1', net = [ NET.resourceUpdate, NET.createDirectChild ]))
+		self.index.add(self._sub('sub2', net = [ NET.resourceDelete ]))
+		self.index.add(self._sub('sub3', pi = 'cnt2'))
+		self.assertEqual(self._ris(self.index.forParent('cnt1')), [ 'sub1', 'sub2' ])
+		self.assertEqual(self._ris(self.index.forEvent('cnt1', NET.resourceUpdate)), [ 'sub1' ])
+		self.assertEqual(self._ris(self.index.forEvent('cnt1', NET.createDirectChild)), [ 'sub1' ])
+		self.assertEqual(self._ris(self.index.forEvent('cnt1', NET.resourceDelete)), [ 'sub2' ])
+		self.assertEqual(self.index.forEvent('cnt1', NET.deleteDirectChild), ())
+		self.assertEqual(self._ris(self.index.forParent('cnt2')), [ 'sub3' ])
+		self.assertEqual(self.index.forParent('unknown'), ())
+		self.assertEqual(self.index.forOperation('cnt1'), ())
+		self.assertFalse(self.index.hasRetrieveSubscriptions())
+
+
+	def test_addCopiesRepresentation(self) -> None:
+		"""	Don't change the index when the added representation is changed afterwards """
+		sub = self._sub('sub1')
+		self.index.add(sub)
+		sub['pi'] = 'cnt2'
+		sub['net'] = [ NET.resourceDelete ]
+		self.assertEqual(self.index.get('sub1').sub['pi'], 'cnt1')
+		self.assertEqual(self._ris(self.index.forEvent('cnt1', NET.resourceUpdate)), [ 'sub1' ])
+
+
+	def test_updateEventTypes(self) -> None:
+		"""	Move an updated subscription to its new event types """
+		self.index.add(self._sub('sub1', net = [ NET.resourceUpdate, NET.createDirectChild ]))
+		self.index.add(self._sub('sub2', net = [ NET.resourceUpdate ]))
+		self.index.add(self._sub('sub1', net = [ NET.resourceDelete ]))
+		self.assertEqual(self._ris(self.index.forEvent('cnt1', NET.resourceUpdate)), [ 'sub2' ])
+		self.assertEqual(self.index.forEvent('cnt1', NET.createDirectChild), ())
+		self.assertEqual(self._ris(self.index.forEvent('cnt1', NET.resourceDelete)), [ 'sub1' ])
+		self.assertEqual(sorted(self._ris(self.index.forParent('cnt1'))), [ 'sub1', 'sub2' ])
+		self.assertEqual(self.index.get('sub1').net, frozenset([ NET.resourceDelete ]))
+
+
+	def test_updateConditions(self) -> None:
+		"""	Replace the matching criteria of an updated subscription """
+		self.index.add(self._sub('sub1', atr = [ 'lbl' ], chty = [ T.CIN ]))
+		self.assertFalse(self.index.get('sub1').matchAttributes({ 'mni': 10 }))
+		self.assertFalse(self.index.get('sub1').matchChildType(T.CNT))
+		self.index.add(self._sub('sub1', atr = [ 'mni' ]))
+		self.assertTrue(self.index.get('sub1').matchAttributes({ 'mni': 10 }))
+		self.assertTrue(self.index.get('sub1').matchChildType(T.CNT))
+		self.index.add(self._sub('sub1', chty = []))
+		self.assertFalse(self.index.get('sub1').matchChildType(T.CNT))	# An empty chty matches no type
+
+
+	def test_updateOperationMonitor(self) -> None:
+		"""	Remove an updated subscription from the operation subscriptions when its *operationMonitor* is removed """
+		self.index.add(self._sub('sub1', om = [ { 'ops': Operation.RETRIEVE, 'org': 'CAdmin' } ]))
+		self.assertEqual(self._ris(self.index.forOperation('cnt1')), [ 'sub1' ])
+		self.assertTrue(self.index.hasRetrieveSubscriptions())
+		self.assertIsNotNone(self.index.get('sub1').matchOperation(Operation.RETRIEVE, 'CAdmin'))
+		self.assertIsNone(self.index.get('sub1').matchOperation(Operation.RETRIEVE, 'Cother'))
+		self.assertIsNone(self.index.get('sub1').matchOperation(Operation.UPDATE, 'CAdmin'))
+
+		self.index.add(self._sub('sub1'))
+		self.assertEqual(self.index.forOperation('cnt1'), ())
+		self.assertFalse(self.index.hasRetrieveSubscriptions())
+		self.assertEqual(self._ris(self.index.forParent('cnt1')), [ 'sub1' ])
+
+
+	def test_updateParent(self) -> None:
+		"""	Move an updated subscription to its new parent resource """
+		self.index.add(self._sub('sub1'))
+		self.index.add(self._sub('sub1', pi = 'cnt2'))
+		self.assertEqual(self.index.forParent('cnt1'), ())
+		self.assertEqual(self.index.forEvent('cnt1', NET.resourceUpdate), ())
+		self.assertEqual(self._ris(self.index.forEvent('cnt2', NET.resourceUpdate)), [ 'sub1' ])
+		self.assertNotIn('cnt1', self.index._parents)
+
+
+	def test_remove(self) -> None:
+		"""	Remove a subscription from all its index entries """
+		self.index.add(self._sub('sub1', net = [ NET.resourceUpdate, NET.blockingRetrieve ], om = [ { 'ops': Operation.CREATE } ]))
+		self.index.add(self._sub('sub2', net = [ NET.resourceUpdate ]))
+		self.assertTrue(self.index.hasRetrieveSubscriptions())
+		self.index.remove('sub1')
+		self.assertIsNone(self.index.get('sub1'))
+		self.assertEqual(self._ris(self.index.forParent('cnt1')), [ 'sub2' ])
+		self.assertEqual(self._ris(self.index.forEvent('cnt1', NET.resourceUpdate)), [ 'sub2' ])
+		self.assertEqual(self.index.forEvent('cnt1', NET.blockingRetrieve), ())
+		self.assertEqual(self.index.forOperation('cnt1'), ())
+		self.assertFalse(self.index.hasRetrieveSubscriptions())
+
+		self.index.remove('sub2')
+		self.assertEqual(self.index.forParent('cnt1'), ())
+		self.assertEqual(self.index._parents, {})
+
+		self.index.remove('sub2')	# Removing an unknown subscription is ignored
+
+
+	def test_loadClear(self) -> None:
+		"""	Replace the content of the index, and clear it """
+		self.index.add(self._sub('sub1', net = [ NET.blockingRetrieve ]))
+		self.index.load([ self._sub('sub2'), self._sub('sub3', pi = 'cnt2') ])
+		self.assertIsNone(self.index.get('sub1'))
+		self.assertFalse(self.index.hasRetrieveSubscriptions())
+		self.assertEqual(self._ris(self.index.forParent('cnt1')), [ 'sub2' ])
+		self.assertEqual(self._ris(self.index.forParent('cnt2')), [ 'sub3' ])
+		self.index.clear()
+		self.assertIsNone(self.index.get('sub2'))
+		self.assertEqual(self.index.forParent('cnt1'), ())
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestSubscriptionIndex, [
+
+		'test_add',
+		'test_addCopiesRepresentation',
+		'test_updateEventTypes',
+		'test_updateConditions',
+		'test_updateOperationMonitor',
+		'test_updateParent',
+		'test_remove',
+		'test_loadClear',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
@@ -0,0 +1,167 @@
+#
+#	testTinyDBBinding.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for bulk retrievals and transactions of the TinyDB binding
+#
+
+import unittest, sys, shutil, tempfile
+from typing import Any
+from threading import Event, Thread
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.etc import Types
+from acmecse.etc.Types import ResourceTypes as T, JSON
+from acmecse.etc.Constants import RuntimeConstants as RC
+from acmecse.runtime.Configuration import Configuration
+from acmecse.plugins.database.TinyDBBinding import TinyDBBinding
+from init import *
+
+
+class TestTinyDBBinding(unittest.TestCase):
+
+	def setUp(self) -> None:
+		self.path = tempfile.mkdtemp()
+		self.binding:TinyDBBinding = None
+
+
+	def tearDown(self) -> None:
+		if self.binding:
+			self.binding.closeDB()
+		shutil.rmtree(self.path, ignore_errors = True)
+
+
+	def _open(self, storage:str = 'buffered', instanceSegmentSize:int = 0, reopen:bool = False) -> None:
+		"""	Open the binding with a database in the test directory. An instance segment size of 0 disables the instance store.
+		"""
+		Configuration.database_type = 'tinydb'
+		Configuration.database_tinydb_path = self.path
+		Configuration.database_tinydb_cacheSize = 0
+		Configuration.database_tinydb_writeDelay = 0
+		Configuration.database_tinydb_storage = storage
+		Configuration.database_tinydb_compactionThreshold = 100
+		Configuration.database_tinydb_instanceSegmentSize = instanceSegmentSize
+		RC.cseSPIDSlashLess = 'acme.example.com'
+		RC.cseCsiSlashLess = 'id-in'
+		Types._resourceTypesInstanceResourcesSet = [ T.CIN, T.FCI, T.TSI ]	# usually registered by the Factory
+
+		self.binding = TinyDBBinding()
+		self.binding.init()
+		self.binding.start()
+		if not reopen:
+			self.binding.upsertChildResource({ 'ri': 'cse', 'ty': T.CSEBase, 'pi': None, 'ch': [] }, 'cse')
+
+
+	@staticmethod
+	def _resource(ri:str, pi:str = 'cse', ty:int = T.CNT, **kwargs:Any) -> JSON:
+		return { 'ri': ri, 'rn': ri, 'pi': pi, 'ty': ty, 'ct': ri, **kwargs }
+
+
+	def _create(self, resource:JSON) -> None:
+		"""	Create a resource with its identifiers and child resource record, like the storage does.
+		"""
+		ri = resource['ri']
+		srn = f'cse-in/{ri}'
+		with self.binding.transaction():
+			self.binding.insertResource(resource, ri)
+			self.binding.upsertIdentifier({ 'ri': ri, 'rn': resource['rn'], 'srn': srn, 'ty': resource['ty'] }, { 'srn': srn, 'ri': ri }, ri, srn)
+			self.binding.upsertChildResource({ 'ri': ri, 'ty': resource['ty'], 'pi': resource['pi'], 'ch': [], 'ct': resource['ct'] }, ri)
+
+
+	def _searchResourcesByRIs(self, instanceSegmentSize:int) -> None:
+		self._open(instanceSegmentSize = instanceSegmentSize)
+		self._create(self._resource('cnt1'))
+		self._create(self._resource('cnt2'))
+		self._create(self._resource('cin1', 'cnt1', T.CIN))
+		found = self.binding.searchResourcesByRIs([ 'cin1', 'cnt2', 'unknown', 'cnt1' ])
+		self.assertEqual([ r['ri'] for r in found ], [ 'cin1', 'cnt2', 'cnt1' ])
+		self.assertEqual(found[1], self._resource('cnt2'))
+		self.assertEqual(self.binding.searchResourcesByRIs([]), [])
+
+
+	def test_searchResourcesByRIs(self) -> None:
+		"""	Return resources by their resource IDs """
+		self._searchResourcesByRIs(0)
+
+
+	def test_searchResourcesByRIsInstanceStore(self) -> None:
+		"""	Return resources by their resource IDs, including resources in the instance store """
+		self._searchResourcesByRIs(10)
+		self.assertIn('cin1', self.binding.instanceStore)
+
+
+	def test_transactionIsolation(self) -> None:
+		"""	Block other threads until a transaction is finished """
+		self._open()
+		inserted = Event()
+		release = Event()
+		found:list[Any] = []
+
+		def create() -> None:
+			with self.binding.transaction():
+				self.binding.insertResource(self._resource('cnt1'), 'cnt1')
+				inserted.set()
+				release.wait(10)
+				self.binding.upsertIdentifier({ 'ri': 'cnt1', 'rn': 'cnt1', 'srn': 'cse-in/cnt1', 'ty': T.CNT }, { 'srn': 'cse-in/cnt1', 'ri': 'cnt1' }, 'cnt1', 'cse-in/cnt1')
+
+		def read() -> None:
+			found.append(self.binding.searchResources(ri = 'cnt1'))
+			found.append(self.binding.searchIdentifiers(ri = 'cnt1'))
+
+		creator = Thread(target = create)
+		creator.start()
+		self.assertTrue(inserted.wait(10))
+		reader = Thread(target = read)
+		reader.start()
+		reader.join(0.2)
+		self.assertTrue(reader.is_alive())		# The reader waits for the transaction
+		release.set()
+		creator.join()
+		reader.join()
+		self.assertEqual([ r['ri'] for r in found[0] ], [ 'cnt1' ])
+		self.assertEqual([ i['ri'] for i in found[1] ], [ 'cnt1' ])
+
+
+	def test_transactionBatch(self) -> None:
+		"""	Write the changes of a transaction to the journals together when the transaction ends """
+		self._open('journal')
+		storage = self.binding.dbResources.storage
+		with self.binding.transaction():
+			self._create(self._resource('cnt1'))		# a nested transaction
+			self.binding.updateResource({ 'lbl': [ 'a' ] }, 'cnt1')
+			self.assertEqual([ k for k in storage._pending if k[1] == 'cnt1' ], [])	# type:ignore[attr-defined]
+			self.assertIn('cnt1', [ k[1] for k in storage._batch ])	# type:ignore[attr-defined]
+		self.assertEqual(storage._batch, {})		# type:ignore[attr-defined]
+
+		# All changes are persisted
+		self.binding.closeDB()
+		self._open('journal', reopen = True)
+		self.assertEqual(self.binding.searchResources(ri = 'cnt1'), [ self._resource('cnt1', lbl = [ 'a' ]) ])
+		self.assertEqual(self.binding.searchIdentifiers(srn = 'cse-in/cnt1')[0]['ri'], 'cnt1')
+		self.assertEqual(self.binding.searchChildResourceIDsByParentRIAndType('cse'), [ 'cnt1' ])
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestTinyDBBinding, [
+
+		'test_searchResourcesByRIs',
+		'test_searchResourcesByRIsInstanceStore',
+		'test_transactionIsolation',
+		'test_transactionBatch',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
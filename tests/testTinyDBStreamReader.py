@@ -0,0 +1,115 @@
+#
+#	testTinyDBStreamReader.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Unit tests for the incremental TinyDB file reader. Very small chunk sizes are
+#	used so that values are split across chunk boundaries.
+#
+
+import unittest, sys, json, io, gc
+from typing import Any
+if '..' not in sys.path:
+	sys.path.append('..')
+from acmecse.helpers.TinyDBStreamReader import TinyDBStreamReader
+from init import *
+
+
+_chunkSizes = ( 1, 2, 3, 7, 16, 64, 1024 * 1024 )
+""" The chunk sizes to test. """
+
+
+_database:dict[str, dict[str, Any]] = {
+	'resources': { str(i): { 'ri': f'cnt{i}', 'ty': 3, 'cni': i * 1000, 'st': 1.5e3, 'lbl': [ 'a', 'b' ], 'acpi': None, 'mni': True } for i in range(1, 30) },
+	'empty': {},
+	'escaped': { 'a"b': { 'x\\y': 'z' }, 'ü\n': [ 1, [ 2, { } ] ] },
+	'values': { '1': 123456789, '2': -0.5, '3': 'text', '4': True, '5': False, '6': None, '7': [], '8': {} },
+}
+""" A database with different kinds of tables and documents. """
+
+
+class TestTinyDBStreamReader(unittest.TestCase):
+
+	def _read(self, text:str, chunkSize:int) -> dict[str, dict[str, Any]]:
+		return TinyDBStreamReader(io.StringIO(text), chunkSize).read()
+
+
+	def test_read(self) -> None:
+		"""	Read a compact database file with different chunk sizes """
+		text = json.dumps(_database)
+		for chunkSize in _chunkSizes:
+			self.assertEqual(self._read(text, chunkSize), _database, chunkSize)
+
+
+	def test_readWhitespace(self) -> None:
+		"""	Read an indented database file with different chunk sizes """
+		text = ' \n' + json.dumps(_database, indent = '\t', ensure_ascii = False) + '\r\n '
+		for chunkSize in _chunkSizes:
+			self.assertEqual(self._read(text, chunkSize), _database, chunkSize)
+
+
+	def test_readEmpty(self) -> None:
+		"""	Read a database file without tables """
+		for text in ( '{}', ' { } ', '{\n}\n' ):
+			for chunkSize in _chunkSizes:
+				self.assertEqual(self._read(text, chunkSize), {}, (text, chunkSize))
+
+
+	def test_readFromPosition(self) -> None:
+		"""	Read from the current position of the file """
+		file = io.StringIO('xyz{"t": {"1": {"a": 1}}}')
+		file.read(3)
+		self.assertEqual(TinyDBStreamReader(file, 2).read(), { 't': { '1': { 'a': 1 } } })
+
+
+	def test_invalid(self) -> None:
+		"""	Raise a JSONDecodeError for invalid database files """
+		for text in ( '', '[]', '{', '{"t"}', '{"t": 1}', '{"t": {"1": }}', '{"t": {"1": {"a": 1}', '{"t": {"1": {"a": 1}}} x',
+					  '{"t": {"1": {"a": 1} "2": {}}}', '{"t": {"1": {"a": tru}}}', '{"t": {1: {}}}' ):
+			for chunkSize in _chunkSizes:
+				with self.assertRaises(json.JSONDecodeError, msg = (text, chunkSize)):
+					self._read(text, chunkSize)
+
+
+	def test_garbageCollector(self) -> None:
+		"""	Restore the state of the garbage collector """
+		self.assertTrue(gc.isenabled())
+		self._read('{"t": {}}', 2)
+		self.assertTrue(gc.isenabled())
+		with self.assertRaises(json.JSONDecodeError):
+			self._read('{"t": ', 2)
+		self.assertTrue(gc.isenabled())
+
+		gc.disable()
+		try:
+			self._read('{"t": {}}', 2)
+			self.assertFalse(gc.isenabled())
+		finally:
+			gc.enable()
+
+
+def run(testFailFast:bool) -> TestResult:
+
+	# Assign tests
+	suite = unittest.TestSuite()
+	addTests(suite, TestTinyDBStreamReader, [
+
+		'test_read',
+		'test_readWhitespace',
+		'test_readEmpty',
+		'test_readFromPosition',
+		'test_invalid',
+		'test_garbageCollector',
+
+	])
+
+	# Run the tests
+	result = unittest.TextTestRunner(verbosity = testVerbosity, failfast = testFailFast).run(suite)
+	printResult(result)
+	return result.testsRun, len(result.errors + result.failures), len(result.skipped), getSleepTimeCount()
+
+
+if __name__ == '__main__':
+	r, errors, s, t = run(True)
+	sys.exit(errors)
@@ -63,6 +63,21 @@ class TestUpperTester(unittest.TestCase):
 		self.assertTrue(CSEStatus.has(r.headers[UTRSP]))
 
 
+	@unittest.skipIf(noCSE, 'No CSEBase')
+	def test_retrieveImportedResources(self) -> None:
+		""" Retrieve the resources that are imported together in one batch during startup and reset """
+		for rn in [ 'acpCreateRootResources', 'acpRetrieveCSEBase', ORIGINATOR, 'defaultNTP' ]:
+			r, rsc = RETRIEVE(f'{cseURL}/{rn}', ORIGINATOR)
+			self.assertEqual(rsc, RC.OK, r)
+
+		# The resources are child resources of the <CSEBase>
+		r, rsc = RETRIEVE(f'{cseURL}?rcn=6', ORIGINATOR)
+		self.assertEqual(rsc, RC.OK, r)
+		self.assertIsNotNone(rrf := findXPath(r, 'm2m:rrl/rrf'), r)
+		for rn in [ 'acpCreateRootResources', 'acpRetrieveCSEBase', ORIGINATOR, 'defaultNTP' ]:
+			self.assertIn(rn, [ ref['nm'] for ref in rrf ])
+
+
 	@unittest.skipIf(noCSE, 'No CSEBase')
 	def test_performReset(self) -> None:
 		""" Perform a CSE reset via UT interface """
@@ -144,7 +159,9 @@ def run(testFailFast:bool) -> TestResult:
 	addTests(suite, TestUpperTester, [
 	
 		'test_checkStatus',
+		'test_retrieveImportedResources',
 		'test_performReset',
+		'test_retrieveImportedResources',
 		'test_enableShortRequestExpiration',
 		'test_disableShortRequestExpiration',
 		'test_enableShortResourceExpiration',
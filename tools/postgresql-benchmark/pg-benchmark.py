@@ -0,0 +1,231 @@
+#
+#	pg-benchmark.py
+#
+#	(c) 2026 by Andreas Kraft
+#	License: BSD 3-Clause License. See the LICENSE file for further details.
+#
+#	Tool to compare the query plans of the ACME CSE's PostgreSQL tables before and after the schema migrations
+#
+
+from __future__ import annotations
+
+import pathlib, os, sys
+parent = pathlib.Path(os.path.abspath(os.path.dirname(__file__))).parent.parent
+sys.path.append(f'{parent}')
+
+import argparse
+from typing import Any
+
+from psycopg2 import connect
+from psycopg2.extensions import connection as PsyConnection
+
+from acmecse.plugins.database.PostgreSQLBinding import PostgreSQLBinding
+
+from rich.console import Console
+from rich.table import Table
+console = Console()
+print = console.print
+
+_defaultSchema = 'acmebenchmark'
+""" Name of the scratch schema. """
+
+
+def createBinding(schema:str) -> PostgreSQLBinding:
+	"""	Create a PostgreSQLBinding object without connecting to the database.
+
+		Only the table creation and upgrade methods are used, so the binding doesn't need to be configured.
+
+		Args:
+			schema: The name of the database schema.
+
+		Return:
+			The PostgreSQLBinding object.
+	"""
+	binding = PostgreSQLBinding.__new__(PostgreSQLBinding)
+	binding.dbSchema = schema
+	return binding
+
+
+def fillTables(connection:PsyConnection, b:PostgreSQLBinding, aes:int, containers:int, instances:int) -> None:
+	"""	Fill the tables with synthetic resources and records.
+
+		Args:
+			connection: The database connection.
+			b: The PostgreSQLBinding object, used for the table names.
+			aes: The number of AE resources.
+			containers: The number of containers per AE.
+			instances: The number of content instances per container.
+	"""
+	with connection.cursor() as cursor:
+		cursor.execute(f'''
+			INSERT INTO {b.tableResources} (ri, resource)
+				SELECT 'ae' || a, jsonb_build_object('ri', 'ae' || a, 'pi', 'cse', 'ty', 2, 'aei', 'Cae' || a,
+													 'ct', '20260101T000000,000000', 'et', '20300101T000000,000000')
+				FROM generate_series(1, %(aes)s) a;
+			INSERT INTO {b.tableResources} (ri, resource)
+				SELECT 'cnt' || a || '_' || c, jsonb_build_object('ri', 'cnt' || a || '_' || c, 'pi', 'ae' || a, 'ty', 3,
+																  'lbl', jsonb_build_array('label' || c),
+																  'ct', '20260101T000000,000000', 'et', '20300101T000000,000000')
+				FROM generate_series(1, %(aes)s) a, generate_series(1, %(containers)s) c;
+			INSERT INTO {b.tableResources} (ri, resource)
+				SELECT 'cin' || a || '_' || c || '_' || i, jsonb_build_object('ri', 'cin' || a || '_' || c || '_' || i, 'pi', 'cnt' || a || '_' || c, 'ty', 4,
+																			  'ct', to_char(timestamp '2026-01-01' + i * interval '1 second', 'YYYYMMDD"T"HH24MISS",000000"'),
+																			  'et', to_char(timestamp '2027-01-01' + i * interval '1 second', 'YYYYMMDD"T"HH24MISS",000000"'),
+																			  'con', 'value' || i)
+				FROM generate_series(1, %(aes)s) a, generate_series(1, %(containers)s) c, generate_series(1, %(instances)s) i;
+
+			INSERT INTO {b.tableChildResources} (pi, childRi, childTy, childCt)
+				SELECT resource->>'pi', ri, (resource->>'ty')::int, resource->>'ct' FROM {b.tableResources} ORDER BY ri;
+
+			INSERT INTO {b.tableSubscriptions} (ri, subscription)
+				SELECT 'sub' || s, jsonb_build_object('ri', 'sub' || s, 'pi', 'cnt' || s || '_1', 'nus', jsonb_build_array('http://localhost:9999'))
+				FROM generate_series(1, %(aes)s) s;
+			INSERT INTO {b.tableBatchNotifications} (batch)
+				SELECT jsonb_build_object('ri', 'sub' || (n %% %(aes)s + 1), 'nu', 'http://localhost:' || (9000 + n %% 10), 'tstamp', n)
+				FROM generate_series(1, %(instances)s * 10) n;
+			INSERT INTO {b.tableActions} (ri, action)
+				SELECT 'act' || a, jsonb_build_object('ri', 'act' || a, 'subject', 'cnt' || a || '_1')
+				FROM generate_series(1, %(aes)s) a;
+			INSERT INTO {b.tableRequests} (ts, request)
+				SELECT to_char(n, 'FM0000000000'), jsonb_build_object('ri', 'cnt' || (n %% %(aes)s + 1) || '_1', 'op', 2)
+				FROM generate_series(1, %(instances)s * 10) n;
+		''', { 'aes': aes, 'containers': containers, 'instances': instances })
+		cursor.execute('ANALYZE')
+
+
+def benchmarkQueries(b:PostgreSQLBinding) -> list[tuple[str, str, tuple[Any, ...]]]:
+	"""	Return the queries to benchmark. They are the same as the binding's prepared statements.
+
+		Args:
+			b: The PostgreSQLBinding object, used for the table names.
+
+		Return:
+			A list of (name, SQL, arguments) tuples.
+	"""
+	return [
+		('getResourceByAEI', f"SELECT resource FROM {b.tableResources} WHERE resource->>'aei' = %s", ('Cae1',)),
+		('getResourcesByPI', f"SELECT resource FROM {b.tableResources} WHERE resource->>'pi' = %s", ('cnt1_1',)),
+		('getResourcesByPIandTY', f"SELECT resource FROM {b.tableResources} WHERE resource->>'pi' = %s AND resource->>'ty' = %s", ('ae1', '3')),
+		('countResourcesByTY', f"SELECT COUNT(*) FROM {b.tableResources} WHERE resource->>'ty' = %s", ('2',)),
+		('getExpiredResources', f"SELECT resource FROM {b.tableResources} WHERE resource->>'et' < %s ORDER BY resource->>'et' LIMIT %s", ('20270101T000010,000000', 100)),
+		('discovery by label', f"SELECT ri FROM {b.tableResources} WHERE resource->'lbl' ?| %s", (['label1'],)),
+		('getChildResourcesByPI', f"SELECT childRi, childTy FROM {b.tableChildResources} WHERE pi = %s", ('cnt1_1',)),
+		('getInstanceByIndexDesc', f"SELECT childRi FROM {b.tableChildResources} WHERE pi = %s AND childTy = %s ORDER BY childCt DESC, id DESC OFFSET %s LIMIT 1", ('cnt1_1', 4, 0)),
+		('getSubscriptionByPI', f"SELECT subscription FROM {b.tableSubscriptions} WHERE subscription->>'pi' = %s", ('cnt1_1',)),
+		('countBatchNotifications', f"SELECT COUNT(*) FROM {b.tableBatchNotifications} WHERE batch->>'ri' = %s AND batch->>'nu' = %s", ('sub1', 'http://localhost:9001')),
+		('getActionBySubject', f"SELECT action FROM {b.tableActions} WHERE action->>'subject' = %s", ('cnt1_1',)),
+		('getRequestsByRI', f"SELECT request FROM {b.tableRequests} WHERE request->>'ri' = %s", ('cnt1_1',)),
+	]
+
+
+def explainQueries(connection:PsyConnection, b:PostgreSQLBinding, verbose:bool) -> dict[str, tuple[str, float]]:
+	"""	Run EXPLAIN ANALYZE for all benchmark queries.
+
+		Args:
+			connection: The database connection.
+			b: The PostgreSQLBinding object, used for the table names.
+			verbose: Print the full query plans.
+
+		Return:
+			A dictionary that maps the query names to the top node type of the plan and the execution time in ms.
+	"""
+	result:dict[str, tuple[str, float]] = {}
+	with connection.cursor() as cursor:
+		for name, sql, args in benchmarkQueries(b):
+			cursor.execute(f'EXPLAIN (ANALYZE, FORMAT JSON) {sql}', args)
+			explain = cursor.fetchone()[0][0]
+			result[name] = (scanNodes(explain['Plan']), explain['Execution Time'])
+			if verbose:
+				cursor.execute(f'EXPLAIN (ANALYZE, COSTS OFF) {sql}', args)
+				print(f'[b]{name}[/b]')
+				print('\n'.join(row[0] for row in cursor.fetchall()), highlight = False)
+				print()
+	return result
+
+
+def scanNodes(plan:dict) -> str:
+	"""	Collect the scan nodes of a query plan.
+
+		Args:
+			plan: A plan node from the JSON output of EXPLAIN.
+
+		Return:
+			The scan node types and index names, separated by commas.
+	"""
+	nodes = []
+	if 'Scan' in plan['Node Type']:
+		nodes.append(f"{plan['Node Type']} ({plan['Index Name']})" if 'Index Name' in plan else plan['Node Type'])
+	for child in plan.get('Plans', []):
+		nodes.append(scanNodes(child))
+	return ', '.join(nodes)
+
+
+# App start
+
+if __name__ == '__main__':
+
+	# Parse command line arguments
+	parser = argparse.ArgumentParser()
+	parser.add_argument('--host', dest='host', metavar='hostname', default='localhost', help='hostname of the PostgreSQL server (default: localhost)')
+	parser.add_argument('--port', dest='port', metavar='port', type=int, default=5432, help='port of the PostgreSQL server (default: 5432)')
+	parser.add_argument('--user', '-u', dest='user', metavar='role', default=None, help='role to connect to the database')
+	parser.add_argument('--password', '-p', dest='password', metavar='password', default=None, help='password to connect to the database')
+	parser.add_argument('--database', '-db', dest='database', metavar='name', default='acmecse', help='name of the database (default: acmecse)')
+	parser.add_argument('--schema', dest='schema', metavar='name', default=_defaultSchema, help=f'name of the scratch schema. It is dropped when the benchmark finishes (default: {_defaultSchema})')
+	parser.add_argument('--aes', dest='aes', metavar='number', type=int, default=100, help='number of AE resources (default: 100)')
+	parser.add_argument('--containers', dest='containers', metavar='number', type=int, default=10, help='number of containers per AE (default: 10)')
+	parser.add_argument('--instances', dest='instances', metavar='number', type=int, default=100, help='number of content instances per container (default: 100)')
+	parser.add_argument('--keep', dest='keep', action='store_true', help='don\'t drop the scratch schema when the benchmark finishes')
+	parser.add_argument('--verbose', '-v', dest='verbose', action='store_true', help='print the full query plans')
+	args = parser.parse_args()
+
+	binding = createBinding(args.schema)
+	connection = connect(host = args.host,
+						 port = args.port,
+						 user = args.user,
+						 password = args.password,
+						 dbname = args.database,
+						 options = f'-c search_path={args.schema}')
+	connection.autocommit = True
+
+	try:
+		with connection.cursor() as cursor:
+			cursor.execute(f'DROP SCHEMA IF EXISTS {args.schema} CASCADE')
+
+		# Create the tables as an older CSE version did, without the migrations
+		print(f'Creating tables in schema [b]{args.schema}[/b]')
+		binding.createTables(connection)
+		print(f'Filling tables with {args.aes * args.containers * (args.instances + 1) + args.aes} resources')
+		fillTables(connection, binding, args.aes, args.containers, args.instances)
+
+		if args.verbose:
+			print('\n[u]Query plans before the migrations[/u]\n')
+		before = explainQueries(connection, binding, args.verbose)
+
+		print('Applying the schema migrations')
+		binding.upgradeTables(connection)
+		with connection.cursor() as cursor:
+			cursor.execute('ANALYZE')
+			cursor.execute(f'SELECT version, description FROM {binding.tableSchemaVersions} ORDER BY version')
+			for version, description in cursor.fetchall():
+				print(f'  {version}: {description}')
+
+		if args.verbose:
+			print('\n[u]Query plans after the migrations[/u]\n')
+		after = explainQueries(connection, binding, args.verbose)
+
+		table = Table()
+		table.add_column('Query')
+		table.add_column('Before')
+		table.add_column('ms', justify = 'right')
+		table.add_column('After')
+		table.add_column('ms', justify = 'right')
+		for name in before:
+			table.add_row(name, before[name][0], f'{before[name][1]:.3f}', after[name][0], f'{after[name][1]:.3f}')
+		print(table)
+
+	finally:
+		if not args.keep:
+			with connection.cursor() as cursor:
+				cursor.execute(f'DROP SCHEMA IF EXISTS {args.schema} CASCADE')
+		connection.close()